@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Migration Dry-Run Planner
+Purpose: Size a migration step from PostgreSQL estimates instead of running its extract
+Used by: --dry-run mode of the phase 1-3 Python scripts
+
+Rows come from EXPLAIN (FORMAT JSON) of the step's extract query, and row
+width from the same query run over a TABLESAMPLE of its source tables (a few
+thousand rows at most), so nothing is materialized. From those the planner
+derives transfer bytes, batch counts, target-store memory and wall time. Wall
+time uses rows/second measured by previous --execute runs (see
+record_throughput) and falls back to conservative defaults.
+
+Usage:
+    planner = DryRunPlanner(pg_conn)
+    estimate = planner.plan('neo4j_nodes', EXTRACT_SQL, tables=['hub3_origin.tractors'],
+                            target_bytes_per_row=neo4j_bytes(nodes=1, properties=22))
+    ...
+    planner.record_throughput('neo4j_nodes', rows, seconds)   # after a real run
+"""
+
+import os
+import re
+import json
+import math
+import fcntl
+import logging
+import tempfile
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Calibrated throughput store (override with MIGRATION_THROUGHPUT_PATH)
+DEFAULT_THROUGHPUT_PATH = os.getenv('MIGRATION_THROUGHPUT_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.throughput.json'
+)
+
+# Rows/second used until a step has been measured
+DEFAULT_THROUGHPUT = {
+    'postgres_load': 5000,
+    'neo4j_nodes': 1000,
+    'neo4j_relationships': 800,
+    'qdrant_vectors': 2000,
+}
+
+# Rows read per table when measuring row width
+SAMPLE_ROWS = 2000
+
+# Weight of the newest measurement when updating calibrated throughput
+CALIBRATION_WEIGHT = 0.3
+
+# Neo4j store record sizes (bytes): node, relationship, property record
+NEO4J_NODE_BYTES = 15
+NEO4J_RELATIONSHIP_BYTES = 34
+NEO4J_PROPERTY_BYTES = 41
+
+# Qdrant sizing rule: vectors * dimension * 4 bytes * 1.5 (HNSW graph + overhead)
+QDRANT_VECTOR_OVERHEAD = 1.5
+
+
+def neo4j_bytes(nodes: int = 0, relationships: int = 0, properties: int = 0) -> int:
+    """Neo4j store size for the given record counts"""
+    return (nodes * NEO4J_NODE_BYTES
+            + relationships * NEO4J_RELATIONSHIP_BYTES
+            + properties * NEO4J_PROPERTY_BYTES)
+
+
+def qdrant_bytes(points: int = 1, dimension: int = 1536, payload_bytes: int = 0) -> int:
+    """Qdrant RAM for float32 vectors plus payload"""
+    return int(points * (dimension * 4 * QDRANT_VECTOR_OVERHEAD + payload_bytes))
+
+
+def format_bytes(size: float) -> str:
+    """Human readable byte count"""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_duration(seconds: float) -> str:
+    """Human readable duration"""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+@dataclass
+class StepEstimate:
+    """Predicted size and cost of one migration step"""
+    step: str
+    rows: int
+    row_width: int
+    batch_size: int
+    target_bytes_per_row: int
+    rows_per_second: float
+    calibrated: bool
+
+    @property
+    def transfer_bytes(self) -> int:
+        return self.rows * self.row_width
+
+    @property
+    def batches(self) -> int:
+        return math.ceil(self.rows / self.batch_size) if self.rows else 0
+
+    @property
+    def target_bytes(self) -> int:
+        return self.rows * self.target_bytes_per_row
+
+    @property
+    def seconds(self) -> float:
+        return self.rows / self.rows_per_second if self.rows_per_second else 0.0
+
+
+class DryRunPlanner:
+    """Estimate migration steps from planner statistics and sampled row widths"""
+
+    def __init__(self, conn, throughput_path: Optional[str] = DEFAULT_THROUGHPUT_PATH):
+        self.conn = conn
+        self.throughput_path = throughput_path
+        self.throughput = self._load_throughput()
+        self.estimates: List[StepEstimate] = []
+
+    def _load_throughput(self) -> Dict[str, Dict]:
+        if not self.throughput_path or not os.path.exists(self.throughput_path):
+            return {}
+        try:
+            with open(self.throughput_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  Could not read throughput calibration {self.throughput_path}: {e}")
+            return {}
+
+    def explain(self, sql: str, params: Optional[Sequence] = None) -> Dict:
+        """Top plan node of EXPLAIN (FORMAT JSON) - estimates only, nothing executed"""
+        with self.conn.cursor() as cur:
+            cur.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cur.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']
+
+    def table_rows(self, table: str) -> float:
+        """pg_class.reltuples (-1 or 0 when the table was never analyzed)"""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+            row = cur.fetchone()
+        return row[0] if row else 0
+
+    def sample_width(self, sql: str, tables: Sequence[str],
+                     params: Optional[Sequence] = None) -> Optional[int]:
+        """
+        Average pg_column_size of the extract's output rows, measured on a
+        TABLESAMPLE of each source table (falls back to None if sampling fails)
+        """
+        # Output order does not change row width; skip the sort
+        sampled = re.sub(r'\s+ORDER\s+BY\s+[\w\s.,]+$', '', sql.strip(), flags=re.IGNORECASE)
+        for table in tables:
+            reltuples = self.table_rows(table)
+            percent = min(100.0, max(0.01, SAMPLE_ROWS / reltuples * 100)) if reltuples > 0 else 100.0
+            # TABLESAMPLE goes after the table alias, if there is one
+            sampled = re.sub(
+                rf"\bFROM\s+{re.escape(table)}(\s+(?!(?:WHERE|JOIN|ORDER|GROUP|LIMIT|UNION)\b)\w+)?\b",
+                lambda m: f"FROM {table}{m.group(1) or ''} TABLESAMPLE SYSTEM ({percent:.4f})",
+                sampled,
+                flags=re.IGNORECASE
+            )
+
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(f"""
+                    SELECT avg(pg_column_size(s.*))
+                    FROM ({sampled} LIMIT {SAMPLE_ROWS * len(tables)}) s
+                """, params)
+                width = cur.fetchone()[0]
+            return int(width) if width else None
+        except Exception as e:
+            self.conn.rollback()
+            logger.warning(f"⚠️  Row width sampling failed, using planner width: {e}")
+            return None
+
+    def rows_per_second(self, step: str) -> Tuple[float, bool]:
+        """Calibrated throughput for a step, else the default"""
+        calibrated = self.throughput.get(step, {}).get('rows_per_second')
+        if calibrated:
+            return calibrated, True
+        return DEFAULT_THROUGHPUT.get(step, 1000), False
+
+    def plan(self, step: str, sql: str, tables: Sequence[str] = (),
+             params: Optional[Sequence] = None, batch_size: int = 1,
+             target_bytes_per_row: Union[int, Callable[[int], int]] = 0,
+             label: Optional[str] = None) -> StepEstimate:
+        """
+        Estimate one extract + load step and log the result
+        target_bytes_per_row may be a function of the measured row width
+        """
+        top = self.explain(sql, params)
+        width = self.sample_width(sql, tables, params) if tables else None
+        width = width or int(top['Plan Width'])
+        if callable(target_bytes_per_row):
+            target_bytes_per_row = target_bytes_per_row(width)
+        rows_per_second, calibrated = self.rows_per_second(step)
+
+        estimate = StepEstimate(
+            step=step,
+            rows=int(top['Plan Rows']),
+            row_width=width,
+            batch_size=max(1, batch_size),
+            target_bytes_per_row=target_bytes_per_row,
+            rows_per_second=rows_per_second,
+            calibrated=calibrated
+        )
+        self.estimates.append(estimate)
+        self.log_estimate(estimate, label or step)
+        return estimate
+
+    def log_estimate(self, estimate: StepEstimate, label: str):
+        """Log a single estimate"""
+        logger.info(f"🔍 DRY RUN PLAN: {label}")
+        logger.info(f"   Rows (estimated):  ~{estimate.rows:,}")
+        logger.info(f"   Row width:         {estimate.row_width} bytes "
+                    f"(~{format_bytes(estimate.transfer_bytes)} to transfer)")
+        logger.info(f"   Batches:           {estimate.batches:,} x {estimate.batch_size}")
+        if estimate.target_bytes_per_row:
+            logger.info(f"   Target memory:     ~{format_bytes(estimate.target_bytes)}")
+        logger.info(f"   Wall time:         ~{format_duration(estimate.seconds)} "
+                    f"at {estimate.rows_per_second:,.0f} rows/s "
+                    f"({'calibrated' if estimate.calibrated else 'default'})")
+
+    def log_summary(self):
+        """Log totals across every step planned so far"""
+        if not self.estimates:
+            return
+        logger.info("📊 DRY RUN TOTALS: "
+                    f"~{sum(e.rows for e in self.estimates):,} rows, "
+                    f"~{format_bytes(sum(e.transfer_bytes for e in self.estimates))} transferred, "
+                    f"~{format_bytes(sum(e.target_bytes for e in self.estimates))} target memory, "
+                    f"~{format_duration(sum(e.seconds for e in self.estimates))}")
+
+    def record_throughput(self, step: str, rows: int, seconds: float):
+        """
+        Fold a measured --execute run into the calibrated rows/second for a step
+
+        run_migration.py runs steps as parallel processes that share the file,
+        so the read-merge-replace holds an exclusive lock ({path}.lock) and
+        writes through a unique temp file in the same directory.
+        """
+        if not self.throughput_path or rows <= 0 or seconds <= 0:
+            return
+        measured = rows / seconds
+
+        tmp_path = None
+        try:
+            with open(f"{self.throughput_path}.lock", 'w') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                # Re-read under the lock: other steps may have written since __init__
+                self.throughput = self._load_throughput()
+                entry = self.throughput.get(step, {})
+                previous = entry.get('rows_per_second')
+                entry['rows_per_second'] = round(
+                    measured if not previous
+                    else CALIBRATION_WEIGHT * measured + (1 - CALIBRATION_WEIGHT) * previous, 2
+                )
+                entry['runs'] = entry.get('runs', 0) + 1
+                self.throughput[step] = entry
+
+                fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.throughput_path) + '.',
+                                                suffix='.tmp',
+                                                dir=os.path.dirname(os.path.abspath(self.throughput_path)))
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(self.throughput, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.throughput_path)
+                tmp_path = None
+        except OSError as e:
+            if tmp_path:
+                os.unlink(tmp_path)
+            logger.warning(f"⚠️  Could not write throughput calibration {self.throughput_path}: {e}")
@@ -11,6 +11,7 @@ Usage:
 
 import os
 import sys
+import time
 import logging
 import psycopg2
 from psycopg2.extras import execute_batch
@@ -19,6 +20,11 @@ from datetime import datetime
 from dotenv import load_dotenv
 import argparse
 
+from geocoding import Geocoder
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dry_run_planner import DryRunPlanner
+
 # Load environment variables
 load_dotenv()
 
@@ -38,6 +44,21 @@ DB_CONFIG = {
     'password': os.getenv('POSTGRES_PASSWORD', 'apexmemory2024')
 }
 
+# Rows per execute_batch round trip
+PAGE_SIZE = 100
+
+# Extract queries (old system)
+TRUCK_EXTRACT_SQL = """
+    SELECT
+        truck_id, vin, make, model, year, status,
+        current_miles, location,
+        purchase_date, purchase_price, current_value,
+        insurance_policy_number, insurance_provider, insurance_expiry_date,
+        created_at, updated_at
+    FROM trucks
+    WHERE active = true
+"""
+
 class DataTransformer:
     """Transforms data from old schema to new 6-hub schema"""
 
@@ -45,6 +66,8 @@ class DataTransformer:
         self.dry_run = dry_run
         self.conn = None
         self.old_conn = None
+        self.planner = None
+        self.geocoder = Geocoder()
         self.stats = {
             'transformed': 0,
             'skipped': 0,
@@ -63,6 +86,7 @@ class DataTransformer:
             old_db_config['database'] = os.getenv('OLD_POSTGRES_DB', 'apex_memory_old')
             try:
                 self.old_conn = psycopg2.connect(**old_db_config)
+                self.planner = DryRunPlanner(self.old_conn)
                 logger.info(f"✅ Connected to old database: {old_db_config['database']}")
             except psycopg2.OperationalError:
                 logger.warning("⚠️  Old database not found - will use sample data instead")
@@ -100,20 +124,10 @@ class DataTransformer:
     def geocode_location(self, location_text: str) -> Optional[Tuple[float, float]]:
         """
         Convert location text to GPS coordinates
-        In production, use actual geocoding API (Google Maps, Mapbox, etc.)
+        Backed by the cached Geocoder (see geocoding.py); call
+        self.geocoder.resolve_all() first to batch an entire extract
         """
-        # Simple lookup table for demo
-        locations = {
-            "Las Vegas, NV": (36.1699, -115.1398),
-            "Los Angeles, CA": (34.0522, -118.2437),
-            "Phoenix, AZ": (33.4484, -112.0740),
-            "Salt Lake City, UT": (40.7608, -111.8910)
-        }
-        coords = locations.get(location_text)
-        if coords:
-            return coords
-        logger.warning(f"⚠️  Unknown location: {location_text}, using default (0, 0)")
-        return (0.0, 0.0)
+        return self.geocoder.lookup(location_text)
 
     def transform_tractors(self) -> int:
         """Transform trucks from old schema to hub3_origin.tractors"""
@@ -123,22 +137,27 @@ class DataTransformer:
             logger.info("📝 No old database - generating sample data")
             return self._generate_sample_tractors()
 
+        if self.dry_run:
+            # Estimate from planner statistics instead of extracting every row
+            estimate = self.planner.plan(
+                'postgres_load', TRUCK_EXTRACT_SQL, tables=['trucks'],
+                batch_size=PAGE_SIZE, target_bytes_per_row=lambda width: width,
+                label='tractors'
+            )
+            self.stats['transformed'] += estimate.rows
+            return estimate.rows
+
+        started = time.time()
         with self.old_conn.cursor() as old_cur, self.conn.cursor() as new_cur:
             # Extract from old system
-            old_cur.execute("""
-                SELECT
-                    truck_id, vin, make, model, year, status,
-                    current_miles, location,
-                    purchase_date, purchase_price, current_value,
-                    insurance_policy_number, insurance_provider, insurance_expiry_date,
-                    created_at, updated_at
-                FROM trucks
-                WHERE active = true
-            """)
+            old_cur.execute(TRUCK_EXTRACT_SQL)
 
             trucks = old_cur.fetchall()
             logger.info(f"📊 Found {len(trucks)} tractors in old system")
 
+            # Resolve each distinct location once for the whole extract
+            self.geocoder.resolve_all(truck[7] for truck in trucks)
+
             batch_data = []
             for truck in trucks:
                 # Transform data
@@ -165,31 +184,29 @@ class DataTransformer:
                     truck[14]     # valid_from (same as created_at)
                 ))
 
-            if not self.dry_run:
-                # Batch insert
-                execute_batch(new_cur, """
-                    INSERT INTO hub3_origin.tractors (
-                        unit_number, vin, make, model, year, status,
-                        current_miles, location_gps,
-                        purchase_date, purchase_price, current_value,
-                        insurance_policy_number, insurance_provider, insurance_expiry_date,
-                        created_at, updated_at, valid_from
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s,
-                        %s, ST_GeogFromText(%s),
-                        %s, %s, %s,
-                        %s, %s, %s,
-                        %s, %s, %s
-                    )
-                    ON CONFLICT (unit_number) DO NOTHING
-                """, batch_data)
-
-                self.conn.commit()
-                logger.info(f"✅ Transformed {len(batch_data)} tractors")
-            else:
-                logger.info(f"🔍 DRY RUN: Would transform {len(batch_data)} tractors")
+            # Batch insert
+            execute_batch(new_cur, """
+                INSERT INTO hub3_origin.tractors (
+                    unit_number, vin, make, model, year, status,
+                    current_miles, location_gps,
+                    purchase_date, purchase_price, current_value,
+                    insurance_policy_number, insurance_provider, insurance_expiry_date,
+                    created_at, updated_at, valid_from
+                ) VALUES (
+                    %s, %s, %s, %s, %s, %s,
+                    %s, ST_GeogFromText(%s),
+                    %s, %s, %s,
+                    %s, %s, %s,
+                    %s, %s, %s
+                )
+                ON CONFLICT (unit_number) DO NOTHING
+            """, batch_data, page_size=PAGE_SIZE)
+
+            self.conn.commit()
+            logger.info(f"✅ Transformed {len(batch_data)} tractors")
 
             self.stats['transformed'] += len(batch_data)
+            self.planner.record_throughput('postgres_load', len(batch_data), time.time() - started)
             return len(batch_data)
 
     def _generate_sample_tractors(self) -> int:
@@ -250,6 +267,11 @@ class DataTransformer:
         logger.info(f"Transformed: {self.stats['transformed']}")
         logger.info(f"Skipped:     {self.stats['skipped']}")
         logger.info(f"Errors:      {self.stats['errors']}")
+        if self.dry_run and self.planner:
+            self.planner.log_summary()
+        logger.info(f"Geocoded:    {self.geocoder.stats['distinct']} distinct locations "
+                    f"({self.geocoder.stats['cache_hits']} cached, "
+                    f"{self.geocoder.stats['unresolved']} unresolved)")
         logger.info("="*60)
 
 
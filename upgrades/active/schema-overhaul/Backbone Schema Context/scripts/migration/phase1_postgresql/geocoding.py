@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Phase 1: PostgreSQL Foundation - Geocoding Support
+Purpose: Batch, cached geocoding of location text for the transform pipeline
+Used by: 04_transform_and_load.py
+
+Locations repeat heavily across extracted records, so the transform resolves
+every distinct location once per extract (one provider batch call for cache
+misses) and the per-row cost is a dictionary lookup.
+
+Usage:
+    geocoder = Geocoder()
+    geocoder.resolve_all(row[7] for row in rows)
+    coords = geocoder.lookup("Las Vegas NV")   # same entry as "Las Vegas, NV"
+"""
+
+import os
+import re
+import json
+import time
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float]
+
+# Persistent cache location (override with GEOCODE_CACHE_PATH)
+DEFAULT_CACHE_PATH = os.getenv('GEOCODE_CACHE_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.geocode_cache.json'
+)
+
+# Fallback used for locations no provider can resolve (matches legacy behaviour)
+DEFAULT_COORDINATES: Coordinates = (0.0, 0.0)
+
+# Seconds before an unresolved location is sent to the provider again
+NEGATIVE_TTL = int(os.getenv('GEOCODE_NEGATIVE_TTL', str(7 * 86400)))
+
+# Known locations for the local stand-in provider
+# In production, swap LocalGeocodingProvider for a real API (Google Maps, Mapbox, etc.)
+KNOWN_LOCATIONS: Dict[str, Coordinates] = {
+    "Las Vegas, NV": (36.1699, -115.1398),
+    "Los Angeles, CA": (34.0522, -118.2437),
+    "Phoenix, AZ": (33.4484, -112.0740),
+    "Salt Lake City, UT": (40.7608, -111.8910)
+}
+
+
+def normalize_location(location_text: str) -> str:
+    """
+    Normalize location text to a cache key
+    Example: "Las Vegas NV", "las vegas, nv " -> "las vegas nv"
+    """
+    text = location_text.strip().lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class GeocodingProvider:
+    """Base class for geocoding backends"""
+
+    name = 'base'
+
+    def geocode_batch(self, keys: List[str]) -> Dict[str, Optional[Coordinates]]:
+        """
+        Resolve normalized location keys to coordinates in one call
+        Keys the provider cannot resolve map to None
+        """
+        raise NotImplementedError
+
+
+class LocalGeocodingProvider(GeocodingProvider):
+    """Local stand-in provider backed by a static lookup table"""
+
+    name = 'local'
+
+    def __init__(self, locations: Optional[Dict[str, Coordinates]] = None):
+        locations = locations if locations is not None else KNOWN_LOCATIONS
+        self.table = {normalize_location(text): coords for text, coords in locations.items()}
+
+    def geocode_batch(self, keys: List[str]) -> Dict[str, Optional[Coordinates]]:
+        return {key: self.table.get(key) for key in keys}
+
+
+class GeocodingCache:
+    """
+    Persistent on-disk cache of normalized location key -> coordinates
+
+    Unresolved locations are stored as {"unresolved_at": ts, "provider": name}
+    and count as cached only for negative_ttl seconds and the same provider,
+    so KNOWN_LOCATIONS changes or a new provider are picked up. Legacy null
+    entries are retried on the next run.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, negative_ttl: int = NEGATIVE_TTL):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self.entries: Dict[str, Coordinates] = {}
+        self.unresolved: Dict[str, Dict] = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """Load cache entries from disk (missing or corrupt file starts empty)"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                raw = json.load(f)
+            for key, value in raw.items():
+                if isinstance(value, list):
+                    self.entries[key] = tuple(value)
+                else:
+                    self.unresolved[key] = value or {'unresolved_at': 0, 'provider': None}
+            logger.info(f"📊 Loaded {len(self.entries)} cached geocodes "
+                        f"({len(self.unresolved)} unresolved) from {self.path}")
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"⚠️  Could not read geocode cache {self.path}: {e}")
+            self.entries, self.unresolved = {}, {}
+
+    def save(self):
+        """Write cache entries to disk atomically"""
+        if not self.path or not self.dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({**self.unresolved, **self.entries}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            logger.warning(f"⚠️  Could not write geocode cache {self.path}: {e}")
+
+    def is_cached(self, key: str, provider: str) -> bool:
+        """Resolved, or unresolved by the same provider less than negative_ttl ago"""
+        if key in self.entries:
+            return True
+        miss = self.unresolved.get(key)
+        return (miss is not None and miss.get('provider') == provider
+                and time.time() - miss.get('unresolved_at', 0) < self.negative_ttl)
+
+    def get(self, key: str) -> Optional[Coordinates]:
+        return self.entries.get(key)
+
+    def update(self, results: Dict[str, Optional[Coordinates]], provider: str):
+        now = int(time.time())
+        for key, coords in results.items():
+            if coords is None:
+                self.entries.pop(key, None)
+                self.unresolved[key] = {'unresolved_at': now, 'provider': provider}
+            else:
+                self.unresolved.pop(key, None)
+                self.entries[key] = tuple(coords)
+        self.dirty = True
+
+
+class Geocoder:
+    """
+    Deduplicating, cached geocoder
+
+    resolve_all() resolves every distinct location of an extract in one pass:
+    cache hits are free, misses go to the provider as a single batch and are
+    written back to the cache (unresolved locations are retried only after
+    GEOCODE_NEGATIVE_TTL or with another provider). lookup() is then a dict
+    lookup per row.
+    """
+
+    def __init__(self, provider: Optional[GeocodingProvider] = None,
+                 cache: Optional[GeocodingCache] = None):
+        self.provider = provider or LocalGeocodingProvider()
+        self.cache = cache if cache is not None else GeocodingCache()
+        self.resolved: Dict[str, Optional[Coordinates]] = {}
+        self.stats = {
+            'distinct': 0,
+            'cache_hits': 0,
+            'provider_lookups': 0,
+            'unresolved': 0
+        }
+
+    def resolve_all(self, location_texts: Iterable[Optional[str]]) -> Dict[str, Optional[Coordinates]]:
+        """Resolve all distinct locations and persist new results to the cache"""
+        keys = {normalize_location(text) for text in location_texts if text}
+        keys.discard('')
+        keys -= self.resolved.keys()
+        if not keys:
+            return self.resolved
+
+        misses = sorted(key for key in keys if not self.cache.is_cached(key, self.provider.name))
+        self.stats['distinct'] += len(keys)
+        self.stats['cache_hits'] += len(keys) - len(misses)
+
+        if misses:
+            logger.info(f"🔄 Geocoding {len(misses)} new locations via {self.provider.name} provider...")
+            results = self.provider.geocode_batch(misses)
+            self.cache.update({key: results.get(key) for key in misses}, self.provider.name)
+            self.cache.save()
+            self.stats['provider_lookups'] += len(misses)
+
+        unresolved = []
+        for key in keys:
+            coords = self.cache.get(key)
+            self.resolved[key] = coords
+            if coords is None:
+                unresolved.append(key)
+
+        if unresolved:
+            self.stats['unresolved'] += len(unresolved)
+            logger.warning(f"⚠️  {len(unresolved)} unknown locations, using default {DEFAULT_COORDINATES}: "
+                           f"{', '.join(sorted(unresolved)[:10])}")
+
+        logger.info(f"📊 Geocoded {len(keys)} distinct locations "
+                    f"({len(keys) - len(misses)} cached, {len(misses)} looked up)")
+        return self.resolved
+
+    def lookup(self, location_text: str) -> Coordinates:
+        """Return coordinates for a location, resolving it first if unseen"""
+        key = normalize_location(location_text)
+        if key not in self.resolved:
+            self.resolve_all([location_text])
+        return self.resolved.get(key) or DEFAULT_COORDINATES
@@ -12,6 +12,7 @@ Usage:
 
 import os
 import sys
+import time
 import logging
 import psycopg2
 from neo4j import GraphDatabase
@@ -20,6 +21,9 @@ from datetime import datetime
 from dotenv import load_dotenv
 import argparse
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dry_run_planner import DryRunPlanner, neo4j_bytes
+
 # Load environment variables
 load_dotenv()
 
@@ -45,6 +49,31 @@ NEO4J_CONFIG = {
     'password': os.getenv('NEO4J_PASSWORD', 'apexmemory2024')
 }
 
+# Extract queries (current records only: valid_to IS NULL)
+TRACTOR_EXTRACT_SQL = """
+    SELECT
+        unit_number, vin, make, model, year, status,
+        current_miles, engine_hours,
+        ST_Y(location_gps::geometry) as lat,
+        ST_X(location_gps::geometry) as lon,
+        purchase_date, purchase_price, current_value,
+        financing_status, lender_name, loan_balance,
+        insurance_policy_number, insurance_provider, insurance_expiry_date,
+        created_at, updated_at, valid_from, valid_to
+    FROM hub3_origin.tractors
+    WHERE valid_to IS NULL
+"""
+
+DRIVER_EXTRACT_SQL = """
+    SELECT
+        driver_id, name, cdl_number, cdl_state, cdl_expiry_date,
+        phone, email, status, current_unit_assignment,
+        hire_date, employment_type, pay_rate, pay_type,
+        created_at, updated_at, valid_from, valid_to
+    FROM hub3_origin.drivers
+    WHERE valid_to IS NULL
+"""
+
 class Neo4jNodeLoader:
     """Load nodes from PostgreSQL to Neo4j"""
 
@@ -52,6 +81,7 @@ class Neo4jNodeLoader:
         self.dry_run = dry_run
         self.pg_conn = None
         self.neo4j_driver = None
+        self.planner = None
         self.stats = {
             'loaded': 0,
             'skipped': 0,
@@ -63,6 +93,7 @@ class Neo4jNodeLoader:
         try:
             # Connect to PostgreSQL
             self.pg_conn = psycopg2.connect(**PG_CONFIG)
+            self.planner = DryRunPlanner(self.pg_conn)
             logger.info(f"✅ Connected to PostgreSQL: {PG_CONFIG['database']}")
 
             # Connect to Neo4j
@@ -87,88 +118,82 @@ class Neo4jNodeLoader:
         """Load tractors from PostgreSQL to Neo4j"""
         logger.info("🔄 Loading tractors...")
 
+        if self.dry_run:
+            # Estimate from planner statistics instead of reading every row
+            estimate = self.planner.plan(
+                'neo4j_nodes', TRACTOR_EXTRACT_SQL, tables=['hub3_origin.tractors'],
+                target_bytes_per_row=neo4j_bytes(nodes=1, properties=22), label='tractors'
+            )
+            self.stats['loaded'] += estimate.rows
+            return estimate.rows
+
+        started = time.time()
         with self.pg_conn.cursor() as pg_cur:
-            # Get all current tractors (valid_to IS NULL)
-            pg_cur.execute("""
-                SELECT
-                    unit_number, vin, make, model, year, status,
-                    current_miles, engine_hours,
-                    ST_Y(location_gps::geometry) as lat,
-                    ST_X(location_gps::geometry) as lon,
-                    purchase_date, purchase_price, current_value,
-                    financing_status, lender_name, loan_balance,
-                    insurance_policy_number, insurance_provider, insurance_expiry_date,
-                    created_at, updated_at, valid_from, valid_to
-                FROM hub3_origin.tractors
-                WHERE valid_to IS NULL
-            """)
+            pg_cur.execute(TRACTOR_EXTRACT_SQL)
 
             tractors = pg_cur.fetchall()
             logger.info(f"📊 Found {len(tractors)} current tractors in PostgreSQL")
 
-            if not self.dry_run:
-                with self.neo4j_driver.session() as session:
-                    for tractor in tractors:
-                        try:
-                            session.run("""
-                                MERGE (t:Tractor {unit_number: $unit_number})
-                                SET t.vin = $vin,
-                                    t.make = $make,
-                                    t.model = $model,
-                                    t.year = $year,
-                                    t.status = $status,
-                                    t.current_miles = $current_miles,
-                                    t.engine_hours = $engine_hours,
-                                    t.location_lat = $lat,
-                                    t.location_lon = $lon,
-                                    t.purchase_date = date($purchase_date),
-                                    t.purchase_price = $purchase_price,
-                                    t.current_value = $current_value,
-                                    t.financing_status = $financing_status,
-                                    t.lender_name = $lender_name,
-                                    t.loan_balance = $loan_balance,
-                                    t.insurance_policy_number = $insurance_policy_number,
-                                    t.insurance_provider = $insurance_provider,
-                                    t.insurance_expiry_date = date($insurance_expiry_date),
-                                    t.created_at = datetime($created_at),
-                                    t.updated_at = datetime($updated_at),
-                                    t.valid_from = datetime($valid_from),
-                                    t.valid_to = datetime($valid_to)
-                            """, {
-                                "unit_number": tractor[0],
-                                "vin": tractor[1],
-                                "make": tractor[2],
-                                "model": tractor[3],
-                                "year": tractor[4],
-                                "status": tractor[5],
-                                "current_miles": tractor[6],
-                                "engine_hours": tractor[7],
-                                "lat": tractor[8],
-                                "lon": tractor[9],
-                                "purchase_date": str(tractor[10]) if tractor[10] else None,
-                                "purchase_price": float(tractor[11]) if tractor[11] else None,
-                                "current_value": float(tractor[12]) if tractor[12] else None,
-                                "financing_status": tractor[13],
-                                "lender_name": tractor[14],
-                                "loan_balance": float(tractor[15]) if tractor[15] else None,
-                                "insurance_policy_number": tractor[16],
-                                "insurance_provider": tractor[17],
-                                "insurance_expiry_date": str(tractor[18]) if tractor[18] else None,
-                                "created_at": tractor[19].isoformat(),
-                                "updated_at": tractor[20].isoformat(),
-                                "valid_from": tractor[21].isoformat(),
-                                "valid_to": tractor[22].isoformat() if tractor[22] else None
-                            })
-                            self.stats['loaded'] += 1
-
-                        except Exception as e:
-                            logger.error(f"❌ Error loading tractor {tractor[0]}: {e}")
-                            self.stats['errors'] += 1
-
-                logger.info(f"✅ Loaded {self.stats['loaded']} tractors to Neo4j")
-            else:
-                logger.info(f"🔍 DRY RUN: Would load {len(tractors)} tractors")
-                self.stats['loaded'] = len(tractors)
+            with self.neo4j_driver.session() as session:
+                for tractor in tractors:
+                    try:
+                        session.run("""
+                            MERGE (t:Tractor {unit_number: $unit_number})
+                            SET t.vin = $vin,
+                                t.make = $make,
+                                t.model = $model,
+                                t.year = $year,
+                                t.status = $status,
+                                t.current_miles = $current_miles,
+                                t.engine_hours = $engine_hours,
+                                t.location_lat = $lat,
+                                t.location_lon = $lon,
+                                t.purchase_date = date($purchase_date),
+                                t.purchase_price = $purchase_price,
+                                t.current_value = $current_value,
+                                t.financing_status = $financing_status,
+                                t.lender_name = $lender_name,
+                                t.loan_balance = $loan_balance,
+                                t.insurance_policy_number = $insurance_policy_number,
+                                t.insurance_provider = $insurance_provider,
+                                t.insurance_expiry_date = date($insurance_expiry_date),
+                                t.created_at = datetime($created_at),
+                                t.updated_at = datetime($updated_at),
+                                t.valid_from = datetime($valid_from),
+                                t.valid_to = datetime($valid_to)
+                        """, {
+                            "unit_number": tractor[0],
+                            "vin": tractor[1],
+                            "make": tractor[2],
+                            "model": tractor[3],
+                            "year": tractor[4],
+                            "status": tractor[5],
+                            "current_miles": tractor[6],
+                            "engine_hours": tractor[7],
+                            "lat": tractor[8],
+                            "lon": tractor[9],
+                            "purchase_date": str(tractor[10]) if tractor[10] else None,
+                            "purchase_price": float(tractor[11]) if tractor[11] else None,
+                            "current_value": float(tractor[12]) if tractor[12] else None,
+                            "financing_status": tractor[13],
+                            "lender_name": tractor[14],
+                            "loan_balance": float(tractor[15]) if tractor[15] else None,
+                            "insurance_policy_number": tractor[16],
+                            "insurance_provider": tractor[17],
+                            "insurance_expiry_date": str(tractor[18]) if tractor[18] else None,
+                            "created_at": tractor[19].isoformat(),
+                            "updated_at": tractor[20].isoformat(),
+                            "valid_from": tractor[21].isoformat(),
+                            "valid_to": tractor[22].isoformat() if tractor[22] else None
+                        })
+                        self.stats['loaded'] += 1
+
+                    except Exception as e:
+                        logger.error(f"❌ Error loading tractor {tractor[0]}: {e}")
+                        self.stats['errors'] += 1
+
+            logger.info(f"✅ Loaded {self.stats['loaded']} tractors to Neo4j")
+            self.planner.record_throughput('neo4j_nodes', len(tractors), time.time() - started)
 
             return len(tractors)
 
@@ -176,71 +201,70 @@ class Neo4jNodeLoader:
         """Load drivers from PostgreSQL to Neo4j"""
         logger.info("🔄 Loading drivers...")
 
+        if self.dry_run:
+            # Estimate from planner statistics instead of reading every row
+            estimate = self.planner.plan(
+                'neo4j_nodes', DRIVER_EXTRACT_SQL, tables=['hub3_origin.drivers'],
+                target_bytes_per_row=neo4j_bytes(nodes=1, properties=16), label='drivers'
+            )
+            self.stats['loaded'] += estimate.rows
+            return estimate.rows
+
+        started = time.time()
         with self.pg_conn.cursor() as pg_cur:
-            pg_cur.execute("""
-                SELECT
-                    driver_id, name, cdl_number, cdl_state, cdl_expiry_date,
-                    phone, email, status, current_unit_assignment,
-                    hire_date, employment_type, pay_rate, pay_type,
-                    created_at, updated_at, valid_from, valid_to
-                FROM hub3_origin.drivers
-                WHERE valid_to IS NULL
-            """)
+            pg_cur.execute(DRIVER_EXTRACT_SQL)
 
             drivers = pg_cur.fetchall()
             logger.info(f"📊 Found {len(drivers)} current drivers in PostgreSQL")
 
-            if not self.dry_run:
-                with self.neo4j_driver.session() as session:
-                    for driver in drivers:
-                        try:
-                            session.run("""
-                                MERGE (d:Driver {driver_id: $driver_id})
-                                SET d.name = $name,
-                                    d.cdl_number = $cdl_number,
-                                    d.cdl_state = $cdl_state,
-                                    d.cdl_expiry_date = date($cdl_expiry_date),
-                                    d.phone = $phone,
-                                    d.email = $email,
-                                    d.status = $status,
-                                    d.current_unit_assignment = $current_unit_assignment,
-                                    d.hire_date = date($hire_date),
-                                    d.employment_type = $employment_type,
-                                    d.pay_rate = $pay_rate,
-                                    d.pay_type = $pay_type,
-                                    d.created_at = datetime($created_at),
-                                    d.updated_at = datetime($updated_at),
-                                    d.valid_from = datetime($valid_from),
-                                    d.valid_to = datetime($valid_to)
-                            """, {
-                                "driver_id": driver[0],
-                                "name": driver[1],
-                                "cdl_number": driver[2],
-                                "cdl_state": driver[3],
-                                "cdl_expiry_date": str(driver[4]) if driver[4] else None,
-                                "phone": driver[5],
-                                "email": driver[6],
-                                "status": driver[7],
-                                "current_unit_assignment": driver[8],
-                                "hire_date": str(driver[9]) if driver[9] else None,
-                                "employment_type": driver[10],
-                                "pay_rate": float(driver[11]) if driver[11] else None,
-                                "pay_type": driver[12],
-                                "created_at": driver[13].isoformat(),
-                                "updated_at": driver[14].isoformat(),
-                                "valid_from": driver[15].isoformat(),
-                                "valid_to": driver[16].isoformat() if driver[16] else None
-                            })
-                            self.stats['loaded'] += 1
-
-                        except Exception as e:
-                            logger.error(f"❌ Error loading driver {driver[0]}: {e}")
-                            self.stats['errors'] += 1
-
-                logger.info(f"✅ Loaded {self.stats['loaded']} drivers to Neo4j")
-            else:
-                logger.info(f"🔍 DRY RUN: Would load {len(drivers)} drivers")
-                self.stats['loaded'] = len(drivers)
+            with self.neo4j_driver.session() as session:
+                for driver in drivers:
+                    try:
+                        session.run("""
+                            MERGE (d:Driver {driver_id: $driver_id})
+                            SET d.name = $name,
+                                d.cdl_number = $cdl_number,
+                                d.cdl_state = $cdl_state,
+                                d.cdl_expiry_date = date($cdl_expiry_date),
+                                d.phone = $phone,
+                                d.email = $email,
+                                d.status = $status,
+                                d.current_unit_assignment = $current_unit_assignment,
+                                d.hire_date = date($hire_date),
+                                d.employment_type = $employment_type,
+                                d.pay_rate = $pay_rate,
+                                d.pay_type = $pay_type,
+                                d.created_at = datetime($created_at),
+                                d.updated_at = datetime($updated_at),
+                                d.valid_from = datetime($valid_from),
+                                d.valid_to = datetime($valid_to)
+                        """, {
+                            "driver_id": driver[0],
+                            "name": driver[1],
+                            "cdl_number": driver[2],
+                            "cdl_state": driver[3],
+                            "cdl_expiry_date": str(driver[4]) if driver[4] else None,
+                            "phone": driver[5],
+                            "email": driver[6],
+                            "status": driver[7],
+                            "current_unit_assignment": driver[8],
+                            "hire_date": str(driver[9]) if driver[9] else None,
+                            "employment_type": driver[10],
+                            "pay_rate": float(driver[11]) if driver[11] else None,
+                            "pay_type": driver[12],
+                            "created_at": driver[13].isoformat(),
+                            "updated_at": driver[14].isoformat(),
+                            "valid_from": driver[15].isoformat(),
+                            "valid_to": driver[16].isoformat() if driver[16] else None
+                        })
+                        self.stats['loaded'] += 1
+
+                    except Exception as e:
+                        logger.error(f"❌ Error loading driver {driver[0]}: {e}")
+                        self.stats['errors'] += 1
+
+            logger.info(f"✅ Loaded {self.stats['loaded']} drivers to Neo4j")
+            self.planner.record_throughput('neo4j_nodes', len(drivers), time.time() - started)
 
             return len(drivers)
 
@@ -280,7 +304,7 @@ class Neo4jNodeLoader:
             pg_cur.execute("SELECT COUNT(*) FROM hub3_origin.tractors WHERE valid_to IS NULL")
             pg_count = pg_cur.fetchone()[0]
 
-            neo4j_result = neo4j_session.run("MATCH (t:Tractor) RETURN count(t) as count")
+            neo4j_result = neo4j_session.run("MATCH (t:Tractor) WHERE t.valid_to IS NULL RETURN count(t) as count")
             neo4j_count = neo4j_result.single()["count"]
 
             logger.info(f"Tractors: PostgreSQL={pg_count}, Neo4j={neo4j_count} {'✅' if pg_count == neo4j_count else '❌'}")
@@ -289,7 +313,7 @@ class Neo4jNodeLoader:
             pg_cur.execute("SELECT COUNT(*) FROM hub3_origin.drivers WHERE valid_to IS NULL")
             pg_count = pg_cur.fetchone()[0]
 
-            neo4j_result = neo4j_session.run("MATCH (d:Driver) RETURN count(d) as count")
+            neo4j_result = neo4j_session.run("MATCH (d:Driver) WHERE d.valid_to IS NULL RETURN count(d) as count")
             neo4j_count = neo4j_result.single()["count"]
 
             logger.info(f"Drivers: PostgreSQL={pg_count}, Neo4j={neo4j_count} {'✅' if pg_count == neo4j_count else '❌'}")
@@ -304,6 +328,8 @@ class Neo4jNodeLoader:
         logger.info(f"Loaded:  {self.stats['loaded']}")
         logger.info(f"Skipped: {self.stats['skipped']}")
         logger.info(f"Errors:  {self.stats['errors']}")
+        if self.dry_run and self.planner:
+            self.planner.log_summary()
         logger.info("="*60)
 
 
@@ -12,6 +12,7 @@ Usage:
 
 import os
 import sys
+import time
 import logging
 import psycopg2
 from neo4j import GraphDatabase
@@ -20,6 +21,9 @@ from datetime import datetime
 from dotenv import load_dotenv
 import argparse
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dry_run_planner import DryRunPlanner, neo4j_bytes
+
 # Load environment variables
 load_dotenv()
 
@@ -45,6 +49,48 @@ NEO4J_CONFIG = {
     'password': os.getenv('NEO4J_PASSWORD', 'apexmemory2024')
 }
 
+# Extract queries
+ASSIGNMENT_EXTRACT_SQL = """
+    SELECT
+        driver_id,
+        current_unit_assignment,
+        hire_date,
+        created_at,
+        valid_from
+    FROM hub3_origin.drivers
+    WHERE valid_to IS NULL
+    AND current_unit_assignment IS NOT NULL
+"""
+
+FUEL_EXTRACT_SQL = """
+    SELECT
+        transaction_id,
+        unit_number,
+        driver_id,
+        transaction_date,
+        created_at
+    FROM hub3_origin.fuel_transactions
+"""
+
+MAINTENANCE_EXTRACT_SQL = """
+    SELECT
+        maintenance_id,
+        unit_number,
+        maintenance_date,
+        created_at
+    FROM hub3_origin.maintenance_records
+"""
+
+INCIDENT_EXTRACT_SQL = """
+    SELECT
+        incident_id,
+        unit_number,
+        driver_id,
+        incident_date,
+        created_at
+    FROM hub3_origin.incidents
+"""
+
 class Neo4jRelationshipCreator:
     """Create relationships in Neo4j from PostgreSQL foreign keys"""
 
@@ -52,6 +98,7 @@ class Neo4jRelationshipCreator:
         self.dry_run = dry_run
         self.pg_conn = None
         self.neo4j_driver = None
+        self.planner = None
         self.stats = {
             'created': 0,
             'skipped': 0,
@@ -63,6 +110,7 @@ class Neo4jRelationshipCreator:
         try:
             # Connect to PostgreSQL
             self.pg_conn = psycopg2.connect(**PG_CONFIG)
+            self.planner = DryRunPlanner(self.pg_conn)
             logger.info(f"✅ Connected to PostgreSQL: {PG_CONFIG['database']}")
 
             # Connect to Neo4j
@@ -87,51 +135,48 @@ class Neo4jRelationshipCreator:
         """Create ASSIGNED_TO relationships between Driver and Tractor"""
         logger.info("🔄 Creating Driver → Tractor assignments...")
 
+        if self.dry_run:
+            # Estimate from planner statistics instead of reading every row
+            estimate = self.planner.plan(
+                'neo4j_relationships', ASSIGNMENT_EXTRACT_SQL, tables=['hub3_origin.drivers'],
+                target_bytes_per_row=neo4j_bytes(relationships=1, properties=3),
+                label='ASSIGNED_TO'
+            )
+            self.stats['created'] += estimate.rows
+            return estimate.rows
+
+        started = time.time()
         with self.pg_conn.cursor() as pg_cur:
-            # Get all driver assignments (current assignments only)
-            pg_cur.execute("""
-                SELECT
-                    driver_id,
-                    current_unit_assignment,
-                    hire_date,
-                    created_at,
-                    valid_from
-                FROM hub3_origin.drivers
-                WHERE valid_to IS NULL
-                AND current_unit_assignment IS NOT NULL
-            """)
+            pg_cur.execute(ASSIGNMENT_EXTRACT_SQL)
 
             assignments = pg_cur.fetchall()
             logger.info(f"📊 Found {len(assignments)} driver assignments in PostgreSQL")
 
-            if not self.dry_run:
-                with self.neo4j_driver.session() as session:
-                    for assignment in assignments:
-                        try:
-                            session.run("""
-                                MATCH (d:Driver {driver_id: $driver_id})
-                                MATCH (t:Tractor {unit_number: $unit_number})
-                                MERGE (d)-[r:ASSIGNED_TO]->(t)
-                                SET r.assigned_date = date($hire_date),
-                                    r.created_at = datetime($created_at),
-                                    r.valid_from = datetime($valid_from)
-                            """, {
-                                "driver_id": assignment[0],
-                                "unit_number": assignment[1],
-                                "hire_date": str(assignment[2]) if assignment[2] else None,
-                                "created_at": assignment[3].isoformat(),
-                                "valid_from": assignment[4].isoformat()
-                            })
-                            self.stats['created'] += 1
-
-                        except Exception as e:
-                            logger.error(f"❌ Error creating assignment {assignment[0]} → {assignment[1]}: {e}")
-                            self.stats['errors'] += 1
-
-                logger.info(f"✅ Created {self.stats['created']} ASSIGNED_TO relationships")
-            else:
-                logger.info(f"🔍 DRY RUN: Would create {len(assignments)} ASSIGNED_TO relationships")
-                self.stats['created'] = len(assignments)
+            with self.neo4j_driver.session() as session:
+                for assignment in assignments:
+                    try:
+                        session.run("""
+                            MATCH (d:Driver {driver_id: $driver_id})
+                            MATCH (t:Tractor {unit_number: $unit_number})
+                            MERGE (d)-[r:ASSIGNED_TO]->(t)
+                            SET r.assigned_date = date($hire_date),
+                                r.created_at = datetime($created_at),
+                                r.valid_from = datetime($valid_from)
+                        """, {
+                            "driver_id": assignment[0],
+                            "unit_number": assignment[1],
+                            "hire_date": str(assignment[2]) if assignment[2] else None,
+                            "created_at": assignment[3].isoformat(),
+                            "valid_from": assignment[4].isoformat()
+                        })
+                        self.stats['created'] += 1
+
+                    except Exception as e:
+                        logger.error(f"❌ Error creating assignment {assignment[0]} → {assignment[1]}: {e}")
+                        self.stats['errors'] += 1
+
+            logger.info(f"✅ Created {self.stats['created']} ASSIGNED_TO relationships")
+            self.planner.record_throughput('neo4j_relationships', len(assignments), time.time() - started)
 
             return len(assignments)
 
@@ -139,63 +184,63 @@ class Neo4jRelationshipCreator:
         """Create FOR_UNIT and BY_DRIVER relationships for fuel transactions"""
         logger.info("🔄 Creating FuelTransaction relationships...")
 
+        if self.dry_run:
+            # Estimate from planner statistics instead of reading every row
+            estimate = self.planner.plan(
+                'neo4j_relationships', FUEL_EXTRACT_SQL, tables=['hub3_origin.fuel_transactions'],
+                target_bytes_per_row=neo4j_bytes(relationships=2, properties=4),
+                label='fuel transactions'
+            )
+            self.stats['created'] += estimate.rows * 2
+            return estimate.rows
+
+        started = time.time()
         with self.pg_conn.cursor() as pg_cur:
-            pg_cur.execute("""
-                SELECT
-                    transaction_id,
-                    unit_number,
-                    driver_id,
-                    transaction_date,
-                    created_at
-                FROM hub3_origin.fuel_transactions
-            """)
+            pg_cur.execute(FUEL_EXTRACT_SQL)
 
             transactions = pg_cur.fetchall()
             logger.info(f"📊 Found {len(transactions)} fuel transactions in PostgreSQL")
 
-            if not self.dry_run:
-                with self.neo4j_driver.session() as session:
-                    for txn in transactions:
-                        try:
-                            # Create FuelTransaction → Tractor relationship
+            with self.neo4j_driver.session() as session:
+                for txn in transactions:
+                    try:
+                        # Create FuelTransaction → Tractor relationship
+                        session.run("""
+                            MATCH (f:FuelTransaction {transaction_id: $transaction_id})
+                            MATCH (t:Tractor {unit_number: $unit_number})
+                            MERGE (f)-[r:FOR_UNIT]->(t)
+                            SET r.transaction_date = datetime($transaction_date),
+                                r.created_at = datetime($created_at)
+                        """, {
+                            "transaction_id": str(txn[0]),
+                            "unit_number": txn[1],
+                            "transaction_date": txn[3].isoformat(),
+                            "created_at": txn[4].isoformat()
+                        })
+
+                        # Create FuelTransaction → Driver relationship (if driver exists)
+                        if txn[2]:
                             session.run("""
                                 MATCH (f:FuelTransaction {transaction_id: $transaction_id})
-                                MATCH (t:Tractor {unit_number: $unit_number})
-                                MERGE (f)-[r:FOR_UNIT]->(t)
+                                MATCH (d:Driver {driver_id: $driver_id})
+                                MERGE (f)-[r:BY_DRIVER]->(d)
                                 SET r.transaction_date = datetime($transaction_date),
                                     r.created_at = datetime($created_at)
                             """, {
                                 "transaction_id": str(txn[0]),
-                                "unit_number": txn[1],
+                                "driver_id": txn[2],
                                 "transaction_date": txn[3].isoformat(),
                                 "created_at": txn[4].isoformat()
                             })
 
-                            # Create FuelTransaction → Driver relationship (if driver exists)
-                            if txn[2]:
-                                session.run("""
-                                    MATCH (f:FuelTransaction {transaction_id: $transaction_id})
-                                    MATCH (d:Driver {driver_id: $driver_id})
-                                    MERGE (f)-[r:BY_DRIVER]->(d)
-                                    SET r.transaction_date = datetime($transaction_date),
-                                        r.created_at = datetime($created_at)
-                                """, {
-                                    "transaction_id": str(txn[0]),
-                                    "driver_id": txn[2],
-                                    "transaction_date": txn[3].isoformat(),
-                                    "created_at": txn[4].isoformat()
-                                })
-
-                            self.stats['created'] += 2 if txn[2] else 1
-
-                        except Exception as e:
-                            logger.error(f"❌ Error creating fuel transaction relationships {txn[0]}: {e}")
-                            self.stats['errors'] += 1
-
-                logger.info(f"✅ Created fuel transaction relationships")
-            else:
-                logger.info(f"🔍 DRY RUN: Would create ~{len(transactions) * 2} fuel transaction relationships")
-                self.stats['created'] = len(transactions) * 2
+                        self.stats['created'] += 2 if txn[2] else 1
+
+                    except Exception as e:
+                        logger.error(f"❌ Error creating fuel transaction relationships {txn[0]}: {e}")
+                        self.stats['errors'] += 1
+
+            logger.info(f"✅ Created fuel transaction relationships")
+            self.planner.record_throughput('neo4j_relationships', len(transactions), time.time() - started)
 
             return len(transactions)
 
@@ -203,45 +248,46 @@ class Neo4jRelationshipCreator:
         """Create FOR_UNIT relationships for maintenance records"""
         logger.info("🔄 Creating MaintenanceRecord → Tractor relationships...")
 
+        if self.dry_run:
+            # Estimate from planner statistics instead of reading every row
+            estimate = self.planner.plan(
+                'neo4j_relationships', MAINTENANCE_EXTRACT_SQL, tables=['hub3_origin.maintenance_records'],
+                target_bytes_per_row=neo4j_bytes(relationships=1, properties=2),
+                label='maintenance'
+            )
+            self.stats['created'] += estimate.rows
+            return estimate.rows
+
+        started = time.time()
         with self.pg_conn.cursor() as pg_cur:
-            pg_cur.execute("""
-                SELECT
-                    maintenance_id,
-                    unit_number,
-                    maintenance_date,
-                    created_at
-                FROM hub3_origin.maintenance_records
-            """)
+            pg_cur.execute(MAINTENANCE_EXTRACT_SQL)
 
             records = pg_cur.fetchall()
             logger.info(f"📊 Found {len(records)} maintenance records in PostgreSQL")
 
-            if not self.dry_run:
-                with self.neo4j_driver.session() as session:
-                    for record in records:
-                        try:
-                            session.run("""
-                                MATCH (m:MaintenanceRecord {maintenance_id: $maintenance_id})
-                                MATCH (t:Tractor {unit_number: $unit_number})
-                                MERGE (m)-[r:FOR_UNIT]->(t)
-                                SET r.maintenance_date = date($maintenance_date),
-                                    r.created_at = datetime($created_at)
-                            """, {
-                                "maintenance_id": str(record[0]),
-                                "unit_number": record[1],
-                                "maintenance_date": str(record[2]),
-                                "created_at": record[3].isoformat()
-                            })
-                            self.stats['created'] += 1
-
-                        except Exception as e:
-                            logger.error(f"❌ Error creating maintenance relationship {record[0]}: {e}")
-                            self.stats['errors'] += 1
-
-                logger.info(f"✅ Created {self.stats['created']} maintenance relationships")
-            else:
-                logger.info(f"🔍 DRY RUN: Would create {len(records)} maintenance relationships")
-                self.stats['created'] = len(records)
+            with self.neo4j_driver.session() as session:
+                for record in records:
+                    try:
+                        session.run("""
+                            MATCH (m:MaintenanceRecord {maintenance_id: $maintenance_id})
+                            MATCH (t:Tractor {unit_number: $unit_number})
+                            MERGE (m)-[r:FOR_UNIT]->(t)
+                            SET r.maintenance_date = date($maintenance_date),
+                                r.created_at = datetime($created_at)
+                        """, {
+                            "maintenance_id": str(record[0]),
+                            "unit_number": record[1],
+                            "maintenance_date": str(record[2]),
+                            "created_at": record[3].isoformat()
+                        })
+                        self.stats['created'] += 1
+
+                    except Exception as e:
+                        logger.error(f"❌ Error creating maintenance relationship {record[0]}: {e}")
+                        self.stats['errors'] += 1
+
+            logger.info(f"✅ Created {self.stats['created']} maintenance relationships")
+            self.planner.record_throughput('neo4j_relationships', len(records), time.time() - started)
 
             return len(records)
 
@@ -249,65 +295,65 @@ class Neo4jRelationshipCreator:
         """Create INVOLVES_UNIT and INVOLVES_DRIVER relationships for incidents"""
         logger.info("🔄 Creating Incident relationships...")
 
+        if self.dry_run:
+            # Estimate from planner statistics instead of reading every row
+            estimate = self.planner.plan(
+                'neo4j_relationships', INCIDENT_EXTRACT_SQL, tables=['hub3_origin.incidents'],
+                target_bytes_per_row=neo4j_bytes(relationships=2, properties=4),
+                label='incidents'
+            )
+            self.stats['created'] += estimate.rows * 2
+            return estimate.rows
+
+        started = time.time()
         with self.pg_conn.cursor() as pg_cur:
-            pg_cur.execute("""
-                SELECT
-                    incident_id,
-                    unit_number,
-                    driver_id,
-                    incident_date,
-                    created_at
-                FROM hub3_origin.incidents
-            """)
+            pg_cur.execute(INCIDENT_EXTRACT_SQL)
 
             incidents = pg_cur.fetchall()
             logger.info(f"📊 Found {len(incidents)} incidents in PostgreSQL")
 
-            if not self.dry_run:
-                with self.neo4j_driver.session() as session:
-                    for incident in incidents:
-                        try:
-                            # Create Incident → Tractor relationship (if unit exists)
-                            if incident[1]:
-                                session.run("""
-                                    MATCH (i:Incident {incident_id: $incident_id})
-                                    MATCH (t:Tractor {unit_number: $unit_number})
-                                    MERGE (i)-[r:INVOLVES_UNIT]->(t)
-                                    SET r.incident_date = datetime($incident_date),
-                                        r.created_at = datetime($created_at)
-                                """, {
-                                    "incident_id": str(incident[0]),
-                                    "unit_number": incident[1],
-                                    "incident_date": incident[3].isoformat(),
-                                    "created_at": incident[4].isoformat()
-                                })
-
-                            # Create Incident → Driver relationship (if driver exists)
-                            if incident[2]:
-                                session.run("""
-                                    MATCH (i:Incident {incident_id: $incident_id})
-                                    MATCH (d:Driver {driver_id: $driver_id})
-                                    MERGE (i)-[r:INVOLVES_DRIVER]->(d)
-                                    SET r.incident_date = datetime($incident_date),
-                                        r.created_at = datetime($created_at)
-                                """, {
-                                    "incident_id": str(incident[0]),
-                                    "driver_id": incident[2],
-                                    "incident_date": incident[3].isoformat(),
-                                    "created_at": incident[4].isoformat()
-                                })
-
-                            rels_created = (1 if incident[1] else 0) + (1 if incident[2] else 0)
-                            self.stats['created'] += rels_created
-
-                        except Exception as e:
-                            logger.error(f"❌ Error creating incident relationships {incident[0]}: {e}")
-                            self.stats['errors'] += 1
-
-                logger.info(f"✅ Created incident relationships")
-            else:
-                logger.info(f"🔍 DRY RUN: Would create ~{len(incidents) * 2} incident relationships")
-                self.stats['created'] = len(incidents) * 2
+            with self.neo4j_driver.session() as session:
+                for incident in incidents:
+                    try:
+                        # Create Incident → Tractor relationship (if unit exists)
+                        if incident[1]:
+                            session.run("""
+                                MATCH (i:Incident {incident_id: $incident_id})
+                                MATCH (t:Tractor {unit_number: $unit_number})
+                                MERGE (i)-[r:INVOLVES_UNIT]->(t)
+                                SET r.incident_date = datetime($incident_date),
+                                    r.created_at = datetime($created_at)
+                            """, {
+                                "incident_id": str(incident[0]),
+                                "unit_number": incident[1],
+                                "incident_date": incident[3].isoformat(),
+                                "created_at": incident[4].isoformat()
+                            })
+
+                        # Create Incident → Driver relationship (if driver exists)
+                        if incident[2]:
+                            session.run("""
+                                MATCH (i:Incident {incident_id: $incident_id})
+                                MATCH (d:Driver {driver_id: $driver_id})
+                                MERGE (i)-[r:INVOLVES_DRIVER]->(d)
+                                SET r.incident_date = datetime($incident_date),
+                                    r.created_at = datetime($created_at)
+                            """, {
+                                "incident_id": str(incident[0]),
+                                "driver_id": incident[2],
+                                "incident_date": incident[3].isoformat(),
+                                "created_at": incident[4].isoformat()
+                            })
+
+                        rels_created = (1 if incident[1] else 0) + (1 if incident[2] else 0)
+                        self.stats['created'] += rels_created
+
+                    except Exception as e:
+                        logger.error(f"❌ Error creating incident relationships {incident[0]}: {e}")
+                        self.stats['errors'] += 1
+
+            logger.info(f"✅ Created incident relationships")
+            self.planner.record_throughput('neo4j_relationships', len(incidents), time.time() - started)
 
             return len(incidents)
 
@@ -377,6 +423,8 @@ class Neo4jRelationshipCreator:
         logger.info(f"Created: {self.stats['created']}")
         logger.info(f"Skipped: {self.stats['skipped']}")
         logger.info(f"Errors:  {self.stats['errors']}")
+        if self.dry_run and self.planner:
+            self.planner.log_summary()
         logger.info("="*60)
 
 
@@ -4,24 +4,36 @@ Phase 3: Qdrant Vector Database - Step 1: Create Collections
 Purpose: Create Qdrant collections for different embedding types
 Run after: Phase 1 PostgreSQL setup
 
+Each collection gets a quantization profile (none, scalar int8, product
+quantization x8/x16, binary) picked from its expected size and recall target.
+Recall figures come from the quantization benchmark results when available
+(examples/qdrant-asymmetric-quantization.py --results-file) and from
+conservative defaults otherwise.
+
 Usage:
     python 01_create_collections.py --collection document_chunks --dry-run
     python 01_create_collections.py --collection document_chunks --execute
     python 01_create_collections.py --all --execute
+    python 01_create_collections.py --all --execute --benchmark-results quantization_results.json
+    python 01_create_collections.py --all --execute --update-existing
+    python 01_create_collections.py --all --execute --indexes-only
 """
 
 import os
 import sys
+import json
 import logging
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
-    Distance, VectorParams, PointStruct,
-    CollectionInfo, HnswConfigDiff
+    Distance, VectorParams, VectorParamsDiff, PointStruct,
+    HnswConfigDiff, PayloadSchemaType
 )
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 import argparse
 
+from quantization_profiles import QUANTIZATION_PROFILES, detect_profile
+
 # Load environment variables
 load_dotenv()
 
@@ -44,10 +56,26 @@ QDRANT_CONFIG = {
 # OpenAI text-embedding-3-large: 3072 dimensions
 EMBEDDING_DIMENSION = int(os.getenv('EMBEDDING_DIMENSION', '1536'))
 
+# payload_schema type names -> Qdrant index types
+# DATETIME indexes need qdrant-client >= 1.8; older clients index the ISO string as a keyword
+# (exact match only - range filters on created_at need the datetime index)
+PAYLOAD_SCHEMA_TYPES = {
+    'keyword': PayloadSchemaType.KEYWORD,
+    'integer': PayloadSchemaType.INTEGER,
+    'float': PayloadSchemaType.FLOAT,
+    'text': PayloadSchemaType.TEXT,
+    'datetime': getattr(PayloadSchemaType, 'DATETIME', PayloadSchemaType.KEYWORD),
+}
+
+# Below this size full-precision vectors fit comfortably in RAM, so don't quantize
+QUANTIZE_ABOVE_POINTS = int(os.getenv('QDRANT_QUANTIZE_ABOVE_POINTS', '100000'))
+
 COLLECTIONS = {
     'document_chunks': {
         'description': 'Document chunk embeddings from all 6 hubs',
         'vector_size': EMBEDDING_DIMENSION,
+        'expected_points': 2_000_000,
+        'recall_target': 0.95,
         'distance': Distance.COSINE,
         'hnsw_config': {
             'm': 16,  # Number of edges per node
@@ -65,6 +93,8 @@ COLLECTIONS = {
     'entity_embeddings': {
         'description': 'Entity embeddings (tractors, drivers, companies, etc.)',
         'vector_size': EMBEDDING_DIMENSION,
+        'expected_points': 250_000,
+        'recall_target': 0.97,
         'distance': Distance.COSINE,
         'hnsw_config': {
             'm': 16,
@@ -82,6 +112,8 @@ COLLECTIONS = {
     'query_cache': {
         'description': 'Cached query embeddings for semantic search',
         'vector_size': EMBEDDING_DIMENSION,
+        'expected_points': 50_000,
+        'recall_target': 0.90,
         'distance': Distance.COSINE,
         'hnsw_config': {
             'm': 8,  # Smaller graph for cache
@@ -90,23 +122,88 @@ COLLECTIONS = {
         'payload_schema': {
             'query_text': 'text',
             'query_hash': 'keyword',
+            'scope_hash': 'keyword',      # semantic_cache.py: hits never cross filter scopes
             'result_ids': 'keyword',
             'created_at': 'datetime',
+            'expires_at': 'integer',      # epoch seconds; expired points are filtered and evicted
             'access_count': 'integer'
         }
     }
 }
 
 
+def load_benchmark_results(path: Optional[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Load measured recall per profile from the quantization benchmark
+    Expected format: {"profiles": {"scalar_int8": {"recall": 0.97, ...}, ...}}
+    """
+    if not path:
+        return {}
+    try:
+        with open(path, 'r') as f:
+            results = json.load(f)
+        profiles = results.get('profiles', {})
+        logger.info(f"📊 Loaded benchmark results for {len(profiles)} profiles from {path}")
+        return profiles
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️  Could not read benchmark results {path}: {e} - using default recall")
+        return {}
+
+
+def profile_recall(profile_name: str, benchmark: Dict[str, Dict[str, float]]) -> float:
+    """Measured recall@k for a profile, else its default"""
+    measured = benchmark.get(profile_name, {}).get('recall')
+    return measured if measured is not None else QUANTIZATION_PROFILES[profile_name]['default_recall']
+
+
+def select_profile(config: Dict[str, Any], benchmark: Dict[str, Dict[str, float]]) -> str:
+    """
+    Pick the smallest-RAM profile that still meets the collection's recall target
+    Small collections stay unquantized; if nothing qualifies, fall back to no quantization
+    """
+    if config['expected_points'] < QUANTIZE_ABOVE_POINTS:
+        return 'no_quantization'
+
+    for profile_name in reversed(list(QUANTIZATION_PROFILES)):
+        if profile_recall(profile_name, benchmark) >= config['recall_target']:
+            return profile_name
+    return 'no_quantization'
+
+
+def estimate_ram_bytes(config: Dict[str, Any], profile_name: str) -> int:
+    """Vector RAM for the collection's expected size under a profile"""
+    profile = QUANTIZATION_PROFILES[profile_name]
+    return int(config['expected_points'] * config['vector_size'] * profile['ram_bytes_per_dim'])
+
+
+def index_type(field_type: str) -> PayloadSchemaType:
+    """Qdrant index type for a payload_schema type name"""
+    if field_type not in PAYLOAD_SCHEMA_TYPES:
+        raise ValueError(f"Unknown payload type '{field_type}'")
+    return PAYLOAD_SCHEMA_TYPES[field_type]
+
+
+def format_mb(size: int) -> str:
+    return f"{size / (1024 * 1024):,.0f} MB"
+
+
 class QdrantCollectionManager:
     """Manage Qdrant collections for Apex Memory System"""
 
-    def __init__(self, dry_run: bool = True):
+    def __init__(self, dry_run: bool = True, benchmark_results: Optional[str] = None,
+                 profile_override: Optional[str] = None, update_existing: bool = False,
+                 indexes_only: bool = False):
         self.dry_run = dry_run
         self.client = None
+        self.benchmark = load_benchmark_results(benchmark_results)
+        self.profile_override = profile_override
+        self.update_existing = update_existing
+        self.indexes_only = indexes_only
         self.stats = {
             'created': 0,
+            'updated': 0,
             'skipped': 0,
+            'indexes_created': 0,
             'errors': 0
         }
 
@@ -141,40 +238,57 @@ class QdrantCollectionManager:
             return False
 
         config = COLLECTIONS[collection_name]
+        profile_name = self.profile_override or select_profile(config, self.benchmark)
+        profile = QUANTIZATION_PROFILES[profile_name]
+        baseline_ram = estimate_ram_bytes(config, 'no_quantization')
+        profile_ram = estimate_ram_bytes(config, profile_name)
+
         logger.info(f"🔄 Creating collection: {collection_name}")
         logger.info(f"   Description: {config['description']}")
         logger.info(f"   Vector size: {config['vector_size']}")
         logger.info(f"   Distance: {config['distance']}")
+        logger.info(f"   Profile: {profile_name} ({profile['description']})")
+        logger.info(f"   Expected points: {config['expected_points']:,}, "
+                    f"recall target {config['recall_target']:.2f}, "
+                    f"profile recall {profile_recall(profile_name, self.benchmark):.3f}")
+        logger.info(f"   Vector RAM: {format_mb(profile_ram)} (vs {format_mb(baseline_ram)} unquantized)")
 
         if not self.dry_run:
             try:
                 # Check if collection already exists
                 existing_collections = self.client.get_collections()
                 if any(c.name == collection_name for c in existing_collections.collections):
+                    # Indexes are (re)checked on every run so schema additions reach old collections
+                    self.ensure_payload_indexes(collection_name)
+                    if self.update_existing and not self.indexes_only:
+                        return self.apply_profile(collection_name, profile_name)
                     logger.info(f"⚠️  Collection '{collection_name}' already exists, skipping")
                     self.stats['skipped'] += 1
                     return True
 
+                if self.indexes_only:
+                    logger.warning(f"⚠️  Collection '{collection_name}' does not exist, skipping indexes")
+                    self.stats['skipped'] += 1
+                    return True
+
                 # Create collection
                 self.client.create_collection(
                     collection_name=collection_name,
                     vectors_config=VectorParams(
                         size=config['vector_size'],
-                        distance=config['distance']
+                        distance=config['distance'],
+                        on_disk=profile['on_disk']
                     ),
                     hnsw_config=HnswConfigDiff(
                         m=config['hnsw_config']['m'],
                         ef_construct=config['hnsw_config']['ef_construct']
-                    )
+                    ),
+                    quantization_config=profile['quantization'],
+                    on_disk_payload=profile['on_disk']
                 )
 
                 # Create payload indexes for efficient filtering
-                for field_name, field_type in config['payload_schema'].items():
-                    self.client.create_payload_index(
-                        collection_name=collection_name,
-                        field_name=field_name,
-                        field_schema=field_type
-                    )
+                self.ensure_payload_indexes(collection_name)
 
                 self.stats['created'] += 1
                 logger.info(f"✅ Created collection: {collection_name}")
@@ -186,9 +300,66 @@ class QdrantCollectionManager:
                 return False
         else:
             logger.info(f"🔍 DRY RUN: Would create collection {collection_name}")
+            for field_name, field_type in config['payload_schema'].items():
+                logger.info(f"   Would index {field_name}: {index_type(field_type).value}")
             self.stats['created'] += 1
             return True
 
+    def missing_payload_indexes(self, collection_name: str) -> Dict[str, PayloadSchemaType]:
+        """Schema fields without a payload index (or indexed with a different type)"""
+        info = self.client.get_collection(collection_name)
+        existing = info.payload_schema or {}
+        missing = {}
+        for field_name, field_type in COLLECTIONS[collection_name]['payload_schema'].items():
+            expected = index_type(field_type)
+            indexed = existing.get(field_name)
+            if indexed is None or indexed.data_type != expected:
+                missing[field_name] = expected
+        return missing
+
+    def ensure_payload_indexes(self, collection_name: str):
+        """Create any payload indexes declared in payload_schema that Qdrant does not have yet"""
+        missing = self.missing_payload_indexes(collection_name)
+        if not missing:
+            logger.info(f"✅ Payload indexes up to date on {collection_name}")
+            return
+
+        for field_name, schema_type in missing.items():
+            self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=schema_type,
+                wait=True
+            )
+            self.stats['indexes_created'] += 1
+            logger.info(f"✅ Indexed {collection_name}.{field_name} ({schema_type.value})")
+
+    def apply_profile(self, collection_name: str, profile_name: str) -> bool:
+        """Switch an existing collection to a profile (Qdrant re-quantizes in the background)"""
+        info = self.client.get_collection(collection_name)
+        current = detect_profile(info)
+        if current == profile_name:
+            logger.info(f"✅ Collection '{collection_name}' already uses profile {profile_name}")
+            self.stats['skipped'] += 1
+            return True
+
+        profile = QUANTIZATION_PROFILES[profile_name]
+        if profile['quantization'] is None:
+            # Removing quantization is not supported by update_collection
+            logger.warning(f"⚠️  Collection '{collection_name}' uses {current}; "
+                           f"recreate it to switch to {profile_name}")
+            self.stats['skipped'] += 1
+            return True
+
+        self.client.update_collection(
+            collection_name=collection_name,
+            vectors_config={'': VectorParamsDiff(on_disk=profile['on_disk'])},
+            quantization_config=profile['quantization']
+        )
+        self.stats['updated'] += 1
+        logger.info(f"✅ Updated collection '{collection_name}': {current} → {profile_name}")
+        return True
+
     def create_all_collections(self):
         """Create all defined collections"""
         logger.info("🔄 Creating all collections...")
@@ -212,10 +383,23 @@ class QdrantCollectionManager:
                 logger.info(f"   Status: {info.status}")
                 logger.info(f"   Vectors: {info.vectors_count}")
                 logger.info(f"   Points: {info.points_count}")
+                logger.info(f"   Quantization profile: {detect_profile(info)}")
                 if hasattr(info.config, 'params'):
                     logger.info(f"   Vector size: {info.config.params.vectors.size}")
                     logger.info(f"   Distance: {info.config.params.vectors.distance}")
 
+                indexed = info.payload_schema or {}
+                for field_name, field_info in sorted(indexed.items()):
+                    logger.info(f"   Index {field_name}: {field_info.data_type.value} "
+                                f"({field_info.points or 0:,} points)")
+                if collection.name in COLLECTIONS:
+                    missing = self.missing_payload_indexes(collection.name)
+                    if missing:
+                        logger.warning(f"   ⚠️  Missing payload indexes: {', '.join(sorted(missing))} "
+                                       f"(run --execute --indexes-only)")
+                    else:
+                        logger.info("   ✅ All schema payload indexes present")
+
             if not collections:
                 logger.warning("⚠️  No collections found in Qdrant")
 
@@ -230,7 +414,9 @@ class QdrantCollectionManager:
         logger.info("COLLECTION CREATION STATISTICS")
         logger.info("="*60)
         logger.info(f"Created: {self.stats['created']}")
+        logger.info(f"Updated: {self.stats['updated']}")
         logger.info(f"Skipped: {self.stats['skipped']}")
+        logger.info(f"Indexes: {self.stats['indexes_created']}")
         logger.info(f"Errors:  {self.stats['errors']}")
         logger.info("="*60)
 
@@ -248,6 +434,14 @@ def main():
                         help='Execute collection creation and write to Qdrant')
     parser.add_argument('--verify', action='store_true',
                         help='Verify collections in Qdrant')
+    parser.add_argument('--benchmark-results', type=str,
+                        help='JSON results from the quantization benchmark (measured recall per profile)')
+    parser.add_argument('--profile', type=str, choices=list(QUANTIZATION_PROFILES),
+                        help='Force a quantization profile instead of selecting one per collection')
+    parser.add_argument('--update-existing', action='store_true',
+                        help='Apply the selected profile to collections that already exist')
+    parser.add_argument('--indexes-only', action='store_true',
+                        help='Only create missing payload indexes on existing collections')
 
     args = parser.parse_args()
 
@@ -267,7 +461,11 @@ def main():
     logger.info(f"Embedding dimension: {EMBEDDING_DIMENSION}")
     logger.info("="*60)
 
-    manager = QdrantCollectionManager(dry_run=dry_run)
+    manager = QdrantCollectionManager(dry_run=dry_run,
+                                      benchmark_results=args.benchmark_results,
+                                      profile_override=args.profile,
+                                      update_existing=args.update_existing,
+                                      indexes_only=args.indexes_only)
 
     try:
         manager.connect()
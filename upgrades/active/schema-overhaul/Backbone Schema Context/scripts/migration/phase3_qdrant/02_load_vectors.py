@@ -12,6 +12,7 @@ Usage:
 
 import os
 import sys
+import time
 import logging
 import psycopg2
 from qdrant_client import QdrantClient
@@ -22,6 +23,9 @@ from dotenv import load_dotenv
 import argparse
 import json
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dry_run_planner import DryRunPlanner, qdrant_bytes
+
 # Load environment variables
 load_dotenv()
 
@@ -50,6 +54,50 @@ QDRANT_CONFIG = {
 # Batch size for uploads
 BATCH_SIZE = 100
 
+EMBEDDING_DIMENSION = int(os.getenv('EMBEDDING_DIMENSION', '1536'))
+
+# Extract queries
+# Note: This assumes a documents table with embeddings
+# Adjust table/column names based on actual schema
+DOCUMENT_CHUNK_EXTRACT_SQL = """
+    SELECT
+        d.document_id,
+        d.chunk_number,
+        d.content,
+        d.embedding,
+        d.metadata,
+        d.created_at
+    FROM documents d
+    WHERE d.embedding IS NOT NULL
+    ORDER BY d.created_at DESC
+"""
+
+# Entities with embeddings from multiple hubs
+# This is a simplified example - adjust based on actual schema
+ENTITY_EXTRACT_SQL = """
+    SELECT
+        'tractor' as entity_type,
+        unit_number as entity_id,
+        make || ' ' || model as entity_name,
+        status as property,
+        NULL as embedding,  -- Placeholder: would need to generate
+        created_at
+    FROM hub3_origin.tractors
+    WHERE valid_to IS NULL
+
+    UNION ALL
+
+    SELECT
+        'driver' as entity_type,
+        driver_id as entity_id,
+        name as entity_name,
+        status as property,
+        NULL as embedding,
+        created_at
+    FROM hub3_origin.drivers
+    WHERE valid_to IS NULL
+"""
+
 
 class QdrantVectorLoader:
     """Load vectors from PostgreSQL to Qdrant"""
@@ -58,6 +106,7 @@ class QdrantVectorLoader:
         self.dry_run = dry_run
         self.pg_conn = None
         self.qdrant_client = None
+        self.planner = None
         self.stats = {
             'loaded': 0,
             'skipped': 0,
@@ -69,6 +118,7 @@ class QdrantVectorLoader:
         try:
             # Connect to PostgreSQL
             self.pg_conn = psycopg2.connect(**PG_CONFIG)
+            self.planner = DryRunPlanner(self.pg_conn)
             logger.info(f"✅ Connected to PostgreSQL: {PG_CONFIG['database']}")
 
             # Connect to Qdrant
@@ -95,78 +145,74 @@ class QdrantVectorLoader:
         """Load document chunk embeddings to Qdrant"""
         logger.info("🔄 Loading document chunks...")
 
+        if self.dry_run:
+            # Estimate from planner statistics instead of reading every row
+            # (payload sized as the full source row - an upper bound)
+            estimate = self.planner.plan(
+                'qdrant_vectors', DOCUMENT_CHUNK_EXTRACT_SQL, tables=['documents'],
+                batch_size=BATCH_SIZE, label='document_chunks',
+                target_bytes_per_row=lambda width: qdrant_bytes(dimension=EMBEDDING_DIMENSION,
+                                                                payload_bytes=width)
+            )
+            self.stats['loaded'] += estimate.rows
+            return estimate.rows
+
+        started = time.time()
         with self.pg_conn.cursor() as pg_cur:
-            # Query document chunks with embeddings
-            # Note: This assumes a documents table with embeddings
-            # Adjust table/column names based on actual schema
-            pg_cur.execute("""
-                SELECT
-                    d.document_id,
-                    d.chunk_number,
-                    d.content,
-                    d.embedding,
-                    d.metadata,
-                    d.created_at
-                FROM documents d
-                WHERE d.embedding IS NOT NULL
-                ORDER BY d.created_at DESC
-            """)
+            pg_cur.execute(DOCUMENT_CHUNK_EXTRACT_SQL)
 
             chunks = pg_cur.fetchall()
             logger.info(f"📊 Found {len(chunks)} document chunks with embeddings in PostgreSQL")
 
-            if not self.dry_run:
-                points = []
-                for chunk in chunks:
-                    try:
-                        # Parse embedding (stored as array in PostgreSQL)
-                        embedding = chunk[3]  # Already a list from pgvector
-
-                        # Extract metadata
-                        metadata = json.loads(chunk[4]) if chunk[4] else {}
-
-                        # Create Qdrant point
-                        point = PointStruct(
-                            id=str(uuid4()),
-                            vector=embedding,
-                            payload={
-                                'document_id': chunk[0],
-                                'chunk_number': chunk[1],
-                                'text': chunk[2],
-                                'hub_name': metadata.get('hub_name', 'unknown'),
-                                'entity_type': metadata.get('entity_type', 'document'),
-                                'created_at': chunk[5].isoformat() if chunk[5] else None
-                            }
-                        )
-                        points.append(point)
-
-                        # Upload in batches
-                        if len(points) >= BATCH_SIZE:
-                            self.qdrant_client.upsert(
-                                collection_name='document_chunks',
-                                points=points
-                            )
-                            self.stats['loaded'] += len(points)
-                            logger.info(f"📤 Uploaded batch of {len(points)} points")
-                            points = []
-
-                    except Exception as e:
-                        logger.error(f"❌ Error processing chunk {chunk[0]}: {e}")
-                        self.stats['errors'] += 1
-
-                # Upload remaining points
-                if points:
-                    self.qdrant_client.upsert(
-                        collection_name='document_chunks',
-                        points=points
+            points = []
+            for chunk in chunks:
+                try:
+                    # Parse embedding (stored as array in PostgreSQL)
+                    embedding = chunk[3]  # Already a list from pgvector
+
+                    # Extract metadata
+                    metadata = json.loads(chunk[4]) if chunk[4] else {}
+
+                    # Create Qdrant point
+                    point = PointStruct(
+                        id=str(uuid4()),
+                        vector=embedding,
+                        payload={
+                            'document_id': chunk[0],
+                            'chunk_number': chunk[1],
+                            'text': chunk[2],
+                            'hub_name': metadata.get('hub_name', 'unknown'),
+                            'entity_type': metadata.get('entity_type', 'document'),
+                            'created_at': chunk[5].isoformat() if chunk[5] else None
+                        }
                     )
-                    self.stats['loaded'] += len(points)
-                    logger.info(f"📤 Uploaded final batch of {len(points)} points")
+                    points.append(point)
 
-                logger.info(f"✅ Loaded {self.stats['loaded']} document chunks to Qdrant")
-            else:
-                logger.info(f"🔍 DRY RUN: Would load {len(chunks)} document chunks")
-                self.stats['loaded'] = len(chunks)
+                    # Upload in batches
+                    if len(points) >= BATCH_SIZE:
+                        self.qdrant_client.upsert(
+                            collection_name='document_chunks',
+                            points=points
+                        )
+                        self.stats['loaded'] += len(points)
+                        logger.info(f"📤 Uploaded batch of {len(points)} points")
+                        points = []
+
+                except Exception as e:
+                    logger.error(f"❌ Error processing chunk {chunk[0]}: {e}")
+                    self.stats['errors'] += 1
+
+            # Upload remaining points
+            if points:
+                self.qdrant_client.upsert(
+                    collection_name='document_chunks',
+                    points=points
+                )
+                self.stats['loaded'] += len(points)
+                logger.info(f"📤 Uploaded final batch of {len(points)} points")
+
+            logger.info(f"✅ Loaded {self.stats['loaded']} document chunks to Qdrant")
+            self.planner.record_throughput('qdrant_vectors', self.stats['loaded'], time.time() - started)
 
             return len(chunks)
 
@@ -174,42 +220,26 @@ class QdrantVectorLoader:
         """Load entity embeddings to Qdrant"""
         logger.info("🔄 Loading entity embeddings...")
 
+        if self.dry_run:
+            # Estimate from planner statistics instead of reading every row
+            estimate = self.planner.plan(
+                'qdrant_vectors', ENTITY_EXTRACT_SQL,
+                tables=['hub3_origin.tractors', 'hub3_origin.drivers'], batch_size=BATCH_SIZE,
+                label='entity_embeddings',
+                target_bytes_per_row=lambda width: qdrant_bytes(dimension=EMBEDDING_DIMENSION,
+                                                                payload_bytes=width)
+            )
+            self.stats['loaded'] += estimate.rows
+            return estimate.rows
+
         with self.pg_conn.cursor() as pg_cur:
-            # Query entities with embeddings from multiple hubs
-            # This is a simplified example - adjust based on actual schema
-            pg_cur.execute("""
-                SELECT
-                    'tractor' as entity_type,
-                    unit_number as entity_id,
-                    make || ' ' || model as entity_name,
-                    status as property,
-                    NULL as embedding,  -- Placeholder: would need to generate
-                    created_at
-                FROM hub3_origin.tractors
-                WHERE valid_to IS NULL
-
-                UNION ALL
-
-                SELECT
-                    'driver' as entity_type,
-                    driver_id as entity_id,
-                    name as entity_name,
-                    status as property,
-                    NULL as embedding,
-                    created_at
-                FROM hub3_origin.drivers
-                WHERE valid_to IS NULL
-            """)
+            pg_cur.execute(ENTITY_EXTRACT_SQL)
 
             entities = pg_cur.fetchall()
             logger.info(f"📊 Found {len(entities)} entities in PostgreSQL")
 
-            if not self.dry_run:
-                logger.info("⚠️  Entity embeddings require generation - skipping for now")
-                logger.info("   (Will be generated during actual migration)")
-            else:
-                logger.info(f"🔍 DRY RUN: Would process {len(entities)} entities")
-                self.stats['loaded'] = len(entities)
+            logger.info("⚠️  Entity embeddings require generation - skipping for now")
+            logger.info("   (Will be generated during actual migration)")
 
             return len(entities)
 
@@ -261,6 +291,8 @@ class QdrantVectorLoader:
         logger.info(f"Loaded:  {self.stats['loaded']}")
         logger.info(f"Skipped: {self.stats['skipped']}")
         logger.info(f"Errors:  {self.stats['errors']}")
+        if self.dry_run and self.planner:
+            self.planner.log_summary()
         logger.info("="*60)
 
 
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Filtered Vector Search
+Purpose: Hub/entity-scoped semantic search that picks filter-first or vector-first per query
+Run after: 01_create_collections.py (payload indexes must exist)
+
+Qdrant evaluates payload filters against the payload indexes built from
+COLLECTIONS[...]['payload_schema']. How the filter and the vector search are
+combined depends on how many points match the filter:
+
+- filter-first: few points match (e.g. one hub's incidents), so score the
+  filtered points exactly. This is cheap, and recall is 100%.
+- vector-first: many points match, so walk the HNSW graph with the filter
+  applied. hnsw_ef is raised as the filter gets more selective so the graph
+  walk still finds `limit` matching neighbours.
+
+The match count comes from an approximate client.count on the same filter,
+which is answered from the payload indexes.
+
+HNSW searches on a quantized collection use its profile's rescore and
+oversampling (quantization_profiles.search_params_for), detected from the
+collection's quantization config unless `quantization` is passed.
+
+Usage:
+    search = FilteredSearch(client, 'document_chunks')
+    hits = search.search(query_vector, limit=10, hub_name='hub3', entity_type='incident')
+    plan = search.plan(search.build_filter(hub_name='hub3'))
+"""
+
+import os
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from qdrant_client import QdrantClient, models
+from qdrant_client.models import (
+    Filter, FieldCondition, MatchValue, MatchAny,
+    SearchParams, QuantizationSearchParams, ScoredPoint
+)
+
+from quantization_profiles import detect_profile, search_params_for
+
+logger = logging.getLogger(__name__)
+
+# Filters matching at most this many points are scored exactly (filter-first)
+FILTER_FIRST_MAX_POINTS = int(os.getenv('QDRANT_FILTER_FIRST_MAX_POINTS', '20000'))
+
+# hnsw_ef for unfiltered / broad searches, and the cap when widening for selective filters
+BASE_HNSW_EF = int(os.getenv('QDRANT_SEARCH_EF', '128'))
+MAX_HNSW_EF = 512
+
+# DatetimeRange needs qdrant-client >= 1.8 (and a datetime payload index)
+DatetimeRange = getattr(models, 'DatetimeRange', None)
+
+
+@dataclass
+class SearchPlan:
+    """How a filtered search will be executed"""
+    strategy: str            # 'filter_first' | 'vector_first' | 'unfiltered'
+    matching_points: int
+    total_points: int
+    params: SearchParams
+
+    @property
+    def selectivity(self) -> float:
+        return self.matching_points / self.total_points if self.total_points else 0.0
+
+
+class FilteredSearch:
+    """Choose between exact filtered scoring and filtered HNSW per query"""
+
+    def __init__(self, client: QdrantClient, collection_name: str,
+                 filter_first_max_points: int = FILTER_FIRST_MAX_POINTS,
+                 quantization: Optional[QuantizationSearchParams] = None):
+        self.client = client
+        self.collection_name = collection_name
+        self.filter_first_max_points = filter_first_max_points
+        # Rescoring settings for quantized collections (default: from the collection's profile)
+        self._quantization = quantization
+        self._quantization_known = quantization is not None
+        self._total_points: Optional[int] = None
+
+    @staticmethod
+    def build_filter(hub_name: Optional[str] = None,
+                     entity_type: Optional[str] = None,
+                     created_after: Optional[datetime] = None,
+                     created_before: Optional[datetime] = None,
+                     **match: Any) -> Optional[Filter]:
+        """
+        Build a filter on indexed payload fields
+        Extra keyword arguments match exactly (a list matches any of its values)
+        """
+        conditions = []
+        fields = {'hub_name': hub_name, 'entity_type': entity_type, **match}
+        for field_name, value in fields.items():
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(FieldCondition(key=field_name, match=MatchAny(any=list(value))))
+            else:
+                conditions.append(FieldCondition(key=field_name, match=MatchValue(value=value)))
+
+        if created_after or created_before:
+            if DatetimeRange is None:
+                raise ValueError("created_at range filters need qdrant-client >= 1.8 "
+                                 "and a datetime payload index")
+            conditions.append(FieldCondition(
+                key='created_at',
+                range=DatetimeRange(gte=created_after, lt=created_before)
+            ))
+
+        return Filter(must=conditions) if conditions else None
+
+    @property
+    def quantization(self) -> Optional[QuantizationSearchParams]:
+        """Query-time rescore/oversampling for the collection's quantization profile (cached)"""
+        if not self._quantization_known:
+            profile_name = detect_profile(self.client.get_collection(self.collection_name))
+            self._quantization = search_params_for(profile_name).quantization
+            self._quantization_known = True
+            logger.debug(f"🔍 {self.collection_name}: quantization profile {profile_name}")
+        return self._quantization
+
+    def total_points(self) -> int:
+        """Collection size (cached per instance)"""
+        if self._total_points is None:
+            self._total_points = self.client.count(self.collection_name, exact=False).count
+        return self._total_points
+
+    def matching_points(self, query_filter: Filter) -> int:
+        """Approximate number of points matching a filter (answered from payload indexes)"""
+        return self.client.count(self.collection_name, count_filter=query_filter, exact=False).count
+
+    def plan(self, query_filter: Optional[Filter], limit: int = 10) -> SearchPlan:
+        """Pick filter-first or vector-first from the filter's cardinality"""
+        total = self.total_points()
+        if query_filter is None:
+            return SearchPlan('unfiltered', total, total,
+                              SearchParams(hnsw_ef=BASE_HNSW_EF, quantization=self.quantization))
+
+        matching = self.matching_points(query_filter)
+        if matching <= self.filter_first_max_points:
+            # Exact scoring over the filtered set; quantized copies are skipped for full precision
+            return SearchPlan('filter_first', matching, total, SearchParams(
+                exact=True,
+                quantization=QuantizationSearchParams(ignore=True) if self.quantization else None
+            ))
+
+        # Filtered HNSW: widen the candidate list roughly in proportion to 1 / selectivity
+        selectivity = matching / total if total else 1.0
+        hnsw_ef = min(MAX_HNSW_EF, max(BASE_HNSW_EF, int(limit / max(selectivity, 1e-6))))
+        return SearchPlan('vector_first', matching, total,
+                          SearchParams(hnsw_ef=hnsw_ef, quantization=self.quantization))
+
+    def search(self, query_vector: List[float], limit: int = 10,
+               with_payload: bool = True, score_threshold: Optional[float] = None,
+               **filters: Any) -> List[ScoredPoint]:
+        """Filtered semantic search (filters as in build_filter)"""
+        query_filter = self.build_filter(**filters)
+        plan = self.plan(query_filter, limit)
+        logger.debug(f"🔍 {self.collection_name}: {plan.strategy} "
+                     f"({plan.matching_points:,}/{plan.total_points:,} points, "
+                     f"selectivity {plan.selectivity:.4f})")
+
+        return self.client.search(
+            collection_name=self.collection_name,
+            query_vector=query_vector,
+            query_filter=query_filter,
+            search_params=plan.params,
+            limit=limit,
+            with_payload=with_payload,
+            score_threshold=score_threshold
+        )
+
+    def explain(self, limit: int = 10, **filters: Any) -> Dict[str, Any]:
+        """Plan summary for a filter without running the search"""
+        plan = self.plan(self.build_filter(**filters), limit)
+        return {
+            'collection': self.collection_name,
+            'strategy': plan.strategy,
+            'matching_points': plan.matching_points,
+            'total_points': plan.total_points,
+            'selectivity': round(plan.selectivity, 6),
+            'hnsw_ef': plan.params.hnsw_ef,
+            'exact': bool(plan.params.exact),
+        }
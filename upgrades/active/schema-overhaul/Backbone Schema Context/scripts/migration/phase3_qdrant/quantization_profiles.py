@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Qdrant Quantization Profiles
+Purpose: Quantization profiles shared by collection setup and query time
+Used by: 01_create_collections.py (picks and applies a profile per collection),
+         filtered_search.py (searches with the profile's rescore/oversampling)
+
+A quantized collection only reaches its benchmarked recall when it is
+queried with the profile's rescore and oversampling. detect_profile maps a
+collection's stored quantization config back to its profile, and
+search_params_for turns that profile into query-time SearchParams.
+
+Usage:
+    profile_name = detect_profile(client.get_collection('document_chunks'))
+    params = search_params_for(profile_name, hnsw_ef=128)
+"""
+
+from typing import Optional
+
+from qdrant_client.models import (
+    CollectionInfo,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    ProductQuantization, ProductQuantizationConfig, CompressionRatio,
+    BinaryQuantization, BinaryQuantizationConfig,
+    SearchParams, QuantizationSearchParams
+)
+
+# Quantization profiles, ordered from most to least RAM per vector
+# ram_bytes_per_dim: RAM used per dimension by the vectors searched in memory
+# default_recall:    recall@10 assumed when no benchmark measurement exists
+# on_disk:           keep original float32 vectors on disk (quantized copy stays in RAM)
+# rescore/oversampling: query-time settings that recover recall from the originals
+QUANTIZATION_PROFILES = {
+    'no_quantization': {
+        'description': 'Full float32 vectors in RAM',
+        'quantization': None,
+        'ram_bytes_per_dim': 4.0,
+        'default_recall': 0.99,
+        'on_disk': False,
+        'rescore': False,
+        'oversampling': None,
+    },
+    'scalar_int8': {
+        'description': 'Scalar INT8 (4x), originals on disk',
+        'quantization': ScalarQuantization(scalar=ScalarQuantizationConfig(
+            type=ScalarType.INT8, quantile=0.99, always_ram=True
+        )),
+        'ram_bytes_per_dim': 1.0,
+        'default_recall': 0.97,
+        'on_disk': True,
+        'rescore': True,
+        'oversampling': 1.5,
+    },
+    'asymmetric_x8': {
+        'description': 'Product quantization x8 (asymmetric distance), originals on disk',
+        'quantization': ProductQuantization(product=ProductQuantizationConfig(
+            compression=CompressionRatio.X8, always_ram=True
+        )),
+        'ram_bytes_per_dim': 0.5,
+        'default_recall': 0.93,
+        'on_disk': True,
+        'rescore': True,
+        'oversampling': 2.0,
+    },
+    'asymmetric_x16': {
+        'description': 'Product quantization x16 (asymmetric distance), originals on disk',
+        'quantization': ProductQuantization(product=ProductQuantizationConfig(
+            compression=CompressionRatio.X16, always_ram=True
+        )),
+        'ram_bytes_per_dim': 0.25,
+        'default_recall': 0.90,
+        'on_disk': True,
+        'rescore': True,
+        'oversampling': 3.0,
+    },
+    'binary': {
+        'description': 'Binary (32x), originals on disk',
+        'quantization': BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True)),
+        'ram_bytes_per_dim': 0.125,
+        'default_recall': 0.85,
+        'on_disk': True,
+        'rescore': True,
+        'oversampling': 3.0,
+    },
+}
+
+
+def search_params_for(profile_name: str, hnsw_ef: Optional[int] = None) -> SearchParams:
+    """Query-time search params (rescoring/oversampling) matching a profile"""
+    profile = QUANTIZATION_PROFILES[profile_name]
+    quantization = None
+    if profile['quantization'] is not None:
+        quantization = QuantizationSearchParams(
+            ignore=False,
+            rescore=profile['rescore'],
+            oversampling=profile['oversampling']
+        )
+    return SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+
+
+def detect_profile(info: CollectionInfo) -> str:
+    """Map an existing collection's quantization config back to a profile name"""
+    quantization = info.config.quantization_config
+    if quantization is None:
+        return 'no_quantization'
+    if isinstance(quantization, ScalarQuantization):
+        return 'scalar_int8'
+    if isinstance(quantization, BinaryQuantization):
+        return 'binary'
+    if isinstance(quantization, ProductQuantization):
+        compression = quantization.product.compression
+        return 'asymmetric_x16' if compression == CompressionRatio.X16 else 'asymmetric_x8'
+    return 'no_quantization'
@@ -38,25 +38,31 @@ REDIS_CONFIG = {
 }
 
 # Cache configuration
+# codec/dtype: value encoding used by cache_client.py (json | vector | bytes)
 CACHE_CONFIG = {
     'query_results': {
         'prefix': 'apex:query:',
         'ttl': 3600,  # 1 hour
+        'codec': 'json',
         'description': 'Cached query results for repeat queries'
     },
     'embeddings': {
         'prefix': 'apex:embedding:',
         'ttl': 86400,  # 24 hours
+        'codec': 'vector',
+        'dtype': 'float32',
         'description': 'Cached embeddings for common texts'
     },
     'entity_cache': {
         'prefix': 'apex:entity:',
         'ttl': 1800,  # 30 minutes
+        'codec': 'json',
         'description': 'Cached entity data for quick lookups'
     },
     'graph_patterns': {
         'prefix': 'apex:pattern:',
         'ttl': 7200,  # 2 hours
+        'codec': 'json',
         'description': 'Cached graph patterns and traversals'
     }
 }
@@ -217,14 +223,18 @@ class RedisConfigurator:
             logger.info(f"✅ Memory policy: {policy.get('maxmemory-policy', 'N/A')}")
             logger.info(f"✅ Max memory: {max_mem.get('maxmemory', 'N/A')}")
 
-            # Check configured keys
-            config_keys = self.client.keys('apex:config:*')
-            logger.info(f"✅ Configuration keys: {len(config_keys)}")
+            # Check configured keys (SCAN, not KEYS: KEYS blocks Redis on large keyspaces)
+            config_keys = sum(1 for _ in self.client.scan_iter(match='apex:config:*', count=1000))
+            logger.info(f"✅ Configuration keys: {config_keys}")
 
             # Check Redis info
             info = self.client.info()
+            keyspace = {name: stats for name, stats in info.items() if name.startswith('db') and isinstance(stats, dict)}
             logger.info(f"📊 Used memory: {info['used_memory_human']}")
-            logger.info(f"📊 Total keys: {info['db0']['keys'] if 'db0' in info else 0}")
+            total_keys = sum(stats['keys'] for stats in keyspace.values())
+            per_db = ', '.join(f"{name}: {stats['keys']}" for name, stats in keyspace.items())
+            logger.info(f"📊 Total keys: {total_keys} ({per_db or 'empty'})")
+            logger.info("   Per-namespace breakdown: python 02_inspect_redis.py")
 
         except Exception as e:
             logger.error(f"❌ Verification failed: {e}")
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Phase 4: Redis Cache - Step 2: Inspect Redis
+Purpose: Report per-namespace key counts, memory, TTLs and eviction rates without blocking Redis
+Run after: 01_configure_redis.py
+
+Read-only. The keyspace of every database listed in INFO keyspace is walked
+with incremental SCAN (--scan-count keys per call, --throttle-ms pause
+between calls), never KEYS, so production traffic is not blocked.
+
+- Keys are grouped by the longest matching prefix from
+  apex:config:cache_namespaces (plus the query reverse index, the query
+  invalidation counter and apex:config:). Other keys are grouped by their
+  first two segments.
+- TTL is read for every key (pipelined per SCAN batch). Keys are bucketed
+  into no expiry / <1m / <10m / <1h / <1d / >=1d.
+- MEMORY USAGE is read for a --sample-rate fraction of keys. Namespace
+  memory is estimated as mean sampled size x key count.
+- evicted_keys, expired_keys and keyspace hits/misses from INFO stats are
+  read before and after the scan. The deltas give per-second rates over at
+  least --rate-window seconds. These counters are server-wide: Redis does
+  not track evictions per namespace.
+
+Usage:
+    python 02_inspect_redis.py
+    python 02_inspect_redis.py --sample-rate 0.01 --throttle-ms 50
+    python 02_inspect_redis.py --db 0 --output redis_report.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import redis
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+import argparse
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Redis configuration
+REDIS_CONFIG = {
+    'host': os.getenv('REDIS_HOST', 'localhost'),
+    'port': int(os.getenv('REDIS_PORT', '6379')),
+    'db': int(os.getenv('REDIS_DB', '0')),
+    'password': os.getenv('REDIS_PASSWORD', None),
+    'decode_responses': True
+}
+
+NAMESPACE_CONFIG_KEY = 'apex:config:cache_namespaces'
+
+# Key groups that are not cache namespaces but belong to the cache
+EXTRA_PREFIXES = {
+    'query_entity_index': 'apex:query:entity:',    # semantic_cache.py reverse index
+    'query_generation': 'apex:query:generation',  # semantic_cache.py invalidation counter
+    'config': 'apex:config:',
+}
+
+SCAN_COUNT = 1000
+SAMPLE_RATE = 0.05
+THROTTLE_MS = 10
+RATE_WINDOW = 10
+
+# (label, upper bound in seconds); keys without expiry go to 'no expiry'
+TTL_BUCKETS = [
+    ('<1m', 60),
+    ('<10m', 600),
+    ('<1h', 3600),
+    ('<1d', 86400),
+    ('>=1d', None),
+]
+NO_EXPIRY = 'no expiry'
+
+RATE_COUNTERS = ['evicted_keys', 'expired_keys', 'keyspace_hits', 'keyspace_misses']
+
+
+def ttl_bucket(ttl: int) -> str:
+    if ttl < 0:
+        return NO_EXPIRY
+    for label, bound in TTL_BUCKETS:
+        if bound is None or ttl < bound:
+            return label
+
+
+def format_bytes(size: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+
+class RedisInspector:
+    """Non-blocking keyspace inspection of the Apex cache"""
+
+    def __init__(self, sample_rate: float = SAMPLE_RATE, scan_count: int = SCAN_COUNT,
+                 throttle_ms: int = THROTTLE_MS, rate_window: float = RATE_WINDOW,
+                 dbs: Optional[List[int]] = None):
+        self.sample_rate = sample_rate
+        self.scan_count = scan_count
+        self.throttle_ms = throttle_ms
+        self.rate_window = rate_window
+        self.dbs = dbs
+        self.client = None
+        self.prefixes: List[tuple] = []
+        self.report: Dict[str, Any] = {}
+        self.stats = {
+            'scanned': 0,
+            'sampled': 0,
+            'scan_calls': 0,
+            'errors': 0
+        }
+
+    def connect(self):
+        """Connect to Redis"""
+        try:
+            self.client = redis.Redis(**REDIS_CONFIG)
+            self.client.ping()
+            logger.info(f"✅ Connected to Redis: {REDIS_CONFIG['host']}:{REDIS_CONFIG['port']}")
+
+        except Exception as e:
+            logger.error(f"❌ Connection failed: {e}")
+            sys.exit(1)
+
+    def disconnect(self):
+        """Close Redis connection"""
+        if self.client:
+            self.client.close()
+
+    def load_prefixes(self):
+        """Namespace prefixes, longest first so the most specific group wins"""
+        raw = self.client.get(NAMESPACE_CONFIG_KEY)
+        namespaces = {}
+        if raw:
+            namespaces = {name: config['prefix'] for name, config in json.loads(raw).items()}
+        else:
+            logger.warning(f"⚠️  {NAMESPACE_CONFIG_KEY} not found - grouping keys by prefix only")
+        namespaces.update(EXTRA_PREFIXES)
+        self.prefixes = sorted(((prefix, name) for name, prefix in namespaces.items()),
+                               key=lambda item: len(item[0]), reverse=True)
+
+    def namespace_of(self, key: str) -> str:
+        for prefix, name in self.prefixes:
+            if key.startswith(prefix):
+                return name
+        parts = key.split(':')
+        return ':'.join(parts[:2]) + ':' if len(parts) > 1 else '(no prefix)'
+
+    def counters(self) -> Dict[str, int]:
+        stats = self.client.info('stats')
+        return {name: stats.get(name, 0) for name in RATE_COUNTERS}
+
+    def databases(self) -> List[int]:
+        """Databases that hold keys (INFO keyspace), or the ones asked for"""
+        keyspace = self.client.info('keyspace')
+        present = sorted(int(name[2:]) for name in keyspace if name.startswith('db'))
+        if self.dbs is None:
+            return present
+        return [db for db in self.dbs if db in present]
+
+    def scan_database(self, db: int) -> Dict[str, Dict[str, Any]]:
+        """Walk one database with SCAN; returns per-namespace aggregates"""
+        client = self.client if db == REDIS_CONFIG['db'] else redis.Redis(**{**REDIS_CONFIG, 'db': db})
+        groups: Dict[str, Dict[str, Any]] = {}
+        cursor = 0
+
+        try:
+            while True:
+                cursor, keys = client.scan(cursor=cursor, count=self.scan_count)
+                self.stats['scan_calls'] += 1
+
+                if keys:
+                    sampled = [key for key in keys if random.random() < self.sample_rate]
+                    pipe = client.pipeline(transaction=False)
+                    for key in keys:
+                        pipe.ttl(key)
+                    for key in sampled:
+                        pipe.memory_usage(key)
+                    results = pipe.execute(raise_on_error=False)
+                    ttls, sizes = results[:len(keys)], results[len(keys):]
+
+                    for key, ttl in zip(keys, ttls):
+                        group = groups.setdefault(self.namespace_of(key), {
+                            'keys': 0, 'sampled': 0, 'sampled_bytes': 0,
+                            'ttl': {label: 0 for label in [NO_EXPIRY] + [b[0] for b in TTL_BUCKETS]}
+                        })
+                        group['keys'] += 1
+                        # -2: expired between SCAN and TTL
+                        if isinstance(ttl, int) and ttl != -2:
+                            group['ttl'][ttl_bucket(ttl)] += 1
+
+                    for key, size in zip(sampled, sizes):
+                        if isinstance(size, int):
+                            group = groups[self.namespace_of(key)]
+                            group['sampled'] += 1
+                            group['sampled_bytes'] += size
+                        elif size is not None:    # None: expired since SCAN
+                            self.stats['errors'] += 1
+
+                    self.stats['scanned'] += len(keys)
+                    self.stats['sampled'] += len(sampled)
+
+                if cursor == 0:
+                    break
+                if self.throttle_ms:
+                    time.sleep(self.throttle_ms / 1000)
+        finally:
+            if client is not self.client:
+                client.close()
+
+        for group in groups.values():
+            mean = group['sampled_bytes'] / group['sampled'] if group['sampled'] else None
+            group['mean_bytes'] = mean
+            group['est_bytes'] = mean * group['keys'] if mean is not None else None
+        return groups
+
+    def inspect(self) -> Dict[str, Any]:
+        """Scan all databases and measure counter rates over the scan"""
+        self.load_prefixes()
+        started = time.monotonic()
+        before = self.counters()
+
+        databases = {}
+        for db in self.databases():
+            logger.info(f"🔍 Scanning db{db}...")
+            databases[db] = self.scan_database(db)
+
+        remaining = self.rate_window - (time.monotonic() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+        elapsed = max(time.monotonic() - started, 0.001)
+        after = self.counters()
+
+        memory = self.client.info('memory')
+        self.report = {
+            'databases': databases,
+            'rates': {name: (after[name] - before[name]) / elapsed for name in RATE_COUNTERS},
+            'totals': after,
+            'window_seconds': elapsed,
+            'memory': {
+                'used_memory': memory.get('used_memory'),
+                'maxmemory': memory.get('maxmemory'),
+                'maxmemory_policy': memory.get('maxmemory_policy'),
+                'mem_fragmentation_ratio': memory.get('mem_fragmentation_ratio'),
+            }
+        }
+        return self.report
+
+    def print_report(self):
+        """Print the per-namespace report"""
+        logger.info("\n" + "="*60)
+        logger.info("REDIS KEYSPACE REPORT")
+        logger.info("="*60)
+
+        memory = self.report['memory']
+        limit = format_bytes(memory['maxmemory']) if memory['maxmemory'] else 'unlimited'
+        logger.info(f"📊 Used memory: {format_bytes(memory['used_memory'] or 0)} / {limit} "
+                    f"({memory['maxmemory_policy']}, fragmentation {memory['mem_fragmentation_ratio']})")
+
+        for db, groups in self.report['databases'].items():
+            logger.info(f"\ndb{db}:")
+            for name, group in sorted(groups.items(), key=lambda item: -item[1]['keys']):
+                size = format_bytes(group['est_bytes']) if group['est_bytes'] is not None else 'n/a'
+                mean = format_bytes(group['mean_bytes']) if group['mean_bytes'] is not None else 'n/a'
+                ttls = ', '.join(f"{label} {count}" for label, count in group['ttl'].items() if count)
+                logger.info(f"  {name}: {group['keys']} keys, ~{size} (mean {mean}, {group['sampled']} sampled)")
+                logger.info(f"    TTL: {ttls or 'n/a'}")
+
+        rates, totals = self.report['rates'], self.report['totals']
+        logger.info(f"\n📊 Over {self.report['window_seconds']:.1f}s (server-wide):")
+        for name in RATE_COUNTERS:
+            logger.info(f"  {name}: {rates[name]:.2f}/s (total {totals[name]})")
+        lookups = totals['keyspace_hits'] + totals['keyspace_misses']
+        if lookups:
+            logger.info(f"  hit rate since restart: {totals['keyspace_hits'] / lookups:.1%}")
+        if totals['evicted_keys']:
+            logger.warning("⚠️  Keys were evicted since restart - compare maxmemory with the namespace sizes above")
+        logger.info("="*60)
+
+    def print_stats(self):
+        """Print inspection statistics"""
+        logger.info("\n" + "="*60)
+        logger.info("INSPECTION STATISTICS")
+        logger.info("="*60)
+        logger.info(f"Keys scanned: {self.stats['scanned']}")
+        logger.info(f"Keys sampled: {self.stats['sampled']}")
+        logger.info(f"SCAN calls:   {self.stats['scan_calls']}")
+        logger.info(f"Errors:       {self.stats['errors']}")
+        logger.info("="*60)
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description='Inspect the Apex Redis cache without blocking it')
+    parser.add_argument('--sample-rate', type=float, default=SAMPLE_RATE,
+                        help=f'Fraction of keys measured with MEMORY USAGE (default: {SAMPLE_RATE})')
+    parser.add_argument('--scan-count', type=int, default=SCAN_COUNT,
+                        help=f'COUNT hint per SCAN call (default: {SCAN_COUNT})')
+    parser.add_argument('--throttle-ms', type=int, default=THROTTLE_MS,
+                        help=f'Pause between SCAN calls in ms (default: {THROTTLE_MS})')
+    parser.add_argument('--rate-window', type=float, default=RATE_WINDOW,
+                        help=f'Minimum seconds to measure eviction/expiry rates over (default: {RATE_WINDOW})')
+    parser.add_argument('--db', type=int, action='append', dest='dbs',
+                        help='Database to inspect (repeatable; default: every database with keys)')
+    parser.add_argument('--output', type=str,
+                        help='Also write the report as JSON to this file')
+
+    args = parser.parse_args()
+
+    if not 0 <= args.sample_rate <= 1:
+        logger.error("❌ --sample-rate must be between 0 and 1")
+        sys.exit(1)
+
+    logger.info("="*60)
+    logger.info("REDIS INSPECTION")
+    logger.info("="*60)
+
+    inspector = RedisInspector(sample_rate=args.sample_rate, scan_count=args.scan_count,
+                               throttle_ms=args.throttle_ms, rate_window=args.rate_window,
+                               dbs=args.dbs)
+
+    try:
+        inspector.connect()
+        inspector.inspect()
+        inspector.print_report()
+        inspector.print_stats()
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(inspector.report, f, indent=2)
+            logger.info(f"✅ Report written to {args.output}")
+
+    except Exception as e:
+        logger.error(f"❌ Inspection failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+    finally:
+        inspector.disconnect()
+
+
+if __name__ == "__main__":
+    main()
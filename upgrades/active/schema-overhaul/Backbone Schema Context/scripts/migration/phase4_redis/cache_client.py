@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Namespace-Aware Cache Client
+Purpose: Typed, pipelined access to the cache namespaces stored by 01_configure_redis.py
+Run after: 01_configure_redis.py (writes apex:config:cache_namespaces)
+
+Namespaces come from apex:config:cache_namespaces (CACHE_CONFIG). Callers
+address them by name ('embeddings', 'query_results', ...), and the client
+applies the prefix, TTL and codec:
+
+- json:   JSON documents (query results, entities, patterns)
+- vector: packed little-endian float16 or float32 ('dtype' in the
+          namespace config). A float32 embedding takes 4 bytes per
+          dimension, 4-5x less than a JSON list; float16 halves that
+- bytes:  stored as given
+
+Every value starts with a one-byte header naming its encoding, so values
+written under an older codec still decode. Values of at least
+CACHE_COMPRESS_MIN_BYTES are zlib-compressed if that saves 10% or more.
+
+TTLs are jittered downwards by up to CACHE_TTL_JITTER (fraction). Entries
+written together then do not all expire in the same second and stampede
+the backing stores. An entry never outlives its configured TTL.
+
+get_many/set_many batch keys into MGET / pipelined SET EX round trips
+(MSET cannot set expiry). Hits, misses and bytes written are counted per
+namespace.
+
+The client needs raw bytes, so the Redis connection must use
+decode_responses=False.
+
+Usage:
+    cache = CacheClient.connect()
+    cache.set('embeddings', text_hash, embedding)
+    vectors = cache.get_many('embeddings', text_hashes)
+    cache.print_stats()
+"""
+
+import os
+import json
+import zlib
+import random
+import struct
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Same connection settings as 01_configure_redis.py, but returning bytes
+REDIS_CONFIG = {
+    'host': os.getenv('REDIS_HOST', 'localhost'),
+    'port': int(os.getenv('REDIS_PORT', '6379')),
+    'db': int(os.getenv('REDIS_DB', '0')),
+    'password': os.getenv('REDIS_PASSWORD', None),
+    'decode_responses': False
+}
+
+NAMESPACE_CONFIG_KEY = 'apex:config:cache_namespaces'
+
+COMPRESS_MIN_BYTES = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', '1024'))
+TTL_JITTER = float(os.getenv('CACHE_TTL_JITTER', '0.1'))
+# Keys per MGET / pipeline round trip
+PIPELINE_BATCH = 500
+
+# Value header: encoding in the low bits, COMPRESSED flag on top
+ENC_JSON = 0x01
+ENC_FLOAT32 = 0x02
+ENC_FLOAT16 = 0x03
+ENC_BYTES = 0x04
+COMPRESSED = 0x80
+
+VECTOR_FORMATS = {
+    ENC_FLOAT32: 'f',
+    ENC_FLOAT16: 'e',
+}
+VECTOR_DTYPES = {
+    'float32': ENC_FLOAT32,
+    'float16': ENC_FLOAT16,
+}
+
+
+def encode_value(value: Any, codec: str = 'json', dtype: str = 'float32',
+                 compress_min_bytes: int = COMPRESS_MIN_BYTES) -> bytes:
+    """Header byte + payload for one value"""
+    if codec == 'vector':
+        enc = VECTOR_DTYPES[dtype]
+        payload = struct.pack(f'<{len(value)}{VECTOR_FORMATS[enc]}', *value)
+    elif codec == 'bytes':
+        enc, payload = ENC_BYTES, bytes(value)
+    elif codec == 'json':
+        enc, payload = ENC_JSON, json.dumps(value, separators=(',', ':'), default=str).encode()
+    else:
+        raise ValueError(f"Unknown codec '{codec}' (expected json, vector or bytes)")
+
+    if len(payload) >= compress_min_bytes:
+        compressed = zlib.compress(payload, 6)
+        if len(compressed) <= len(payload) * 0.9:
+            return bytes([enc | COMPRESSED]) + compressed
+    return bytes([enc]) + payload
+
+
+# examples/uuid7-implementation.py keeps a copy (decode_cache_value): update it with this
+def decode_value(raw: bytes) -> Any:
+    """Inverse of encode_value; vectors decode to lists of floats"""
+    header, payload = raw[0], raw[1:]
+    if header & COMPRESSED:
+        payload = zlib.decompress(payload)
+    enc = header & ~COMPRESSED
+
+    if enc in VECTOR_FORMATS:
+        fmt = VECTOR_FORMATS[enc]
+        return list(struct.unpack(f'<{len(payload) // struct.calcsize(fmt)}{fmt}', payload))
+    if enc == ENC_JSON:
+        return json.loads(payload)
+    if enc == ENC_BYTES:
+        return payload
+    raise ValueError(f"Unknown cache value header 0x{header:02x}")
+
+
+class CacheClient:
+    """Cache namespaces from apex:config:cache_namespaces over one Redis connection"""
+
+    def __init__(self, redis_client: redis.Redis,
+                 namespaces: Optional[Dict[str, Dict[str, Any]]] = None,
+                 compress_min_bytes: int = COMPRESS_MIN_BYTES,
+                 ttl_jitter: float = TTL_JITTER,
+                 batch_size: int = PIPELINE_BATCH):
+        if redis_client.connection_pool.connection_kwargs.get('decode_responses'):
+            raise ValueError("CacheClient needs a Redis connection with decode_responses=False")
+
+        self.redis = redis_client
+        self.compress_min_bytes = compress_min_bytes
+        self.ttl_jitter = ttl_jitter
+        self.batch_size = batch_size
+        self.namespaces = namespaces if namespaces is not None else self.load_namespaces()
+        self.metrics = {
+            name: {'hits': 0, 'misses': 0, 'sets': 0, 'bytes_written': 0}
+            for name in self.namespaces
+        }
+
+    @classmethod
+    def connect(cls, **kwargs) -> 'CacheClient':
+        """Client on a new connection built from REDIS_CONFIG"""
+        return cls(redis.Redis(**REDIS_CONFIG), **kwargs)
+
+    def close(self):
+        self.redis.close()
+
+    def load_namespaces(self) -> Dict[str, Dict[str, Any]]:
+        """Namespace config written by 01_configure_redis.py"""
+        raw = self.redis.get(NAMESPACE_CONFIG_KEY)
+        if raw is None:
+            raise ValueError(f"{NAMESPACE_CONFIG_KEY} not found - run 01_configure_redis.py --execute first")
+        return json.loads(raw)
+
+    def _namespace(self, namespace: str) -> Dict[str, Any]:
+        try:
+            return self.namespaces[namespace]
+        except KeyError:
+            raise KeyError(f"Unknown cache namespace '{namespace}' (configured: {list(self.namespaces)})") from None
+
+    def key(self, namespace: str, key: Any) -> str:
+        return f"{self._namespace(namespace)['prefix']}{key}"
+
+    def ttl_for(self, namespace: str, ttl: Optional[int] = None) -> int:
+        """Configured (or given) TTL minus up to ttl_jitter of it"""
+        ttl = ttl or self._namespace(namespace)['ttl']
+        return max(1, int(ttl * (1 - random.uniform(0, self.ttl_jitter))))
+
+    def encode(self, namespace: str, value: Any) -> bytes:
+        config = self._namespace(namespace)
+        return encode_value(value, config.get('codec', 'json'), config.get('dtype', 'float32'),
+                            self.compress_min_bytes)
+
+    def _record(self, namespace: str, hits: int, misses: int):
+        self.metrics[namespace]['hits'] += hits
+        self.metrics[namespace]['misses'] += misses
+
+    def get(self, namespace: str, key: Any, default: Any = None) -> Any:
+        raw = self.redis.get(self.key(namespace, key))
+        self._record(namespace, raw is not None, raw is None)
+        return default if raw is None else decode_value(raw)
+
+    def set(self, namespace: str, key: Any, value: Any, ttl: Optional[int] = None,
+            pipe: Optional[redis.client.Pipeline] = None):
+        """
+        Store one value with a jittered TTL
+
+        Args:
+            ttl: Seconds before jitter (default: the namespace TTL)
+            pipe: Queue the SET on this pipeline instead of sending it
+        """
+        data = self.encode(namespace, value)
+        # An empty pipeline is falsy, so no `pipe or self.redis`
+        target = self.redis if pipe is None else pipe
+        target.set(self.key(namespace, key), data, ex=self.ttl_for(namespace, ttl))
+        self.metrics[namespace]['sets'] += 1
+        self.metrics[namespace]['bytes_written'] += len(data)
+
+    def get_many(self, namespace: str, keys: Iterable[Any]) -> Dict[Any, Any]:
+        """Cached values for the keys that hit, one MGET per batch_size keys"""
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), self.batch_size):
+            chunk = keys[start:start + self.batch_size]
+            values = self.redis.mget([self.key(namespace, key) for key in chunk])
+            for key, raw in zip(chunk, values):
+                if raw is not None:
+                    found[key] = decode_value(raw)
+        self._record(namespace, len(found), len(keys) - len(found))
+        return found
+
+    def set_many(self, namespace: str, items: Dict[Any, Any], ttl: Optional[int] = None):
+        """Store many values, one pipelined round trip per batch_size keys"""
+        items = list(items.items())
+        for start in range(0, len(items), self.batch_size):
+            pipe = self.redis.pipeline(transaction=False)
+            for key, value in items[start:start + self.batch_size]:
+                self.set(namespace, key, value, ttl=ttl, pipe=pipe)
+            pipe.execute()
+
+    def delete(self, namespace: str, keys: Iterable[Any]) -> int:
+        """Delete keys from a namespace; returns how many existed"""
+        names = [self.key(namespace, key) for key in keys]
+        deleted = 0
+        for start in range(0, len(names), self.batch_size):
+            deleted += self.redis.delete(*names[start:start + self.batch_size])
+        return deleted
+
+    def hit_rate(self, namespace: str) -> float:
+        metrics = self.metrics[namespace]
+        lookups = metrics['hits'] + metrics['misses']
+        return metrics['hits'] / lookups if lookups else 0.0
+
+    def print_stats(self):
+        """Print per-namespace cache metrics"""
+        logger.info("\n" + "="*60)
+        logger.info("CACHE STATISTICS")
+        logger.info("="*60)
+        for namespace, metrics in self.metrics.items():
+            logger.info(f"📊 {namespace}: {metrics['hits']} hits / {metrics['misses']} misses "
+                        f"({self.hit_rate(namespace):.1%}), {metrics['sets']} sets, "
+                        f"{metrics['bytes_written']:,} bytes written")
+        logger.info("="*60)
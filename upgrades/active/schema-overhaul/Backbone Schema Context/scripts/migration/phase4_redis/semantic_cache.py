@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Semantic Query Cache
+Purpose: Two-tier result cache for semantic search (Redis exact, Qdrant near-duplicate)
+Run after: 01_configure_redis.py and phase3_qdrant/01_create_collections.py (query_cache)
+
+- Tier 1, exact (Redis): the query_results namespace of cache_client.py
+  (apex:query:<hash>) holds the results of a query whose normalized text
+  and scope hash the same. One GET, no embedding needed.
+- Tier 2, semantic (Qdrant): the query_cache collection holds one point
+  per cached query embedding. A query within similarity_threshold (cosine)
+  of a cached query with the same scope reuses its results. The hit is
+  promoted into Redis under the new query's hash, so a repeat is exact.
+
+Both tiers are bounded:
+- Redis entries expire after QUERY_CACHE_TTL seconds (jittered down by
+  CacheClient). allkeys-lru (01_configure_redis.py) evicts earlier under
+  memory pressure.
+- Qdrant points carry expires_at, so expired points are never served.
+  evict() deletes them, then the least accessed points above max_entries.
+
+Invalidation is driven by entity writes. invalidate_entities(ids) drops
+every cached result that contains one of the ids from both tiers.
+Redis keeps a reverse index (apex:query:entity:<id> -> query hashes);
+Qdrant is filtered on the indexed result_ids payload.
+sync/incremental_sync.py --invalidate-cache calls it for every synced batch.
+
+A get() whose Qdrant search ran before an invalidation could otherwise
+promote stale results after it. Every invalidation bumps
+apex:query:generation, and a semantic hit is only promoted if the
+generation read before its search is still current (WATCH/MULTI).
+
+Usage:
+    cache = SemanticQueryCache(CacheClient.connect(), qdrant_client)
+    hit = cache.get(query_text, embedding, scope={'hub_name': 'hub3'})
+    if hit is None:
+        points = search(...)
+        cache.put(query_text, embedding, [p.payload['entity_id'] for p in points],
+                  results=[p.payload for p in points], scope={'hub_name': 'hub3'})
+    cache.invalidate_entities(['1234'])
+    cache.evict()
+"""
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import logging
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import redis
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Filter, FieldCondition, MatchValue, MatchAny, Range,
+    PointStruct, FilterSelector, PointIdsList
+)
+
+from cache_client import CacheClient
+
+logger = logging.getLogger(__name__)
+
+# CACHE_CONFIG namespace in 01_configure_redis.py
+QUERY_NAMESPACE = 'query_results'
+# Reverse index sets (entity id -> query hashes), beside the namespace
+ENTITY_INDEX_PREFIX = 'apex:query:entity:'
+# Bumped by every invalidation; guards promotion of semantic hits
+GENERATION_KEY = 'apex:query:generation'
+QUERY_CACHE_COLLECTION = 'query_cache'
+
+QUERY_CACHE_TTL = int(os.getenv('QUERY_CACHE_TTL', '3600'))
+# Cosine similarity a cached query needs to be served for a new one
+SIMILARITY_THRESHOLD = float(os.getenv('QUERY_CACHE_SIMILARITY', '0.95'))
+# query_cache expected_points in 01_create_collections.py
+MAX_ENTRIES = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', '50000'))
+
+DELETE_CHUNK = 1000
+
+
+def normalize_query(text: str) -> str:
+    """Unicode-normalized, case-folded, whitespace-collapsed query text"""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return ' '.join(text.split()).strip(' ?!.')
+
+
+def scope_hash(scope: Optional[Dict[str, Any]]) -> str:
+    """Stable hash of the filters a query ran with (results differ per scope)"""
+    return hashlib.sha256(json.dumps(scope or {}, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def query_hash(text: str, scope: Optional[Dict[str, Any]] = None) -> str:
+    """Exact-tier key: normalized text + scope"""
+    return hashlib.sha256(f"{scope_hash(scope)}:{normalize_query(text)}".encode()).hexdigest()
+
+
+@dataclass
+class CacheHit:
+    """Cached results served for a query"""
+    tier: str                       # 'exact' | 'semantic'
+    score: float                    # 1.0 for exact hits, cosine similarity otherwise
+    result_ids: List[str]
+    results: Optional[List[Any]]
+    query_text: str                 # the cached query the results were computed for
+
+
+class SemanticQueryCache:
+    """Redis exact tier in front of a Qdrant near-duplicate tier"""
+
+    def __init__(self, cache: CacheClient, qdrant_client: QdrantClient,
+                 collection_name: str = QUERY_CACHE_COLLECTION,
+                 similarity_threshold: float = SIMILARITY_THRESHOLD,
+                 ttl: int = QUERY_CACHE_TTL,
+                 max_entries: int = MAX_ENTRIES):
+        self.cache = cache
+        self.qdrant = qdrant_client
+        self.collection_name = collection_name
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {
+            'exact_hits': 0,
+            'semantic_hits': 0,
+            'misses': 0,
+            'puts': 0,
+            'invalidated': 0,
+            'promotions_skipped': 0,
+            'evicted': 0
+        }
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.stats['exact_hits'] + self.stats['semantic_hits']
+        lookups = hits + self.stats['misses']
+        return hits / lookups if lookups else 0.0
+
+    def _queue_exact(self, pipe: redis.client.Pipeline, key_hash: str, entry: Dict[str, Any], ttl: int):
+        """Redis entry plus reverse-index membership for each result id"""
+        self.cache.set(QUERY_NAMESPACE, key_hash, entry, ttl=ttl, pipe=pipe)
+        for entity_id in entry['result_ids']:
+            index_key = ENTITY_INDEX_PREFIX + entity_id
+            pipe.sadd(index_key, key_hash)
+            # Outlives every entry it points to (NX for a new set, GT never
+            # shortens it; Redis 7+). Stale members only cost a no-op DEL
+            pipe.expire(index_key, ttl, nx=True)
+            pipe.expire(index_key, ttl, gt=True)
+
+    def _store_exact(self, key_hash: str, entry: Dict[str, Any], ttl: int):
+        pipe = self.cache.redis.pipeline(transaction=False)
+        self._queue_exact(pipe, key_hash, entry, ttl)
+        pipe.execute()
+
+    def _promote(self, key_hash: str, entry: Dict[str, Any], ttl: int,
+                 generation: Optional[bytes]) -> bool:
+        """Store a semantic hit in the exact tier unless an invalidation ran since generation was read"""
+        with self.cache.redis.pipeline(transaction=True) as pipe:
+            try:
+                pipe.watch(GENERATION_KEY)
+                if pipe.get(GENERATION_KEY) != generation:
+                    return False
+                pipe.multi()
+                self._queue_exact(pipe, key_hash, entry, ttl)
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                return False
+
+    def get(self, query_text: str, embedding: Optional[Sequence[float]] = None,
+            scope: Optional[Dict[str, Any]] = None) -> Optional[CacheHit]:
+        """
+        Cached results for a query, or None
+
+        Without an embedding only the exact tier is checked.
+        """
+        key_hash = query_hash(query_text, scope)
+        entry = self.cache.get(QUERY_NAMESPACE, key_hash)
+        if entry is not None:
+            self.stats['exact_hits'] += 1
+            return CacheHit('exact', 1.0, entry['result_ids'], entry.get('results'), entry['query_text'])
+
+        if embedding is None:
+            self.stats['misses'] += 1
+            return None
+
+        # Read before the search: an invalidation after this point blocks promotion
+        generation = self.cache.redis.get(GENERATION_KEY)
+        now = int(time.time())
+        points = self.qdrant.search(
+            collection_name=self.collection_name,
+            query_vector=list(embedding),
+            query_filter=Filter(must=[
+                FieldCondition(key='scope_hash', match=MatchValue(value=scope_hash(scope))),
+                FieldCondition(key='expires_at', range=Range(gt=now))
+            ]),
+            limit=1,
+            score_threshold=self.similarity_threshold,
+            with_payload=True
+        )
+        if not points:
+            self.stats['misses'] += 1
+            return None
+
+        point = points[0]
+        payload = point.payload
+        self.qdrant.set_payload(
+            collection_name=self.collection_name,
+            payload={'access_count': payload.get('access_count', 0) + 1, 'last_accessed': now},
+            points=[point.id],
+            wait=False
+        )
+
+        # Promote for exact repeats, expiring with the cached point
+        entry = {
+            'query_text': payload['query_text'],
+            'result_ids': payload['result_ids'],
+            'results': payload.get('results'),
+        }
+        if not self._promote(key_hash, entry, max(1, payload['expires_at'] - now), generation):
+            self.stats['promotions_skipped'] += 1
+
+        self.stats['semantic_hits'] += 1
+        return CacheHit('semantic', point.score, entry['result_ids'], entry['results'], entry['query_text'])
+
+    def put(self, query_text: str, embedding: Sequence[float], result_ids: Sequence[Any],
+            results: Optional[List[Any]] = None, scope: Optional[Dict[str, Any]] = None,
+            ttl: Optional[int] = None):
+        """
+        Cache a query's results in both tiers
+
+        Args:
+            query_text: Query as the user typed it
+            embedding: Query embedding (same model as the query_cache collection)
+            result_ids: Entity / document ids in the results (drive invalidation)
+            results: Optional JSON-serializable results to serve on a hit
+            scope: Filters the query ran with; hits never cross scopes
+            ttl: Seconds to keep the entry (default: QUERY_CACHE_TTL)
+        """
+        ttl = ttl or self.ttl
+        key_hash = query_hash(query_text, scope)
+        entry = {
+            'query_text': query_text,
+            'result_ids': [str(result_id) for result_id in result_ids],
+            'results': results,
+        }
+        self._store_exact(key_hash, entry, ttl)
+
+        now = int(time.time())
+        self.qdrant.upsert(
+            collection_name=self.collection_name,
+            points=[PointStruct(
+                # Deterministic id: re-caching the same query overwrites its point
+                id=str(uuid.UUID(key_hash[:32])),
+                vector=list(embedding),
+                payload={
+                    **entry,
+                    'query_hash': key_hash,
+                    'scope_hash': scope_hash(scope),
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                    'expires_at': now + ttl,
+                    'access_count': 0,
+                    'last_accessed': now
+                }
+            )],
+            wait=False
+        )
+        self.stats['puts'] += 1
+
+    def invalidate_entities(self, entity_ids: Sequence[Any]) -> int:
+        """
+        Drop every cached result that contains one of the entities
+
+        Returns:
+            Number of exact-tier entries removed
+        """
+        entity_ids = sorted({str(entity_id) for entity_id in entity_ids if entity_id is not None})
+        if not entity_ids:
+            return 0
+
+        # Qdrant first, and wait: a get() that reads the generation after the
+        # bump below can no longer find the points
+        self.qdrant.delete(
+            collection_name=self.collection_name,
+            points_selector=FilterSelector(filter=Filter(must=[
+                FieldCondition(key='result_ids', match=MatchAny(any=entity_ids))
+            ])),
+            wait=True
+        )
+
+        # Searches that started earlier fail their promotion check from here
+        # on. One that promoted before the bump is in the reverse index read next
+        pipe = self.cache.redis.pipeline(transaction=False)
+        pipe.incr(GENERATION_KEY)
+        for entity_id in entity_ids:
+            pipe.smembers(ENTITY_INDEX_PREFIX + entity_id)
+        hashes = {h.decode() for members in pipe.execute()[1:] for h in members}
+
+        removed = self.cache.delete(QUERY_NAMESPACE, sorted(hashes))
+        self.cache.redis.delete(*[ENTITY_INDEX_PREFIX + entity_id for entity_id in entity_ids])
+
+        self.stats['invalidated'] += removed
+        logger.debug(f"🔄 Invalidated {removed} cached queries for {len(entity_ids)} entities")
+        return removed
+
+    def evict(self, max_entries: Optional[int] = None) -> int:
+        """
+        Bound the semantic tier: delete expired points, then the least
+        accessed (oldest access first) above max_entries
+
+        Returns:
+            Number of points deleted for exceeding max_entries
+        """
+        max_entries = self.max_entries if max_entries is None else max_entries
+        self.qdrant.delete(
+            collection_name=self.collection_name,
+            points_selector=FilterSelector(filter=Filter(must=[
+                FieldCondition(key='expires_at', range=Range(lte=int(time.time())))
+            ])),
+            wait=True
+        )
+
+        excess = self.qdrant.count(self.collection_name, exact=True).count - max_entries
+        if excess <= 0:
+            return 0
+
+        points, offset = [], None
+        while True:
+            batch, offset = self.qdrant.scroll(
+                collection_name=self.collection_name,
+                limit=DELETE_CHUNK,
+                offset=offset,
+                with_payload=['access_count', 'last_accessed'],
+                with_vectors=False
+            )
+            points.extend(batch)
+            if offset is None:
+                break
+
+        points.sort(key=lambda p: (p.payload.get('access_count', 0), p.payload.get('last_accessed', 0)))
+        victims = [p.id for p in points[:excess]]
+        for start in range(0, len(victims), DELETE_CHUNK):
+            self.qdrant.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=victims[start:start + DELETE_CHUNK]),
+                wait=True
+            )
+
+        self.stats['evicted'] += len(victims)
+        logger.info(f"✅ Evicted {len(victims)} least-accessed query_cache points (limit {max_entries})")
+        return len(victims)
@@ -7,18 +7,23 @@ Run after: Phase 1-4 setup
 Usage:
     python 01_initialize_graphiti.py --dry-run
     python 01_initialize_graphiti.py --execute
+    python 01_initialize_graphiti.py --execute --index-timeout 900 --strict-indexes
+    python 01_initialize_graphiti.py --verify
 """
 
 import os
 import sys
+import time
 import logging
 import psycopg2
 from neo4j import GraphDatabase
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 import argparse
 
+from pattern_engine import PATTERN_DEFINITIONS
+
 # Load environment variables
 load_dotenv()
 
@@ -44,16 +49,73 @@ NEO4J_CONFIG = {
     'password': os.getenv('NEO4J_PASSWORD', 'apexmemory2024')
 }
 
+EMBEDDING_DIMENSION = int(os.getenv('EMBEDDING_DIMENSION', '1536'))
+INDEX_TIMEOUT = float(os.getenv('GRAPHITI_INDEX_TIMEOUT', '300'))
+
+# Graphiti indexes, created in one pass by create_temporal_indexes
+TEMPORAL_INDEXES = {
+    # Temporal range lookups (valid_from / valid_to)
+    'index_node_valid_from': {'type': 'RANGE', 'entity': 'node', 'label': 'TemporalEntity', 'properties': ['valid_from']},
+    'index_node_valid_to': {'type': 'RANGE', 'entity': 'node', 'label': 'TemporalEntity', 'properties': ['valid_to']},
+    'index_rel_valid_from': {'type': 'RANGE', 'entity': 'relationship', 'label': 'TEMPORAL_RELATIONSHIP', 'properties': ['valid_from']},
+    'index_rel_valid_to': {'type': 'RANGE', 'entity': 'relationship', 'label': 'TEMPORAL_RELATIONSHIP', 'properties': ['valid_to']},
+    # Name lookups (CONTAINS / ENDS WITH)
+    'index_node_name_text': {'type': 'TEXT', 'entity': 'node', 'label': 'TemporalEntity', 'properties': ['name']},
+    # Graphiti entity embeddings
+    'index_entity_name_embedding': {
+        'type': 'VECTOR', 'entity': 'node', 'label': 'Entity', 'properties': ['name_embedding'],
+        'options': f"{{indexConfig: {{`vector.dimensions`: {EMBEDDING_DIMENSION}, "
+                   f"`vector.similarity_function`: 'cosine'}}}}"
+    },
+}
+
+# Temporal queries that must plan an index seek: (query, label, property)
+TEMPORAL_QUERY_CHECKS = {
+    'node valid_from range': ("MATCH (n:TemporalEntity) WHERE n.valid_from <= $at RETURN n", 'TemporalEntity', 'valid_from'),
+    'node valid_to range': ("MATCH (n:TemporalEntity) WHERE n.valid_to > $at RETURN n", 'TemporalEntity', 'valid_to'),
+    'relationship valid_from range': ("MATCH ()-[r:TEMPORAL_RELATIONSHIP]->() WHERE r.valid_from <= $at RETURN r",
+                                      'TEMPORAL_RELATIONSHIP', 'valid_from'),
+    'relationship valid_to range': ("MATCH ()-[r:TEMPORAL_RELATIONSHIP]->() WHERE r.valid_to > $at RETURN r",
+                                    'TEMPORAL_RELATIONSHIP', 'valid_to'),
+}
+
+
+def index_ddl(name: str, spec: Dict[str, Any]) -> str:
+    """CREATE ... INDEX statement for a TEMPORAL_INDEXES entry"""
+    pattern = f"(n:{spec['label']})" if spec['entity'] == 'node' else f"()-[n:{spec['label']}]-()"
+    properties = ", ".join(f"n.{prop}" for prop in spec['properties'])
+    kind = "" if spec['type'] == 'RANGE' else f"{spec['type']} "
+    ddl = f"CREATE {kind}INDEX {name} IF NOT EXISTS FOR {pattern} ON ({properties})"
+    if spec.get('options'):
+        ddl += f" OPTIONS {spec['options']}"
+    return ddl
+
+
+def plan_operators(plan: Optional[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """(operatorType, Details) of every operator in an EXPLAIN plan, root first"""
+    if not plan:
+        return []
+    args = plan.get('args') or plan.get('arguments') or {}
+    operators = [(plan.get('operatorType', ''), str(args.get('Details', '')))]
+    for child in plan.get('children', []):
+        operators.extend(plan_operators(child))
+    return operators
+
+
 
 class GraphitiInitializer:
     """Initialize Graphiti for temporal intelligence"""
 
-    def __init__(self, dry_run: bool = True):
+    def __init__(self, dry_run: bool = True, index_timeout: float = INDEX_TIMEOUT,
+                 strict_indexes: bool = False):
         self.dry_run = dry_run
+        self.index_timeout = index_timeout
+        self.strict_indexes = strict_indexes
         self.pg_conn = None
         self.neo4j_driver = None
         self.stats = {
             'initialized': 0,
+            'warnings': 0,
             'errors': 0
         }
 
@@ -83,41 +145,146 @@ class GraphitiInitializer:
             self.neo4j_driver.close()
 
     def create_temporal_indexes(self):
-        """Create temporal indexes in Neo4j for Graphiti"""
-        logger.info("🔄 Creating temporal indexes...")
-
-        if not self.dry_run:
-            with self.neo4j_driver.session() as session:
+        """
+        Create all Graphiti indexes (range, text, vector) in one pass.
+
+        Every definition is issued first, so Neo4j populates them in the
+        background concurrently. Then, unless index_timeout is 0, waits for
+        them to come online and checks that the temporal range queries plan
+        an index seek. Indexes still populating at the timeout are a warning
+        (an error with strict_indexes): until they are online, queries fall
+        back to label scans.
+        """
+        logger.info(f"🔄 Creating {len(TEMPORAL_INDEXES)} Graphiti indexes...")
+
+        if self.dry_run:
+            for name, spec in TEMPORAL_INDEXES.items():
+                logger.info(f"🔍 DRY RUN: Would run {index_ddl(name, spec)}")
+            return
+
+        issued = 0
+        with self.neo4j_driver.session() as session:
+            for name, spec in TEMPORAL_INDEXES.items():
                 try:
-                    # Create indexes on temporal properties
-                    session.run("""
-                        CREATE INDEX index_node_valid_from IF NOT EXISTS
-                        FOR (n:TemporalEntity) ON (n.valid_from)
-                    """)
-
-                    session.run("""
-                        CREATE INDEX index_node_valid_to IF NOT EXISTS
-                        FOR (n:TemporalEntity) ON (n.valid_to)
-                    """)
+                    session.run(index_ddl(name, spec)).consume()
+                    issued += 1
+                except Exception as e:
+                    logger.error(f"❌ Error creating index {name}: {e}")
+                    self.stats['errors'] += 1
 
-                    session.run("""
-                        CREATE INDEX index_rel_valid_from IF NOT EXISTS
-                        FOR ()-[r:TEMPORAL_RELATIONSHIP]-() ON (r.valid_from)
-                    """)
+        logger.info(f"✅ Issued {issued}/{len(TEMPORAL_INDEXES)} index definitions")
+        self.stats['initialized'] += 1
 
-                    session.run("""
-                        CREATE INDEX index_rel_valid_to IF NOT EXISTS
-                        FOR ()-[r:TEMPORAL_RELATIONSHIP]-() ON (r.valid_to)
-                    """)
+        if self.index_timeout <= 0:
+            logger.info("⚠️  Not waiting for index population (--index-timeout 0)")
+            return
 
-                    logger.info("✅ Created temporal indexes")
-                    self.stats['initialized'] += 1
+        if self.wait_for_indexes(self.index_timeout):
+            self.verify_index_usage()
+        else:
+            self._index_problem(
+                f"Indexes not online after {self.index_timeout}s - temporal queries use label scans "
+                f"until population finishes (check with --verify)"
+            )
 
+    def _index_problem(self, message: str):
+        """Warning, or error with strict_indexes."""
+        if self.strict_indexes:
+            logger.error(f"❌ {message}")
+            self.stats['errors'] += 1
+        else:
+            logger.warning(f"⚠️  {message}")
+            self.stats['warnings'] += 1
+
+    def index_states(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        SHOW INDEXES row for each TEMPORAL_INDEXES entry (None if missing).
+
+        Rows are matched by name, then by schema: IF NOT EXISTS is a no-op
+        when an equivalent index already exists under another name.
+        """
+        with self.neo4j_driver.session() as session:
+            rows = session.run("""
+                SHOW INDEXES
+                YIELD name, type, entityType, labelsOrTypes, properties,
+                      state, populationPercent, failureMessage
+            """).data()
+
+        states = {}
+        for name, spec in TEMPORAL_INDEXES.items():
+            schema = (spec['type'], spec['entity'].upper(), [spec['label']], spec['properties'])
+            states[name] = (
+                next((row for row in rows if row['name'] == name), None)
+                or next((row for row in rows
+                         if (row['type'], row['entityType'], row['labelsOrTypes'], row['properties']) == schema), None)
+            )
+        return states
+
+    def wait_for_indexes(self, timeout: float, poll_interval: float = 2.0) -> bool:
+        """
+        Poll SHOW INDEXES until every index is ONLINE.
+
+        Returns:
+            True if all are online; False on timeout or a FAILED index
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            states = self.index_states()
+            pending = {name: row for name, row in states.items() if row is None or row['state'] != 'ONLINE'}
+
+            failed = {name: row for name, row in pending.items() if row and row['state'] == 'FAILED'}
+            for name, row in failed.items():
+                logger.error(f"❌ Index {name} FAILED: {row['failureMessage']}")
+                self.stats['errors'] += 1
+            if failed:
+                return False
+
+            if not pending:
+                logger.info(f"✅ All {len(states)} indexes online")
+                return True
+
+            progress = ", ".join(
+                f"{name} {row['populationPercent'] or 0:.0f}%" if row else f"{name} missing"
+                for name, row in pending.items()
+            )
+            if time.monotonic() >= deadline:
+                logger.warning(f"⚠️  Still populating: {progress}")
+                return False
+            logger.info(f"🔄 Populating {len(pending)}/{len(states)}: {progress}")
+            time.sleep(poll_interval)
+
+    def verify_index_usage(self) -> bool:
+        """
+        EXPLAIN the key temporal queries and assert each plans an index seek.
+
+        A query passes when its plan has an index seek/scan operator on the
+        expected label and property (Details: "RANGE INDEX n:Label(prop) ...").
+
+        Returns:
+            True if every query uses its index
+        """
+        all_ok = True
+        with self.neo4j_driver.session() as session:
+            for check, (query, label, prop) in TEMPORAL_QUERY_CHECKS.items():
+                try:
+                    plan = session.run(f"EXPLAIN {query}", at=datetime.now(timezone.utc)).consume().plan
                 except Exception as e:
-                    logger.error(f"❌ Error creating temporal indexes: {e}")
+                    logger.error(f"❌ EXPLAIN {check} failed: {e}")
                     self.stats['errors'] += 1
-        else:
-            logger.info("🔍 DRY RUN: Would create temporal indexes")
+                    all_ok = False
+                    continue
+
+                operators = plan_operators(plan)
+                seeks = [op for op, details in operators
+                         if 'Index' in op and f"{label}({prop})" in details]
+                if seeks:
+                    logger.info(f"✅ {check}: {seeks[0].split('@')[0]}")
+                else:
+                    logger.error(f"❌ {check}: no index on {label}.{prop} in plan "
+                                 f"({' <- '.join(op.split('@')[0] for op, _ in operators)})")
+                    self.stats['errors'] += 1
+                    all_ok = False
+        return all_ok
 
     def register_entity_types(self):
         """Register entity types with Graphiti"""
@@ -198,35 +365,10 @@ class GraphitiInitializer:
             logger.info("🔍 DRY RUN: Would initialize temporal tracking")
 
     def create_pattern_detection_config(self):
-        """Create configuration for pattern detection"""
+        """Create configuration for pattern detection (evaluated by 02_detect_patterns.py)"""
         logger.info("🔄 Creating pattern detection configuration...")
 
-        patterns = {
-            'recurring_maintenance': {
-                'description': 'Detect recurring maintenance patterns',
-                'entity_type': 'MaintenanceRecord',
-                'temporal_window': 90,  # days
-                'min_occurrences': 3
-            },
-            'driver_reassignment': {
-                'description': 'Detect frequent driver reassignments',
-                'entity_type': 'Driver',
-                'temporal_window': 30,
-                'min_occurrences': 2
-            },
-            'load_frequency': {
-                'description': 'Detect load frequency patterns by carrier',
-                'entity_type': 'Load',
-                'temporal_window': 7,
-                'min_occurrences': 5
-            },
-            'expense_spikes': {
-                'description': 'Detect unusual expense patterns',
-                'entity_type': 'Expense',
-                'temporal_window': 30,
-                'threshold_multiplier': 2.0
-            }
-        }
+        patterns = PATTERN_DEFINITIONS
 
         if not self.dry_run:
             with self.pg_conn.cursor() as cur:
@@ -264,13 +406,22 @@ class GraphitiInitializer:
                 config_count = cur.fetchone()[0]
                 logger.info(f"✅ PostgreSQL config entries: {config_count}")
 
-            # Check Neo4j temporal indexes
-            with self.neo4j_driver.session() as session:
-                result = session.run("SHOW INDEXES")
-                indexes = [record for record in result]
-                temporal_indexes = [idx for idx in indexes if 'temporal' in str(idx).lower() or 'valid' in str(idx).lower()]
-                logger.info(f"✅ Neo4j temporal indexes: {len(temporal_indexes)}")
+            # Check Neo4j indexes and their population
+            states = self.index_states()
+            online = [name for name, row in states.items() if row and row['state'] == 'ONLINE']
+            logger.info(f"{'✅' if len(online) == len(states) else '⚠️ '} Neo4j Graphiti indexes online: "
+                        f"{len(online)}/{len(states)}")
+            for name, row in states.items():
+                if row is None:
+                    logger.warning(f"   ⚠️  {name}: missing")
+                elif row['state'] != 'ONLINE':
+                    logger.warning(f"   ⚠️  {name}: {row['state']} {row['populationPercent'] or 0:.0f}%")
+
+            # Temporal queries must use the indexes
+            if len(online) == len(states):
+                self.verify_index_usage()
 
+            with self.neo4j_driver.session() as session:
                 # Check TemporalEntity nodes
                 result = session.run("MATCH (n:TemporalEntity) RETURN count(n) as count")
                 count = result.single()['count']
@@ -287,6 +438,7 @@ class GraphitiInitializer:
         logger.info("INITIALIZATION STATISTICS")
         logger.info("="*60)
         logger.info(f"Initialized: {self.stats['initialized']}")
+        logger.info(f"Warnings:    {self.stats['warnings']}")
         logger.info(f"Errors:      {self.stats['errors']}")
         logger.info("="*60)
 
@@ -300,6 +452,11 @@ def main():
                         help='Execute initialization and write to databases')
     parser.add_argument('--verify', action='store_true',
                         help='Verify Graphiti initialization')
+    parser.add_argument('--index-timeout', type=float, default=INDEX_TIMEOUT,
+                        help='Seconds to wait for index population (0 = do not wait, '
+                             'default: GRAPHITI_INDEX_TIMEOUT or 300)')
+    parser.add_argument('--strict-indexes', action='store_true',
+                        help='Count indexes still populating after the timeout as errors')
 
     args = parser.parse_args()
 
@@ -314,7 +471,11 @@ def main():
     logger.info(f"Mode: {'DRY RUN' if dry_run else 'EXECUTE' if args.execute else 'VERIFY'}")
     logger.info("="*60)
 
-    initializer = GraphitiInitializer(dry_run=dry_run)
+    initializer = GraphitiInitializer(
+        dry_run=dry_run,
+        index_timeout=args.index_timeout,
+        strict_indexes=args.strict_indexes
+    )
 
     try:
         initializer.connect()
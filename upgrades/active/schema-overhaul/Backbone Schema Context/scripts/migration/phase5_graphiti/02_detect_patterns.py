@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Phase 5: Graphiti Temporal Intelligence - Step 2: Detect Patterns
+Purpose: Evaluate the graphiti_config pattern definitions incrementally and record hits
+Run after: 01_initialize_graphiti.py
+
+The pattern definitions stored by 01_initialize_graphiti.py drive a
+PatternEngine (see pattern_engine.py) that keeps per-entity windowed state.
+A run first backfills that state once from PostgreSQL. It reads only the
+last temporal_window days of events, in event-time order. With --interval
+it then keeps running and feeds only the rows added since (keyset on
+created_at / updated_at, like sync/incremental_sync.py), in O(1) per event.
+
+Hits go to the graphiti_pattern_hits table. They are unique per
+(pattern, entity, time), so re-running the backfill does not duplicate them.
+
+Event sources (tables missing from this database are skipped):
+- recurring_maintenance: hub3_origin.maintenance_records, per unit and service type
+- driver_reassignment:   hub3_origin.drivers.current_unit_assignment changes. PostgreSQL
+                         keeps only the current assignment, so the backfill sets each
+                         driver's baseline and reassignments are counted from then on
+- load_frequency:        hub2_openhaul.loads, per carrier
+- expense_spikes:        hub3_origin fuel and maintenance costs, per unit and category
+
+Usage:
+    python 02_detect_patterns.py --dry-run
+    python 02_detect_patterns.py --execute
+    python 02_detect_patterns.py --execute --interval 60
+    python 02_detect_patterns.py --verify
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import psycopg2
+from psycopg2.extras import execute_values
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+import argparse
+
+from pattern_engine import PATTERN_DEFINITIONS, Event, PatternEngine, PatternHit
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Database configuration
+PG_CONFIG = {
+    'host': os.getenv('POSTGRES_HOST', 'localhost'),
+    'port': os.getenv('POSTGRES_PORT', '5432'),
+    'database': os.getenv('POSTGRES_DB', 'apex_memory'),
+    'user': os.getenv('POSTGRES_USER', 'apex'),
+    'password': os.getenv('POSTGRES_PASSWORD', 'apexmemory2024')
+}
+
+BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE', '500'))
+# Ignore rows newer than this: a transaction still in flight can commit older watermarks
+LAG_SECONDS = int(os.getenv('SYNC_LAG_SECONDS', '30'))
+FETCH_SIZE = 10000
+SAMPLE_HITS = 5
+
+
+# ====================
+# Event sources
+# ====================
+# key:        primary key (keyset tiebreaker, stored as the hit's source_ref)
+# watermark:  column that orders new rows for --interval (created_at for
+#             insert-only events, updated_at for state changes)
+# event_time: when the event happened (window position)
+# columns:    extra columns the pattern feeds read
+# snapshot:   backfill reads every row (current state), not just the window
+
+EVENT_SOURCES = {
+    'maintenance_records': {
+        'table': 'hub3_origin.maintenance_records',
+        'key': 'maintenance_id',
+        'watermark': 'created_at',
+        'event_time': 'maintenance_date::timestamptz',
+        'columns': 'unit_number, service_type, total_cost, status',
+    },
+    'fuel_transactions': {
+        'table': 'hub3_origin.fuel_transactions',
+        'key': 'transaction_id',
+        'watermark': 'created_at',
+        'event_time': 'transaction_date',
+        'columns': 'unit_number, total_amount',
+    },
+    'drivers': {
+        'table': 'hub3_origin.drivers',
+        'key': 'driver_id',
+        'watermark': 'updated_at',
+        'event_time': 'updated_at',
+        'columns': 'driver_id, current_unit_assignment',
+        'snapshot': True,
+    },
+    'loads': {
+        'table': 'hub2_openhaul.loads',
+        'key': 'load_id',
+        'watermark': 'created_at',
+        'event_time': 'pickup_date::timestamptz',
+        'columns': 'carrier_id',
+    },
+}
+
+
+def _completed(row: Dict[str, Any]) -> bool:
+    return row['status'] != 'cancelled'
+
+
+# pattern -> [(source, row -> Event or None)]
+PATTERN_FEEDS: Dict[str, List[Tuple[str, Callable[[Dict[str, Any]], Optional[Event]]]]] = {
+    'recurring_maintenance': [
+        ('maintenance_records', lambda row: Event(
+            f"{row['unit_number']}:{row['service_type']}", row['event_time'], ref=row['ref']
+        ) if _completed(row) else None),
+    ],
+    'driver_reassignment': [
+        ('drivers', lambda row: Event(
+            row['driver_id'], row['event_time'], label=row['current_unit_assignment'], ref=row['ref']
+        )),
+    ],
+    'load_frequency': [
+        ('loads', lambda row: Event(str(row['carrier_id']), row['event_time'], ref=row['ref'])),
+    ],
+    'expense_spikes': [
+        ('fuel_transactions', lambda row: Event(
+            f"{row['unit_number']}:fuel", row['event_time'], float(row['total_amount']), ref=row['ref']
+        )),
+        ('maintenance_records', lambda row: Event(
+            f"{row['unit_number']}:maintenance", row['event_time'], float(row['total_cost']), ref=row['ref']
+        ) if _completed(row) else None),
+    ],
+}
+
+
+class PatternDetector:
+    """Backfill and incrementally run the Graphiti pattern engine"""
+
+    def __init__(self, dry_run: bool = True, batch_size: int = BATCH_SIZE):
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.pg_conn = None
+        self.engine: Optional[PatternEngine] = None
+        self.routes: Dict[str, List[Tuple[str, Callable]]] = {}
+        self.watermarks: Dict[str, Tuple[datetime, str]] = {}
+        self.stats = {
+            'events': 0,
+            'hits': 0,
+            'written': 0,
+            'skipped_sources': 0,
+            'errors': 0
+        }
+
+    def connect(self):
+        """Connect to PostgreSQL"""
+        try:
+            self.pg_conn = psycopg2.connect(**PG_CONFIG)
+            logger.info(f"✅ Connected to PostgreSQL: {PG_CONFIG['database']}")
+        except Exception as e:
+            logger.error(f"❌ Connection failed: {e}")
+            sys.exit(1)
+
+    def disconnect(self):
+        """Close connections"""
+        if self.pg_conn:
+            self.pg_conn.close()
+
+    def load_patterns(self):
+        """Build the engine from graphiti_config and route sources to patterns"""
+        with self.pg_conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('graphiti_config')")
+            patterns = None
+            if cur.fetchone()[0] is not None:
+                cur.execute("SELECT config_value FROM graphiti_config WHERE config_key = 'pattern_detection'")
+                row = cur.fetchone()
+                patterns = row[0] if row else None
+        self.pg_conn.commit()
+
+        if not patterns and self.dry_run:
+            # 01_initialize_graphiti.py --dry-run does not store the config
+            logger.warning("⚠️  No pattern_detection config - dry run uses the definitions from 01_initialize_graphiti.py")
+            patterns = PATTERN_DEFINITIONS
+        elif not patterns:
+            raise RuntimeError("No pattern_detection config - run 01_initialize_graphiti.py --execute first")
+
+        self.engine = PatternEngine(patterns)
+        self.routes = {}
+        for pattern in patterns:
+            if pattern not in PATTERN_FEEDS:
+                logger.warning(f"⚠️  No event source for pattern {pattern} - skipped")
+                continue
+            for source_name, to_event in PATTERN_FEEDS[pattern]:
+                self.routes.setdefault(source_name, []).append((pattern, to_event))
+
+        logger.info(f"✅ Loaded {len(patterns)} patterns (history needed: {self.engine.max_window.days} days)")
+
+    def ensure_hits_table(self):
+        """Create graphiti_pattern_hits"""
+        with self.pg_conn.cursor() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS graphiti_pattern_hits (
+                    hit_id BIGSERIAL PRIMARY KEY,
+                    pattern VARCHAR(100) NOT NULL,
+                    entity_key TEXT NOT NULL,
+                    detected_at TIMESTAMPTZ NOT NULL,
+                    event_count INTEGER NOT NULL,
+                    window_days INTEGER NOT NULL,
+                    source_ref TEXT,
+                    details JSONB,
+                    created_at TIMESTAMPTZ DEFAULT NOW(),
+                    UNIQUE (pattern, entity_key, detected_at)
+                )
+            """)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_pattern_hits_detected
+                ON graphiti_pattern_hits(pattern, detected_at DESC)
+            """)
+        self.pg_conn.commit()
+
+    def source_exists(self, source: Dict[str, Any]) -> bool:
+        with self.pg_conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s)", (source['table'],))
+            exists = cur.fetchone()[0] is not None
+        self.pg_conn.commit()
+        return exists
+
+    def _select(self, source: Dict[str, Any]) -> str:
+        return f"""
+            SELECT {source['key']}::text AS ref,
+                   {source['event_time']} AS event_time,
+                   {source['watermark']} AS watermark,
+                   {source['columns']}
+            FROM {source['table']}
+        """
+
+    def feed(self, source_name: str, row: Dict[str, Any]) -> List[PatternHit]:
+        """Turn one source row into events for every pattern it feeds"""
+        hits = []
+        for pattern, to_event in self.routes[source_name]:
+            event = to_event(row)
+            if event is None or event.timestamp is None:
+                continue
+            self.stats['events'] += 1
+            hit = self.engine.process(pattern, event)
+            if hit:
+                hits.append(hit)
+        return hits
+
+    def backfill(self, history_days: Optional[int] = None):
+        """
+        Warm the engine once from PostgreSQL.
+
+        Reads events from the last history_days (default: the longest
+        temporal window) in event-time order, up to NOW() - lag. Rows after
+        that cutoff are left to the incremental polls.
+        """
+        history = timedelta(days=history_days) if history_days else self.engine.max_window
+        with self.pg_conn.cursor() as cur:
+            cur.execute("SELECT NOW() - make_interval(secs => %s), NOW() - %s", (LAG_SECONDS, history))
+            cutoff, since = cur.fetchone()
+        self.pg_conn.commit()
+        logger.info(f"🔄 Backfilling {history.days} days of events (until {cutoff.isoformat()})...")
+
+        for source_name in self.routes:
+            source = EVENT_SOURCES[source_name]
+            if not self.source_exists(source):
+                logger.warning(f"⚠️  {source['table']} does not exist - skipping {source_name}")
+                self.stats['skipped_sources'] += 1
+                continue
+
+            where = f"{source['watermark']} < %(cutoff)s"
+            if not source.get('snapshot'):
+                where += f" AND {source['event_time']} >= %(since)s"
+
+            rows, hits = 0, []
+            try:
+                with self.pg_conn.cursor(name=f"patterns_{source_name}") as cur:
+                    cur.itersize = FETCH_SIZE
+                    cur.execute(f"""
+                        {self._select(source)}
+                        WHERE {where}
+                        ORDER BY {source['event_time']}, {source['key']}::text
+                    """, {'cutoff': cutoff, 'since': since})
+                    names = None
+                    for values in cur:
+                        names = names or [col[0] for col in cur.description]
+                        hits.extend(self.feed(source_name, dict(zip(names, values))))
+                        rows += 1
+            finally:
+                # Read-only; end the transaction the named cursor opened
+                self.pg_conn.rollback()
+
+            self.watermarks[source_name] = (cutoff, '')
+            logger.info(f"✅ {source_name}: {rows} rows, {len(hits)} hits")
+            self.record_hits(hits)
+
+    def poll(self, source_name: str) -> int:
+        """Feed rows added since the source's watermark; returns rows read"""
+        source = EVENT_SOURCES[source_name]
+        total = 0
+        while True:
+            with self.pg_conn.cursor() as cur:
+                cur.execute(f"""
+                    {self._select(source)}
+                    WHERE ({source['watermark']}, {source['key']}::text) > (%s, %s)
+                    AND {source['watermark']} <= NOW() - make_interval(secs => %s)
+                    ORDER BY {source['watermark']}, {source['key']}::text
+                    LIMIT %s
+                """, (*self.watermarks[source_name], LAG_SECONDS, self.batch_size))
+                names = [col[0] for col in cur.description]
+                rows = [dict(zip(names, values)) for values in cur.fetchall()]
+            self.pg_conn.commit()
+
+            if not rows:
+                return total
+
+            hits = []
+            for row in rows:
+                hits.extend(self.feed(source_name, row))
+            self.record_hits(hits, log_each=True)
+            self.watermarks[source_name] = (rows[-1]['watermark'], rows[-1]['ref'])
+            total += len(rows)
+
+    def poll_all(self):
+        """One incremental round over every backfilled source"""
+        rows = sum(self.poll(source_name) for source_name in self.watermarks)
+        pruned = self.engine.prune(datetime.now().astimezone())
+        logger.info(f"✅ Poll: {rows} new rows, tracking {sum(self.engine.tracked_entities().values())} "
+                    f"entities ({pruned} expired)")
+
+    def record_hits(self, hits: List[PatternHit], log_each: bool = False):
+        """Log hits and store them in graphiti_pattern_hits"""
+        self.stats['hits'] += len(hits)
+        for hit in (hits if log_each else hits[:SAMPLE_HITS]):
+            detail = (f"{hit.value:.2f} vs mean {hit.mean:.2f}" if hit.value is not None
+                      else f"{hit.count} in {hit.window_days}d")
+            logger.info(f"   📊 {hit.pattern}: {hit.key} at {hit.timestamp.isoformat()} ({detail})")
+        if not log_each and len(hits) > SAMPLE_HITS:
+            logger.info(f"   ... and {len(hits) - SAMPLE_HITS} more")
+
+        if self.dry_run or not hits:
+            return
+
+        try:
+            with self.pg_conn.cursor() as cur:
+                inserted = execute_values(cur, """
+                    INSERT INTO graphiti_pattern_hits
+                        (pattern, entity_key, detected_at, event_count, window_days, source_ref, details)
+                    VALUES %s
+                    ON CONFLICT (pattern, entity_key, detected_at) DO NOTHING
+                    RETURNING 1
+                """, [
+                    (hit.pattern, hit.key, hit.timestamp, hit.count, hit.window_days, hit.ref,
+                     json.dumps({'value': hit.value, 'mean': hit.mean, 'stddev': hit.stddev})
+                     if hit.value is not None else None)
+                    for hit in hits
+                ], page_size=self.batch_size, fetch=True)
+                self.stats['written'] += len(inserted)
+            self.pg_conn.commit()
+        except Exception as e:
+            self.pg_conn.rollback()
+            logger.error(f"❌ Error storing {len(hits)} pattern hits: {e}")
+            self.stats['errors'] += 1
+
+    def verify(self):
+        """Show stored hits per pattern"""
+        logger.info("\n" + "="*60)
+        logger.info("PATTERN HITS")
+        logger.info("="*60)
+
+        with self.pg_conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('graphiti_pattern_hits')")
+            if cur.fetchone()[0] is None:
+                logger.warning("⚠️  graphiti_pattern_hits does not exist - run with --execute first")
+                return
+            cur.execute("""
+                SELECT pattern, COUNT(*), COUNT(DISTINCT entity_key), MAX(detected_at)
+                FROM graphiti_pattern_hits
+                GROUP BY pattern
+                ORDER BY pattern
+            """)
+            rows = cur.fetchall()
+
+        if not rows:
+            logger.info("No pattern hits recorded")
+        for pattern, hits, entities, latest in rows:
+            logger.info(f"✅ {pattern}: {hits} hits for {entities} entities (latest {latest.isoformat()})")
+        logger.info("="*60)
+
+    def print_stats(self):
+        """Print detection statistics"""
+        logger.info("\n" + "="*60)
+        logger.info("PATTERN DETECTION STATISTICS")
+        logger.info("="*60)
+        logger.info(f"Events:          {self.stats['events']}")
+        logger.info(f"Hits:            {self.stats['hits']}")
+        logger.info(f"Hits written:    {self.stats['written']}")
+        logger.info(f"Skipped sources: {self.stats['skipped_sources']}")
+        logger.info(f"Errors:          {self.stats['errors']}")
+        if self.engine:
+            for pattern, counts in self.engine.stats.items():
+                logger.info(f"  {pattern}: {counts['events']} events, {counts['hits']} hits")
+        logger.info("="*60)
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description='Detect Graphiti temporal patterns incrementally')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Run detection without writing hits')
+    parser.add_argument('--execute', action='store_true',
+                        help='Run detection and store hits in graphiti_pattern_hits')
+    parser.add_argument('--verify', action='store_true',
+                        help='Show stored pattern hits')
+    parser.add_argument('--history-days', type=int, default=None,
+                        help='Days of history to backfill (default: longest pattern window)')
+    parser.add_argument('--interval', type=int, default=0,
+                        help='Keep running, feeding new rows every N seconds')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f'Rows per incremental poll (default: {BATCH_SIZE})')
+
+    args = parser.parse_args()
+
+    if not args.dry_run and not args.execute and not args.verify:
+        logger.error("❌ Must specify either --dry-run, --execute, or --verify")
+        sys.exit(1)
+
+    dry_run = args.dry_run or not args.execute
+
+    logger.info("="*60)
+    logger.info("GRAPHITI PATTERN DETECTION")
+    logger.info(f"Mode: {'VERIFY' if args.verify else 'DRY RUN' if dry_run else 'EXECUTE'}")
+    logger.info("="*60)
+
+    detector = PatternDetector(dry_run=dry_run, batch_size=args.batch_size)
+
+    try:
+        detector.connect()
+
+        if args.verify:
+            detector.verify()
+            return
+
+        detector.load_patterns()
+        if not dry_run:
+            detector.ensure_hits_table()
+
+        detector.backfill(args.history_days)
+
+        while args.interval:
+            logger.info(f"⏳ Next poll in {args.interval}s")
+            time.sleep(args.interval)
+            detector.poll_all()
+
+        detector.print_stats()
+
+        if dry_run:
+            logger.info("\n✅ Dry run complete - no hits were written")
+        else:
+            logger.info("\n✅ Pattern detection complete")
+
+    except KeyboardInterrupt:
+        detector.print_stats()
+        logger.info("\n⚠️  Pattern detection interrupted")
+
+    except Exception as e:
+        logger.error(f"❌ Pattern detection failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+    finally:
+        detector.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Pattern Detection Engine
+Purpose: Incrementally evaluate the graphiti_config 'pattern_detection' definitions
+Run after: 01_initialize_graphiti.py (stores the pattern definitions)
+
+Every pattern keeps per-entity state covering only its temporal window.
+Events are folded into that state as they arrive, and history is never
+re-scanned:
+
+- window_count:  events per entity in the last temporal_window days. A hit
+                 when the count reaches min_occurrences (recurring_maintenance,
+                 load_frequency)
+- value_change:  like window_count, but only counts events whose label
+                 differs from the entity's previous label, e.g. a driver
+                 moving to another unit (driver_reassignment)
+- rolling_spike: rolling mean and standard deviation of the entity's values
+                 in the window. A hit when a value exceeds
+                 threshold_multiplier x the mean of the preceding window, which
+                 must hold at least min_samples values (expense_spikes)
+
+A pattern's detector comes from its 'detector' key. Without one, it is
+rolling_spike if the pattern has threshold_multiplier, else window_count.
+
+Each event is appended to one window and evicted from it once, so
+processing is O(1) amortized per event. Events should arrive in time order
+per entity (the backfill and --follow in 02_detect_patterns.py read them
+in order). A late event is treated as arriving at the entity's newest
+timestamp. A count pattern emits one hit when its threshold is crossed and
+re-arms once the count drops below it again.
+
+Usage:
+    engine = PatternEngine(patterns)    # graphiti_config['pattern_detection']
+    hit = engine.process('expense_spikes', Event(key='1234:fuel', timestamp=ts, value=812.40))
+"""
+
+import math
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+@dataclass
+class Event:
+    """One occurrence for one entity"""
+    key: str                       # entity key, e.g. unit number or 'unit:service_type'
+    timestamp: datetime
+    value: float = 1.0             # amount for rolling_spike
+    label: Optional[str] = None    # state for value_change (e.g. assigned unit)
+    ref: Optional[str] = None      # source row id
+
+
+@dataclass
+class PatternHit:
+    """A pattern detected for one entity at one event"""
+    pattern: str
+    key: str
+    timestamp: datetime
+    count: int                     # events in the window (incl. this one)
+    window_days: int
+    ref: Optional[str] = None
+    value: Optional[float] = None  # rolling_spike: the spiking value
+    mean: Optional[float] = None   # rolling_spike: mean of the preceding window
+    stddev: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class WindowCountDetector:
+    """Hit when an entity has min_occurrences events within temporal_window days"""
+
+    kind = 'window_count'
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        self.window_days = int(config['temporal_window'])
+        self.window = timedelta(days=self.window_days)
+        self.min_occurrences = int(config.get('min_occurrences', 1))
+        self.windows: Dict[str, Deque[datetime]] = {}
+
+    def _evict(self, window: Deque, now: datetime):
+        cutoff = now - self.window
+        while window and window[0] <= cutoff:
+            window.popleft()
+
+    def _counts(self, event: Event) -> bool:
+        """Whether the event counts towards the pattern"""
+        return True
+
+    def update(self, event: Event) -> Optional[PatternHit]:
+        if not self._counts(event):
+            return None
+
+        window = self.windows.setdefault(event.key, deque())
+        now = max(event.timestamp, window[-1]) if window else event.timestamp
+        self._evict(window, now)
+        before = len(window)
+        window.append(now)
+
+        if before < self.min_occurrences <= len(window):
+            return PatternHit(self.name, event.key, event.timestamp, len(window), self.window_days, event.ref)
+        return None
+
+    def prune(self, now: datetime) -> int:
+        """Drop entities with no event inside the window; returns how many"""
+        stale = [key for key, window in self.windows.items() if not window or window[-1] <= now - self.window]
+        for key in stale:
+            del self.windows[key]
+        return len(stale)
+
+
+class ValueChangeDetector(WindowCountDetector):
+    """Hit when an entity's label changes min_occurrences times within the window"""
+
+    kind = 'value_change'
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        super().__init__(name, config)
+        self.last_label: Dict[str, Optional[str]] = {}
+
+    def _counts(self, event: Event) -> bool:
+        # No label (e.g. unassigned) is not a state of its own: A -> none -> B is one change
+        if event.label is None:
+            return False
+        previous = self.last_label.get(event.key)
+        self.last_label[event.key] = event.label
+        return previous is not None and event.label != previous
+
+
+class RollingSpikeDetector:
+    """Hit when a value exceeds threshold_multiplier x the rolling mean of the window"""
+
+    kind = 'rolling_spike'
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        self.window_days = int(config['temporal_window'])
+        self.window = timedelta(days=self.window_days)
+        self.multiplier = float(config.get('threshold_multiplier', 2.0))
+        self.min_samples = int(config.get('min_samples', 3))
+        # key -> ((timestamp, value) window, [sum, sum of squares])
+        self.windows: Dict[str, Tuple[Deque[Tuple[datetime, float]], List[float]]] = {}
+
+    def update(self, event: Event) -> Optional[PatternHit]:
+        window, sums = self.windows.setdefault(event.key, (deque(), [0.0, 0.0]))
+        now = max(event.timestamp, window[-1][0]) if window else event.timestamp
+
+        cutoff = now - self.window
+        while window and window[0][0] <= cutoff:
+            _, old = window.popleft()
+            sums[0] -= old
+            sums[1] -= old * old
+        if not window:
+            sums[0] = sums[1] = 0.0        # drop accumulated float error
+
+        hit = None
+        n = len(window)
+        if n >= self.min_samples:
+            mean = sums[0] / n
+            if mean > 0 and event.value > self.multiplier * mean:
+                stddev = math.sqrt(max(0.0, sums[1] / n - mean * mean))
+                hit = PatternHit(self.name, event.key, event.timestamp, n + 1, self.window_days,
+                                 event.ref, event.value, mean, stddev)
+
+        window.append((now, event.value))
+        sums[0] += event.value
+        sums[1] += event.value * event.value
+        return hit
+
+    def prune(self, now: datetime) -> int:
+        """Drop entities with no value inside the window; returns how many"""
+        stale = [key for key, (window, _) in self.windows.items()
+                 if not window or window[-1][0] <= now - self.window]
+        for key in stale:
+            del self.windows[key]
+        return len(stale)
+
+
+# Stored in graphiti_config by 01_initialize_graphiti.py
+PATTERN_DEFINITIONS = {
+    'recurring_maintenance': {
+        'detector': 'window_count',
+        'description': 'Detect recurring maintenance patterns',
+        'entity_type': 'MaintenanceRecord',
+        'temporal_window': 90,  # days
+        'min_occurrences': 3
+    },
+    'driver_reassignment': {
+        'detector': 'value_change',
+        'description': 'Detect frequent driver reassignments',
+        'entity_type': 'Driver',
+        'temporal_window': 30,
+        'min_occurrences': 2
+    },
+    'load_frequency': {
+        'detector': 'window_count',
+        'description': 'Detect load frequency patterns by carrier',
+        'entity_type': 'Load',
+        'temporal_window': 7,
+        'min_occurrences': 5
+    },
+    'expense_spikes': {
+        'detector': 'rolling_spike',
+        'description': 'Detect unusual expense patterns',
+        'entity_type': 'Expense',
+        'temporal_window': 30,
+        'threshold_multiplier': 2.0
+    }
+}
+
+
+DETECTORS = {
+    detector.kind: detector
+    for detector in (WindowCountDetector, ValueChangeDetector, RollingSpikeDetector)
+}
+
+
+def build_detector(name: str, config: Dict[str, Any]):
+    """Detector for one pattern definition"""
+    kind = config.get('detector') or ('rolling_spike' if 'threshold_multiplier' in config else 'window_count')
+    if kind not in DETECTORS:
+        raise ValueError(f"Unknown detector '{kind}' for pattern {name} (expected one of {list(DETECTORS)})")
+    return DETECTORS[kind](name, config)
+
+
+class PatternEngine:
+    """All configured patterns, fed one event at a time"""
+
+    def __init__(self, patterns: Dict[str, Dict[str, Any]]):
+        self.detectors = {name: build_detector(name, config) for name, config in patterns.items()}
+        self.stats = {name: {'events': 0, 'hits': 0} for name in patterns}
+
+    @property
+    def max_window(self) -> timedelta:
+        """Longest temporal window: how much history a backfill has to read"""
+        return max((d.window for d in self.detectors.values()), default=timedelta(0))
+
+    def process(self, pattern: str, event: Event) -> Optional[PatternHit]:
+        """Fold one event into a pattern's state; returns a hit if it fired"""
+        hit = self.detectors[pattern].update(event)
+        self.stats[pattern]['events'] += 1
+        if hit:
+            self.stats[pattern]['hits'] += 1
+        return hit
+
+    def prune(self, now: datetime) -> int:
+        """Forget entities whose windows are empty as of now"""
+        return sum(d.prune(now) for d in self.detectors.values())
+
+    def tracked_entities(self) -> Dict[str, int]:
+        return {name: len(d.windows) for name, d in self.detectors.items()}
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Migration Orchestrator: Run all migration phases as one dependency-ordered DAG
+Purpose: Run per-hub and per-entity migration steps concurrently, in dependency
+         order, with progress tracking and resume
+Run after: 01_create_database.sql, 02_create_schemas.sql, 03_create_tables_hub3.sql,
+           01_create_constraints.cypher
+
+Each hub and entity step of the phase scripts is a task; a task starts as soon
+as every task it depends on has completed:
+    - PostgreSQL hub loads run first (one task per hub, hubs run in parallel)
+    - Neo4j nodes follow their source hub, relationships follow their nodes
+    - Qdrant vectors follow their collections and source data
+    - Graphiti initialization follows the Neo4j graph
+
+Usage:
+    python run_migration.py --list
+    python run_migration.py --all --dry-run
+    python run_migration.py --all --execute --workers 4
+    python run_migration.py --phase 2 --phase 3 --execute
+    python run_migration.py --all --execute --resume
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List
+import argparse
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATION_DIR = os.path.join(SCRIPTS_DIR, 'migration')
+
+DEFAULT_STATE_FILE = os.path.join(SCRIPTS_DIR, '.migration_state.json')
+DEFAULT_LOG_DIR = os.path.join(SCRIPTS_DIR, 'logs', 'migration')
+
+HUBS = [1, 2, 3, 4, 5, 6]
+
+# Source hub for each Neo4j node entity (02_load_nodes.py --entity)
+NODE_ENTITIES = {
+    'tractors': 3,
+    'drivers': 3,
+}
+
+# Node entities each relationship needs (03_create_relationships.py --relationship)
+RELATIONSHIPS = {
+    'assigned_to': ['drivers', 'tractors'],
+    'fuel_transactions': ['tractors', 'drivers'],
+    'maintenance': ['tractors'],
+    'incidents': ['tractors', 'drivers'],
+}
+
+# Source hubs for each Qdrant collection (02_load_vectors.py --collection)
+VECTOR_COLLECTIONS = {
+    'document_chunks': HUBS,
+    'entity_embeddings': [3],
+}
+
+
+@dataclass
+class MigrationTask:
+    """Single migration step run as a phase script invocation"""
+    task_id: str
+    phase: int
+    script: str
+    args: List[str]
+    depends_on: List[str] = field(default_factory=list)
+
+    def command(self, mode_flag: str) -> List[str]:
+        return [sys.executable, os.path.join(MIGRATION_DIR, self.script), *self.args, mode_flag]
+
+
+def build_tasks(hubs: List[int]) -> Dict[str, MigrationTask]:
+    """Build the full migration DAG (task_id -> task)"""
+    tasks: List[MigrationTask] = []
+
+    # Phase 1: PostgreSQL - one task per hub
+    for hub in hubs:
+        tasks.append(MigrationTask(
+            task_id=f'postgres:hub{hub}',
+            phase=1,
+            script='phase1_postgresql/04_transform_and_load.py',
+            args=['--hub', str(hub)]
+        ))
+
+    # Phase 2: Neo4j - nodes after their hub, relationships after their nodes
+    for entity, hub in NODE_ENTITIES.items():
+        tasks.append(MigrationTask(
+            task_id=f'neo4j:nodes:{entity}',
+            phase=2,
+            script='phase2_neo4j/02_load_nodes.py',
+            args=['--entity', entity],
+            depends_on=[f'postgres:hub{hub}']
+        ))
+
+    for relationship, entities in RELATIONSHIPS.items():
+        tasks.append(MigrationTask(
+            task_id=f'neo4j:relationships:{relationship}',
+            phase=2,
+            script='phase2_neo4j/03_create_relationships.py',
+            args=['--relationship', relationship],
+            depends_on=[f'neo4j:nodes:{entity}' for entity in entities]
+        ))
+
+    # Phase 3: Qdrant - collections are schema-only, vectors need source data
+    tasks.append(MigrationTask(
+        task_id='qdrant:collections',
+        phase=3,
+        script='phase3_qdrant/01_create_collections.py',
+        args=['--all']
+    ))
+
+    for collection, source_hubs in VECTOR_COLLECTIONS.items():
+        tasks.append(MigrationTask(
+            task_id=f'qdrant:vectors:{collection}',
+            phase=3,
+            script='phase3_qdrant/02_load_vectors.py',
+            args=['--collection', collection],
+            depends_on=['qdrant:collections'] + [f'postgres:hub{hub}' for hub in source_hubs]
+        ))
+
+    # Phase 4: Redis - configuration only
+    tasks.append(MigrationTask(
+        task_id='redis:configure',
+        phase=4,
+        script='phase4_redis/01_configure_redis.py',
+        args=[]
+    ))
+
+    # Phase 5: Graphiti - needs the complete Neo4j graph and PostgreSQL
+    tasks.append(MigrationTask(
+        task_id='graphiti:initialize',
+        phase=5,
+        script='phase5_graphiti/01_initialize_graphiti.py',
+        args=[],
+        depends_on=[t.task_id for t in tasks if t.phase == 2] + ['postgres:hub3']
+    ))
+
+    tasks.append(MigrationTask(
+        task_id='graphiti:patterns',
+        phase=5,
+        script='phase5_graphiti/02_detect_patterns.py',
+        args=[],
+        depends_on=['graphiti:initialize']
+    ))
+
+    # Drop dependencies on hubs that were not selected
+    task_map = {t.task_id: t for t in tasks}
+    for task in tasks:
+        task.depends_on = [dep for dep in task.depends_on if dep in task_map]
+    return task_map
+
+
+def select_tasks(task_map: Dict[str, MigrationTask], phases: List[int]) -> Dict[str, MigrationTask]:
+    """
+    Restrict the DAG to the given phases
+    Dependencies on unselected phases are treated as already satisfied
+    """
+    selected = {tid: t for tid, t in task_map.items() if t.phase in phases}
+    for task in selected.values():
+        task.depends_on = [dep for dep in task.depends_on if dep in selected]
+    return selected
+
+
+def topological_levels(task_map: Dict[str, MigrationTask]) -> List[List[str]]:
+    """Group tasks into levels (each level only depends on earlier ones)"""
+    remaining = {tid: set(t.depends_on) for tid, t in task_map.items()}
+    levels = []
+    done = set()
+    while remaining:
+        ready = sorted(tid for tid, deps in remaining.items() if deps <= done)
+        if not ready:
+            raise ValueError(f"Dependency cycle between tasks: {', '.join(sorted(remaining))}")
+        levels.append(ready)
+        done.update(ready)
+        for tid in ready:
+            del remaining[tid]
+    return levels
+
+
+class MigrationOrchestrator:
+    """Run migration tasks in dependency order with a bounded worker pool"""
+
+    def __init__(self, tasks: Dict[str, MigrationTask], dry_run: bool = True, workers: int = 4,
+                 state_file: str = DEFAULT_STATE_FILE, log_dir: str = DEFAULT_LOG_DIR,
+                 resume: bool = False):
+        self.tasks = tasks
+        self.dry_run = dry_run
+        self.workers = workers
+        self.state_file = state_file
+        self.log_dir = log_dir
+        self.resume = resume
+        self.completed: Dict[str, Dict] = {}
+        self.previous: Dict[str, Dict] = {}
+        self.stats = {
+            'completed': 0,
+            'resumed': 0,
+            'failed': 0,
+            'blocked': 0
+        }
+
+    def load_state(self):
+        """Load completed tasks from a previous execute run"""
+        if not self.resume or self.dry_run or not os.path.exists(self.state_file):
+            return
+        with open(self.state_file, 'r') as f:
+            state = json.load(f)
+        # Keep entries for unselected tasks so a partial run does not forget them
+        self.previous = state.get('completed', {})
+        self.completed = {tid: info for tid, info in self.previous.items() if tid in self.tasks}
+        self.stats['resumed'] = len(self.completed)
+        logger.info(f"📊 Resuming: {len(self.completed)} tasks already completed")
+
+    def save_state(self):
+        """Persist completed tasks (execute mode only)"""
+        if self.dry_run:
+            return
+        tmp_path = f"{self.state_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'updated_at': datetime.now().isoformat(),
+                       'completed': {**self.previous, **self.completed}},
+                      f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_file)
+
+    def run_task(self, task: MigrationTask) -> float:
+        """Run a single task as a subprocess, logging its output to a file"""
+        mode_flag = '--dry-run' if self.dry_run else '--execute'
+        log_path = os.path.join(self.log_dir, f"{task.task_id.replace(':', '_')}.log")
+        start = time.time()
+
+        with open(log_path, 'w') as log_file:
+            result = subprocess.run(
+                task.command(mode_flag),
+                cwd=SCRIPTS_DIR,
+                stdout=log_file,
+                stderr=subprocess.STDOUT
+            )
+
+        if result.returncode != 0:
+            raise RuntimeError(f"exit code {result.returncode} (see {log_path})")
+        return time.time() - start
+
+    def run(self) -> bool:
+        """Run all tasks; returns True when every task completed"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.load_state()
+
+        total = len(self.tasks)
+        done = set(self.completed)
+        failed = set()
+        pending = {tid: t for tid, t in self.tasks.items() if tid not in done}
+        running = {}
+
+        def is_blocked(task: MigrationTask) -> bool:
+            return any(dep in failed for dep in task.depends_on)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or running:
+                # Fail fast downstream of failed tasks (transitively)
+                blocked = [tid for tid, t in pending.items() if is_blocked(t)]
+                while blocked:
+                    for tid in blocked:
+                        logger.warning(f"⚠️  Skipping {tid}: a dependency failed")
+                        failed.add(tid)
+                        self.stats['blocked'] += 1
+                        del pending[tid]
+                    blocked = [tid for tid, t in pending.items() if is_blocked(t)]
+
+                # Submit every task whose dependencies are satisfied
+                for tid in sorted(pending):
+                    task = pending[tid]
+                    if all(dep in done for dep in task.depends_on):
+                        logger.info(f"🔄 Starting {tid}")
+                        running[executor.submit(self.run_task, task)] = tid
+                        del pending[tid]
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    tid = running.pop(future)
+                    try:
+                        duration = future.result()
+                    except Exception as e:
+                        failed.add(tid)
+                        self.stats['failed'] += 1
+                        logger.error(f"❌ {tid} failed: {e}")
+                        continue
+
+                    done.add(tid)
+                    self.stats['completed'] += 1
+                    self.completed[tid] = {
+                        'finished_at': datetime.now().isoformat(),
+                        'duration_seconds': round(duration, 2)
+                    }
+                    self.save_state()
+                    logger.info(f"✅ [{len(done)}/{total}] {tid} ({duration:.1f}s)")
+
+        return not failed
+
+    def print_plan(self):
+        """Print the task DAG grouped into dependency levels"""
+        logger.info("\n" + "="*60)
+        logger.info("MIGRATION PLAN")
+        logger.info("="*60)
+        for level, task_ids in enumerate(topological_levels(self.tasks), 1):
+            logger.info(f"Level {level}:")
+            for tid in task_ids:
+                deps = self.tasks[tid].depends_on
+                logger.info(f"   {tid}" + (f"  ← {', '.join(deps)}" if deps else ""))
+        logger.info("="*60)
+
+    def print_stats(self):
+        """Print orchestration statistics"""
+        logger.info("\n" + "="*60)
+        logger.info("MIGRATION STATISTICS")
+        logger.info("="*60)
+        logger.info(f"Tasks:     {len(self.tasks)}")
+        logger.info(f"Completed: {self.stats['completed']}")
+        logger.info(f"Resumed:   {self.stats['resumed']}")
+        logger.info(f"Failed:    {self.stats['failed']}")
+        logger.info(f"Blocked:   {self.stats['blocked']}")
+        logger.info("="*60)
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description='Run the 6-hub migration as a dependency-ordered DAG')
+    parser.add_argument('--all', action='store_true',
+                        help='Run all phases')
+    parser.add_argument('--phase', type=int, action='append', choices=range(1, 6),
+                        help='Phase to run (repeatable, 1-5)')
+    parser.add_argument('--hubs', type=int, nargs='+', choices=HUBS, default=HUBS,
+                        help='Hubs to migrate (default: all)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Maximum number of tasks running at once (default: 4)')
+    parser.add_argument('--list', action='store_true',
+                        help='Print the task plan and exit')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Run every task in dry-run mode')
+    parser.add_argument('--execute', action='store_true',
+                        help='Run every task in execute mode')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip tasks completed by a previous execute run')
+    parser.add_argument('--state-file', type=str, default=DEFAULT_STATE_FILE,
+                        help='Progress file used for --resume')
+    parser.add_argument('--log-dir', type=str, default=DEFAULT_LOG_DIR,
+                        help='Directory for per-task output logs')
+
+    args = parser.parse_args()
+
+    if not args.list and not args.dry_run and not args.execute:
+        logger.error("❌ Must specify either --dry-run, --execute, or --list")
+        sys.exit(1)
+
+    phases = [1, 2, 3, 4, 5] if args.all or not args.phase else sorted(set(args.phase))
+    if not args.all and not args.phase and not args.list:
+        logger.error("❌ Must specify either --all or --phase")
+        sys.exit(1)
+
+    tasks = select_tasks(build_tasks(sorted(set(args.hubs))), phases)
+    dry_run = not args.execute
+
+    orchestrator = MigrationOrchestrator(
+        tasks,
+        dry_run=dry_run,
+        workers=max(1, args.workers),
+        state_file=args.state_file,
+        log_dir=args.log_dir,
+        resume=args.resume
+    )
+
+    if args.list:
+        orchestrator.print_plan()
+        return
+
+    logger.info("="*60)
+    logger.info("MIGRATION ORCHESTRATOR")
+    logger.info(f"Mode: {'DRY RUN' if dry_run else 'EXECUTE'}")
+    logger.info(f"Phases: {', '.join(str(p) for p in phases)}")
+    logger.info(f"Workers: {orchestrator.workers}")
+    logger.info("="*60)
+
+    success = orchestrator.run()
+    orchestrator.print_stats()
+
+    if not success:
+        logger.error("\n❌ Migration incomplete - fix the failed tasks and re-run with --resume")
+        sys.exit(1)
+
+    if dry_run:
+        logger.info("\n✅ Dry run complete - no data was written")
+    else:
+        logger.info("\n✅ Migration complete - all tasks finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,707 @@
+#!/usr/bin/env python3
+"""
+Incremental Sync: PostgreSQL -> Neo4j / Qdrant
+Purpose: Propagate only rows changed since the last run instead of re-loading everything
+Run after: Phase 2 (02_load_nodes.py, 03_create_relationships.py) and Phase 3 initial loads
+
+Change capture uses the updated_at column that every hub3_origin table already
+maintains through its update_updated_at_column() trigger. Each source keeps a
+(updated_at, primary key) watermark in the sync_watermarks table and changed
+rows are read in keyset order, so a run costs O(changed rows), not O(table).
+
+Bi-temporal closes become expirations rather than deletes: when a row gets
+valid_to set, the node keeps its history with t.valid_to set, its open edges
+get r.valid_to set, and its Qdrant payload is stamped with valid_to. A driver
+reassignment expires the old ASSIGNED_TO edge and opens a new one.
+
+Rows are only read up to NOW() - SYNC_LAG_SECONDS: updated_at is the writer's
+transaction start time, so a transaction still in flight can commit rows older
+than the newest visible updated_at. Hard deletes are not captured (rows are
+closed with valid_to, never deleted); validation/test_cross_db_sync.py catches drift.
+
+With --invalidate-cache every applied batch also drops cached query results
+that contain the changed entities (migration/phase4_redis/semantic_cache.py).
+
+Usage:
+    python incremental_sync.py --all --dry-run
+    python incremental_sync.py --all --execute
+    python incremental_sync.py --source drivers --execute
+    python incremental_sync.py --all --execute --interval 60
+    python incremental_sync.py --all --execute --interval 60 --invalidate-cache
+    python incremental_sync.py --status
+    python incremental_sync.py --source tractors --reset --execute
+"""
+
+import os
+import sys
+import time
+import logging
+import psycopg2
+from neo4j import GraphDatabase
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Filter, FieldCondition, MatchValue, SetPayload, SetPayloadOperation
+)
+from typing import Dict, List, Any, Tuple
+from datetime import date, datetime
+from decimal import Decimal
+from dotenv import load_dotenv
+import argparse
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Database configuration
+PG_CONFIG = {
+    'host': os.getenv('POSTGRES_HOST', 'localhost'),
+    'port': os.getenv('POSTGRES_PORT', '5432'),
+    'database': os.getenv('POSTGRES_DB', 'apex_memory'),
+    'user': os.getenv('POSTGRES_USER', 'apex'),
+    'password': os.getenv('POSTGRES_PASSWORD', 'apexmemory2024')
+}
+
+NEO4J_CONFIG = {
+    'uri': os.getenv('NEO4J_URI', 'bolt://localhost:7687'),
+    'user': os.getenv('NEO4J_USER', 'neo4j'),
+    'password': os.getenv('NEO4J_PASSWORD', 'apexmemory2024')
+}
+
+QDRANT_CONFIG = {
+    'host': os.getenv('QDRANT_HOST', 'localhost'),
+    'port': int(os.getenv('QDRANT_PORT', '6333')),
+    'grpc_port': int(os.getenv('QDRANT_GRPC_PORT', '6334')),
+}
+
+REDIS_CONFIG = {
+    'host': os.getenv('REDIS_HOST', 'localhost'),
+    'port': int(os.getenv('REDIS_PORT', '6379')),
+    'db': int(os.getenv('REDIS_DB', '0')),
+    'password': os.getenv('REDIS_PASSWORD', None),
+    'decode_responses': True
+}
+
+SEMANTIC_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'migration', 'phase4_redis')
+
+# Rows per keyset batch (one Neo4j UNWIND + one Qdrant request per batch)
+BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE', '500'))
+
+# Only read rows older than this, so in-flight transactions are not skipped
+SYNC_LAG_SECONDS = int(os.getenv('SYNC_LAG_SECONDS', '30'))
+
+EPOCH = datetime(1970, 1, 1).isoformat() + '+00:00'
+
+
+# ====================
+# Cypher statements (all take $rows and run as one UNWIND per batch)
+# ====================
+
+TRACTOR_MERGE = """
+UNWIND $rows AS row
+MERGE (t:Tractor {unit_number: row.unit_number})
+SET t.vin = row.vin,
+    t.make = row.make,
+    t.model = row.model,
+    t.year = row.year,
+    t.status = row.status,
+    t.current_miles = row.current_miles,
+    t.engine_hours = row.engine_hours,
+    t.location_lat = row.lat,
+    t.location_lon = row.lon,
+    t.purchase_date = date(row.purchase_date),
+    t.purchase_price = row.purchase_price,
+    t.current_value = row.current_value,
+    t.financing_status = row.financing_status,
+    t.lender_name = row.lender_name,
+    t.loan_balance = row.loan_balance,
+    t.insurance_policy_number = row.insurance_policy_number,
+    t.insurance_provider = row.insurance_provider,
+    t.insurance_expiry_date = date(row.insurance_expiry_date),
+    t.created_at = datetime(row.created_at),
+    t.updated_at = datetime(row.updated_at),
+    t.valid_from = datetime(row.valid_from),
+    t.valid_to = datetime(row.valid_to)
+"""
+
+DRIVER_MERGE = """
+UNWIND $rows AS row
+MERGE (d:Driver {driver_id: row.driver_id})
+SET d.name = row.name,
+    d.cdl_number = row.cdl_number,
+    d.cdl_state = row.cdl_state,
+    d.cdl_expiry_date = date(row.cdl_expiry_date),
+    d.phone = row.phone,
+    d.email = row.email,
+    d.status = row.status,
+    d.current_unit_assignment = row.current_unit_assignment,
+    d.hire_date = date(row.hire_date),
+    d.employment_type = row.employment_type,
+    d.pay_rate = row.pay_rate,
+    d.pay_type = row.pay_type,
+    d.created_at = datetime(row.created_at),
+    d.updated_at = datetime(row.updated_at),
+    d.valid_from = datetime(row.valid_from),
+    d.valid_to = datetime(row.valid_to)
+"""
+
+# Closed entities: expire every open edge touching the node
+EXPIRE_EDGES = """
+UNWIND $rows AS row
+WITH row WHERE row.valid_to IS NOT NULL
+MATCH (n:{label} {{{key}: row.{key}}})-[r]-()
+WHERE r.valid_to IS NULL
+SET r.valid_to = datetime(row.valid_to)
+"""
+
+# Reassigned or unassigned drivers: expire the open edge to the old tractor
+EXPIRE_STALE_ASSIGNMENTS = """
+UNWIND $rows AS row
+MATCH (d:Driver {driver_id: row.driver_id})-[r:ASSIGNED_TO]->(t:Tractor)
+WHERE r.valid_to IS NULL
+  AND (row.current_unit_assignment IS NULL OR t.unit_number <> row.current_unit_assignment)
+SET r.valid_to = datetime(coalesce(row.valid_to, row.updated_at))
+"""
+
+# Open a new ASSIGNED_TO interval unless the current one already points there
+OPEN_ASSIGNMENTS = """
+UNWIND $rows AS row
+WITH row WHERE row.valid_to IS NULL AND row.current_unit_assignment IS NOT NULL
+MATCH (d:Driver {driver_id: row.driver_id})
+MATCH (t:Tractor {unit_number: row.current_unit_assignment})
+OPTIONAL MATCH (d)-[open:ASSIGNED_TO]->(t) WHERE open.valid_to IS NULL
+WITH d, t, row, open WHERE open IS NULL
+CREATE (d)-[r:ASSIGNED_TO]->(t)
+SET r.assigned_date = date(row.hire_date),
+    r.created_at = datetime(row.updated_at),
+    r.valid_from = datetime(row.updated_at)
+"""
+
+# Event tables have no valid_to; a changed reference is a correction, so the
+# edge to the old target is replaced rather than expired
+FUEL_RELATIONSHIPS = """
+UNWIND $rows AS row
+MATCH (f:FuelTransaction {transaction_id: row.transaction_id})
+OPTIONAL MATCH (f)-[stale:FOR_UNIT|BY_DRIVER]->(old)
+WHERE (type(stale) = 'FOR_UNIT' AND old.unit_number <> row.unit_number)
+   OR (type(stale) = 'BY_DRIVER' AND (row.driver_id IS NULL OR old.driver_id <> row.driver_id))
+DELETE stale
+WITH DISTINCT f, row
+MATCH (t:Tractor {unit_number: row.unit_number})
+MERGE (f)-[r:FOR_UNIT]->(t)
+SET r.transaction_date = datetime(row.transaction_date),
+    r.created_at = datetime(row.created_at)
+WITH f, row WHERE row.driver_id IS NOT NULL
+MATCH (d:Driver {driver_id: row.driver_id})
+MERGE (f)-[r:BY_DRIVER]->(d)
+SET r.transaction_date = datetime(row.transaction_date),
+    r.created_at = datetime(row.created_at)
+"""
+
+MAINTENANCE_RELATIONSHIPS = """
+UNWIND $rows AS row
+MATCH (m:MaintenanceRecord {maintenance_id: row.maintenance_id})
+OPTIONAL MATCH (m)-[stale:FOR_UNIT]->(old:Tractor)
+WHERE old.unit_number <> row.unit_number
+DELETE stale
+WITH DISTINCT m, row
+MATCH (t:Tractor {unit_number: row.unit_number})
+MERGE (m)-[r:FOR_UNIT]->(t)
+SET r.maintenance_date = date(row.maintenance_date),
+    r.created_at = datetime(row.created_at)
+"""
+
+INCIDENT_RELATIONSHIPS = """
+UNWIND $rows AS row
+MATCH (i:Incident {incident_id: row.incident_id})
+OPTIONAL MATCH (i)-[stale:INVOLVES_UNIT|INVOLVES_DRIVER]->(old)
+WHERE (type(stale) = 'INVOLVES_UNIT' AND (row.unit_number IS NULL OR old.unit_number <> row.unit_number))
+   OR (type(stale) = 'INVOLVES_DRIVER' AND (row.driver_id IS NULL OR old.driver_id <> row.driver_id))
+DELETE stale
+WITH DISTINCT i, row
+CALL {
+    WITH i, row
+    WITH i, row WHERE row.unit_number IS NOT NULL
+    MATCH (t:Tractor {unit_number: row.unit_number})
+    MERGE (i)-[r:INVOLVES_UNIT]->(t)
+    SET r.incident_date = datetime(row.incident_date),
+        r.created_at = datetime(row.created_at)
+}
+CALL {
+    WITH i, row
+    WITH i, row WHERE row.driver_id IS NOT NULL
+    MATCH (d:Driver {driver_id: row.driver_id})
+    MERGE (i)-[r:INVOLVES_DRIVER]->(d)
+    SET r.incident_date = datetime(row.incident_date),
+        r.created_at = datetime(row.created_at)
+}
+"""
+
+
+# ====================
+# Sync sources
+# ====================
+# columns:     SELECT list (must include updated_at and the key column)
+# cypher:      statements run in order for each batch
+# entity_type: entity_embeddings payload type to refresh (None = graph only)
+# cache_keys:  columns holding entity ids whose cached query results go stale
+
+SYNC_SOURCES = {
+    'tractors': {
+        'table': 'hub3_origin.tractors',
+        'key': 'unit_number',
+        'columns': """
+            unit_number, vin, make, model, year, status,
+            current_miles, engine_hours,
+            ST_Y(location_gps::geometry) as lat,
+            ST_X(location_gps::geometry) as lon,
+            purchase_date, purchase_price, current_value,
+            financing_status, lender_name, loan_balance,
+            insurance_policy_number, insurance_provider, insurance_expiry_date,
+            created_at, updated_at, valid_from, valid_to,
+            make || ' ' || model as entity_name
+        """,
+        'cypher': [TRACTOR_MERGE, EXPIRE_EDGES.format(label='Tractor', key='unit_number')],
+        'entity_type': 'tractor',
+        'cache_keys': ['unit_number'],
+    },
+    'drivers': {
+        'table': 'hub3_origin.drivers',
+        'key': 'driver_id',
+        'columns': """
+            driver_id, name, cdl_number, cdl_state, cdl_expiry_date,
+            phone, email, status, current_unit_assignment,
+            hire_date, employment_type, pay_rate, pay_type,
+            created_at, updated_at, valid_from, valid_to,
+            name as entity_name
+        """,
+        'cypher': [DRIVER_MERGE, EXPIRE_STALE_ASSIGNMENTS, OPEN_ASSIGNMENTS,
+                   EXPIRE_EDGES.format(label='Driver', key='driver_id')],
+        'entity_type': 'driver',
+        'cache_keys': ['driver_id', 'current_unit_assignment'],
+    },
+    'fuel_transactions': {
+        'table': 'hub3_origin.fuel_transactions',
+        'key': 'transaction_id',
+        'columns': """
+            transaction_id::text as transaction_id, unit_number, driver_id,
+            transaction_date, created_at, updated_at
+        """,
+        'cypher': [FUEL_RELATIONSHIPS],
+        'entity_type': None,
+        'cache_keys': ['unit_number', 'driver_id'],
+    },
+    'maintenance_records': {
+        'table': 'hub3_origin.maintenance_records',
+        'key': 'maintenance_id',
+        'columns': """
+            maintenance_id::text as maintenance_id, unit_number,
+            maintenance_date, created_at, updated_at
+        """,
+        'cypher': [MAINTENANCE_RELATIONSHIPS],
+        'entity_type': None,
+        'cache_keys': ['unit_number'],
+    },
+    'incidents': {
+        'table': 'hub3_origin.incidents',
+        'key': 'incident_id',
+        'columns': """
+            incident_id::text as incident_id, unit_number, driver_id,
+            incident_date, created_at, updated_at
+        """,
+        'cypher': [INCIDENT_RELATIONSHIPS],
+        'entity_type': None,
+        'cache_keys': ['unit_number', 'driver_id'],
+    },
+}
+
+
+def to_param(value: Any) -> Any:
+    """Convert a PostgreSQL value to a Neo4j/Qdrant parameter"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+class IncrementalSync:
+    """Watermark-based incremental sync from PostgreSQL to Neo4j and Qdrant"""
+
+    def __init__(self, dry_run: bool = True, batch_size: int = BATCH_SIZE,
+                 invalidate_cache: bool = False):
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.invalidate_cache = invalidate_cache
+        self.pg_conn = None
+        self.neo4j_driver = None
+        self.qdrant_client = None
+        self.query_cache = None
+        self.stats = {
+            'changed': 0,
+            'closed': 0,
+            'payloads': 0,
+            'invalidated': 0,
+            'batches': 0,
+            'errors': 0
+        }
+
+    def connect(self, targets: bool = True):
+        """Connect to PostgreSQL and (unless only reading watermarks) Neo4j and Qdrant"""
+        try:
+            # Connect to PostgreSQL
+            self.pg_conn = psycopg2.connect(**PG_CONFIG)
+            logger.info(f"✅ Connected to PostgreSQL: {PG_CONFIG['database']}")
+
+            if not targets:
+                return
+
+            # Connect to Neo4j
+            self.neo4j_driver = GraphDatabase.driver(
+                NEO4J_CONFIG['uri'],
+                auth=(NEO4J_CONFIG['user'], NEO4J_CONFIG['password'])
+            )
+            logger.info(f"✅ Connected to Neo4j: {NEO4J_CONFIG['uri']}")
+
+            # Connect to Qdrant
+            self.qdrant_client = QdrantClient(
+                host=QDRANT_CONFIG['host'],
+                port=QDRANT_CONFIG['port'],
+                grpc_port=QDRANT_CONFIG['grpc_port'],
+                prefer_grpc=True
+            )
+            logger.info(f"✅ Connected to Qdrant: {QDRANT_CONFIG['host']}:{QDRANT_CONFIG['port']}")
+
+            if self.invalidate_cache:
+                import redis
+                sys.path.insert(0, SEMANTIC_CACHE_DIR)
+                from cache_client import CacheClient
+                from semantic_cache import SemanticQueryCache
+
+                # CacheClient reads raw bytes
+                redis_client = redis.Redis(**{**REDIS_CONFIG, 'decode_responses': False})
+                redis_client.ping()
+                self.query_cache = SemanticQueryCache(CacheClient(redis_client), self.qdrant_client)
+                logger.info(f"✅ Connected to Redis: {REDIS_CONFIG['host']}:{REDIS_CONFIG['port']} (query cache invalidation)")
+
+        except Exception as e:
+            logger.error(f"❌ Connection failed: {e}")
+            sys.exit(1)
+
+    def disconnect(self):
+        """Close connections"""
+        if self.pg_conn:
+            self.pg_conn.close()
+        if self.neo4j_driver:
+            self.neo4j_driver.close()
+        if self.qdrant_client:
+            self.qdrant_client.close()
+        if self.query_cache:
+            self.query_cache.cache.close()
+
+    def ensure_change_capture(self):
+        """Create the watermark table and the updated_at indexes used for change reads"""
+        if self.dry_run:
+            logger.info("🔍 DRY RUN: Would ensure sync_watermarks table and updated_at indexes")
+            return
+
+        with self.pg_conn.cursor() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS sync_watermarks (
+                    source_name VARCHAR(100) PRIMARY KEY,
+                    last_updated_at TIMESTAMPTZ NOT NULL,
+                    last_key TEXT NOT NULL,
+                    rows_synced BIGINT NOT NULL DEFAULT 0,
+                    synced_at TIMESTAMPTZ DEFAULT NOW()
+                )
+            """)
+            for source in SYNC_SOURCES.values():
+                table = source['table'].split('.')[1]
+                cur.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{table}_updated_at
+                    ON {source['table']}(updated_at)
+                """)
+        self.pg_conn.commit()
+
+    def get_watermark(self, source_name: str) -> Tuple[str, str]:
+        """Return the (updated_at, key) position synced so far (epoch if never synced)"""
+        with self.pg_conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('sync_watermarks')")
+            if cur.fetchone()[0] is None:
+                return EPOCH, ''
+            cur.execute("""
+                SELECT last_updated_at, last_key FROM sync_watermarks
+                WHERE source_name = %s
+            """, (source_name,))
+            row = cur.fetchone()
+        return (row[0].isoformat(), row[1]) if row else (EPOCH, '')
+
+    def save_watermark(self, source_name: str, updated_at: str, key: str, rows: int):
+        """Advance the watermark after a batch reached every target"""
+        with self.pg_conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO sync_watermarks (source_name, last_updated_at, last_key, rows_synced)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (source_name)
+                DO UPDATE SET
+                    last_updated_at = EXCLUDED.last_updated_at,
+                    last_key = EXCLUDED.last_key,
+                    rows_synced = sync_watermarks.rows_synced + EXCLUDED.rows_synced,
+                    synced_at = NOW()
+            """, (source_name, updated_at, key, rows))
+        self.pg_conn.commit()
+
+    def reset_watermark(self, source_name: str):
+        """Forget a source's watermark so the next run re-syncs the whole table"""
+        if self.dry_run:
+            logger.info(f"🔍 DRY RUN: Would reset watermark for {source_name}")
+            return
+        with self.pg_conn.cursor() as cur:
+            cur.execute("DELETE FROM sync_watermarks WHERE source_name = %s", (source_name,))
+        self.pg_conn.commit()
+        logger.info(f"✅ Reset watermark for {source_name}")
+
+    def fetch_changes(self, source: Dict, since: Tuple[str, str]) -> List[Dict[str, Any]]:
+        """Read the next keyset batch of rows changed after the watermark"""
+        with self.pg_conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT {source['columns']}
+                FROM {source['table']}
+                WHERE (updated_at, {source['key']}::text) > (%s::timestamptz, %s)
+                AND updated_at <= NOW() - make_interval(secs => %s)
+                ORDER BY updated_at, {source['key']}::text
+                LIMIT %s
+            """, (since[0], since[1], SYNC_LAG_SECONDS, self.batch_size))
+            names = [col[0] for col in cur.description]
+            return [
+                {name: to_param(value) for name, value in zip(names, row)}
+                for row in cur.fetchall()
+            ]
+
+    def count_changes(self, source: Dict, since: Tuple[str, str]) -> Tuple[int, int]:
+        """Count changed rows (and how many of them are closed) since the watermark"""
+        closed = "count(*) FILTER (WHERE valid_to IS NOT NULL)" if source['entity_type'] else "0"
+        with self.pg_conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT count(*), {closed}
+                FROM {source['table']}
+                WHERE (updated_at, {source['key']}::text) > (%s::timestamptz, %s)
+                AND updated_at <= NOW() - make_interval(secs => %s)
+            """, (since[0], since[1], SYNC_LAG_SECONDS))
+            return cur.fetchone()
+
+    def apply_graph(self, source: Dict, rows: List[Dict[str, Any]]):
+        """Apply a batch to Neo4j in one transaction"""
+        def work(tx):
+            for statement in source['cypher']:
+                tx.run(statement, rows=rows).consume()
+
+        with self.neo4j_driver.session() as session:
+            session.execute_write(work)
+
+    def apply_vectors(self, source: Dict, rows: List[Dict[str, Any]]):
+        """Refresh entity_embeddings payloads in place (vectors are re-embedded separately)"""
+        if not source['entity_type']:
+            return
+
+        operations = []
+        for row in rows:
+            entity_id = row[source['key']]
+            operations.append(SetPayloadOperation(set_payload=SetPayload(
+                payload={
+                    'entity_name': row['entity_name'],
+                    'properties': row['status'],
+                    'updated_at': row['updated_at'],
+                    'valid_to': row['valid_to']
+                },
+                filter=Filter(must=[
+                    FieldCondition(key='entity_type', match=MatchValue(value=source['entity_type'])),
+                    FieldCondition(key='entity_id', match=MatchValue(value=entity_id))
+                ])
+            )))
+
+        self.qdrant_client.batch_update_points(
+            collection_name='entity_embeddings',
+            update_operations=operations
+        )
+        self.stats['payloads'] += len(operations)
+
+    def invalidate_cached_queries(self, source: Dict, rows: List[Dict[str, Any]]):
+        """Drop cached query results that contain the batch's entities"""
+        if not self.query_cache:
+            return
+        entity_ids = {row[column] for row in rows for column in source['cache_keys'] if row.get(column)}
+        self.stats['invalidated'] += self.query_cache.invalidate_entities(entity_ids)
+
+    def sync_source(self, source_name: str) -> int:
+        """Sync one source from its watermark to NOW() - SYNC_LAG_SECONDS"""
+        source = SYNC_SOURCES[source_name]
+        watermark = self.get_watermark(source_name)
+        logger.info(f"🔄 Syncing {source_name} (watermark: {watermark[0]})...")
+
+        if self.dry_run:
+            changed, closed = self.count_changes(source, watermark)
+            logger.info(f"🔍 DRY RUN: Would sync {changed} changed {source_name} ({closed} closed)")
+            self.stats['changed'] += changed
+            self.stats['closed'] += closed
+            return changed
+
+        synced = 0
+        while True:
+            rows = self.fetch_changes(source, watermark)
+            if not rows:
+                break
+
+            try:
+                self.apply_graph(source, rows)
+                self.apply_vectors(source, rows)
+                self.invalidate_cached_queries(source, rows)
+            except Exception as e:
+                # Watermark stays put, so the batch is retried on the next run
+                logger.error(f"❌ Error syncing {source_name} batch after {watermark[0]}: {e}")
+                self.stats['errors'] += 1
+                break
+
+            last = rows[-1]
+            watermark = (last['updated_at'], str(last[source['key']]))
+            self.save_watermark(source_name, watermark[0], watermark[1], len(rows))
+
+            synced += len(rows)
+            self.stats['changed'] += len(rows)
+            self.stats['closed'] += sum(1 for row in rows if row.get('valid_to'))
+            self.stats['batches'] += 1
+
+            if len(rows) < self.batch_size:
+                break
+
+        logger.info(f"✅ Synced {synced} changed {source_name}")
+        return synced
+
+    def sync_all(self, source_names: List[str]):
+        """Sync sources in dependency order (nodes before edges that reference them)"""
+        for source_name in SYNC_SOURCES:
+            if source_name in source_names:
+                self.sync_source(source_name)
+
+    def show_status(self):
+        """Show each source's watermark and pending change count"""
+        logger.info("\n" + "="*60)
+        logger.info("SYNC STATUS")
+        logger.info("="*60)
+
+        for source_name, source in SYNC_SOURCES.items():
+            watermark = self.get_watermark(source_name)
+            pending, closed = self.count_changes(source, watermark)
+            synced_to = 'never' if watermark[0] == EPOCH else watermark[0]
+            logger.info(f"{source_name:<20} synced to {synced_to:<34} pending: {pending} ({closed} closed)")
+
+        logger.info("="*60)
+
+    def print_stats(self):
+        """Print sync statistics"""
+        logger.info("\n" + "="*60)
+        logger.info("INCREMENTAL SYNC STATISTICS")
+        logger.info("="*60)
+        logger.info(f"Changed rows:     {self.stats['changed']}")
+        logger.info(f"Closed (expired): {self.stats['closed']}")
+        logger.info(f"Payload updates:  {self.stats['payloads']}")
+        logger.info(f"Cache entries invalidated: {self.stats['invalidated']}")
+        logger.info(f"Batches:          {self.stats['batches']}")
+        logger.info(f"Errors:           {self.stats['errors']}")
+        logger.info("="*60)
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description='Incrementally sync PostgreSQL changes to Neo4j and Qdrant')
+    parser.add_argument('--source', type=str, action='append', choices=list(SYNC_SOURCES),
+                        help='Source to sync (repeatable)')
+    parser.add_argument('--all', action='store_true',
+                        help='Sync all sources')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Count pending changes without writing')
+    parser.add_argument('--execute', action='store_true',
+                        help='Apply pending changes to Neo4j and Qdrant')
+    parser.add_argument('--status', action='store_true',
+                        help='Show watermarks and pending changes')
+    parser.add_argument('--reset', action='store_true',
+                        help='Reset watermarks of the selected sources (forces a full re-sync)')
+    parser.add_argument('--interval', type=int, default=0,
+                        help='Keep running, syncing every N seconds')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f'Rows per batch (default: {BATCH_SIZE})')
+    parser.add_argument('--invalidate-cache', action='store_true',
+                        help='Drop cached query results (Redis + Qdrant query_cache) for changed entities')
+
+    args = parser.parse_args()
+
+    if not args.dry_run and not args.execute and not args.status:
+        logger.error("❌ Must specify either --dry-run, --execute, or --status")
+        sys.exit(1)
+
+    if not args.source and not args.all and not args.status:
+        logger.error("❌ Must specify either --source, --all, or --status")
+        sys.exit(1)
+
+    dry_run = args.dry_run or not args.execute
+    source_names = list(SYNC_SOURCES) if args.all else (args.source or [])
+
+    logger.info("="*60)
+    logger.info("INCREMENTAL SYNC")
+    logger.info(f"Mode: {'STATUS' if args.status else 'DRY RUN' if dry_run else 'EXECUTE'}")
+    logger.info(f"Batch size: {args.batch_size}, lag: {SYNC_LAG_SECONDS}s")
+    logger.info("="*60)
+
+    syncer = IncrementalSync(dry_run=dry_run, batch_size=args.batch_size,
+                             invalidate_cache=args.invalidate_cache)
+
+    try:
+        syncer.connect(targets=not (args.status or dry_run))
+
+        if args.status:
+            syncer.show_status()
+            return
+
+        syncer.ensure_change_capture()
+
+        if args.reset:
+            for source_name in source_names:
+                syncer.reset_watermark(source_name)
+
+        while True:
+            syncer.sync_all(source_names)
+            if not args.interval:
+                break
+            logger.info(f"⏳ Next sync in {args.interval}s")
+            time.sleep(args.interval)
+
+        syncer.print_stats()
+
+        if dry_run:
+            logger.info("\n✅ Dry run complete - no data was written")
+        else:
+            logger.info("\n✅ Incremental sync complete")
+
+    except KeyboardInterrupt:
+        syncer.print_stats()
+        logger.info("\n⚠️  Sync interrupted")
+
+    except Exception as e:
+        logger.error(f"❌ Incremental sync failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+    finally:
+        syncer.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+Validation: Hash-Based Cross-Database Consistency Check
+Purpose: Detect drift between PostgreSQL (PRIMARY) and Neo4j / Qdrant (REPLICAS) at scale
+Run after: Phase 2 and Phase 3 migrations (or any time as a scheduled job)
+
+Every current entity is assigned to a bucket by the first characters of
+md5(primary key). Each store is streamed once and folded into per-bucket
+digests of (count, sum of row hashes mod 2^64, xor of row hashes), which do
+not depend on row order. Only buckets whose digests differ are drilled into
+key by key, so a clean run reads each store once and compares a few thousand
+numbers instead of millions of rows.
+
+With --sample N only N random buckets are checked: PostgreSQL filters them
+server-side and the replica is probed by key, so the cost is proportional to
+the sample. Replica-only rows are then caught by the total count comparison.
+
+Row hashes and digests are computed here, not inside each store. Qdrant has
+no server-side aggregation, core Cypher has no hash function (only APOC
+does), and reproducing canonical() identically in SQL, Cypher and Python
+is brittle: one formatting difference reports every row as drift. The cost
+is transfer. A full check streams each store's keys plus the compared
+fields once (no vectors), about 50-150 bytes per row, or roughly 0.1 GB
+per store per million entities, at FETCH_SIZE rows per round trip. Use
+--sample to bound it.
+
+Usage:
+    python consistency_check.py --all
+    python consistency_check.py --entity tractors --target neo4j
+    python consistency_check.py --all --sample 64 --report reports/consistency.json
+    python consistency_check.py --all --interval 3600 --report reports/consistency.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import logging
+import psycopg2
+from neo4j import GraphDatabase
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Filter, FieldCondition, MatchValue, MatchAny, IsEmptyCondition, PayloadField
+)
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from dotenv import load_dotenv
+import argparse
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Database configurations
+PG_CONFIG = {
+    'host': os.getenv('POSTGRES_HOST', 'localhost'),
+    'port': os.getenv('POSTGRES_PORT', '5432'),
+    'database': os.getenv('POSTGRES_DB', 'apex_memory'),
+    'user': os.getenv('POSTGRES_USER', 'apex'),
+    'password': os.getenv('POSTGRES_PASSWORD', 'apexmemory2024')
+}
+
+NEO4J_CONFIG = {
+    'uri': os.getenv('NEO4J_URI', 'bolt://localhost:7687'),
+    'user': os.getenv('NEO4J_USER', 'neo4j'),
+    'password': os.getenv('NEO4J_PASSWORD', 'apexmemory2024')
+}
+
+QDRANT_CONFIG = {
+    'host': os.getenv('QDRANT_HOST', 'localhost'),
+    'port': int(os.getenv('QDRANT_PORT', '6333')),
+    'grpc_port': int(os.getenv('QDRANT_GRPC_PORT', '6334')),
+}
+
+# Hex characters of md5(key) used as the bucket id (2 -> 256 buckets, 3 -> 4096)
+DEFAULT_PREFIX_LEN = 2
+
+# Rows fetched per round trip while streaming
+FETCH_SIZE = 10000
+
+# Keys listed per problem type in the report
+REPORT_KEY_LIMIT = 50
+
+MASK64 = (1 << 64) - 1
+
+# Entities to check
+# graph_fields:  PostgreSQL columns mirrored as same-named Neo4j node properties
+# vector_fields: Qdrant entity_embeddings payload field -> PostgreSQL expression
+CHECKS = {
+    'tractors': {
+        'table': 'hub3_origin.tractors',
+        'key': 'unit_number',
+        'label': 'Tractor',
+        'entity_type': 'tractor',
+        'graph_fields': ['vin', 'make', 'model', 'year', 'status', 'current_miles',
+                         'purchase_date', 'insurance_expiry_date', 'valid_from'],
+        'vector_fields': {'entity_name': "make || ' ' || model", 'properties': 'status'},
+    },
+    'drivers': {
+        'table': 'hub3_origin.drivers',
+        'key': 'driver_id',
+        'label': 'Driver',
+        'entity_type': 'driver',
+        'graph_fields': ['name', 'cdl_number', 'cdl_state', 'status',
+                         'current_unit_assignment', 'hire_date', 'valid_from'],
+        'vector_fields': {'entity_name': 'name', 'properties': 'status'},
+    },
+}
+
+TARGETS = ['neo4j', 'qdrant']
+
+
+# ====================
+# Hashing
+# ====================
+
+def canonical(value: Any) -> str:
+    """
+    Format a value identically regardless of which store returned it
+    (Decimal vs float, neo4j.time vs datetime, local vs UTC offsets)
+    """
+    if value is None:
+        return ''
+    if hasattr(value, 'to_native'):
+        value = value.to_native()
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat(timespec='microseconds')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (int, float, Decimal)):
+        return f"{float(value):.6f}"
+    return str(value)
+
+
+def row_hash(key: Any, values: Iterable[Any]) -> int:
+    """64-bit hash of a row's key and canonical field values"""
+    text = '\x1f'.join([canonical(key)] + [canonical(v) for v in values])
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def bucket_of(key: Any, prefix_len: int) -> str:
+    """Bucket id; matches left(md5(key::text), prefix_len) in PostgreSQL"""
+    return hashlib.md5(str(key).encode('utf-8')).hexdigest()[:prefix_len]
+
+
+def build_digests(rows: Iterable[Tuple[Any, int]], prefix_len: int) -> Dict[str, List[int]]:
+    """Fold (key, row_hash) pairs into order-independent [count, sum, xor] digests per bucket"""
+    digests: Dict[str, List[int]] = {}
+    for key, h in rows:
+        digest = digests.setdefault(bucket_of(key, prefix_len), [0, 0, 0])
+        digest[0] += 1
+        digest[1] = (digest[1] + h) & MASK64
+        digest[2] ^= h
+    return digests
+
+
+# ====================
+# Store readers (each yields (key, row_hash))
+# ====================
+
+class PostgresReader:
+    """Stream current rows from PostgreSQL with a server-side cursor"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def stream(self, check: Dict, expressions: List[str], prefix_len: int = 0,
+               buckets: Optional[List[str]] = None) -> Iterator[Tuple[Any, int]]:
+        where = "valid_to IS NULL"
+        params: List[Any] = []
+        if buckets is not None:
+            where += f" AND left(md5({check['key']}::text), {int(prefix_len)}) = ANY(%s)"
+            params.append(list(buckets))
+
+        try:
+            with self.conn.cursor(name=f"consistency_{check['label'].lower()}") as cur:
+                cur.itersize = FETCH_SIZE
+                cur.execute(f"""
+                    SELECT {check['key']}, {', '.join(expressions)}
+                    FROM {check['table']}
+                    WHERE {where}
+                """, params)
+                for row in cur:
+                    yield row[0], row_hash(row[0], row[1:])
+        finally:
+            # Read-only; end the transaction the named cursor opened
+            self.conn.rollback()
+
+
+class Neo4jReader:
+    """Stream current nodes (valid_to IS NULL) from Neo4j"""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def _query(self, check: Dict, fields: List[str], where: str) -> str:
+        values = ', '.join(f"n.{field}" for field in fields)
+        return f"""
+            MATCH (n:{check['label']})
+            WHERE n.valid_to IS NULL {where}
+            RETURN n.{check['key']} AS key, [{values}] AS vals
+        """
+
+    def stream(self, check: Dict, fields: List[str]) -> Iterator[Tuple[Any, int]]:
+        with self.driver.session(fetch_size=FETCH_SIZE) as session:
+            for record in session.run(self._query(check, fields, '')):
+                yield record['key'], row_hash(record['key'], record['vals'])
+
+    def fetch(self, check: Dict, fields: List[str], keys: List[Any]) -> Dict[Any, int]:
+        query = self._query(check, fields, f"AND n.{check['key']} IN $keys")
+        with self.driver.session() as session:
+            return {
+                record['key']: row_hash(record['key'], record['vals'])
+                for record in session.run(query, keys=keys)
+            }
+
+    def count(self, check: Dict) -> int:
+        with self.driver.session() as session:
+            result = session.run(
+                f"MATCH (n:{check['label']}) WHERE n.valid_to IS NULL RETURN count(n) AS count"
+            )
+            return result.single()['count']
+
+
+class QdrantReader:
+    """Stream current entity payloads (no vectors) from the entity_embeddings collection"""
+
+    collection = 'entity_embeddings'
+
+    def __init__(self, client):
+        self.client = client
+
+    def _filter(self, check: Dict, keys: Optional[List[Any]] = None) -> Filter:
+        must = [FieldCondition(key='entity_type', match=MatchValue(value=check['entity_type'])),
+                IsEmptyCondition(is_empty=PayloadField(key='valid_to'))]
+        if keys is not None:
+            must.append(FieldCondition(key='entity_id', match=MatchAny(any=[str(k) for k in keys])))
+        return Filter(must=must)
+
+    def _scroll(self, check: Dict, fields: List[str], keys: Optional[List[Any]] = None):
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection,
+                scroll_filter=self._filter(check, keys),
+                limit=FETCH_SIZE,
+                offset=offset,
+                with_payload=['entity_id'] + fields,
+                with_vectors=False
+            )
+            for point in points:
+                key = point.payload.get('entity_id')
+                yield key, row_hash(key, [point.payload.get(field) for field in fields])
+            if offset is None:
+                break
+
+    def stream(self, check: Dict, fields: List[str]) -> Iterator[Tuple[Any, int]]:
+        return self._scroll(check, fields)
+
+    def fetch(self, check: Dict, fields: List[str], keys: List[Any]) -> Dict[Any, int]:
+        return dict(self._scroll(check, fields, keys))
+
+    def count(self, check: Dict) -> int:
+        return self.client.count(
+            collection_name=self.collection,
+            count_filter=self._filter(check),
+            exact=True
+        ).count
+
+
+# ====================
+# Consistency engine
+# ====================
+
+class ConsistencyChecker:
+    """Compare bucket digests between PostgreSQL and each replica, drilling into differences"""
+
+    def __init__(self, pg_conn, neo4j_driver=None, qdrant_client=None,
+                 prefix_len: int = DEFAULT_PREFIX_LEN, sample: int = 0):
+        self.postgres = PostgresReader(pg_conn)
+        self.replicas = {}
+        if neo4j_driver is not None:
+            self.replicas['neo4j'] = Neo4jReader(neo4j_driver)
+        if qdrant_client is not None:
+            self.replicas['qdrant'] = QdrantReader(qdrant_client)
+        self.prefix_len = prefix_len
+        self.sample = sample
+        self.stats = {
+            'checks': 0,
+            'rows_hashed': 0,
+            'buckets_drilled': 0,
+            'inconsistent': 0
+        }
+
+    def _fields(self, check: Dict, target: str) -> Tuple[List[str], List[str]]:
+        """(PostgreSQL expressions, replica field names) compared for a target"""
+        if target == 'neo4j':
+            return check['graph_fields'], check['graph_fields']
+        return list(check['vector_fields'].values()), list(check['vector_fields'])
+
+    def _counted(self, rows: Iterable[Tuple[Any, int]]) -> Iterator[Tuple[Any, int]]:
+        for row in rows:
+            self.stats['rows_hashed'] += 1
+            yield row
+
+    def drill_down(self, check: Dict, target: str, buckets: List[str],
+                   replica_total: Optional[int] = None) -> Dict[str, List[Any]]:
+        """
+        Compare the rows of the given buckets key by key
+        replica_total is the replica's row count in those buckets; when it exceeds
+        the rows found by key lookup, the replica is rescanned for its extra keys.
+        """
+        expressions, fields = self._fields(check, target)
+        replica = self.replicas[target]
+        self.stats['buckets_drilled'] += len(buckets)
+
+        primary = dict(self._counted(
+            self.postgres.stream(check, expressions, self.prefix_len, buckets)))
+        keys = list(primary)
+        found: Dict[Any, int] = {}
+        for i in range(0, len(keys), FETCH_SIZE):
+            found.update(replica.fetch(check, fields, keys[i:i + FETCH_SIZE]))
+
+        extra: List[Any] = []
+        if replica_total is not None and replica_total > len(found):
+            bucket_set = set(buckets)
+            extra = [
+                key for key, _ in self._counted(replica.stream(check, fields))
+                if key not in primary and bucket_of(key, self.prefix_len) in bucket_set
+            ]
+
+        return {
+            'missing': sorted(str(k) for k in keys if k not in found),
+            'extra': sorted(str(k) for k in extra),
+            'mismatched': sorted(str(k) for k in keys if k in found and found[k] != primary[k])
+        }
+
+    def check_entity(self, entity: str, target: str) -> Dict[str, Any]:
+        """Check one entity against one replica and return a report entry"""
+        check = CHECKS[entity]
+        expressions, fields = self._fields(check, target)
+        replica = self.replicas[target]
+        started = time.time()
+        logger.info(f"🔄 Checking {entity} → {target}...")
+
+        if self.sample:
+            all_buckets = [format(i, f'0{self.prefix_len}x') for i in range(16 ** self.prefix_len)]
+            diff_buckets = sorted(random.sample(all_buckets, min(self.sample, len(all_buckets))))
+            problems = self.drill_down(check, target, diff_buckets)
+            with self.postgres.conn.cursor() as cur:
+                cur.execute(f"SELECT count(*) FROM {check['table']} WHERE valid_to IS NULL")
+                pg_count = cur.fetchone()[0]
+            replica_count = replica.count(check)
+            total_buckets = len(all_buckets)
+        else:
+            pg_digests = build_digests(self._counted(self.postgres.stream(check, expressions)),
+                                       self.prefix_len)
+            replica_digests = build_digests(self._counted(replica.stream(check, fields)),
+                                            self.prefix_len)
+            pg_count = sum(d[0] for d in pg_digests.values())
+            replica_count = sum(d[0] for d in replica_digests.values())
+            total_buckets = len(set(pg_digests) | set(replica_digests))
+            diff_buckets = sorted(
+                b for b in set(pg_digests) | set(replica_digests)
+                if pg_digests.get(b) != replica_digests.get(b)
+            )
+            problems = {'missing': [], 'extra': [], 'mismatched': []}
+            if diff_buckets:
+                replica_total = sum(replica_digests.get(b, [0])[0] for b in diff_buckets)
+                problems = self.drill_down(check, target, diff_buckets, replica_total)
+
+        consistent = pg_count == replica_count and not any(problems.values())
+        self.stats['checks'] += 1
+        if not consistent:
+            self.stats['inconsistent'] += 1
+
+        logger.info(
+            f"{'✅' if consistent else '❌'} {entity} → {target}: "
+            f"PostgreSQL={pg_count}, {target}={replica_count}, "
+            f"{len(diff_buckets)}/{total_buckets} buckets {'sampled' if self.sample else 'differ'}, "
+            f"missing={len(problems['missing'])}, extra={len(problems['extra'])}, "
+            f"mismatched={len(problems['mismatched'])}"
+        )
+
+        return {
+            'entity': entity,
+            'target': target,
+            'mode': 'sample' if self.sample else 'full',
+            'consistent': consistent,
+            'postgres_count': pg_count,
+            'replica_count': replica_count,
+            'buckets_total': total_buckets,
+            'buckets_drilled': len(diff_buckets),
+            'missing_count': len(problems['missing']),
+            'extra_count': len(problems['extra']),
+            'mismatched_count': len(problems['mismatched']),
+            'missing': problems['missing'][:REPORT_KEY_LIMIT],
+            'extra': problems['extra'][:REPORT_KEY_LIMIT],
+            'mismatched': problems['mismatched'][:REPORT_KEY_LIMIT],
+            'duration_seconds': round(time.time() - started, 2)
+        }
+
+    def run(self, entities: List[str], targets: List[str]) -> Dict[str, Any]:
+        """Run every entity/target check and build the JSON report"""
+        results = []
+        for entity in entities:
+            for target in targets:
+                if target not in self.replicas:
+                    continue
+                try:
+                    results.append(self.check_entity(entity, target))
+                except Exception as e:
+                    logger.error(f"❌ Error checking {entity} → {target}: {e}")
+                    self.stats['inconsistent'] += 1
+                    results.append({'entity': entity, 'target': target,
+                                    'consistent': False, 'error': str(e)})
+
+        return {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'prefix_len': self.prefix_len,
+            'sample_buckets': self.sample,
+            'consistent': all(result['consistent'] for result in results),
+            'results': results
+        }
+
+    def print_stats(self):
+        """Print check statistics"""
+        logger.info("\n" + "="*60)
+        logger.info("CONSISTENCY CHECK STATISTICS")
+        logger.info("="*60)
+        logger.info(f"Checks:          {self.stats['checks']}")
+        logger.info(f"Rows hashed:     {self.stats['rows_hashed']}")
+        logger.info(f"Buckets drilled: {self.stats['buckets_drilled']}")
+        logger.info(f"Inconsistent:    {self.stats['inconsistent']}")
+        logger.info("="*60)
+
+
+def write_report(report: Dict[str, Any], path: str):
+    """Write the JSON report atomically"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+    logger.info(f"📊 Report written to {path}")
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description='Hash-based PostgreSQL / Neo4j / Qdrant consistency check')
+    parser.add_argument('--entity', type=str, action='append', choices=list(CHECKS),
+                        help='Entity to check (repeatable)')
+    parser.add_argument('--all', action='store_true',
+                        help='Check all entities')
+    parser.add_argument('--target', type=str, action='append', choices=TARGETS,
+                        help='Replica to compare against PostgreSQL (default: all)')
+    parser.add_argument('--prefix-len', type=int, default=DEFAULT_PREFIX_LEN, choices=range(1, 5),
+                        help=f'md5 hex characters per bucket id (default: {DEFAULT_PREFIX_LEN})')
+    parser.add_argument('--sample', type=int, default=0,
+                        help='Check only N random buckets instead of full digests')
+    parser.add_argument('--report', type=str,
+                        help='Write a JSON report to this path')
+    parser.add_argument('--interval', type=int, default=0,
+                        help='Keep running, checking every N seconds')
+
+    args = parser.parse_args()
+
+    if not args.entity and not args.all:
+        logger.error("❌ Must specify either --entity or --all")
+        sys.exit(1)
+
+    entities = list(CHECKS) if args.all else args.entity
+    targets = args.target or TARGETS
+
+    logger.info("="*60)
+    logger.info("CROSS-DATABASE CONSISTENCY CHECK")
+    logger.info(f"Mode: {'SAMPLE (' + str(args.sample) + ' buckets)' if args.sample else 'FULL'}")
+    logger.info(f"Buckets: {16 ** args.prefix_len}")
+    logger.info("="*60)
+
+    pg_conn = neo4j_driver = qdrant_client = None
+    try:
+        pg_conn = psycopg2.connect(**PG_CONFIG)
+        logger.info(f"✅ Connected to PostgreSQL: {PG_CONFIG['database']}")
+        if 'neo4j' in targets:
+            neo4j_driver = GraphDatabase.driver(
+                NEO4J_CONFIG['uri'],
+                auth=(NEO4J_CONFIG['user'], NEO4J_CONFIG['password'])
+            )
+            logger.info(f"✅ Connected to Neo4j: {NEO4J_CONFIG['uri']}")
+        if 'qdrant' in targets:
+            qdrant_client = QdrantClient(
+                host=QDRANT_CONFIG['host'],
+                port=QDRANT_CONFIG['port'],
+                grpc_port=QDRANT_CONFIG['grpc_port'],
+                prefer_grpc=True
+            )
+            logger.info(f"✅ Connected to Qdrant: {QDRANT_CONFIG['host']}:{QDRANT_CONFIG['port']}")
+    except Exception as e:
+        logger.error(f"❌ Connection failed: {e}")
+        sys.exit(1)
+
+    checker = ConsistencyChecker(pg_conn, neo4j_driver, qdrant_client,
+                                 prefix_len=args.prefix_len, sample=args.sample)
+
+    try:
+        while True:
+            report = checker.run(entities, targets)
+            if args.report:
+                write_report(report, args.report)
+            if not args.interval:
+                break
+            logger.info(f"⏳ Next check in {args.interval}s")
+            time.sleep(args.interval)
+
+        checker.print_stats()
+
+        if report['consistent']:
+            logger.info("\n✅ All checked stores are consistent with PostgreSQL")
+        else:
+            logger.error("\n❌ Drift detected - see report for affected keys")
+            sys.exit(1)
+
+    except KeyboardInterrupt:
+        checker.print_stats()
+        logger.info("\n⚠️  Consistency check interrupted")
+
+    finally:
+        pg_conn.close()
+        if neo4j_driver:
+            neo4j_driver.close()
+        if qdrant_client:
+            qdrant_client.close()
+
+
+if __name__ == "__main__":
+    main()
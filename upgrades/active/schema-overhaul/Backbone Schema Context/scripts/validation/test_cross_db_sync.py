@@ -14,6 +14,8 @@ from neo4j import GraphDatabase
 import os
 from dotenv import load_dotenv
 
+from consistency_check import ConsistencyChecker
+
 # Load environment variables
 load_dotenv()
 
@@ -66,9 +68,9 @@ def test_tractor_count_sync(pg_conn, neo4j_driver):
         """)
         pg_count = pg_cur.fetchone()[0]
 
-    # Neo4j count
+    # Neo4j count (closed tractors stay in the graph with valid_to set)
     with neo4j_driver.session() as neo4j_session:
-        result = neo4j_session.run("MATCH (t:Tractor) RETURN count(t) as count")
+        result = neo4j_session.run("MATCH (t:Tractor) WHERE t.valid_to IS NULL RETURN count(t) as count")
         neo4j_count = result.single()['count']
 
     assert pg_count == neo4j_count, f"Tractor count mismatch: PostgreSQL={pg_count}, Neo4j={neo4j_count}"
@@ -84,9 +86,9 @@ def test_driver_count_sync(pg_conn, neo4j_driver):
         """)
         pg_count = pg_cur.fetchone()[0]
 
-    # Neo4j count
+    # Neo4j count (closed drivers stay in the graph with valid_to set)
     with neo4j_driver.session() as neo4j_session:
-        result = neo4j_session.run("MATCH (d:Driver) RETURN count(d) as count")
+        result = neo4j_session.run("MATCH (d:Driver) WHERE d.valid_to IS NULL RETURN count(d) as count")
         neo4j_count = result.single()['count']
 
     assert pg_count == neo4j_count, f"Driver count mismatch: PostgreSQL={pg_count}, Neo4j={neo4j_count}"
@@ -195,7 +197,8 @@ def test_driver_assignment_sync(pg_conn, neo4j_driver):
     # Get driver assignments from Neo4j
     with neo4j_driver.session() as neo4j_session:
         result = neo4j_session.run("""
-            MATCH (d:Driver)-[:ASSIGNED_TO]->(t:Tractor)
+            MATCH (d:Driver)-[r:ASSIGNED_TO]->(t:Tractor)
+            WHERE r.valid_to IS NULL
             RETURN d.driver_id as driver_id, t.unit_number as unit_number
         """)
         neo4j_assignments = {record['driver_id']: record['unit_number'] for record in result}
@@ -247,6 +250,46 @@ def test_temporal_tracking_sync(pg_conn, neo4j_driver):
     assert neo4j_tractor['valid_to'] is None
 
 
+def test_closed_records_expired_in_neo4j(pg_conn, neo4j_driver):
+    """Verify closed PostgreSQL records are expired (not current) in Neo4j"""
+    with pg_conn.cursor() as pg_cur:
+        pg_cur.execute("""
+            SELECT unit_number FROM hub3_origin.tractors
+            WHERE valid_to IS NOT NULL
+            LIMIT 100
+        """)
+        closed_units = [row[0] for row in pg_cur.fetchall()]
+
+    if not closed_units:
+        pytest.skip("No closed tractors in PostgreSQL yet")
+
+    with neo4j_driver.session() as neo4j_session:
+        result = neo4j_session.run("""
+            MATCH (t:Tractor)
+            WHERE t.unit_number IN $units AND t.valid_to IS NULL
+            RETURN collect(t.unit_number) as still_current
+        """, units=closed_units)
+        still_current = result.single()['still_current']
+
+    assert not still_current, f"Closed tractors still current in Neo4j: {still_current}"
+
+
+# ======================
+# Hash Digest Tests
+# ======================
+
+@pytest.mark.parametrize('entity', ['tractors', 'drivers'])
+def test_bucket_digests_match(pg_conn, neo4j_driver, entity):
+    """Verify every PostgreSQL row matches its Neo4j node via bucket digests"""
+    checker = ConsistencyChecker(pg_conn, neo4j_driver)
+    result = checker.check_entity(entity, 'neo4j')
+
+    assert result['consistent'], (
+        f"{entity} drift: missing={result['missing']}, extra={result['extra']}, "
+        f"mismatched={result['mismatched']}"
+    )
+
+
 # ======================
 # Summary Test
 # ======================
@@ -261,7 +304,7 @@ def test_cross_db_sync_summary(pg_conn, neo4j_driver):
         pg_tractor_count = pg_cur.fetchone()[0]
 
     with neo4j_driver.session() as neo4j_session:
-        result = neo4j_session.run("MATCH (t:Tractor) RETURN count(t) as count")
+        result = neo4j_session.run("MATCH (t:Tractor) WHERE t.valid_to IS NULL RETURN count(t) as count")
         neo4j_tractor_count = result.single()['count']
 
     if pg_tractor_count != neo4j_tractor_count:
@@ -273,7 +316,7 @@ def test_cross_db_sync_summary(pg_conn, neo4j_driver):
         pg_driver_count = pg_cur.fetchone()[0]
 
     with neo4j_driver.session() as neo4j_session:
-        result = neo4j_session.run("MATCH (d:Driver) RETURN count(d) as count")
+        result = neo4j_session.run("MATCH (d:Driver) WHERE d.valid_to IS NULL RETURN count(d) as count")
         neo4j_driver_count = result.single()['count']
 
     if pg_driver_count != neo4j_driver_count:
@@ -15,27 +15,349 @@ Features:
 - Custom entity types (Company, Product, Department)
 - Seed entities with predefined relationships
 - Natural entity extraction from documents
-- Deduplication strategies
+- Concurrent episode ingestion (adaptive limit, per-entity ordering, rate-limit backoff)
+- Deduplication strategies (MinHash-LSH / token blocking, vectorized scoring)
 - GPT-4 Turbo for faster extraction
 - Temporal queries (time-aware entity tracking)
 
 Requirements:
-    pip install graphiti-core neo4j openai
+    pip install graphiti-core neo4j openai numpy
     Neo4j 5.13+ running on localhost:7687
     OPENAI_API_KEY environment variable
 """
 
 import os
+import re
 import json
+import time
+import zlib
+import random
 import asyncio
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple
+import numpy as np
 from graphiti_core import Graphiti
 from graphiti_core.nodes import EntityNode, EpisodeNode
 from graphiti_core.edges import EntityEdge
 from graphiti_core.utils.datetime_utils import utc_now
 
 
+class EntityResolver:
+    """
+    Duplicate-candidate generation and scoring for entity names.
+
+    Blocking (no n² comparison):
+    - Exact blocking on the normalized name: entities sharing it are paired
+      directly (score 1.0), however many there are. Entities with the same
+      set of names are identical to the steps below, so only one of them
+      takes part in them
+    - MinHash-LSH over character trigrams of name + aliases: catches spelling
+      variants ("OpenHaul" / "Open Haul"). With bands × rows = num_perm, pairs
+      with trigram Jaccard above ~(1/bands)^(1/rows) share a bucket
+    - Token blocking on whole words: catches short names inside longer ones
+      ("G" / "The G Companies"). Tokens shared by more than max_bucket
+      entities ("inc", "the") carry no signal and are skipped
+
+    Scoring (vectorized over candidate pairs, batch_size at a time):
+        score = max(trigram Jaccard, token containment)
+    both estimated from the MinHash signatures. Token containment is
+    |A ∩ B| / min(|A|, |B|), derived from the token Jaccard and set sizes.
+    """
+
+    PRIME = (1 << 31) - 1                   # hash values and a·h + b stay below 2^62
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 32,
+        max_bucket: int = 200,
+        batch_size: int = 100_000,
+        seed: int = 42
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.max_bucket = max_bucket
+        self.batch_size = batch_size
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, self.PRIME, size=(2, num_perm), dtype=np.int64)
+        self.b = rng.integers(0, self.PRIME, size=(2, num_perm), dtype=np.int64)
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Lowercase, punctuation to spaces, collapsed whitespace."""
+        return " ".join(re.sub(r"[^\w\s]", " ", (name or "").lower()).split())
+
+    @staticmethod
+    def _hash(shingle: str) -> int:
+        return zlib.crc32(shingle.encode()) & 0x7FFFFFFF
+
+    def shingles(self, names: List[str]) -> Tuple[List[int], List[int]]:
+        """Hashed trigrams and hashed tokens of all names of one entity."""
+        grams, tokens = set(), set()
+        for name in names:
+            # Trigrams ignore spaces so "OpenHaul" and "Open Haul" match
+            padded = f" {name.replace(' ', '')} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+            tokens.update(name.split())
+        return [self._hash(g) for g in grams], [self._hash(t) for t in tokens]
+
+    def signatures(self, shingle_sets: List[List[int]], which: int, chunk: int = 200_000) -> np.ndarray:
+        """
+        MinHash signatures, computed in chunks of whole entities.
+
+        Returns:
+            int32 array of shape (n, num_perm)
+        """
+        a, b = self.a[which][:, None], self.b[which][:, None]
+        sigs = np.empty((len(shingle_sets), self.num_perm), dtype=np.int32)
+        start = 0
+        while start < len(shingle_sets):
+            end, size = start, 0
+            while end < len(shingle_sets) and (size == 0 or size + len(shingle_sets[end]) <= chunk):
+                size += len(shingle_sets[end])
+                end += 1
+            block = shingle_sets[start:end]
+            hashes = np.fromiter((h for s in block for h in s), dtype=np.int64, count=size)
+            offsets = np.cumsum([0] + [len(s) for s in block[:-1]])
+            values = (a * hashes[None, :] + b) % self.PRIME
+            sigs[start:end] = np.minimum.reduceat(values, offsets, axis=1).T
+            start = end
+        return sigs
+
+    def _bucket_pairs(self, members: np.ndarray, pairs: List[np.ndarray], capped: bool = False) -> bool:
+        """Append all pairs of one bucket; False if it was skipped as too large."""
+        if len(members) < 2:
+            return True
+        if capped and len(members) > self.max_bucket:
+            return False
+        i, j = np.triu_indices(len(members), k=1)
+        pairs.append(np.stack([members[i], members[j]], axis=1))
+        return True
+
+    def candidate_pairs(self, gram_sigs: np.ndarray, token_sets: List[List[int]]) -> Tuple[np.ndarray, int]:
+        """
+        Candidate pairs from LSH bands and token blocks.
+
+        Returns:
+            (unique (i, j) pairs with i < j, number of oversized token blocks skipped)
+        """
+        n = len(gram_sigs)
+        rows = self.num_perm // self.bands
+        pairs, skipped = [], 0
+
+        # Each band's rows folded into one uint64 key (wrapping multiply-add)
+        weights = np.uint64(0x9E3779B97F4A7C15) ** np.arange(rows, dtype=np.uint64)
+        for band in range(self.bands):
+            keys = gram_sigs[:, band * rows:(band + 1) * rows].astype(np.uint64) @ weights
+            _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            # Only buckets with 2+ members produce pairs (most entities are alone)
+            shared = np.flatnonzero(counts[inverse] >= 2)
+            order = shared[np.argsort(inverse[shared], kind="stable")]
+            bounds = np.cumsum(counts[np.unique(inverse[shared])])[:-1]
+            for members in np.split(order, bounds):
+                self._bucket_pairs(members, pairs)
+
+        blocks: Dict[int, List[int]] = {}
+        for entity, tokens in enumerate(token_sets):
+            for token in tokens:
+                blocks.setdefault(token, []).append(entity)
+        for members in blocks.values():
+            skipped += not self._bucket_pairs(np.array(members), pairs, capped=True)
+
+        if not pairs:
+            return np.empty((0, 2), dtype=np.int64), skipped
+        pairs = np.concatenate(pairs).astype(np.int64)
+        pairs.sort(axis=1)
+        codes = np.unique(pairs[:, 0] * n + pairs[:, 1])
+        return np.stack([codes // n, codes % n], axis=1), skipped
+
+    def score(
+        self,
+        pairs: np.ndarray,
+        gram_sigs: np.ndarray,
+        token_sigs: np.ndarray,
+        token_counts: np.ndarray
+    ) -> np.ndarray:
+        """Similarity of each candidate pair, batch_size pairs at a time."""
+        scores = np.empty(len(pairs), dtype=np.float32)
+        for start in range(0, len(pairs), self.batch_size):
+            i, j = pairs[start:start + self.batch_size].T
+            gram_jaccard = (gram_sigs[i] == gram_sigs[j]).mean(axis=1)
+            token_jaccard = (token_sigs[i] == token_sigs[j]).mean(axis=1)
+            size_i, size_j = token_counts[i], token_counts[j]
+            # |A ∩ B| = J (|A| + |B|) / (1 + J)
+            containment = token_jaccard * (size_i + size_j) / ((1 + token_jaccard) * np.minimum(size_i, size_j))
+            scores[start:start + len(i)] = np.maximum(gram_jaccard, np.minimum(containment, 1.0))
+        return scores
+
+    def resolve(self, entities: List[Dict[str, Any]], threshold: float) -> Dict[str, Any]:
+        """
+        Duplicate pairs among entities (dicts with uuid, name, name_variations).
+
+        Returns:
+            {"pairs": [(index1, index2, score)] sorted by score, "candidates": int,
+             "skipped_buckets": int}
+        """
+        names = [
+            [n for n in (self.normalize(x) for x in [e["name"], *(e.get("name_variations") or [])]) if n]
+            for e in entities
+        ]
+        keep = [k for k, entity_names in enumerate(names) if entity_names]
+        if len(keep) < 2:
+            return {"pairs": [], "candidates": 0, "skipped_buckets": 0}
+
+        # Entities with the same name set are one group: LSH and token blocking
+        # run on one representative per group, and every pair within a group
+        # (or sharing a primary name) scores 1.0. Exact duplicates would
+        # otherwise overflow any capped block.
+        groups: Dict[frozenset, List[int]] = {}
+        same_name: Dict[str, List[int]] = {}
+        for position, k in enumerate(keep):
+            groups.setdefault(frozenset(names[k]), []).append(position)
+            same_name.setdefault(names[k][0], []).append(position)
+        members = [np.array(group) for group in groups.values()]
+        exact: List[np.ndarray] = []
+        for group in [*members, *map(np.array, same_name.values())]:
+            self._bucket_pairs(group, exact)
+
+        shingled = [self.shingles(names[keep[group[0]]]) for group in members]
+        gram_sets = [grams for grams, _ in shingled]
+        token_sets = [tokens for _, tokens in shingled]
+
+        gram_sigs = self.signatures(gram_sets, which=0)
+        token_sigs = self.signatures(token_sets, which=1)
+        token_counts = np.array([len(t) for t in token_sets], dtype=np.float32)
+
+        rep_pairs, skipped = self.candidate_pairs(gram_sigs, token_sets)
+        rep_scores = self.score(rep_pairs, gram_sigs, token_sigs, token_counts)
+
+        # Expand each representative pair to every member of both groups
+        sizes = np.array([len(group) for group in members])
+        firsts = np.array([group[0] for group in members])
+        multi = (sizes[rep_pairs[:, 0]] > 1) | (sizes[rep_pairs[:, 1]] > 1)
+        pairs = [firsts[rep_pairs[~multi]]]
+        scores = [rep_scores[~multi]]
+        for (a, b), score in zip(rep_pairs[multi], rep_scores[multi]):
+            i, j = np.meshgrid(members[a], members[b], indexing="ij")
+            pairs.append(np.stack([i.ravel(), j.ravel()], axis=1))
+            scores.append(np.full(i.size, score, dtype=np.float32))
+        if exact:
+            pairs.extend(exact)
+            scores.extend(np.ones(len(block), dtype=np.float32) for block in exact)
+        pairs = np.concatenate(pairs).astype(np.int64)
+        scores = np.concatenate(scores)
+        pairs.sort(axis=1)
+
+        # Keep each pair once, with its best score
+        n = len(keep)
+        codes = pairs[:, 0] * n + pairs[:, 1]
+        order = np.lexsort((-scores, codes))
+        first = order[np.r_[True, codes[order][1:] != codes[order][:-1]]] if len(order) else order
+        pairs, scores = pairs[first], scores[first]
+
+        hits = np.flatnonzero(scores >= threshold)
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        index = np.array(keep)
+        return {
+            "pairs": [(int(index[pairs[h, 0]]), int(index[pairs[h, 1]]), float(scores[h])) for h in hits],
+            "candidates": len(pairs),
+            "skipped_buckets": skipped,
+        }
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for provider rate-limit errors (OpenAI RateLimitError, HTTP 429)."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    text = f"{type(error).__name__} {error}".lower()
+    return status == 429 or "ratelimit" in text or "rate limit" in text
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server-suggested wait (Retry-After header) if the error carries one."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """
+    Async semaphore whose limit adapts to rate limits (AIMD).
+
+    - limit successes in a row: limit + 1 (up to max_limit)
+    - rate limit: limit halved (at least 1), at most once per cooldown, so
+      one burst of 429s from the same window counts as a single signal
+    """
+
+    def __init__(self, initial: int, max_limit: int, cooldown: float = 1.0):
+        self.limit = max(1, initial)
+        self.max_limit = max(self.limit, max_limit)
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_limit:
+            self.limit += 1
+            self._successes = 0
+
+    def on_rate_limit(self):
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self.limit = max(1, self.limit // 2)
+            self._last_decrease = now
+        self._successes = 0
+
+
+class IngestionProgress:
+    """Episode counters with periodic progress lines and a final summary."""
+
+    def __init__(self, total: int, report_every: float = 5.0):
+        self.total = total
+        self.report_every = report_every
+        self.stats = {"completed": 0, "failed": 0, "rate_limited": 0}
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def record(self, outcome: str, limiter: AdaptiveLimiter):
+        """Count one outcome ("completed" / "failed" / "rate_limited")."""
+        self.stats[outcome] += 1
+        if outcome == "rate_limited":
+            return
+        now = time.perf_counter()
+        done = self.stats["completed"] + self.stats["failed"]
+        if now - self._last_report >= self.report_every or done == self.total:
+            self._last_report = now
+            print(f"🔄 {done}/{self.total} episodes | {self.stats['completed'] / (now - self.started):.2f}/s "
+                  f"| in flight {limiter.in_flight}/{limiter.limit} | rate limited {self.stats['rate_limited']}")
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            **self.stats,
+            "total": self.total,
+            "seconds": elapsed,
+            "episodes_per_sec": self.stats["completed"] / elapsed if elapsed else 0.0,
+        }
+
+
 class GraphitiSeedManager:
     """
     Manage seed entities and natural extraction in Graphiti.
@@ -69,7 +391,89 @@ class GraphitiSeedManager:
             embedding_model="text-embedding-3-small"
         )
 
-    async def seed_entities(self, seed_file: str = "data/seed/entities.json"):
+    async def _add_episode(
+        self,
+        episode: Dict[str, Any],
+        limiter: AdaptiveLimiter,
+        progress: IngestionProgress,
+        max_retries: int
+    ) -> bool:
+        """
+        add_episode with rate-limit retries.
+
+        Backs off outside the limiter (Retry-After, else exponential with
+        jitter) so the slot is free while waiting. Other errors are reported
+        and not retried.
+        """
+        for attempt in range(max_retries + 1):
+            async with limiter:
+                try:
+                    await self.graphiti.add_episode(**episode)
+                    limiter.on_success()
+                    progress.record("completed", limiter)
+                    return True
+                except Exception as e:
+                    if not is_rate_limit_error(e) or attempt == max_retries:
+                        progress.record("failed", limiter)
+                        print(f"❌ {episode['name']}: {e}")
+                        return False
+                    limiter.on_rate_limit()
+                    progress.record("rate_limited", limiter)
+                    delay = retry_after_seconds(e) or min(60.0, 2.0 ** attempt) * random.uniform(0.5, 1.0)
+            await asyncio.sleep(delay)
+        return False
+
+    async def ingest_episodes(
+        self,
+        episodes: List[Tuple[str, Dict[str, Any]]],
+        concurrency: int = 1,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = 6
+    ) -> Dict[str, Any]:
+        """
+        Add many episodes concurrently, in order where it matters.
+
+        Episodes with the same ordering key run one after another in
+        reference_time order, so later facts about an entity are never
+        extracted before earlier ones. Different keys run concurrently, with
+        at most limiter.limit episodes in flight. The limit starts at
+        concurrency, grows towards max_concurrency while calls succeed, and
+        halves on rate limits.
+
+        Args:
+            episodes: (ordering key, add_episode kwargs) pairs
+            concurrency: Initial in-flight limit (1 = sequential)
+            max_concurrency: Highest limit to grow to (default: concurrency)
+            max_retries: Rate-limit retries per episode
+
+        Returns:
+            Summary: completed, failed, rate_limited, total, seconds, episodes_per_sec
+        """
+        limiter = AdaptiveLimiter(concurrency, max_concurrency or concurrency)
+        progress = IngestionProgress(len(episodes))
+
+        chains: Dict[str, List[Dict[str, Any]]] = {}
+        for key, episode in episodes:
+            chains.setdefault(key, []).append(episode)
+
+        async def run_chain(chain: List[Dict[str, Any]]):
+            for episode in sorted(chain, key=lambda ep: ep["reference_time"]):
+                await self._add_episode(episode, limiter, progress, max_retries)
+
+        await asyncio.gather(*(run_chain(chain) for chain in chains.values()))
+
+        summary = progress.summary()
+        print(f"📊 {summary['completed']}/{summary['total']} episodes in {summary['seconds']:.1f}s "
+              f"({summary['episodes_per_sec']:.2f}/s, final limit {limiter.limit}, "
+              f"{summary['rate_limited']} rate-limited retries, {summary['failed']} failed)")
+        return summary
+
+    async def seed_entities(
+        self,
+        seed_file: str = "data/seed/entities.json",
+        concurrency: int = 1,
+        max_concurrency: Optional[int] = None
+    ):
         """
         Seed critical entities into Graphiti before natural extraction.
 
@@ -80,8 +484,13 @@ class GraphitiSeedManager:
         - Fleet (Department)
         - Financials (Department)
 
+        Entity episodes run first and concurrently. Relationship episodes run
+        after all of them, so both endpoints already exist.
+
         Args:
             seed_file: Path to seed entities JSON file
+            concurrency: Initial in-flight episode limit (see ingest_episodes)
+            max_concurrency: Highest limit to grow to on success
         """
         print("=" * 70)
         print("Step 1: Seeding Critical Entities")
@@ -91,41 +500,33 @@ class GraphitiSeedManager:
             seed_data = json.load(f)
 
         # Seed entities
-        entities_created = 0
-        for entity_data in seed_data["entities"]:
-            # Create entity through Graphiti
-            # We use add_episode to create entities with context
-            episode_body = self._create_entity_episode(entity_data)
-
-            await self.graphiti.add_episode(
-                name=f"Seed: {entity_data['name']}",
-                episode_body=episode_body,
-                source="seed_data",
-                reference_time=utc_now(),
-                source_description=f"Seeded entity: {entity_data['name']}"
-            )
-
-            entities_created += 1
-            print(f"✅ Seeded entity: {entity_data['name']} ({entity_data['entity_type']})")
-
-        # Seed relationships
-        relationships_created = 0
-        for rel in seed_data["relationships"]:
-            # Create relationship episode
-            rel_episode = self._create_relationship_episode(rel)
-
-            await self.graphiti.add_episode(
-                name=f"Seed Relationship: {rel['source']} -> {rel['target']}",
-                episode_body=rel_episode,
-                source="seed_data",
-                reference_time=utc_now(),
-                source_description=f"Seeded relationship: {rel['type']}"
-            )
-
-            relationships_created += 1
-            print(f"✅ Seeded relationship: {rel['source']} --{rel['type']}--> {rel['target']}")
-
-        print(f"\n✅ Seeded {entities_created} entities and {relationships_created} relationships")
+        # We use add_episode to create entities with context
+        entity_episodes = [
+            (f"entity:{entity_data['name']}", {
+                "name": f"Seed: {entity_data['name']}",
+                "episode_body": self._create_entity_episode(entity_data),
+                "source": "seed_data",
+                "reference_time": utc_now(),
+                "source_description": f"Seeded entity: {entity_data['name']}"
+            })
+            for entity_data in seed_data["entities"]
+        ]
+        entities = await self.ingest_episodes(entity_episodes, concurrency, max_concurrency)
+
+        # Seed relationships (ordered per entity pair)
+        relationship_episodes = [
+            (f"relationship:{rel['source']}->{rel['target']}", {
+                "name": f"Seed Relationship: {rel['source']} -> {rel['target']}",
+                "episode_body": self._create_relationship_episode(rel),
+                "source": "seed_data",
+                "reference_time": utc_now(),
+                "source_description": f"Seeded relationship: {rel['type']}"
+            })
+            for rel in seed_data["relationships"]
+        ]
+        relationships = await self.ingest_episodes(relationship_episodes, concurrency, max_concurrency)
+
+        print(f"\n✅ Seeded {entities['completed']} entities and {relationships['completed']} relationships")
 
     def _create_entity_episode(self, entity_data: Dict[str, Any]) -> str:
         """
@@ -179,9 +580,12 @@ class GraphitiSeedManager:
 
     async def extract_from_documents(
         self,
-        documents: List[Dict[str, str]],
-        reference_time: datetime = None
-    ):
+        documents: List[Dict[str, Any]],
+        reference_time: datetime = None,
+        concurrency: int = 1,
+        max_concurrency: Optional[int] = None,
+        order_key: Optional[Callable[[Dict[str, Any]], str]] = None
+    ) -> Dict[str, Any]:
         """
         Extract entities naturally from documents using Graphiti.
 
@@ -193,7 +597,16 @@ class GraphitiSeedManager:
 
         Args:
             documents: List of documents with 'title' and 'content'
+                (optional 'reference_time' per document)
             reference_time: Reference time for episodes (defaults to now)
+            concurrency: Initial in-flight episode limit (1 = sequential)
+            max_concurrency: Highest limit to grow to on success
+            order_key: Documents with the same key are ingested in
+                reference_time order (e.g. lambda doc: doc["customer"]);
+                default: every document is independent
+
+        Returns:
+            Ingestion summary (see ingest_episodes)
         """
         print("\n" + "=" * 70)
         print("Step 2: Natural Entity Extraction from Documents")
@@ -202,88 +615,111 @@ class GraphitiSeedManager:
         if reference_time is None:
             reference_time = utc_now()
 
-        for i, doc in enumerate(documents):
-            print(f"\nProcessing document {i+1}/{len(documents)}: {doc['title']}")
-
-            await self.graphiti.add_episode(
-                name=doc['title'],
-                episode_body=doc['content'],
-                source="document",
-                reference_time=reference_time,
-                source_description=f"Document: {doc['title']}"
-            )
-
-            print(f"✅ Extracted entities from: {doc['title']}")
+        episodes = [
+            (order_key(doc) if order_key else f"document:{i}", {
+                "name": doc['title'],
+                "episode_body": doc['content'],
+                "source": "document",
+                "reference_time": doc.get('reference_time', reference_time),
+                "source_description": f"Document: {doc['title']}"
+            })
+            for i, doc in enumerate(documents)
+        ]
+        summary = await self.ingest_episodes(episodes, concurrency, max_concurrency)
 
-        print(f"\n✅ Processed {len(documents)} documents")
+        print(f"\n✅ Processed {summary['completed']}/{len(documents)} documents")
+        return summary
 
-    async def deduplicate_entities(self, similarity_threshold: float = 0.9):
+    async def deduplicate_entities(self, similarity_threshold: float = 0.9, show: int = 20) -> List[Dict[str, Any]]:
         """
-        Deduplicate entities with similar names.
+        Find duplicate entities across the whole graph.
 
         Graphiti 0.22.0 has improved entity deduplication:
         - Detects "G", "The G Companies", "G Transport" as same entity
         - Merges into single entity with aliases
         - Links all relationships to merged entity
 
+        This pass catches what extraction-time dedup missed. It reads names once,
+        blocks candidates with MinHash-LSH and token blocking (see
+        EntityResolver), scores them vectorized, and resolves seed status for
+        every pair in one query. No cartesian product, no per-pair queries.
+
         Args:
-            similarity_threshold: Threshold for entity similarity (0.85-0.95)
+            similarity_threshold: Minimum pair score to report (0.85-0.95)
+            show: Number of top pairs to print
+
+        Returns:
+            Duplicate pairs (uuid1/name1/type1, uuid2/name2/type2, score,
+            seed1/seed2 and keep_uuid, the preferred survivor), best first
         """
         print("\n" + "=" * 70)
         print("Step 3: Entity Deduplication")
         print("=" * 70)
 
-        # Get all entities
         driver = self.graphiti.driver
+        start_time = time.perf_counter()
 
         with driver.session() as session:
-            # Find potential duplicates
-            result = session.run("""
-                MATCH (e1:Entity), (e2:Entity)
-                WHERE e1.uuid < e2.uuid
-                  AND (
-                    e1.name CONTAINS e2.name
-                    OR e2.name CONTAINS e1.name
-                    OR e1.name IN e2.name_variations
-                    OR e2.name IN e1.name_variations
-                  )
-                RETURN e1.uuid AS uuid1,
-                       e1.name AS name1,
-                       e1.entity_type AS type1,
-                       e2.uuid AS uuid2,
-                       e2.name AS name2,
-                       e2.entity_type AS type2
-                LIMIT 50
-            """)
-
-            duplicates = list(result)
-
-            if not duplicates:
-                print("✅ No duplicates found")
-                return
-
-            print(f"Found {len(duplicates)} potential duplicate pairs:")
-
-            for dup in duplicates:
-                print(f"\n  Duplicate pair:")
-                print(f"    • {dup['name1']} ({dup['type1']})")
-                print(f"    • {dup['name2']} ({dup['type2']})")
-
-                # Check if one is seed data
-                seed_check = session.run("""
-                    MATCH (ep:Episode)-[:RELATES_TO]->(e:Entity {uuid: $uuid})
+            entities = [dict(record) for record in session.run("""
+                MATCH (e:Entity)
+                RETURN e.uuid AS uuid,
+                       e.name AS name,
+                       e.entity_type AS entity_type,
+                       coalesce(e.name_variations, []) AS name_variations
+            """)]
+
+            resolved = EntityResolver().resolve(entities, similarity_threshold)
+            pairs = resolved["pairs"]
+
+            # Seed status for every entity in any pair, in one query
+            pair_uuids = list({entities[k]["uuid"] for i, j, _ in pairs for k in (i, j)})
+            seed_uuids = {
+                record["uuid"] for record in session.run("""
+                    UNWIND $uuids AS uuid
+                    MATCH (ep:Episode)-[:RELATES_TO]->(e:Entity {uuid: uuid})
                     WHERE ep.source = 'seed_data'
-                    RETURN count(ep) AS seed_count
-                """, uuid=dup['uuid1'])
-
-                seed_result = seed_check.single()
-                is_seed = seed_result['seed_count'] > 0
-
-                if is_seed:
-                    print(f"    ⚠️  {dup['name1']} is seed entity - will keep this name")
-
-            print(f"\n💡 Graphiti automatically deduplicates similar entities")
-            print(f"   Similarity threshold: {similarity_threshold}")
+                    RETURN DISTINCT e.uuid AS uuid
+                """, uuids=pair_uuids)
+            } if pair_uuids else set()
+
+        elapsed = time.perf_counter() - start_time
+        n = len(entities)
+        print(f"Entities: {n:,} | candidate pairs: {resolved['candidates']:,} "
+              f"(of {n * (n - 1) // 2:,}) | duplicates ≥ {similarity_threshold}: {len(pairs):,} "
+              f"| {elapsed:.2f}s")
+        if resolved["skipped_buckets"]:
+            print(f"⚠️  Skipped {resolved['skipped_buckets']} oversized blocks (common tokens / trigram bands)")
+
+        duplicates = []
+        for i, j, score in pairs:
+            e1, e2 = entities[i], entities[j]
+            seed1, seed2 = e1["uuid"] in seed_uuids, e2["uuid"] in seed_uuids
+            duplicates.append({
+                "uuid1": e1["uuid"], "name1": e1["name"], "type1": e1["entity_type"],
+                "uuid2": e2["uuid"], "name2": e2["name"], "type2": e2["entity_type"],
+                "score": score,
+                "seed1": seed1,
+                "seed2": seed2,
+                "keep_uuid": e2["uuid"] if seed2 and not seed1 else e1["uuid"],
+            })
+
+        if not duplicates:
+            print("✅ No duplicates found")
+            return duplicates
+
+        for dup in duplicates[:show]:
+            print(f"\n  Duplicate pair (score {dup['score']:.2f}):")
+            print(f"    • {dup['name1']} ({dup['type1']})")
+            print(f"    • {dup['name2']} ({dup['type2']})")
+            for seed, name in ((dup["seed1"], dup["name1"]), (dup["seed2"], dup["name2"])):
+                if seed:
+                    print(f"    ⚠️  {name} is seed entity - will keep this name")
+        if len(duplicates) > show:
+            print(f"\n  ... {len(duplicates) - show} more pairs")
+
+        print(f"\n💡 Graphiti automatically deduplicates similar entities")
+        print(f"   Similarity threshold: {similarity_threshold}")
+        return duplicates
 
     async def query_entity_timeline(self, entity_name: str, days: int = 90):
         """
@@ -490,7 +926,7 @@ async def example_usage():
         with open("data/seed/entities.json", 'w') as f:
             json.dump(seed_data, f, indent=2)
 
-        await manager.seed_entities("data/seed/entities.json")
+        await manager.seed_entities("data/seed/entities.json", concurrency=4)
 
         # Step 2: Extract entities from documents
         documents = [
@@ -526,7 +962,7 @@ async def example_usage():
             }
         ]
 
-        await manager.extract_from_documents(documents)
+        await manager.extract_from_documents(documents, concurrency=3, max_concurrency=8)
 
         # Step 3: Deduplicate entities
         await manager.deduplicate_entities(similarity_threshold=0.9)
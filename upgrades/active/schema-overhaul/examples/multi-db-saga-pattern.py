@@ -10,14 +10,19 @@ This example demonstrates the Saga pattern for distributed transactions
 across multiple databases (Neo4j, PostgreSQL, Qdrant).
 
 Saga Pattern:
-- Execute activities in sequence
-- If any activity fails, run compensation activities in reverse order
+- Execute independent activities concurrently (configurable fan-out)
+- If any activity fails, run compensation activities (retried until they succeed)
 - Ensures eventual consistency across all databases
 
 Features:
 - Coordinated writes to Neo4j, PostgreSQL, Qdrant
+- Concurrent writes: saga latency ≈ slowest store, not the sum of all three
+- Idempotent writes (MERGE / ON CONFLICT / upsert) and compensations (safe to retry)
+- Batch sagas: N entities per UNWIND transaction / multi-row insert / multi-point upsert
+- Durable saga log (SQLite WAL, group commit) and crash recovery of unfinished sagas
 - Compensation activities for rollback
 - Error handling and retry logic
+- Schema setup once at startup, pooled connections per write
 - UUID v7 for cross-database consistency
 - Activity orchestration pattern
 
@@ -26,16 +31,24 @@ Requirements:
     Neo4j, PostgreSQL, Qdrant running locally
 """
 
+import json
+import queue
+import sqlite3
+import threading
 import time
-import uuid
-from typing import Dict, Any, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
-import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from neo4j import GraphDatabase
 from qdrant_client import QdrantClient
 from qdrant_client.models import PointStruct, VectorParams, Distance
 
+from uuid7 import generate_uuid_v7
+
 
 class SagaStatus(Enum):
     """Saga execution status."""
@@ -55,6 +68,7 @@ class SagaActivity:
     compensate_fn: callable
     status: SagaStatus = SagaStatus.PENDING
     error: Optional[str] = None
+    store: str = ""                         # "neo4j" | "postgres" | "qdrant" (saga log step)
 
 
 @dataclass
@@ -65,23 +79,223 @@ class SagaResult:
     activities_completed: List[str]
     activities_compensated: List[str]
     error: Optional[str] = None
+    duration_ms: float = 0.0
+
+
+@dataclass
+class EntityInput:
+    """One entity for a batch saga (uuid is assigned if not given)."""
+    name: str
+    entity_type: str
+    summary: str
+    embedding: List[float]
+    uuid: Optional[str] = None
+
+
+@dataclass
+class BatchSagaResult:
+    """Result of a batch saga."""
+    success: bool
+    entity_uuids: List[str]                 # entities written to all databases
+    failed: Dict[str, str]                  # entity uuid -> error (compensated)
+    activities_completed: List[str]
+    activities_compensated: List[str]
+    isolated: bool = False                  # fell back to per-entity sagas
+    duration_ms: float = 0.0
+
+
+def retry(fn: Callable[[], Any], attempts: int = 3, base_delay: float = 0.1) -> Any:
+    """
+    Call fn, retrying with exponential backoff (0.1s, 0.2s, 0.4s, ...).
+
+    Only use for idempotent operations: a retried call may follow an
+    attempt that actually succeeded on the server.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn()
+        except Exception:
+            if attempt == attempts:
+                raise
+            time.sleep(base_delay * (2 ** (attempt - 1)))
+
+
+class SagaLog:
+    """
+    Write-ahead saga log in SQLite (WAL mode) with group commit.
+
+    One row per event: saga_started (payload = entity UUIDs), then per step
+    intent -> completed / failed -> compensated, then saga_completed or
+    saga_compensated. An intent is durable before its write starts, so after
+    a crash every store that may hold orphan data is known.
+
+    A single writer thread owns the connection. It drains everything queued
+    since its last commit into one transaction, so concurrent sagas share
+    one fsync instead of paying one each.
+    """
+
+    FINISHED = ("saga_completed", "saga_compensated", "saga_handed_off")
+
+    def __init__(self, path: str = "saga_log.db", max_batch: int = 1024):
+        """
+        Args:
+            path: SQLite database file
+            max_batch: Most appends grouped into one commit
+        """
+        self.path = path
+        self.max_batch = max_batch
+        self.queue: "queue.Queue" = queue.Queue()
+        self.stats = {"records": 0, "commits": 0}
+
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS saga_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                saga_id TEXT NOT NULL,
+                step TEXT,
+                event TEXT NOT NULL,
+                payload TEXT,
+                created_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS saga_log_saga_idx ON saga_log (saga_id)")
+        conn.commit()
+        conn.close()
+
+        self.writer = threading.Thread(target=self._writer_loop, name="saga-log-writer", daemon=True)
+        self.writer.start()
+
+    def append(self, records: List[Tuple[str, Optional[str], str, Optional[dict]]], durable: bool = True):
+        """
+        Queue (saga_id, step, event, payload) records for the next group commit.
+
+        Args:
+            records: Records written in one transaction, in order
+            durable: Block until the records are committed (required for intents)
+        """
+        future = Future()
+        self.queue.put((records, future))
+        if durable:
+            future.result()
+
+    def _writer_loop(self):
+        """Commit queued appends in groups until close() sends None."""
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA synchronous=FULL")
+        stop = False
+        while not stop:
+            item = self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            # Everything that queued up during the previous commit joins this one
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            now = time.time()
+            rows = [
+                (saga_id, step, event, json.dumps(payload) if payload is not None else None, now)
+                for records, _ in batch
+                for saga_id, step, event, payload in records
+            ]
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO saga_log (saga_id, step, event, payload, created_at) "
+                        "VALUES (?, ?, ?, ?, ?)", rows
+                    )
+                self.stats["records"] += len(rows)
+                self.stats["commits"] += 1
+                for _, future in batch:
+                    future.set_result(None)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+        conn.close()
+
+    def unfinished(self, stale_after: float = 0.0) -> Dict[str, Dict[str, Any]]:
+        """
+        Sagas with no final event whose last record is older than stale_after seconds.
+
+        Returns:
+            saga_id -> {"uuids": [...], "steps": {step: last event}}
+        """
+        conn = sqlite3.connect(self.path)
+        try:
+            rows = conn.execute(f"""
+                SELECT saga_id, step, event, payload FROM saga_log
+                WHERE saga_id IN (
+                    SELECT saga_id FROM saga_log
+                    GROUP BY saga_id
+                    HAVING SUM(event IN ({", ".join("?" * len(self.FINISHED))})) = 0
+                       AND MAX(created_at) < ?
+                )
+                ORDER BY seq
+            """, (*self.FINISHED, time.time() - stale_after)).fetchall()
+        finally:
+            conn.close()
+
+        sagas: Dict[str, Dict[str, Any]] = {}
+        for saga_id, step, event, payload in rows:
+            saga = sagas.setdefault(saga_id, {"uuids": [], "steps": {}})
+            if event == "saga_started" and payload and not saga["uuids"]:
+                saga["uuids"] = json.loads(payload)["uuids"]
+            elif step is not None:
+                saga["steps"][step] = event
+        return sagas
+
+    def prune(self) -> int:
+        """Delete the records of finished sagas. Returns rows deleted."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                deleted = conn.execute(f"""
+                    DELETE FROM saga_log WHERE saga_id IN (
+                        SELECT saga_id FROM saga_log
+                        WHERE event IN ({", ".join("?" * len(self.FINISHED))})
+                    )
+                """, self.FINISHED).rowcount
+        finally:
+            conn.close()
+        return deleted
+
+    def close(self):
+        """Flush pending appends and stop the writer thread."""
+        self.queue.put(None)
+        self.writer.join()
 
 
 class MultiDatabaseSaga:
     """
     Orchestrate writes across multiple databases using Saga pattern.
 
-    Saga Workflow:
-    1. Write to Neo4j (graph entity)
-    2. Write to PostgreSQL (metadata)
-    3. Write to Qdrant (vector embedding)
+    Saga Workflow (the three writes are independent and run concurrently):
+    - Write to Neo4j (graph entity)
+    - Write to PostgreSQL (metadata)
+    - Write to Qdrant (vector embedding)
+
+    If any write fails, every write that completed (or may have partly
+    completed) is compensated:
+    - Compensate Qdrant (delete vector)
+    - Compensate PostgreSQL (delete record)
+    - Compensate Neo4j (delete entity)
 
-    If any step fails:
-    1. Compensate Qdrant (delete vector)
-    2. Compensate PostgreSQL (delete record)
-    3. Compensate Neo4j (delete entity)
+    Writes are upserts keyed by the entity UUID and compensations are
+    deletes by UUID, so both are idempotent and retried with backoff.
 
     This ensures eventual consistency: either all writes succeed or all are rolled back.
+
+    With a SagaLog, every step's intent is logged durably before the write
+    starts, and a recovery worker finishes sagas a crash left behind (see
+    recover()).
     """
 
     def __init__(
@@ -91,14 +305,66 @@ class MultiDatabaseSaga:
         neo4j_user: str = "neo4j",
         neo4j_password: str = "apexmemory2024",
         qdrant_host: str = "localhost",
-        qdrant_port: int = 6333
+        qdrant_port: int = 6333,
+        fan_out: int = 3,
+        retries: int = 3,
+        saga_log: Optional[SagaLog] = None,
+        stale_after: float = 60.0,
+        recovery_interval: float = 30.0
     ):
-        """Initialize database connections."""
-        self.pg_conn = psycopg2.connect(postgres_conn_string)
+        """
+        Initialize database connections and schema.
+
+        Args:
+            fan_out: Maximum activities running at once (1 = sequential)
+            retries: Attempts per write and per compensation
+            saga_log: Write-ahead log for crash recovery (None = in-memory only)
+            stale_after: Seconds without a log record before a saga counts as abandoned
+            recovery_interval: Seconds between recovery passes (0 = no background worker)
+        """
+        self.fan_out = max(1, fan_out)
+        self.retries = retries
+        self.saga_log = saga_log
+        self.stale_after = stale_after
+        # One extra connection for the recovery worker
+        self.pg_pool = ThreadedConnectionPool(1, self.fan_out + 1, postgres_conn_string)
         self.neo4j_driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
         self.qdrant_client = QdrantClient(host=qdrant_host, port=qdrant_port)
+        self.executor = ThreadPoolExecutor(max_workers=self.fan_out, thread_name_prefix="saga")
+
+        # Schema setup happens once here, not on every write
+        self._init_schema()
+
+        # Recovery runs at startup, then periodically (catches sagas that were
+        # still within stale_after when the process restarted)
+        self._stop_recovery = threading.Event()
+        self.recovery_thread = None
+        if saga_log is not None and recovery_interval > 0:
+            self.recovery_thread = threading.Thread(
+                target=self._recovery_loop, args=(recovery_interval,),
+                name="saga-recovery", daemon=True
+            )
+            self.recovery_thread.start()
+
+    def _init_schema(self):
+        """Create the PostgreSQL table, Neo4j constraint and Qdrant collection if missing."""
+        with self._pg() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS entities (
+                    uuid UUID PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    entity_type TEXT NOT NULL,
+                    summary TEXT,
+                    created_at TIMESTAMP DEFAULT NOW()
+                )
+            """)
+
+        # Backs MERGE on uuid (and makes concurrent MERGEs safe)
+        self.neo4j_driver.execute_query("""
+            CREATE CONSTRAINT entity_uuid_unique IF NOT EXISTS
+            FOR (e:Entity) REQUIRE e.uuid IS UNIQUE
+        """)
 
-        # Ensure collection exists in Qdrant
         self._init_qdrant_collection()
 
     def _init_qdrant_collection(self):
@@ -112,24 +378,196 @@ class MultiDatabaseSaga:
                 vectors_config=VectorParams(size=1536, distance=Distance.COSINE)
             )
 
+    @contextmanager
+    def _pg(self):
+        """Cursor on a pooled PostgreSQL connection; commits on success."""
+        conn = self.pg_pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                yield cur
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pg_pool.putconn(conn)
+
     def generate_uuid_v7(self) -> str:
         """
         Generate UUID v7 for cross-database consistency.
 
         All databases will use the same UUID for the same entity.
         """
-        timestamp_ms = int(time.time() * 1000)
-        time_high = (timestamp_ms >> 16) & 0xFFFFFFFF
-        time_mid = (timestamp_ms & 0xFFFF)
-        time_low = 0x7000 | (int(time.time() * 1000000) & 0x0FFF)
-        random_bits = uuid.uuid4().int & ((1 << 62) - 1)
-        clock_seq = (random_bits >> 48) & 0x3FFF | 0x8000
-        node = random_bits & 0xFFFFFFFFFFFF
-
-        return str(uuid.UUID(
-            fields=(time_high, time_mid, time_low, clock_seq, node),
-            version=7
-        ))
+        return generate_uuid_v7()
+
+    def _build_activities(
+        self,
+        entity_uuid: str,
+        entity_name: str,
+        entity_type: str,
+        summary: str,
+        embedding: List[float],
+        fail_at_activity: Optional[str] = None
+    ) -> List[SagaActivity]:
+        """Saga activities for one entity (optionally failing one on purpose)."""
+        writes = {
+            "Write to Neo4j": (
+                "neo4j",
+                lambda: self._write_neo4j(entity_uuid, entity_name, entity_type, summary),
+                lambda: self._delete_neo4j(entity_uuid)
+            ),
+            "Write to PostgreSQL": (
+                "postgres",
+                lambda: self._write_postgres(entity_uuid, entity_name, entity_type, summary),
+                lambda: self._delete_postgres(entity_uuid)
+            ),
+            "Write to Qdrant": (
+                "qdrant",
+                lambda: self._write_qdrant(entity_uuid, entity_name, embedding),
+                lambda: self._delete_qdrant(entity_uuid)
+            ),
+        }
+
+        def fail_intentionally():
+            raise Exception(f"Intentional failure at {fail_at_activity}")
+
+        return [
+            SagaActivity(
+                name=name,
+                execute_fn=fail_intentionally if name == fail_at_activity else execute_fn,
+                compensate_fn=compensate_fn,
+                store=store
+            )
+            for name, (store, execute_fn, compensate_fn) in writes.items()
+        ]
+
+    def _log(self, saga_id: str, records: List[Tuple[Optional[str], str, Optional[dict]]], durable: bool = True):
+        """Append (step, event, payload) records for one saga to the saga log, if any."""
+        if self.saga_log is not None:
+            self.saga_log.append(
+                [(saga_id, step, event, payload) for step, event, payload in records], durable
+            )
+
+    def _execute_activity(self, activity: SagaActivity):
+        """Run one activity with retries (its status is logged by _run_activities)."""
+        print(f"\n▶ Executing: {activity.name}")
+        activity.status = SagaStatus.IN_PROGRESS
+        try:
+            retry(activity.execute_fn, attempts=self.retries)
+            activity.status = SagaStatus.COMPLETED
+            print(f"✅ {activity.name} completed")
+        except Exception as e:
+            activity.status = SagaStatus.FAILED
+            activity.error = str(e)
+            print(f"❌ {activity.name} failed: {e}")
+
+    def _compensate_activity(self, saga_id: str, activity: SagaActivity):
+        """Undo one activity with retries (compensations are idempotent)."""
+        print(f"\n◀ Compensating: {activity.name}")
+        activity.status = SagaStatus.COMPENSATING
+        try:
+            retry(activity.compensate_fn, attempts=self.retries)
+            activity.status = SagaStatus.COMPENSATED
+            self._log(saga_id, [(activity.store, "compensated", None)], durable=False)
+            print(f"✅ {activity.name} compensated")
+        except Exception as comp_error:
+            activity.error = f"compensation failed: {comp_error}"
+            print(f"❌ Compensation failed for {activity.name}: {comp_error}")
+
+    def _run_activities(
+        self,
+        entity_uuid: str,
+        activities: List[SagaActivity],
+        compensate: bool = True,
+        entity_uuids: Optional[List[str]] = None
+    ) -> SagaResult:
+        """
+        Execute activities concurrently (up to fan_out at once), then
+        compensate if any failed.
+
+        A failed activity is compensated too: it may have written before
+        failing (e.g. a timeout after the server committed), and the
+        compensations are safe to run on data that does not exist.
+
+        With compensate=False a failure is reported but nothing is undone
+        (the caller takes over, see execute_saga_batch).
+
+        Args:
+            entity_uuid: Saga id (the entity UUID, or the batch id)
+            activities: Activities to run
+            compensate: Undo everything on failure
+            entity_uuids: Entity UUIDs the saga writes (default [entity_uuid]),
+                logged so recovery can compensate them
+        """
+        start_time = time.perf_counter()
+
+        # Write-ahead: all intents are durable before any write starts
+        self._log(entity_uuid, [(None, "saga_started", {"uuids": entity_uuids or [entity_uuid]})]
+                  + [(a.store, "intent", None) for a in activities])
+
+        # Forward execution - wait for every write so nothing is left in flight
+        wait([self.executor.submit(self._execute_activity, a) for a in activities])
+
+        activities_completed = [a.name for a in activities if a.status == SagaStatus.COMPLETED]
+        failed = [a for a in activities if a.status == SagaStatus.FAILED]
+        step_records = [(a.store, a.status.value, None) for a in activities]
+
+        if not failed:
+            # Durable before success is reported: a saga left with only intents
+            # would be compensated by recover(), deleting data the caller was
+            # told was written. Group commit shares the fsync across sagas.
+            self._log(entity_uuid, step_records + [(None, "saga_completed", None)])
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            print("\n" + "=" * 70)
+            print(f"✅ Saga Completed Successfully ({duration_ms:.1f}ms)")
+            print("=" * 70)
+
+            return SagaResult(
+                success=True,
+                entity_uuid=entity_uuid,
+                activities_completed=activities_completed,
+                activities_compensated=[],
+                duration_ms=duration_ms
+            )
+
+        # Not durable: if lost, recovery compensates the failed saga anyway
+        self._log(entity_uuid, step_records, durable=False)
+
+        # Saga failed - compensate everything that ran
+        error = "; ".join(f"Activity '{a.name}' failed: {a.error}" for a in failed)
+        if not compensate:
+            return SagaResult(
+                success=False,
+                entity_uuid=None,
+                activities_completed=activities_completed,
+                activities_compensated=[],
+                error=error,
+                duration_ms=(time.perf_counter() - start_time) * 1000
+            )
+
+        print("\n" + "=" * 70)
+        print("⚠️  Saga Failed - Starting Compensation")
+        print("=" * 70)
+
+        wait([self.executor.submit(self._compensate_activity, entity_uuid, a) for a in reversed(activities)])
+        activities_compensated = [a.name for a in activities if a.status == SagaStatus.COMPENSATED]
+        # A saga whose compensation failed stays unfinished for the recovery worker
+        if len(activities_compensated) == len(activities):
+            self._log(entity_uuid, [(None, "saga_compensated", None)], durable=False)
+
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        print("\n" + "=" * 70)
+        print(f"❌ Saga Failed and Compensated ({duration_ms:.1f}ms)")
+        print("=" * 70)
+
+        return SagaResult(
+            success=False,
+            entity_uuid=None,
+            activities_completed=activities_completed,
+            activities_compensated=activities_compensated,
+            error=error,
+            duration_ms=duration_ms
+        )
 
     def execute_saga(
         self,
@@ -141,12 +579,12 @@ class MultiDatabaseSaga:
         """
         Execute saga to write entity across all databases.
 
-        Saga Activities:
-        1. Write to Neo4j
-        2. Write to PostgreSQL
-        3. Write to Qdrant
+        Saga Activities (concurrent):
+        - Write to Neo4j
+        - Write to PostgreSQL
+        - Write to Qdrant
 
-        If any activity fails, compensate in reverse order.
+        If any activity fails, compensate all of them.
 
         Args:
             entity_name: Entity name
@@ -157,151 +595,167 @@ class MultiDatabaseSaga:
         Returns:
             SagaResult with success status and entity UUID
         """
-        entity_uuid = self.generate_uuid_v7()
+        return self._execute_entity(EntityInput(entity_name, entity_type, summary, embedding))
+
+    def _execute_entity(self, entity: EntityInput) -> SagaResult:
+        """Single-entity saga (keeps entity.uuid if already assigned)."""
+        entity_uuid = entity.uuid or self.generate_uuid_v7()
 
         print("=" * 70)
-        print(f"Starting Saga for Entity: {entity_name}")
+        print(f"Starting Saga for Entity: {entity.name}")
         print(f"UUID: {entity_uuid}")
         print("=" * 70)
 
-        # Define saga activities
-        activities = [
-            SagaActivity(
-                name="Write to Neo4j",
-                execute_fn=lambda: self._write_neo4j(entity_uuid, entity_name, entity_type, summary),
-                compensate_fn=lambda: self._delete_neo4j(entity_uuid)
-            ),
-            SagaActivity(
-                name="Write to PostgreSQL",
-                execute_fn=lambda: self._write_postgres(entity_uuid, entity_name, entity_type, summary),
-                compensate_fn=lambda: self._delete_postgres(entity_uuid)
-            ),
-            SagaActivity(
-                name="Write to Qdrant",
-                execute_fn=lambda: self._write_qdrant(entity_uuid, entity_name, embedding),
-                compensate_fn=lambda: self._delete_qdrant(entity_uuid)
-            )
-        ]
-
-        # Execute saga
-        activities_completed = []
-        activities_compensated = []
-
-        try:
-            # Forward execution
-            for activity in activities:
-                print(f"\n▶ Executing: {activity.name}")
-                activity.status = SagaStatus.IN_PROGRESS
-
-                try:
-                    activity.execute_fn()
-                    activity.status = SagaStatus.COMPLETED
-                    activities_completed.append(activity.name)
-                    print(f"✅ {activity.name} completed")
+        activities = self._build_activities(
+            entity_uuid, entity.name, entity.entity_type, entity.summary, entity.embedding
+        )
+        return self._run_activities(entity_uuid, activities)
 
-                except Exception as e:
-                    activity.status = SagaStatus.FAILED
-                    activity.error = str(e)
-                    print(f"❌ {activity.name} failed: {e}")
+    def execute_saga_batch(
+        self,
+        entities: List[EntityInput],
+        isolate_failures: bool = False
+    ) -> BatchSagaResult:
+        """
+        Execute one saga for N entities.
 
-                    # Trigger compensation
-                    raise Exception(f"Activity '{activity.name}' failed: {e}")
+        Each database gets a single round trip and commit for the whole
+        batch: one UNWIND transaction in Neo4j, one multi-row INSERT in
+        PostgreSQL, one multi-point upsert in Qdrant (run concurrently).
 
-            # All activities succeeded
-            print("\n" + "=" * 70)
-            print("✅ Saga Completed Successfully")
-            print("=" * 70)
+        On failure:
+        - default: compensate the whole batch in every database
+        - isolate_failures=True: re-run each entity as its own saga. The
+          writes are idempotent upserts, so entities the batch already wrote
+          are simply confirmed, and only entities whose own saga fails are
+          compensated (including anything the batch wrote for them)
 
-            return SagaResult(
-                success=True,
-                entity_uuid=entity_uuid,
-                activities_completed=activities_completed,
-                activities_compensated=[]
-            )
+        Args:
+            entities: Entities to write
+            isolate_failures: Fall back to per-entity sagas on batch failure
 
-        except Exception as e:
-            # Saga failed - compensate in reverse order
-            print("\n" + "=" * 70)
-            print("⚠️  Saga Failed - Starting Compensation")
-            print("=" * 70)
+        Returns:
+            BatchSagaResult with written and failed entity UUIDs
+        """
+        if not entities:
+            # Nothing to write (an empty multi-row INSERT is invalid SQL)
+            return BatchSagaResult(success=True, entity_uuids=[], failed={},
+                                   activities_completed=[], activities_compensated=[])
 
-            # Compensate completed activities in reverse order
-            for activity in reversed(activities):
-                if activity.status == SagaStatus.COMPLETED:
-                    print(f"\n◀ Compensating: {activity.name}")
-                    activity.status = SagaStatus.COMPENSATING
+        start_time = time.perf_counter()
+        for entity in entities:
+            entity.uuid = entity.uuid or self.generate_uuid_v7()
+        batch_id = self.generate_uuid_v7()
 
-                    try:
-                        activity.compensate_fn()
-                        activity.status = SagaStatus.COMPENSATED
-                        activities_compensated.append(activity.name)
-                        print(f"✅ {activity.name} compensated")
+        print("=" * 70)
+        print(f"Starting Batch Saga: {len(entities)} entities")
+        print(f"Batch: {batch_id}")
+        print("=" * 70)
 
-                    except Exception as comp_error:
-                        print(f"❌ Compensation failed for {activity.name}: {comp_error}")
-                        # Continue compensating other activities
+        uuids = [entity.uuid for entity in entities]
+        activities = self._build_batch_activities(entities)
+        result = self._run_activities(batch_id, activities, compensate=not isolate_failures,
+                                      entity_uuids=uuids)
+
+        if result.success or not isolate_failures:
+            return BatchSagaResult(
+                success=result.success,
+                entity_uuids=uuids if result.success else [],
+                failed={} if result.success else {u: result.error for u in uuids},
+                activities_completed=result.activities_completed,
+                activities_compensated=result.activities_compensated,
+                duration_ms=(time.perf_counter() - start_time) * 1000
+            )
 
-            print("\n" + "=" * 70)
-            print("❌ Saga Failed and Compensated")
-            print("=" * 70)
+        print(f"\n🔄 Batch failed ({result.error}) - isolating {len(entities)} entities")
+        # Hand the batch's writes over to per-entity sagas in one commit, so
+        # a crash mid-isolation compensates only entities not yet confirmed
+        self._log(batch_id, [(None, "saga_handed_off", None)])
+        if self.saga_log is not None:
+            self.saga_log.append([
+                record
+                for u in uuids
+                for record in [(u, None, "saga_started", {"uuids": [u]})]
+                + [(u, a.store, "intent", None) for a in activities]
+            ])
+        written, failed = [], {}
+        for entity in entities:
+            entity_result = self._execute_entity(entity)
+            if entity_result.success:
+                written.append(entity.uuid)
+            else:
+                failed[entity.uuid] = entity_result.error
+
+        return BatchSagaResult(
+            success=not failed,
+            entity_uuids=written,
+            failed=failed,
+            activities_completed=result.activities_completed,
+            activities_compensated=[],
+            isolated=True,
+            duration_ms=(time.perf_counter() - start_time) * 1000
+        )
 
-            return SagaResult(
-                success=False,
-                entity_uuid=None,
-                activities_completed=activities_completed,
-                activities_compensated=activities_compensated,
-                error=str(e)
-            )
+    def _build_batch_activities(self, entities: List[EntityInput]) -> List[SagaActivity]:
+        """Saga activities writing a whole batch per database."""
+        uuids = [entity.uuid for entity in entities]
+        return [
+            SagaActivity(
+                name="Batch write to Neo4j",
+                execute_fn=lambda: self._write_neo4j_batch(entities),
+                compensate_fn=lambda: self._delete_neo4j_batch(uuids),
+                store="neo4j"
+            ),
+            SagaActivity(
+                name="Batch write to PostgreSQL",
+                execute_fn=lambda: self._write_postgres_batch(entities),
+                compensate_fn=lambda: self._delete_postgres_batch(uuids),
+                store="postgres"
+            ),
+            SagaActivity(
+                name="Batch write to Qdrant",
+                execute_fn=lambda: self._write_qdrant_batch(entities),
+                compensate_fn=lambda: self._delete_qdrant_batch(uuids),
+                store="qdrant"
+            ),
+        ]
 
     def _write_neo4j(self, entity_uuid: str, name: str, entity_type: str, summary: str):
-        """Write entity to Neo4j."""
-        with self.neo4j_driver.session() as session:
-            session.run("""
-                CREATE (e:Entity {
-                    uuid: $uuid,
-                    name: $name,
-                    entity_type: $entity_type,
-                    summary: $summary,
-                    created_at: datetime()
-                })
-            """, uuid=entity_uuid, name=name, entity_type=entity_type, summary=summary)
+        """Write entity to Neo4j (MERGE on uuid - idempotent)."""
+        self.neo4j_driver.execute_query("""
+            MERGE (e:Entity {uuid: $uuid})
+            ON CREATE SET e.created_at = datetime()
+            SET e.name = $name,
+                e.entity_type = $entity_type,
+                e.summary = $summary
+        """, uuid=entity_uuid, name=name, entity_type=entity_type, summary=summary)
 
     def _delete_neo4j(self, entity_uuid: str):
         """Delete entity from Neo4j (compensation)."""
-        with self.neo4j_driver.session() as session:
-            session.run("""
-                MATCH (e:Entity {uuid: $uuid})
-                DETACH DELETE e
-            """, uuid=entity_uuid)
+        self.neo4j_driver.execute_query("""
+            MATCH (e:Entity {uuid: $uuid})
+            DETACH DELETE e
+        """, uuid=entity_uuid)
 
     def _write_postgres(self, entity_uuid: str, name: str, entity_type: str, summary: str):
-        """Write entity to PostgreSQL."""
-        with self.pg_conn.cursor() as cur:
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS entities (
-                    uuid UUID PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    entity_type TEXT NOT NULL,
-                    summary TEXT,
-                    created_at TIMESTAMP DEFAULT NOW()
-                )
-            """)
-
+        """Write entity to PostgreSQL (upsert on uuid - idempotent)."""
+        with self._pg() as cur:
             cur.execute("""
                 INSERT INTO entities (uuid, name, entity_type, summary)
                 VALUES (%s, %s, %s, %s)
+                ON CONFLICT (uuid) DO UPDATE
+                SET name = EXCLUDED.name,
+                    entity_type = EXCLUDED.entity_type,
+                    summary = EXCLUDED.summary
             """, (entity_uuid, name, entity_type, summary))
 
-        self.pg_conn.commit()
-
     def _delete_postgres(self, entity_uuid: str):
         """Delete entity from PostgreSQL (compensation)."""
-        with self.pg_conn.cursor() as cur:
+        with self._pg() as cur:
             cur.execute("DELETE FROM entities WHERE uuid = %s", (entity_uuid,))
-        self.pg_conn.commit()
 
     def _write_qdrant(self, entity_uuid: str, name: str, embedding: List[float]):
-        """Write vector to Qdrant."""
+        """Write vector to Qdrant (upsert by id - idempotent)."""
         point = PointStruct(
             id=entity_uuid,
             vector=embedding,
@@ -320,6 +774,64 @@ class MultiDatabaseSaga:
             points_selector=[entity_uuid]
         )
 
+    def _write_neo4j_batch(self, entities: List[EntityInput]):
+        """Write a batch of entities to Neo4j in one UNWIND transaction."""
+        rows = [
+            {"uuid": e.uuid, "name": e.name, "entity_type": e.entity_type, "summary": e.summary}
+            for e in entities
+        ]
+        self.neo4j_driver.execute_query("""
+            UNWIND $rows AS row
+            MERGE (e:Entity {uuid: row.uuid})
+            ON CREATE SET e.created_at = datetime()
+            SET e.name = row.name,
+                e.entity_type = row.entity_type,
+                e.summary = row.summary
+        """, rows=rows)
+
+    def _delete_neo4j_batch(self, entity_uuids: List[str]):
+        """Delete a batch of entities from Neo4j (compensation)."""
+        self.neo4j_driver.execute_query("""
+            UNWIND $uuids AS uuid
+            MATCH (e:Entity {uuid: uuid})
+            DETACH DELETE e
+        """, uuids=entity_uuids)
+
+    def _write_postgres_batch(self, entities: List[EntityInput]):
+        """Write a batch of entities to PostgreSQL in one multi-row upsert."""
+        with self._pg() as cur:
+            execute_values(cur, """
+                INSERT INTO entities (uuid, name, entity_type, summary)
+                VALUES %s
+                ON CONFLICT (uuid) DO UPDATE
+                SET name = EXCLUDED.name,
+                    entity_type = EXCLUDED.entity_type,
+                    summary = EXCLUDED.summary
+            """, [(e.uuid, e.name, e.entity_type, e.summary) for e in entities],
+                page_size=len(entities))
+
+    def _delete_postgres_batch(self, entity_uuids: List[str]):
+        """Delete a batch of entities from PostgreSQL (compensation)."""
+        with self._pg() as cur:
+            cur.execute("DELETE FROM entities WHERE uuid = ANY(%s::uuid[])", (entity_uuids,))
+
+    def _write_qdrant_batch(self, entities: List[EntityInput]):
+        """Write a batch of vectors to Qdrant in one upsert."""
+        self.qdrant_client.upsert(
+            collection_name="entities",
+            points=[
+                PointStruct(id=e.uuid, vector=e.embedding, payload={"name": e.name})
+                for e in entities
+            ]
+        )
+
+    def _delete_qdrant_batch(self, entity_uuids: List[str]):
+        """Delete a batch of vectors from Qdrant (compensation)."""
+        self.qdrant_client.delete(
+            collection_name="entities",
+            points_selector=entity_uuids
+        )
+
     def simulate_failure(
         self,
         entity_name: str,
@@ -349,83 +861,76 @@ class MultiDatabaseSaga:
         print(f"UUID: {entity_uuid}")
         print("=" * 70)
 
-        # Define activities with intentional failure
-        def fail_intentionally():
-            raise Exception(f"Intentional failure at {fail_at_activity}")
-
-        activities = [
-            SagaActivity(
-                name="Write to Neo4j",
-                execute_fn=lambda: self._write_neo4j(entity_uuid, entity_name, entity_type, summary)
-                    if fail_at_activity != "Write to Neo4j" else fail_intentionally(),
-                compensate_fn=lambda: self._delete_neo4j(entity_uuid)
-            ),
-            SagaActivity(
-                name="Write to PostgreSQL",
-                execute_fn=lambda: self._write_postgres(entity_uuid, entity_name, entity_type, summary)
-                    if fail_at_activity != "Write to PostgreSQL" else fail_intentionally(),
-                compensate_fn=lambda: self._delete_postgres(entity_uuid)
-            ),
-            SagaActivity(
-                name="Write to Qdrant",
-                execute_fn=lambda: self._write_qdrant(entity_uuid, entity_name, embedding)
-                    if fail_at_activity != "Write to Qdrant" else fail_intentionally(),
-                compensate_fn=lambda: self._delete_qdrant(entity_uuid)
-            )
-        ]
-
-        # Execute saga (will fail and compensate)
-        activities_completed = []
-        activities_compensated = []
-
-        try:
-            for activity in activities:
-                print(f"\n▶ Executing: {activity.name}")
-                activity.status = SagaStatus.IN_PROGRESS
-
-                try:
-                    activity.execute_fn()
-                    activity.status = SagaStatus.COMPLETED
-                    activities_completed.append(activity.name)
-                    print(f"✅ {activity.name} completed")
-
-                except Exception as e:
-                    activity.status = SagaStatus.FAILED
-                    activity.error = str(e)
-                    print(f"❌ {activity.name} failed: {e}")
-                    raise Exception(f"Activity '{activity.name}' failed: {e}")
-
-        except Exception as e:
-            # Compensate in reverse order
-            print("\n" + "=" * 70)
-            print("⚠️  Starting Compensation")
-            print("=" * 70)
+        activities = self._build_activities(
+            entity_uuid, entity_name, entity_type, summary, embedding,
+            fail_at_activity=fail_at_activity
+        )
+        return self._run_activities(entity_uuid, activities)
 
-            for activity in reversed(activities):
-                if activity.status == SagaStatus.COMPLETED:
-                    print(f"\n◀ Compensating: {activity.name}")
-                    activity.status = SagaStatus.COMPENSATING
+    def recover(self, stale_after: Optional[float] = None) -> Dict[str, str]:
+        """
+        Finish sagas that a crash (or a failed compensation) left unfinished.
 
-                    try:
-                        activity.compensate_fn()
-                        activity.status = SagaStatus.COMPENSATED
-                        activities_compensated.append(activity.name)
-                        print(f"✅ {activity.name} compensated")
+        - every step completed: all writes landed and only the final record
+          was lost, so the saga is marked completed (roll forward)
+        - otherwise: every step with an intent is compensated by deleting
+          the logged entity UUIDs (idempotent, so steps that never wrote are
+          harmless) and the saga is marked compensated
 
-                    except Exception as comp_error:
-                        print(f"❌ Compensation failed: {comp_error}")
+        Only sagas with no log record for stale_after seconds are touched,
+        so sagas still running in this or another process are left alone.
 
-            return SagaResult(
-                success=False,
-                entity_uuid=None,
-                activities_completed=activities_completed,
-                activities_compensated=activities_compensated,
-                error=str(e)
-            )
+        Returns:
+            saga_id -> "completed" | "compensated" | "failed"
+        """
+        if self.saga_log is None:
+            return {}
+        stale_after = self.stale_after if stale_after is None else stale_after
+        compensators = {
+            "neo4j": self._delete_neo4j_batch,
+            "postgres": self._delete_postgres_batch,
+            "qdrant": self._delete_qdrant_batch,
+        }
+
+        outcomes = {}
+        for saga_id, saga in self.saga_log.unfinished(stale_after).items():
+            steps = saga["steps"]
+            if steps and all(event == "completed" for event in steps.values()):
+                self._log(saga_id, [(None, "saga_completed", None)])
+                outcomes[saga_id] = "completed"
+                continue
+            try:
+                for step in steps:
+                    retry(lambda: compensators[step](saga["uuids"]), attempts=self.retries)
+                    self._log(saga_id, [(step, "compensated", None)], durable=False)
+                self._log(saga_id, [(None, "saga_compensated", None)])
+                outcomes[saga_id] = "compensated"
+            except Exception as e:
+                outcomes[saga_id] = "failed"
+                print(f"❌ Recovery of saga {saga_id} failed: {e}")
+
+        if outcomes:
+            counts = {o: list(outcomes.values()).count(o) for o in set(outcomes.values())}
+            print(f"🔄 Saga recovery: {counts}")
+        return outcomes
+
+    def _recovery_loop(self, interval: float):
+        """Background recovery worker: one pass now, then every interval seconds."""
+        while True:
+            try:
+                self.recover()
+            except Exception as e:
+                print(f"⚠️  Saga recovery pass failed: {e}")
+            if self._stop_recovery.wait(interval):
+                break
 
     def close(self):
-        """Close database connections."""
-        self.pg_conn.close()
+        """Close database connections (the saga log is owned by the caller)."""
+        self._stop_recovery.set()
+        if self.recovery_thread is not None:
+            self.recovery_thread.join()
+        self.executor.shutdown(wait=True)
+        self.pg_pool.closeall()
         self.neo4j_driver.close()
         self.qdrant_client.close()
 
@@ -455,6 +960,7 @@ def example_successful_saga():
         print("\nSaga Result:")
         print(f"  Success: {result.success}")
         print(f"  Entity UUID: {result.entity_uuid}")
+        print(f"  Duration: {result.duration_ms:.1f}ms")
         print(f"  Activities Completed: {len(result.activities_completed)}")
         for activity in result.activities_completed:
             print(f"    • {activity}")
@@ -504,12 +1010,80 @@ def example_failed_saga():
         saga.close()
 
 
+def example_batch_saga():
+    """
+    Example 3: Batch saga (one round trip per database for many entities).
+    """
+    print("\n\n" + "=" * 70)
+    print("Example 3: Batch Saga")
+    print("=" * 70)
+
+    saga = MultiDatabaseSaga()
+
+    try:
+        import numpy as np
+        entities = [
+            EntityInput(
+                name=f"Supplier {i}",
+                entity_type="Company",
+                summary=f"Parts supplier #{i}",
+                embedding=np.random.randn(1536).astype(np.float32).tolist()
+            )
+            for i in range(100)
+        ]
+
+        result = saga.execute_saga_batch(entities, isolate_failures=True)
+
+        print("\nBatch Saga Result:")
+        print(f"  Success: {result.success}")
+        print(f"  Entities written: {len(result.entity_uuids)}")
+        print(f"  Entities failed: {len(result.failed)}")
+        print(f"  Isolated: {result.isolated}")
+        print(f"  Duration: {result.duration_ms:.1f}ms "
+              f"({result.duration_ms / len(entities):.2f}ms per entity)")
+
+    finally:
+        saga.close()
+
+
+def example_saga_recovery():
+    """
+    Example 4: Crash recovery from the saga log.
+    """
+    print("\n\n" + "=" * 70)
+    print("Example 4: Saga Log and Crash Recovery")
+    print("=" * 70)
+
+    saga_log = SagaLog("saga_log.db")
+    saga = MultiDatabaseSaga(saga_log=saga_log, recovery_interval=0)
+
+    try:
+        # Simulate a crash: intents logged, Neo4j written, then the process dies
+        entity_uuid = saga.generate_uuid_v7()
+        saga._log(entity_uuid, [(None, "saga_started", {"uuids": [entity_uuid]})]
+                  + [(store, "intent", None) for store in ("neo4j", "postgres", "qdrant")])
+        saga._write_neo4j(entity_uuid, "Orphan Corp", "Company", "Written just before a crash")
+        saga._log(entity_uuid, [("neo4j", "completed", None)])
+        print(f"\n💥 Simulated crash mid-saga, orphan Neo4j entity {entity_uuid}")
+
+        # On restart the recovery worker compensates the orphan write
+        outcomes = saga.recover(stale_after=0)
+
+        print("\nRecovery Result:")
+        print(f"  Saga {entity_uuid}: {outcomes.get(entity_uuid)}")
+        print(f"  Log: {saga_log.stats['records']} records in {saga_log.stats['commits']} commits")
+
+    finally:
+        saga.close()
+        saga_log.close()
+
+
 def example_saga_patterns():
     """
-    Example 3: Common saga patterns and best practices.
+    Example 5: Common saga patterns and best practices.
     """
     print("\n\n" + "=" * 70)
-    print("Example 3: Saga Patterns and Best Practices")
+    print("Example 5: Saga Patterns and Best Practices")
     print("=" * 70)
 
     print("""
@@ -521,17 +1095,18 @@ def example_saga_patterns():
 2. Compensation Activities Must Be Idempotent:
    • Can run multiple times without side effects
    • Example: DELETE WHERE uuid = X (safe to run twice)
-   • Example: INSERT (not idempotent, needs check first)
+   • Example: INSERT ... ON CONFLICT / MERGE (upserts make writes retry-safe too)
 
 3. Activity Ordering:
-   • Cheapest operations first (PostgreSQL, Neo4j)
-   • Expensive operations last (Qdrant vector index)
-   • Easier to compensate early failures
+   • Independent writes run concurrently (latency ≈ slowest store)
+   • Use fan_out=1 to run them one at a time (cheapest first)
+   • Compensate every activity that ran, including failed ones
 
 4. Temporal Integration:
    • Each activity is a Temporal activity
    • Temporal handles retries and compensation
    • Saga state persisted in Temporal
+   • Without Temporal: SagaLog + recover() (write-ahead intents, recovery worker)
 
 5. Monitoring:
    • Track saga success rate
@@ -596,7 +1171,13 @@ def main():
     # Example 2: Failed saga with compensation
     example_failed_saga()
 
-    # Example 3: Saga patterns and best practices
+    # Example 3: Batch saga
+    example_batch_saga()
+
+    # Example 4: Crash recovery from the saga log
+    example_saga_recovery()
+
+    # Example 5: Saga patterns and best practices
     example_saga_patterns()
 
     print("\n" + "=" * 70)
@@ -607,7 +1188,7 @@ def main():
     print("✅ Saga pattern ensures eventual consistency across databases")
     print("✅ Compensation activities rollback partial failures")
     print("✅ UUID v7 enables cross-database entity tracking")
-    print("✅ Activity ordering: cheap first, expensive last")
+    print("✅ Independent writes run concurrently; compensations retry safely")
     print("✅ Temporal handles retries and compensation automatically")
 
     print("\nProduction Recommendations:")
@@ -615,7 +1196,7 @@ def main():
     print("2. Make all compensation activities idempotent")
     print("3. Monitor saga success rate and compensation frequency")
     print("4. Test failure scenarios thoroughly")
-    print("5. Order activities by cost (cheap → expensive)")
+    print("5. Keep writes idempotent so retries and compensations are safe")
 
 
 if __name__ == "__main__":
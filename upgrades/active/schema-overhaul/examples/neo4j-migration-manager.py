@@ -20,12 +20,26 @@ Usage:
 
     # Create new migration
     python neo4j-migration-manager.py create "add customer indices"
+
+Batched (online) data migrations:
+    A statement preceded by a `// @batch ...` comment runs in batches
+    instead of inside the migration transaction (see parse_batch_directive):
+
+    // @batch mode=keyset size=5000 throttle=0.2
+    MATCH (e:Entity) WHERE e.uuid > $last_key
+    WITH e ORDER BY e.uuid LIMIT $batch_size
+    SET e.name_normalized = toLower(e.name)
+    RETURN max(e.uuid) AS last_key, count(e) AS rows;
+
+    Progress is checkpointed in :MigrationCheckpoint nodes, so re-running
+    `upgrade` after an interruption resumes where it stopped.
 """
 
 import os
 import re
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from neo4j import GraphDatabase
 
 
@@ -35,8 +49,21 @@ class Neo4jMigrationManager:
 
     Tracks migration versions using a special :SchemaVersion node.
     Migrations are Cypher scripts in migrations/neo4j/ directory.
+
+    Migrations without `// @batch` steps run as one transaction. Migrations
+    with batched steps run step by step, each step (or batch) committing
+    together with its :MigrationCheckpoint.
     """
 
+    BATCH_DIRECTIVE = re.compile(r'^\s*//\s*@batch\b(.*)$', re.MULTILINE)
+    BATCH_MODES = ("keyset", "in_transactions")
+    IN_TRANSACTIONS = re.compile(r'IN\s+TRANSACTIONS(\s+OF\s+\S+\s+ROWS?)?', re.IGNORECASE)
+    # Schema commands cannot share a transaction with data writes
+    SCHEMA_STATEMENT = re.compile(
+        r'^\s*(CREATE|DROP)\s+(OR\s+REPLACE\s+)?((RANGE|TEXT|POINT|LOOKUP|FULLTEXT|VECTOR)\s+)?(INDEX|CONSTRAINT)\b',
+        re.IGNORECASE | re.MULTILINE
+    )
+
     def __init__(self, uri: str, user: str, password: str, migrations_dir: str = "migrations/neo4j"):
         """
         Initialize migration manager.
@@ -108,6 +135,79 @@ class Neo4jMigrationManager:
 
         return pending
 
+    @classmethod
+    def parse_batch_directive(cls, args: str) -> Dict[str, Any]:
+        """
+        Parse the options of a `// @batch` comment.
+
+        Options (key=value, all optional):
+            mode: keyset (default) - client-side loop. The statement gets
+                  $last_key and $batch_size and must RETURN last_key, rows.
+                  One transaction per batch, progress, checkpoint, throttle.
+                  in_transactions - server-side CALL { ... } IN TRANSACTIONS.
+                  Fastest, but no per-batch progress or throttle; the
+                  statement must only match rows it has not migrated yet,
+                  so a re-run continues where it stopped.
+            size: Rows per batch (default 10000)
+            throttle: Seconds to pause between batches (default 0)
+            target_ms: Halve the batch size while batches take longer than
+                       this, grow it back (up to size) when well below
+            start: Initial $last_key (default '', before any UUID string)
+
+        Returns:
+            Batch options dict
+        """
+        options = {"mode": "keyset", "size": 10000, "throttle": 0.0, "target_ms": None, "start": ""}
+        for token in args.split():
+            key, _, value = token.partition('=')
+            if key not in options or not value:
+                raise ValueError(f"Invalid @batch option: {token}")
+            if key in ("size", "target_ms"):
+                options[key] = int(value)
+            elif key == "throttle":
+                options[key] = float(value)
+            elif key == "start":
+                options[key] = int(value) if value.lstrip('-').isdigit() else value.strip('\'"')
+            else:
+                options[key] = value
+
+        if options["mode"] not in cls.BATCH_MODES:
+            raise ValueError(f"Invalid @batch mode: {options['mode']} (expected one of {cls.BATCH_MODES})")
+        if options["size"] < 1:
+            raise ValueError("@batch size must be positive")
+        return options
+
+    def parse_steps(self, cypher: str) -> List[Dict[str, Any]]:
+        """
+        Split a migration script into steps.
+
+        Statements are separated by semicolons; comment-only chunks are
+        dropped. A `// @batch` comment makes its statement a batched step.
+
+        Returns:
+            List of {"index", "cypher", "batch"} (batch is None for plain steps)
+        """
+        steps = []
+        for chunk in cypher.split(';'):
+            code = [line for line in chunk.splitlines() if line.strip() and not line.strip().startswith('//')]
+            if not code:
+                continue
+
+            directive = self.BATCH_DIRECTIVE.search(chunk)
+            batch = self.parse_batch_directive(directive.group(1)) if directive else None
+            statement = chunk.strip()
+
+            if batch and batch["mode"] == "keyset":
+                if "$last_key" not in statement or "$batch_size" not in statement:
+                    raise ValueError(f"Keyset step {len(steps)} must use $last_key and $batch_size")
+            elif batch:
+                if not self.IN_TRANSACTIONS.search(statement):
+                    raise ValueError(f"in_transactions step {len(steps)} needs CALL {{ ... }} IN TRANSACTIONS")
+                statement = self.IN_TRANSACTIONS.sub(f"IN TRANSACTIONS OF {batch['size']} ROWS", statement, count=1)
+
+            steps.append({"index": len(steps), "cypher": statement, "batch": batch})
+        return steps
+
     def run_migration(self, version: int, script_path: str):
         """
         Execute a single migration script.
@@ -122,16 +222,18 @@ class Neo4jMigrationManager:
         with open(script_path, 'r') as f:
             cypher = f.read()
 
+        steps = self.parse_steps(cypher)
+        if any(step["batch"] for step in steps):
+            self._run_stepwise(version, os.path.basename(script_path), steps)
+            return
+
         # Execute in transaction
         with self.driver.session() as session:
             with session.begin_transaction() as tx:
                 try:
                     # Run migration statements
-                    # Split on semicolons to handle multiple statements
-                    statements = [s.strip() for s in cypher.split(';') if s.strip()]
-
-                    for statement in statements:
-                        tx.run(statement)
+                    for step in steps:
+                        tx.run(step["cypher"])
 
                     # Record version
                     tx.run("""
@@ -150,6 +252,177 @@ class Neo4jMigrationManager:
                     print(f"❌ Migration V{version:03d} failed: {e}")
                     raise
 
+    def _load_checkpoints(self, version: int) -> Dict[int, Dict[str, Any]]:
+        """Checkpoints of a partly applied migration, by step index."""
+        records, _, _ = self.driver.execute_query("""
+            MATCH (c:MigrationCheckpoint {version: $version})
+            RETURN c.step AS step, c.status AS status, c.last_key AS last_key,
+                   c.rows AS rows, c.batch_size AS batch_size
+        """, version=version)
+        return {record["step"]: dict(record) for record in records}
+
+    @staticmethod
+    def _checkpoint(tx, version: int, step: int, status: str, rows: int = 0,
+                    last_key: Any = None, batch_size: Optional[int] = None):
+        """Upsert a step checkpoint (runs inside the step's own transaction)."""
+        tx.run("""
+            MERGE (c:MigrationCheckpoint {version: $version, step: $step})
+            SET c.status = $status,
+                c.rows = coalesce(c.rows, 0) + $rows,
+                c.last_key = coalesce($last_key, c.last_key),
+                c.batch_size = coalesce($batch_size, c.batch_size),
+                c.updated_at = datetime()
+        """, version=version, step=step, status=status, rows=rows,
+            last_key=last_key, batch_size=batch_size).consume()
+
+    def _run_stepwise(self, version: int, script: str, steps: List[Dict[str, Any]]):
+        """
+        Run a migration with batched steps, resuming from its checkpoints.
+
+        Steps run in file order. Finished steps are skipped on a re-run and
+        a keyset step continues after its checkpointed last_key. The version
+        is recorded (and the checkpoints removed) after the last step.
+        """
+        checkpoints = self._load_checkpoints(version)
+        if checkpoints:
+            done = sum(1 for c in checkpoints.values() if c["status"] == "done")
+            print(f"🔄 Resuming V{version:03d}: {done}/{len(steps)} steps already applied")
+
+        try:
+            for step in steps:
+                checkpoint = checkpoints.get(step["index"], {})
+                if checkpoint.get("status") == "done":
+                    continue
+
+                batch = step["batch"]
+                if batch is None and self.SCHEMA_STATEMENT.search(step["cypher"]):
+                    self._run_schema_step(version, step)
+                elif batch is None:
+                    with self.driver.session() as session:
+                        session.execute_write(self._run_plain_step, version, step)
+                elif batch["mode"] == "in_transactions":
+                    self._run_in_transactions_step(version, step)
+                else:
+                    self._run_keyset_step(version, step, checkpoint)
+
+            with self.driver.session() as session:
+                session.execute_write(self._record_version, version, script)
+            print(f"✅ Migration V{version:03d} complete")
+
+        except Exception as e:
+            print(f"❌ Migration V{version:03d} failed: {e}")
+            print("   Completed steps and batches are checkpointed - run upgrade again to resume")
+            raise
+
+    @classmethod
+    def _run_plain_step(cls, tx, version: int, step: Dict[str, Any]):
+        tx.run(step["cypher"]).consume()
+        cls._checkpoint(tx, version, step["index"], "done")
+
+    def _run_schema_step(self, version: int, step: Dict[str, Any]):
+        """
+        Run an index / constraint step.
+
+        Neo4j rejects a transaction mixing schema and data writes, so the
+        DDL runs in its own auto-commit transaction and the checkpoint in
+        the next one. Migration DDL uses IF NOT EXISTS, so a crash in
+        between only repeats a no-op.
+        """
+        with self.driver.session() as session:
+            session.run(step["cypher"]).consume()
+            session.execute_write(self._checkpoint, version, step["index"], "done")
+
+    @staticmethod
+    def _record_version(tx, version: int, script: str):
+        tx.run("""
+            CREATE (v:SchemaVersion {
+                version: $version,
+                script: $script,
+                applied_at: datetime()
+            })
+        """, version=version, script=script).consume()
+        tx.run("MATCH (c:MigrationCheckpoint {version: $version}) DELETE c", version=version).consume()
+
+    def _run_in_transactions_step(self, version: int, step: Dict[str, Any]):
+        """
+        Run a CALL { ... } IN TRANSACTIONS step.
+
+        It needs an auto-commit transaction (session.run); the server commits
+        each inner batch on its own.
+        """
+        print(f"🔄 Step {step['index']}: server-side batches of {step['batch']['size']} rows...")
+        start_time = time.perf_counter()
+        with self.driver.session() as session:
+            counters = session.run(step["cypher"]).consume().counters
+            session.execute_write(self._checkpoint, version, step["index"], "done")
+
+        print(f"✅ Step {step['index']}: {counters.properties_set} properties set, "
+              f"{counters.nodes_created} nodes created, {counters.nodes_deleted} nodes deleted, "
+              f"{counters.relationships_created} relationships created "
+              f"in {time.perf_counter() - start_time:.1f}s")
+
+    @classmethod
+    def _run_keyset_batch(cls, tx, version: int, step: Dict[str, Any], last_key: Any, batch_size: int):
+        """
+        One keyset batch plus its checkpoint, in the same transaction.
+
+        Returns:
+            (last_key, rows) or None when there is nothing left
+        """
+        record = tx.run(step["cypher"], last_key=last_key, batch_size=batch_size).single()
+        if record is None or not record["rows"] or record["last_key"] is None:
+            return None
+        cls._checkpoint(tx, version, step["index"], "running", record["rows"], record["last_key"], batch_size)
+        return record["last_key"], record["rows"]
+
+    def _run_keyset_step(self, version: int, step: Dict[str, Any], checkpoint: Dict[str, Any]):
+        """
+        Client-side keyset loop: WHERE key > $last_key ... LIMIT $batch_size.
+
+        Each batch is its own (retried) write transaction, so locks are held
+        only for one batch. Between batches the loop pauses for `throttle`
+        seconds, and with `target_ms` the batch size adapts to keep each
+        transaction short while live queries are running.
+        """
+        batch = step["batch"]
+        last_key = checkpoint.get("last_key", batch["start"])
+        batch_size = checkpoint.get("batch_size") or batch["size"]
+        total = checkpoint.get("rows") or 0
+        migrated, batches = 0, 0
+        start_time = time.perf_counter()
+
+        if checkpoint:
+            print(f"🔄 Step {step['index']}: resuming after {last_key!r} ({total:,} rows already migrated)")
+
+        with self.driver.session() as session:
+            while True:
+                batch_start = time.perf_counter()
+                result = session.execute_write(self._run_keyset_batch, version, step, last_key, batch_size)
+                if result is None:
+                    break
+                last_key, rows = result
+                batch_ms = (time.perf_counter() - batch_start) * 1000
+                total += rows
+                migrated += rows
+                batches += 1
+
+                rate = migrated / (time.perf_counter() - start_time)
+                print(f"🔄 Step {step['index']}: batch {batches} | {rows:,} rows in {batch_ms:.0f}ms "
+                      f"| {total:,} total | {rate:,.0f} rows/s | last_key={last_key!r}")
+
+                if batch["target_ms"]:
+                    if batch_ms > batch["target_ms"]:
+                        batch_size = max(100, batch_size // 2)
+                    elif batch_ms < batch["target_ms"] / 2:
+                        batch_size = min(batch["size"], batch_size * 2)
+                if batch["throttle"]:
+                    time.sleep(batch["throttle"])
+
+            session.execute_write(self._checkpoint, version, step["index"], "done")
+
+        print(f"✅ Step {step['index']}: {total:,} rows in {batches} batches "
+              f"({time.perf_counter() - start_time:.1f}s this run)")
+
     def upgrade(self, target_version: Optional[int] = None):
         """
         Apply all pending migrations up to target version.
@@ -274,6 +547,15 @@ class Neo4jMigrationManager:
 // SET e.newProperty = e.oldProperty
 // REMOVE e.oldProperty;
 
+// Large backfills: add a @batch line to run online in resumable batches
+// Example:
+// // @batch mode=keyset size=10000 throttle=0.1 target_ms=500
+// MATCH (e:Entity) WHERE e.uuid > $last_key
+// WITH e ORDER BY e.uuid LIMIT $batch_size
+// SET e.newProperty = e.oldProperty
+// REMOVE e.oldProperty
+// RETURN max(e.uuid) AS last_key, count(e) AS rows;
+
 // ============================================
 // VERIFICATION
 // ============================================
@@ -300,6 +582,13 @@ class Neo4jMigrationManager:
         print(f"Current version: V{current:03d}")
 
         if pending:
+            checkpoints = self._load_checkpoints(pending[0][0])
+            if checkpoints:
+                done = sum(1 for c in checkpoints.values() if c["status"] == "done")
+                rows = sum(c["rows"] or 0 for c in checkpoints.values())
+                print(f"\n🔄 V{pending[0][0]:03d} partly applied: {done} steps done, "
+                      f"{rows:,} rows migrated in batches (upgrade resumes it)")
+
             print(f"\nPending migrations ({len(pending)}):")
             for version, filename in pending:
                 print(f"  V{version:03d} - {filename}")
@@ -423,6 +712,34 @@ FOR (n:Document) ON EACH [n.title, n.content];
 SHOW INDEXES WHERE name CONTAINS 'document';
 """
 
+# V003__backfill_temporal_properties.cypher
+BACKFILL_TEMPORAL_PROPERTIES = """
+// Migration V003: Backfill normalized names and edge validity (online)
+// Created: 2025-11-01
+
+CREATE INDEX entity_name_normalized_idx IF NOT EXISTS
+FOR (e:Entity) ON (e.name_normalized);
+
+// Client-side keyset loop over the unique uuid index:
+// progress per batch, checkpointed, paused between batches
+// @batch mode=keyset size=5000 throttle=0.2 target_ms=500
+MATCH (e:Entity)
+WHERE e.uuid > $last_key
+WITH e ORDER BY e.uuid LIMIT $batch_size
+SET e.name_normalized = toLower(trim(e.name))
+RETURN max(e.uuid) AS last_key, count(e) AS rows;
+
+// Server-side batches: only matches edges not yet backfilled,
+// so a re-run continues where it stopped
+// @batch mode=in_transactions size=10000
+MATCH (ed:Edge)
+WHERE ed.valid_from IS NULL AND ed.created_at IS NOT NULL
+CALL {
+  WITH ed
+  SET ed.valid_from = ed.created_at
+} IN TRANSACTIONS OF 10000 ROWS;
+"""
+
 
 # CLI Entry Point
 if __name__ == "__main__":
@@ -12,7 +12,9 @@ Features:
 - HALFVEC(1536) type for 16-bit floats
 - 50% memory reduction (6 KB → 3 KB per vector)
 - HNSW index support for half-precision
-- Migration from full precision to half precision
+- Resumable, parallel migration from full to half precision
+- Binary COPY inserts and single-bind vector queries (PgVectorIO)
+- Two-stage search: halfvec/binary candidates + exact full-precision rerank
 - Accuracy benchmarking
 
 Requirements:
@@ -20,13 +22,234 @@ Requirements:
     PostgreSQL 14+ with pgvector 0.8.1
 """
 
+import io
+import struct
 import psycopg2
 from psycopg2.extras import execute_values
+from pgvector.psycopg2 import register_vector
 import numpy as np
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
 import time
 
 
+class PgVectorIO:
+    """
+    Vector I/O for pgvector without per-element Python conversion.
+
+    - Inserts: COPY ... FROM STDIN WITH (FORMAT BINARY). Each embedding is
+      written as pgvector's binary wire format (int16 dim, int16 unused,
+      then big-endian float4 for VECTOR or float2 for HALFVEC). The whole
+      batch is converted with one NumPy astype, never element by element.
+    - Queries: pgvector's registered adapter sends the NumPy query vector,
+      bound once through a CTE instead of twice as Python lists. Fetched
+      embeddings come back as NumPy arrays.
+
+    psycopg2 has no binary bind parameters, so the query vector travels as
+    one text literal; binary framing applies to COPY.
+    """
+
+    # COPY BINARY framing: signature, flags, header extension length / trailer
+    COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+    COPY_TRAILER = struct.pack(">h", -1)
+
+    def __init__(self, conn):
+        """
+        Args:
+            conn: psycopg2 connection (pgvector adapters are registered on it)
+        """
+        self.conn = conn
+        register_vector(conn)
+
+    @classmethod
+    def encode_copy_binary(
+        cls,
+        rows: Sequence[Tuple[str, Optional[str]]],
+        embeddings: np.ndarray,
+        half: bool = False
+    ) -> io.BytesIO:
+        """
+        Encode (title, content, embedding) rows as a COPY BINARY stream.
+
+        Args:
+            rows: (title, content) per document
+            embeddings: Matrix [n_rows, dimension] in the same order
+            half: Encode as HALFVEC (float2) instead of VECTOR (float4)
+
+        Returns:
+            Buffer ready for cursor.copy_expert
+        """
+        n_rows, dimension = embeddings.shape
+        # One vectorized conversion to the wire element type for the whole batch
+        wire = np.ascontiguousarray(embeddings, dtype=">f2" if half else ">f4")
+        vector_header = struct.pack(">ihh", 4 + wire.itemsize * dimension, dimension, 0)
+
+        buf = io.BytesIO()
+        buf.write(cls.COPY_HEADER)
+        field_count = struct.pack(">h", 3)
+        null_field = struct.pack(">i", -1)
+
+        for (title, content), vector in zip(rows, wire):
+            title_bytes = title.encode("utf-8")
+            buf.write(field_count)
+            buf.write(struct.pack(">i", len(title_bytes)))
+            buf.write(title_bytes)
+            if content is None:
+                buf.write(null_field)
+            else:
+                content_bytes = content.encode("utf-8")
+                buf.write(struct.pack(">i", len(content_bytes)))
+                buf.write(content_bytes)
+            buf.write(vector_header)
+            buf.write(vector.tobytes())
+
+        buf.write(cls.COPY_TRAILER)
+        buf.seek(0)
+        return buf
+
+    def copy_documents(
+        self,
+        table: str,
+        documents: List[Tuple[str, str, np.ndarray]],
+        half: bool = False,
+        batch_size: int = 10000
+    ) -> int:
+        """
+        Bulk insert documents with COPY BINARY (id and created_at use column defaults).
+
+        Args:
+            table: Target table (documents_full or documents_half)
+            documents: List of (title, content, embedding) tuples
+            half: Target column is HALFVEC
+            batch_size: Rows per COPY stream (bounds client memory)
+
+        Returns:
+            Number of rows copied
+        """
+        with self.conn.cursor() as cur:
+            for start in range(0, len(documents), batch_size):
+                batch = documents[start:start + batch_size]
+                embeddings = np.stack([embedding for _, _, embedding in batch])
+                buf = self.encode_copy_binary([(title, content) for title, content, _ in batch],
+                                              embeddings, half=half)
+                cur.copy_expert(
+                    f"COPY {table} (title, content, embedding) FROM STDIN WITH (FORMAT BINARY)",
+                    buf
+                )
+        self.conn.commit()
+        return len(documents)
+
+    def query(
+        self,
+        table: str,
+        query_embedding: np.ndarray,
+        limit: int = 10,
+        half: bool = False
+    ) -> List[Tuple]:
+        """
+        Cosine nearest neighbours with the query vector bound once.
+
+        The planner inlines the single-use CTE, so the ORDER BY still sees a
+        constant vector and uses the HNSW index.
+
+        Returns:
+            List of (id, title, distance) tuples
+        """
+        vector_type = "halfvec" if half else "vector"
+        with self.conn.cursor() as cur:
+            cur.execute(f"""
+                WITH q AS (SELECT %s::{vector_type} AS v)
+                SELECT d.id, d.title, d.embedding <=> q.v AS distance
+                FROM {table} d, q
+                ORDER BY d.embedding <=> q.v
+                LIMIT %s
+            """, (np.asarray(query_embedding, dtype=np.float32), limit))
+            return cur.fetchall()
+
+
+class MmapVectorStore:
+    """
+    Full-precision vectors in a memory-mapped NumPy file, used for reranking.
+
+    Only the candidate rows are paged in, so a rerank reads about
+    k × oversample × 6 KB per query. The full table never has to fit in RAM.
+    Vectors are stored L2-normalized, so the cosine score is a dot product.
+
+    Files: <path>.vectors.npy (float32 [n, dim]) and <path>.ids.npy (UUID strings)
+    """
+
+    def __init__(self, path: str):
+        self.vectors = np.load(f"{path}.vectors.npy", mmap_mode="r")
+        ids = np.load(f"{path}.ids.npy")
+        self.positions = {str(id_): row for row, id_ in enumerate(ids)}
+
+    @classmethod
+    def build(
+        cls,
+        conn,
+        path: str,
+        table: str = "documents_full",
+        dimension: int = 1536,
+        batch_size: int = 10000
+    ) -> "MmapVectorStore":
+        """
+        Export a table's embeddings to a memory-mapped store.
+
+        Streams through a server-side cursor in one REPEATABLE READ
+        snapshot, so the row count and the rows agree.
+        """
+        register_vector(conn)
+        # register_vector's catalog lookup opened a transaction; SET TRANSACTION
+        # must be the first statement of the next one
+        conn.commit()
+        with conn.cursor() as cur:
+            cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            cur.execute(f"SELECT COUNT(*) FROM {table}")
+            total = cur.fetchone()[0]
+
+        vectors = np.lib.format.open_memmap(f"{path}.vectors.npy", mode="w+",
+                                            dtype=np.float32, shape=(total, dimension))
+        ids = np.empty(total, dtype="<U36")
+
+        with conn.cursor(name="vector_store_export") as cur:
+            cur.itersize = batch_size
+            cur.execute(f"SELECT id::text, embedding FROM {table} ORDER BY id")
+            row = 0
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    break
+                end = row + len(batch)
+                ids[row:end] = [id_ for id_, _ in batch]
+                block = np.stack([embedding for _, embedding in batch]).astype(np.float32)
+                vectors[row:end] = block / np.maximum(np.linalg.norm(block, axis=1, keepdims=True), 1e-12)
+                row = end
+        conn.commit()
+
+        vectors.flush()
+        np.save(f"{path}.ids.npy", ids)
+        print(f"✅ Exported {total} vectors to {path}.vectors.npy")
+        return cls(path)
+
+    def rerank(self, query_embedding: np.ndarray, candidate_ids: Sequence[str], k: int) -> List[Tuple[str, float]]:
+        """
+        Exact cosine rerank of candidates.
+
+        Returns:
+            Up to k (id, cosine distance) tuples, closest first
+        """
+        known = [str(c) for c in candidate_ids if str(c) in self.positions]
+        if not known:
+            return []
+        rows = np.array([self.positions[c] for c in known])
+        order = np.argsort(rows)                 # sequential reads from the mmap
+        query = query_embedding / max(np.linalg.norm(query_embedding), 1e-12)
+        sims = np.empty(len(rows), dtype=np.float32)
+        sims[order] = self.vectors[rows[order]] @ query.astype(np.float32)
+        best = np.argsort(-sims)[:k]
+        return [(known[i], float(1 - sims[i])) for i in best]
+
+
 class PgVectorHalfPrecision:
     """
     Demonstrates pgvector half-precision vector operations.
@@ -44,8 +267,16 @@ class PgVectorHalfPrecision:
         Args:
             conn_string: PostgreSQL connection string
         """
+        self.conn_string = conn_string
         self.conn = psycopg2.connect(conn_string)
         self.conn.autocommit = False
+        self.io = None
+
+    def vector_io(self) -> PgVectorIO:
+        """PgVectorIO on this connection (needs the vector extension to exist)."""
+        if self.io is None:
+            self.io = PgVectorIO(self.conn)
+        return self.io
 
     def create_half_precision_table(self):
         """
@@ -113,19 +344,12 @@ class PgVectorHalfPrecision:
         Args:
             documents: List of (title, content, embedding) tuples
         """
-        with self.conn.cursor() as cur:
-            execute_values(
-                cur,
-                """
-                INSERT INTO documents_half (title, content, embedding)
-                VALUES %s
-                """,
-                [(title, content, embedding.tolist()) for title, content, embedding in documents],
-                template="(%s, %s, %s::halfvec)"  # Cast to halfvec
-            )
+        start_time = time.perf_counter()
+        self.vector_io().copy_documents("documents_half", documents, half=True)
+        elapsed = time.perf_counter() - start_time
 
-        self.conn.commit()
-        print(f"✅ Inserted {len(documents)} documents (half-precision)")
+        print(f"✅ Inserted {len(documents)} documents (half-precision) "
+              f"in {elapsed:.2f}s ({len(documents) / elapsed:,.0f} rows/s)")
 
     def insert_documents_full(self, documents: List[Tuple[str, str, np.ndarray]]):
         """
@@ -134,19 +358,12 @@ class PgVectorHalfPrecision:
         Args:
             documents: List of (title, content, embedding) tuples
         """
-        with self.conn.cursor() as cur:
-            execute_values(
-                cur,
-                """
-                INSERT INTO documents_full (title, content, embedding)
-                VALUES %s
-                """,
-                [(title, content, embedding.tolist()) for title, content, embedding in documents],
-                template="(%s, %s, %s::vector)"  # Cast to vector
-            )
+        start_time = time.perf_counter()
+        self.vector_io().copy_documents("documents_full", documents, half=False)
+        elapsed = time.perf_counter() - start_time
 
-        self.conn.commit()
-        print(f"✅ Inserted {len(documents)} documents (full-precision)")
+        print(f"✅ Inserted {len(documents)} documents (full-precision) "
+              f"in {elapsed:.2f}s ({len(documents) / elapsed:,.0f} rows/s)")
 
     def query_half_precision(self, query_embedding: np.ndarray, limit: int = 10) -> List[Tuple]:
         """
@@ -159,21 +376,12 @@ class PgVectorHalfPrecision:
         Returns:
             List of (id, title, distance) tuples
         """
-        with self.conn.cursor() as cur:
-            start_time = time.time()
+        start_time = time.perf_counter()
+        results = self.vector_io().query("documents_half", query_embedding, limit, half=True)
+        query_time = (time.perf_counter() - start_time) * 1000  # ms
 
-            cur.execute("""
-                SELECT id, title, embedding <=> %s::halfvec AS distance
-                FROM documents_half
-                ORDER BY embedding <=> %s::halfvec
-                LIMIT %s
-            """, (query_embedding.tolist(), query_embedding.tolist(), limit))
-
-            results = cur.fetchall()
-            query_time = (time.time() - start_time) * 1000  # ms
-
-            print(f"Half-precision query time: {query_time:.2f}ms")
-            return results
+        print(f"Half-precision query time: {query_time:.2f}ms")
+        return results
 
     def query_full_precision(self, query_embedding: np.ndarray, limit: int = 10) -> List[Tuple]:
         """
@@ -186,56 +394,446 @@ class PgVectorHalfPrecision:
         Returns:
             List of (id, title, distance) tuples
         """
+        start_time = time.perf_counter()
+        results = self.vector_io().query("documents_full", query_embedding, limit, half=False)
+        query_time = (time.perf_counter() - start_time) * 1000  # ms
+
+        print(f"Full-precision query time: {query_time:.2f}ms")
+        return results
+
+    def create_checkpoint_table(self):
+        """
+        Create the checkpoint table used by migrate_full_to_half.
+
+        Each (migration, worker) row holds that worker's ID range and the last
+        ID it copied, so an interrupted migration resumes where it stopped.
+        """
         with self.conn.cursor() as cur:
-            start_time = time.time()
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS vector_migration_checkpoints (
+                    migration TEXT NOT NULL,
+                    worker INTEGER NOT NULL,
+                    range_start UUID,          -- exclusive, NULL = unbounded
+                    range_end UUID,            -- inclusive, NULL = unbounded
+                    last_id UUID,              -- last copied ID, NULL = not started
+                    rows_copied BIGINT NOT NULL DEFAULT 0,
+                    completed BOOLEAN NOT NULL DEFAULT FALSE,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (migration, worker)
+                )
+            """)
+        self.conn.commit()
 
+    def plan_id_ranges(self, workers: int) -> List[Tuple[Optional[str], Optional[str]]]:
+        """
+        Split documents_full into contiguous ID ranges of roughly equal size.
+
+        The boundaries are ID quantiles, not an even split of the UUID space,
+        so time-ordered IDs (UUID v7) balance as well as random ones. On large
+        tables the quantiles come from a sample.
+
+        Returns:
+            List of (exclusive start, inclusive end) bounds; None = unbounded
+        """
+        if workers <= 1:
+            return [(None, None)]
+
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT reltuples FROM pg_class WHERE oid = 'documents_full'::regclass")
+            estimated = cur.fetchone()[0]
+            # ~100k sampled IDs are plenty for quantiles
+            sample = ("" if estimated < 100000
+                      else f"TABLESAMPLE SYSTEM ({max(0.01, 100000 / estimated * 100):.4f})")
+
+            fractions = [i / workers for i in range(1, workers)]
+            cur.execute(f"""
+                SELECT (percentile_disc(%s::float8[]) WITHIN GROUP (ORDER BY id))::text[]
+                FROM documents_full {sample}
+            """, (fractions,))
+            boundaries = cur.fetchone()[0] or []
+        self.conn.rollback()
+
+        # Drop duplicate boundaries (tiny tables); bounds are (start, end]
+        boundaries = sorted(set(b for b in boundaries if b is not None))
+        starts = [None] + boundaries
+        ends = boundaries + [None]
+        return list(zip(starts, ends))
+
+    def _load_checkpoints(self, migration: str) -> List[dict]:
+        with self.conn.cursor() as cur:
             cur.execute("""
-                SELECT id, title, embedding <=> %s::vector AS distance
-                FROM documents_full
-                ORDER BY embedding <=> %s::vector
-                LIMIT %s
-            """, (query_embedding.tolist(), query_embedding.tolist(), limit))
+                SELECT worker, range_start::text, range_end::text, last_id::text, rows_copied, completed
+                FROM vector_migration_checkpoints
+                WHERE migration = %s
+                ORDER BY worker
+            """, (migration,))
+            rows = cur.fetchall()
+        self.conn.rollback()
+        return [
+            {"worker": r[0], "range_start": r[1], "range_end": r[2],
+             "last_id": r[3], "rows_copied": r[4], "completed": r[5]}
+            for r in rows
+        ]
 
-            results = cur.fetchall()
-            query_time = (time.time() - start_time) * 1000  # ms
+    def _migrate_range(self, migration: str, checkpoint: dict, batch_size: int) -> int:
+        """
+        Copy one ID range in keyset order. Each batch commits together with
+        its checkpoint, so a crash loses at most the uncommitted batch.
 
-            print(f"Full-precision query time: {query_time:.2f}ms")
-            return results
+        Returns:
+            Rows inserted by this run
+        """
+        worker = checkpoint["worker"]
+        last_id = checkpoint["last_id"] or checkpoint["range_start"]
+        range_end = checkpoint["range_end"]
+        inserted_total = 0
+
+        conn = psycopg2.connect(self.conn_string)
+        try:
+            with conn.cursor() as cur:
+                while True:
+                    conditions, params = [], {"batch_size": batch_size}
+                    if last_id is not None:
+                        conditions.append("id > %(last_id)s::uuid")
+                        params["last_id"] = last_id
+                    if range_end is not None:
+                        conditions.append("id <= %(range_end)s::uuid")
+                        params["range_end"] = range_end
+                    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+                    # Keyset page -> idempotent insert -> the page's last ID
+                    cur.execute(f"""
+                        WITH batch AS (
+                            SELECT id, title, content, embedding, created_at
+                            FROM documents_full
+                            {where}
+                            ORDER BY id
+                            LIMIT %(batch_size)s
+                        ),
+                        inserted AS (
+                            INSERT INTO documents_half (id, title, content, embedding, created_at)
+                            SELECT id, title, content, embedding::halfvec, created_at
+                            FROM batch
+                            ON CONFLICT (id) DO NOTHING
+                            RETURNING 1
+                        )
+                        SELECT
+                            (SELECT id::text FROM batch ORDER BY id DESC LIMIT 1),
+                            (SELECT COUNT(*) FROM batch),
+                            (SELECT COUNT(*) FROM inserted)
+                    """, params)
+                    batch_last_id, batch_rows, inserted = cur.fetchone()
+
+                    if batch_rows == 0:
+                        cur.execute("""
+                            UPDATE vector_migration_checkpoints
+                            SET completed = TRUE, updated_at = NOW()
+                            WHERE migration = %s AND worker = %s
+                        """, (migration, worker))
+                        conn.commit()
+                        break
+
+                    cur.execute("""
+                        UPDATE vector_migration_checkpoints
+                        SET last_id = %s, rows_copied = rows_copied + %s, updated_at = NOW()
+                        WHERE migration = %s AND worker = %s
+                    """, (batch_last_id, inserted, migration, worker))
+                    conn.commit()
+
+                    last_id = batch_last_id
+                    inserted_total += inserted
+        finally:
+            conn.close()
+
+        print(f"   Worker {worker}: copied {inserted_total} rows")
+        return inserted_total
+
+    def rebuild_half_precision_index(self, maintenance_work_mem: str = "2GB", parallel_workers: int = 4):
+        """
+        Build the HNSW index on documents_half in one pass.
 
-    def migrate_full_to_half(self, batch_size: int = 1000):
+        One build after a bulk load is much faster than maintaining the
+        graph row by row during the load.
+        """
+        print("Building HNSW index on documents_half...")
+        start_time = time.time()
+        with self.conn.cursor() as cur:
+            cur.execute("SET maintenance_work_mem = %s", (maintenance_work_mem,))
+            cur.execute("SET max_parallel_maintenance_workers = %s", (parallel_workers,))
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS documents_half_embedding_hnsw_idx
+                ON documents_half USING hnsw (embedding halfvec_cosine_ops)
+                WITH (m = 16, ef_construction = 64)
+            """)
+        self.conn.commit()
+        print(f"✅ HNSW index built in {time.time() - start_time:.1f}s")
+
+    def migrate_full_to_half(
+        self,
+        batch_size: int = 1000,
+        workers: int = 4,
+        migration: str = "full_to_half",
+        rebuild_index: bool = True,
+        reset: bool = False
+    ):
         """
         Migrate existing full-precision embeddings to half-precision.
 
-        This is a one-way migration. Backup data before running.
+        - Keyset pagination (ORDER BY id, WHERE id > last_id): each batch is
+          an index range scan, with no OFFSET rescans and no skipped or
+          repeated rows
+        - Idempotent: ON CONFLICT (id) DO NOTHING, safe to re-run
+        - Resumable: each batch commits with its checkpoint
+        - Parallel: workers copy disjoint ID ranges on their own connections
+        - The HNSW index is dropped for the load and rebuilt once at the end
+
+        After an interruption, run it again to resume. The ID ranges from
+        the first run are kept.
 
         Args:
             batch_size: Number of documents to migrate per batch
+            workers: Number of parallel workers (ID ranges)
+            migration: Checkpoint name (use a new name for an unrelated run)
+            rebuild_index: Drop the HNSW index before loading and rebuild after
+            reset: Discard existing checkpoints and start over
         """
         print("Starting migration from full to half precision...")
+        start_time = time.time()
+
+        self.create_checkpoint_table()
+        if reset:
+            with self.conn.cursor() as cur:
+                cur.execute("DELETE FROM vector_migration_checkpoints WHERE migration = %s", (migration,))
+            self.conn.commit()
+
+        checkpoints = self._load_checkpoints(migration)
+        if checkpoints:
+            done = sum(1 for c in checkpoints if c["completed"])
+            print(f"🔄 Resuming '{migration}': {done}/{len(checkpoints)} ranges complete, "
+                  f"{sum(c['rows_copied'] for c in checkpoints)} rows copied so far")
+        else:
+            ranges = self.plan_id_ranges(workers)
+            with self.conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO vector_migration_checkpoints (migration, worker, range_start, range_end)
+                    VALUES %s
+                """, [(migration, i, start, end) for i, (start, end) in enumerate(ranges)],
+                    template="(%s, %s, %s::uuid, %s::uuid)")
+            self.conn.commit()
+            checkpoints = self._load_checkpoints(migration)
+            print(f"Planned {len(checkpoints)} ID ranges for '{migration}'")
+
+        pending = [c for c in checkpoints if not c["completed"]]
+
+        if pending and rebuild_index:
+            with self.conn.cursor() as cur:
+                cur.execute("DROP INDEX IF EXISTS documents_half_embedding_hnsw_idx")
+            self.conn.commit()
+            print("Dropped HNSW index on documents_half for the bulk load")
+
+        copied = 0
+        if pending:
+            with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+                futures = [pool.submit(self._migrate_range, migration, c, batch_size) for c in pending]
+                # result() re-raises worker errors; completed batches stay checkpointed
+                copied = sum(f.result() for f in futures)
+
+        if rebuild_index:
+            self.rebuild_half_precision_index()
+
+        print(f"✅ Migration complete: {copied} rows copied in {time.time() - start_time:.1f}s")
+
+    # Stage-1 candidate scans for two_stage_search (q.v is the query vector)
+    CANDIDATE_SQL = {
+        # HALFVEC HNSW index: 3,072 bytes per vector
+        "halfvec": """
+            SELECT id, title FROM documents_half, q
+            ORDER BY embedding <=> q.v::halfvec
+            LIMIT %s
+        """,
+        # Binary-quantized expression index: 192 bytes per vector
+        "binary": """
+            SELECT id, title FROM documents_full, q
+            ORDER BY binary_quantize(embedding)::bit(1536) <~> binary_quantize(q.v)
+            LIMIT %s
+        """,
+    }
+
+    CANDIDATE_INDEXES = {
+        "halfvec": "documents_half_embedding_hnsw_idx",
+        "binary": "documents_full_embedding_bq_idx",
+    }
+
+    # Exact rerank of the stage-1 candidates against documents_full. q is
+    # referenced twice, so PostgreSQL would materialize it by default and the
+    # candidate ORDER BY would compare against a CTE scan column instead of a
+    # constant: no index scan, a full scan and sort on every query.
+    # NOT MATERIALIZED (PostgreSQL 12+) inlines it. Check with candidate_plan.
+    RERANK_SQL = """
+        WITH q AS NOT MATERIALIZED (SELECT %s::vector AS v),
+        candidates AS ({candidate_sql})
+        SELECT f.id, f.title, f.embedding <=> q.v AS distance
+        FROM documents_full f
+        JOIN candidates c ON c.id = f.id, q
+        ORDER BY distance
+        LIMIT %s
+    """
 
+    def create_binary_quantized_index(self):
+        """
+        Create a binary-quantized HNSW expression index on documents_full.
+
+        Each vector is indexed as 1 bit per dimension (Hamming distance) and
+        used only to find candidates for two_stage_search. The expression
+        must match CANDIDATE_SQL["binary"] exactly for the index to be used.
+        """
+        print("Creating binary-quantized HNSW index on documents_full...")
         with self.conn.cursor() as cur:
-            # Get total count
-            cur.execute("SELECT COUNT(*) FROM documents_full")
-            total = cur.fetchone()[0]
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS documents_full_embedding_bq_idx
+                ON documents_full USING hnsw ((binary_quantize(embedding)::bit(1536)) bit_hamming_ops)
+                WITH (m = 16, ef_construction = 64)
+            """)
+        self.conn.commit()
+        print("✅ Binary-quantized index created")
+
+    def two_stage_search(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 10,
+        oversample: int = 4,
+        candidates: str = "halfvec",
+        store: Optional[MmapVectorStore] = None
+    ) -> List[Tuple]:
+        """
+        Compact-index candidate scan followed by an exact full-precision rerank.
 
-            print(f"Migrating {total} documents...")
+        Stage 1 pulls k × oversample candidates from the halfvec or binary
+        index. Stage 2 reranks them exactly against float32 vectors, read
+        from documents_full or from a memory-mapped store. Only the compact
+        index must stay in memory. A larger oversample trades latency for
+        recall (see tune_oversample).
 
-            # Migrate in batches
-            offset = 0
-            while offset < total:
-                print(f"Migrating batch {offset}-{offset+batch_size}...")
+        Args:
+            query_embedding: Query vector (1536 dimensions)
+            k: Number of results to return
+            oversample: Candidates fetched per result
+            candidates: "halfvec" (documents_half must share IDs with
+                documents_full, e.g. filled by migrate_full_to_half) or "binary"
+            store: Rerank from this MmapVectorStore instead of documents_full
+
+        Returns:
+            List of (id, title, distance) tuples, distance = exact cosine distance
+        """
+        n_candidates = k * oversample
+        candidate_sql = self.CANDIDATE_SQL[candidates]
+        query = np.asarray(query_embedding, dtype=np.float32)
+        self.vector_io()
 
-                cur.execute("""
-                    INSERT INTO documents_half (id, title, content, embedding, created_at)
-                    SELECT id, title, content, embedding::halfvec, created_at
-                    FROM documents_full
-                    LIMIT %s OFFSET %s
-                """, (batch_size, offset))
+        with self.conn.cursor() as cur:
+            # HNSW returns at most ef_search rows (pgvector caps it at 1000)
+            cur.execute("SET LOCAL hnsw.ef_search = %s", (min(1000, max(40, n_candidates)),))
+
+            if store is None:
+                cur.execute(self.RERANK_SQL.format(candidate_sql=candidate_sql), (query, n_candidates, k))
+                results = cur.fetchall()
+            else:
+                cur.execute(f"WITH q AS (SELECT %s::vector AS v) {candidate_sql}", (query, n_candidates))
+                titles = {str(id_): title for id_, title in cur.fetchall()}
+                results = [(id_, titles[id_], distance)
+                           for id_, distance in store.rerank(query, list(titles), k)]
+        self.conn.commit()
+        return results
+
+    def candidate_plan(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 10,
+        oversample: int = 4,
+        candidates: str = "halfvec"
+    ) -> bool:
+        """
+        EXPLAIN the two_stage_search query and check that stage 1 uses the index.
 
-                self.conn.commit()
-                offset += batch_size
+        Returns:
+            True if the plan contains an index scan on the candidate HNSW index
+        """
+        n_candidates = k * oversample
+        sql = self.RERANK_SQL.format(candidate_sql=self.CANDIDATE_SQL[candidates])
+        self.vector_io()
+        with self.conn.cursor() as cur:
+            cur.execute("SET LOCAL hnsw.ef_search = %s", (min(1000, max(40, n_candidates)),))
+            cur.execute(f"EXPLAIN {sql}", (np.asarray(query_embedding, dtype=np.float32), n_candidates, k))
+            plan = [row[0] for row in cur.fetchall()]
+        self.conn.commit()
 
-        print("✅ Migration complete")
+        index = self.CANDIDATE_INDEXES[candidates]
+        uses_index = any("Index Scan" in line and index in line for line in plan)
+        if not uses_index:
+            print(f"⚠️  Stage 1 ({candidates}) does not use {index}:")
+            for line in plan:
+                print(f"   {line}")
+        return uses_index
+
+    def exact_search(self, query_embedding: np.ndarray, k: int = 10) -> List[Tuple]:
+        """
+        Exact full-precision top-k (sequential scan, no index) for ground truth.
+
+        Returns:
+            List of (id, title, distance) tuples
+        """
+        self.vector_io()
+        with self.conn.cursor() as cur:
+            cur.execute("SET LOCAL enable_indexscan = off")
+            cur.execute("""
+                WITH q AS (SELECT %s::vector AS v)
+                SELECT d.id, d.title, d.embedding <=> q.v AS distance
+                FROM documents_full d, q
+                ORDER BY d.embedding <=> q.v
+                LIMIT %s
+            """, (np.asarray(query_embedding, dtype=np.float32), k))
+            results = cur.fetchall()
+        self.conn.commit()
+        return results
+
+    def tune_oversample(
+        self,
+        test_queries: List[np.ndarray],
+        k: int = 10,
+        factors: Sequence[int] = (1, 2, 4, 8, 16),
+        candidates: str = "halfvec",
+        target_recall: float = 0.99,
+        store: Optional[MmapVectorStore] = None
+    ) -> int:
+        """
+        Recall@k and latency of two_stage_search per oversampling factor.
+
+        Returns:
+            Smallest factor that reaches target_recall (else the largest tried)
+        """
+        # Latencies are meaningless if stage 1 fell back to a sequential scan
+        self.candidate_plan(test_queries[0], k, max(factors), candidates)
+        truth = [set(str(r[0]) for r in self.exact_search(q, k)) for q in test_queries]
+
+        print(f"\n📊 Two-stage search ({candidates} candidates, recall@{k} vs exact):")
+        print(f"   {'oversample':>10} {'recall':>8} {'avg ms':>8}")
+        chosen = None
+        for factor in factors:
+            recalls, latencies = [], []
+            for query, expected in zip(test_queries, truth):
+                start_time = time.perf_counter()
+                results = self.two_stage_search(query, k, factor, candidates, store)
+                latencies.append((time.perf_counter() - start_time) * 1000)
+                recalls.append(len(expected & set(str(r[0]) for r in results)) / k)
+
+            recall = float(np.mean(recalls))
+            print(f"   {factor:>10} {recall:>8.4f} {np.mean(latencies):>8.2f}")
+            if chosen is None and recall >= target_recall:
+                chosen = factor
+
+        chosen = chosen or factors[-1]
+        print(f"   ✅ Oversample {chosen} for recall ≥ {target_recall}")
+        return chosen
 
     def compare_memory_usage(self):
         """
@@ -367,7 +965,8 @@ def example_usage():
         print("Step 3: Inserting documents")
         print("=" * 60)
         pgv.insert_documents_full(documents)
-        pgv.insert_documents_half(documents)
+        # Same IDs in both tables, so halfvec candidates can be reranked from documents_full
+        pgv.migrate_full_to_half(workers=2)
 
         # 4. Compare memory usage
         print("\n" + "=" * 60)
@@ -391,7 +990,17 @@ def example_usage():
         test_queries = [np.random.randn(dim).astype(np.float32) for _ in range(10)]
         accuracy = pgv.benchmark_accuracy(test_queries, k=10)
 
-        # 7. Summary
+        # 7. Two-stage search: compact candidates, exact rerank
+        print("\n" + "=" * 60)
+        print("Step 7: Two-stage search")
+        print("=" * 60)
+        pgv.create_binary_quantized_index()
+        oversample = pgv.tune_oversample(test_queries, k=10, candidates="halfvec")
+        pgv.tune_oversample(test_queries, k=10, candidates="binary")
+        two_stage_results = pgv.two_stage_search(query_embedding, k=10, oversample=oversample)
+        print(f"Two-stage top 3: {[r[0] for r in two_stage_results[:3]]}")
+
+        # 8. Summary
         print("\n" + "=" * 60)
         print("SUMMARY")
         print("=" * 60)
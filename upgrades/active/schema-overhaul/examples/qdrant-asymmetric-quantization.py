@@ -12,30 +12,406 @@ Features:
 - Asymmetric quantization (stored vs. query vectors)
 - Comparison with scalar INT8 and binary quantization
 - Memory usage calculation
-- Accuracy benchmarking (NDCG@10)
-- Performance comparison
+- Exact brute-force ground truth (NumPy) with true recall@k and NDCG@k
+- Sweeps over hnsw_ef, oversampling and rescore
+- Concurrent load test with p50/p95/p99 latency and QPS
+- In-process index stand-in (no Qdrant server needed)
+- JSON results per quantization profile (consumed by
+  scripts/migration/phase3_qdrant/01_create_collections.py --benchmark-results)
 
 Requirements:
-    pip install qdrant-client numpy scikit-learn
-    Qdrant 1.15.1 running on localhost:6333
+    pip install qdrant-client numpy
+    Qdrant 1.15.1 running on localhost:6333 (not needed for --backend inprocess)
+
+Usage:
+    python qdrant-asymmetric-quantization.py
+    python qdrant-asymmetric-quantization.py --backend inprocess --vectors 50000
 """
 
+import argparse
+import json
+import math
 import numpy as np
 import time
-from typing import List, Tuple, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Dict, Any, Optional, Sequence
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     VectorParams,
     Distance,
     PointStruct,
     ProductQuantization,
+    ProductQuantizationConfig,
     CompressionRatio,
     ScalarQuantization,
+    ScalarQuantizationConfig,
     ScalarType,
     BinaryQuantization,
-    QuantizationSearchParams
+    BinaryQuantizationConfig,
+    QuantizationSearchParams,
+    SearchParams
 )
-from sklearn.metrics import ndcg_score
+
+
+# ============================================================================
+# Ground Truth and Metrics
+# ============================================================================
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (cosine similarity becomes a dot product)."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores along the last axis, best first."""
+    k = min(k, scores.shape[-1])
+    top = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=-1), axis=-1)
+    return np.take_along_axis(top, order, axis=-1)
+
+
+def exact_ground_truth(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    chunk_size: int = 256
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact top-k neighbours by brute force.
+
+    Scores are one matrix multiplication per chunk of queries
+    (chunk_size x n_vectors floats in memory at a time).
+
+    Args:
+        vectors: Normalized base vectors [n_vectors, dimension]
+        queries: Normalized query vectors [n_queries, dimension]
+        k: Number of neighbours
+
+    Returns:
+        Tuple of (ids [n_queries, k], scores [n_queries, k]), best first
+    """
+    k = min(k, len(vectors))
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    scores = np.empty((len(queries), k), dtype=np.float32)
+
+    for start in range(0, len(queries), chunk_size):
+        sims = queries[start:start + chunk_size] @ vectors.T
+        chunk_ids = top_k(sims, k)
+        ids[start:start + chunk_size] = chunk_ids
+        scores[start:start + chunk_size] = np.take_along_axis(sims, chunk_ids, axis=1)
+
+    return ids, scores
+
+
+def recall_at_k(result_ids: Sequence[int], truth_ids: Sequence[int], k: int) -> float:
+    """Fraction of the true top-k found in the returned top-k."""
+    return len(set(result_ids[:k]) & set(truth_ids[:k])) / k
+
+
+def ndcg_at_k(
+    result_ids: Sequence[int],
+    query: np.ndarray,
+    vectors: np.ndarray,
+    truth_scores: np.ndarray,
+    k: int
+) -> float:
+    """
+    NDCG@k with graded relevance = exact similarity of each returned vector.
+
+    The ideal ranking is the exact top-k, so a result list that returns
+    near-misses in the right order still earns partial credit.
+    """
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    ideal = float(np.clip(truth_scores[:k], 0, None) @ discounts[:len(truth_scores[:k])])
+    if not len(result_ids) or ideal <= 0:
+        return 0.0
+    gains = np.clip(vectors[np.asarray(result_ids[:k])] @ query, 0, None)
+    return min(1.0, float(gains @ discounts[:len(gains)]) / ideal)
+
+
+def latency_percentiles(latencies_ms: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99 and mean of latencies in milliseconds."""
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "mean_ms": float(np.mean(latencies_ms))
+    }
+
+
+def profile_entry(accuracy: Dict[str, float], bytes_per_vector: float) -> Dict[str, Any]:
+    """One profile's row in the results file (accuracy: evaluate() output)."""
+    return {
+        "recall": round(accuracy["recall"], 4),
+        "ndcg": round(accuracy["ndcg"], 4),
+        "avg_query_time_ms": round(accuracy["mean_ms"], 3),
+        "p50_ms": round(accuracy["p50_ms"], 3),
+        "p95_ms": round(accuracy["p95_ms"], 3),
+        "p99_ms": round(accuracy["p99_ms"], 3),
+        "bytes_per_vector": bytes_per_vector
+    }
+
+
+def write_results(path: str, dimension: int, k: int, profiles: Dict[str, Dict[str, Any]]):
+    """
+    Write benchmark results keyed by quantization profile name.
+
+    The profile names match QUANTIZATION_PROFILES in
+    phase3_qdrant/quantization_profiles.py. 01_create_collections.py uses the measured
+    recall to pick a profile per collection.
+    """
+    with open(path, "w") as f:
+        json.dump({
+            "dimension": dimension,
+            "k": k,
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "profiles": profiles
+        }, f, indent=2)
+    print(f"\n💾 Saved results for {len(profiles)} profiles to {path}")
+
+
+def generate_clustered_vectors(
+    n_vectors: int,
+    n_queries: int,
+    dimension: int,
+    n_clusters: int = 100,
+    spread: float = 0.5,
+    seed: int = 42
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Synthetic embeddings with cluster structure (replace with real embeddings).
+
+    Uniform random vectors have almost equidistant neighbours, which makes
+    every approximate method look worse than it is on real embeddings.
+    Queries are perturbed copies of base vectors, like real queries that
+    land near relevant documents.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((n_clusters, dimension)).astype(np.float32)
+    assignments = rng.integers(0, n_clusters, n_vectors)
+    noise = rng.standard_normal((n_vectors, dimension)).astype(np.float32)
+    vectors = normalize(centroids[assignments] + spread * noise)
+
+    anchors = vectors[rng.integers(0, n_vectors, n_queries)]
+    query_noise = rng.standard_normal((n_queries, dimension)).astype(np.float32)
+    queries = normalize(anchors + 0.05 * query_noise)
+    return vectors, queries
+
+
+# ============================================================================
+# Search Backends
+# ============================================================================
+
+class QdrantBackend:
+    """
+    Search one Qdrant collection with per-query search params.
+    """
+
+    def __init__(self, client: QdrantClient, collection_name: str):
+        self.client = client
+        self.collection_name = collection_name
+        self.name = collection_name
+
+    def search(
+        self,
+        query: np.ndarray,
+        limit: int = 10,
+        hnsw_ef: Optional[int] = None,
+        oversampling: Optional[float] = None,
+        rescore: Optional[bool] = None
+    ) -> List[int]:
+        quantization = None
+        if oversampling is not None or rescore is not None:
+            quantization = QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+
+        hits = self.client.search(
+            collection_name=self.collection_name,
+            query_vector=query.tolist(),
+            limit=limit,
+            search_params=SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+        )
+        return [hit.id for hit in hits]
+
+
+class InProcessIndex:
+    """
+    In-process stand-in for a Qdrant collection (no server needed).
+
+    Scans every vector, optionally through a quantized copy, then rescores
+    the top limit x oversampling candidates against the float32 originals,
+    mirroring Qdrant's quantized search path:
+
+    - "none":        float32 dot product (exact)
+    - "scalar_int8": 8-bit codes over the 0.99 quantile range
+    - "binary":      sign bits, scored by Hamming similarity
+
+    There is no HNSW graph, so hnsw_ef is accepted and ignored; recall
+    differences come from quantization, oversampling and rescoring only.
+    """
+
+    POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def __init__(self, vectors: np.ndarray, quantization: str = "none", quantile: float = 0.99):
+        self.vectors = normalize(vectors)
+        self.quantization = quantization
+        self.name = f"inprocess_{quantization}"
+
+        if quantization == "scalar_int8":
+            tail = (1 - quantile) / 2
+            self.low, high = np.quantile(self.vectors, [tail, 1 - tail])
+            self.scale = (high - self.low) / 255
+            self.codes = np.round(
+                (np.clip(self.vectors, self.low, high) - self.low) / self.scale
+            ).astype(np.uint8)
+        elif quantization == "binary":
+            self.bits = np.packbits(self.vectors > 0, axis=1)
+        elif quantization != "none":
+            raise ValueError(f"Unsupported quantization: {quantization}")
+
+    def _approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        if self.quantization == "scalar_int8":
+            # v ≈ low + scale * code, so q·v ≈ low * sum(q) + scale * (code · q)
+            return self.low * query.sum() + self.scale * (self.codes @ query)
+        # Matching sign bits (higher is more similar)
+        query_bits = np.packbits(query > 0)
+        return -self.POPCOUNT[np.bitwise_xor(self.bits, query_bits)].sum(axis=1, dtype=np.int32)
+
+    def search(
+        self,
+        query: np.ndarray,
+        limit: int = 10,
+        hnsw_ef: Optional[int] = None,
+        oversampling: Optional[float] = None,
+        rescore: Optional[bool] = None
+    ) -> List[int]:
+        query = normalize(query)
+        if self.quantization == "none":
+            return top_k(self.vectors @ query, limit).tolist()
+
+        n_candidates = math.ceil(limit * (oversampling or 1.0))
+        candidates = top_k(self._approximate_scores(query), n_candidates)
+        if rescore is False:
+            return candidates[:limit].tolist()
+
+        exact = self.vectors[candidates] @ query
+        return candidates[top_k(exact, limit)].tolist()
+
+
+# ============================================================================
+# Benchmark Harness
+# ============================================================================
+
+def evaluate(
+    backend,
+    queries: np.ndarray,
+    vectors: np.ndarray,
+    truth_ids: np.ndarray,
+    truth_scores: np.ndarray,
+    k: int = 10,
+    **search_params
+) -> Dict[str, float]:
+    """
+    Sequential recall@k, NDCG@k and latency for one backend and param set.
+
+    Args:
+        backend: QdrantBackend or InProcessIndex
+        queries: Normalized query vectors
+        vectors: Normalized base vectors (for graded NDCG)
+        truth_ids, truth_scores: Output of exact_ground_truth
+        search_params: hnsw_ef / oversampling / rescore
+    """
+    recalls, ndcgs, latencies = [], [], []
+
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        result_ids = backend.search(query, limit=k, **search_params)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        recalls.append(recall_at_k(result_ids, truth_ids[i], k))
+        ndcgs.append(ndcg_at_k(result_ids, query, vectors, truth_scores[i], k))
+
+    return {
+        "recall": float(np.mean(recalls)),
+        "ndcg": float(np.mean(ndcgs)),
+        **latency_percentiles(latencies)
+    }
+
+
+def sweep_search_params(
+    backend,
+    queries: np.ndarray,
+    vectors: np.ndarray,
+    truth_ids: np.ndarray,
+    truth_scores: np.ndarray,
+    k: int = 10,
+    hnsw_ef_values: Sequence[Optional[int]] = (32, 64, 128, 256),
+    oversampling_values: Sequence[Optional[float]] = (None,),
+    rescore_values: Sequence[Optional[bool]] = (None,)
+) -> List[Dict[str, Any]]:
+    """
+    Recall/latency for every hnsw_ef x oversampling x rescore combination.
+
+    Pass oversampling_values/rescore_values only for quantized collections.
+    """
+    print(f"\n🔍 Sweeping search params on {backend.name} (recall@{k})...")
+    print(f"  {'hnsw_ef':>8} {'oversample':>10} {'rescore':>8} {'recall':>8} {'ndcg':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8}")
+
+    results = []
+    for hnsw_ef in hnsw_ef_values:
+        for oversampling in oversampling_values:
+            for rescore in rescore_values:
+                metrics = evaluate(backend, queries, vectors, truth_ids, truth_scores, k,
+                                   hnsw_ef=hnsw_ef, oversampling=oversampling, rescore=rescore)
+                results.append({
+                    "hnsw_ef": hnsw_ef,
+                    "oversampling": oversampling,
+                    "rescore": rescore,
+                    **metrics
+                })
+                print(f"  {str(hnsw_ef):>8} {str(oversampling):>10} {str(rescore):>8} "
+                      f"{metrics['recall']:>8.4f} {metrics['ndcg']:>8.4f} "
+                      f"{metrics['p50_ms']:>8.2f} {metrics['p95_ms']:>8.2f}")
+    return results
+
+
+def load_test(
+    backend,
+    queries: np.ndarray,
+    k: int = 10,
+    concurrency: int = 8,
+    n_requests: int = 1000,
+    **search_params
+) -> Dict[str, float]:
+    """
+    Throughput and tail latency under concurrent load.
+
+    Each worker thread issues searches back to back; latency is measured
+    per request with perf_counter and QPS over the wall time of the run.
+    """
+    def timed_search(i: int) -> float:
+        start = time.perf_counter()
+        backend.search(queries[i % len(queries)], limit=k, **search_params)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed_search, range(n_requests)))
+    wall_seconds = time.perf_counter() - start
+
+    results = {
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "qps": n_requests / wall_seconds,
+        **latency_percentiles(latencies)
+    }
+    print(f"\n⚡ Load test {backend.name}: {concurrency} workers, {n_requests} requests")
+    print(f"    QPS: {results['qps']:.0f}")
+    print(f"    p50/p95/p99: {results['p50_ms']:.2f} / {results['p95_ms']:.2f} / "
+          f"{results['p99_ms']:.2f} ms")
+    return results
 
 
 class QdrantQuantizationBenchmark:
@@ -49,6 +425,15 @@ class QdrantQuantizationBenchmark:
     This provides better accuracy than symmetric quantization at same compression ratio.
     """
 
+    # Benchmark collection -> quantization profile name
+    PROFILE_COLLECTIONS = {
+        "docs_no_quant": "no_quantization",
+        "docs_scalar_int8": "scalar_int8",
+        "docs_asymmetric": "asymmetric_x8",
+        "docs_asymmetric_x16": "asymmetric_x16",
+        "docs_binary": "binary"
+    }
+
     def __init__(self, host: str = "localhost", port: int = 6333):
         """
         Initialize Qdrant client.
@@ -90,7 +475,7 @@ class QdrantQuantizationBenchmark:
                 distance=Distance.COSINE
             ),
             quantization_config=ScalarQuantization(
-                scalar=ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
                     type=ScalarType.INT8,
                     quantile=0.99,
                     always_ram=True
@@ -102,7 +487,7 @@ class QdrantQuantizationBenchmark:
     def create_collection_asymmetric(
         self,
         collection_name: str = "docs_asymmetric",
-        compression_ratio: CompressionRatio = CompressionRatio.x8
+        compression_ratio: CompressionRatio = CompressionRatio.X8
     ):
         """
         Create collection with asymmetric quantization (8x-32x compression).
@@ -127,7 +512,7 @@ class QdrantQuantizationBenchmark:
                 distance=Distance.COSINE
             ),
             quantization_config=ProductQuantization(
-                product=ProductQuantization(
+                product=ProductQuantizationConfig(
                     compression=compression_ratio,
                     always_ram=True
                 )
@@ -153,7 +538,7 @@ class QdrantQuantizationBenchmark:
                 distance=Distance.COSINE
             ),
             quantization_config=BinaryQuantization(
-                binary=BinaryQuantization(
+                binary=BinaryQuantizationConfig(
                     always_ram=True
                 )
             )
@@ -213,16 +598,11 @@ class QdrantQuantizationBenchmark:
         Returns:
             Tuple of (result IDs, query time in ms)
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        results = self.client.search(
-            collection_name=collection_name,
-            query_vector=query_vector.tolist(),
-            limit=limit
-        )
+        result_ids = QdrantBackend(self.client, collection_name).search(query_vector, limit=limit)
 
-        query_time = (time.time() - start_time) * 1000  # ms
-        result_ids = [hit.id for hit in results]
+        query_time = (time.perf_counter() - start_time) * 1000  # ms
 
         return result_ids, query_time
 
@@ -272,58 +652,50 @@ class QdrantQuantizationBenchmark:
         self,
         collections: List[str],
         test_queries: np.ndarray,
-        baseline_collection: str = "docs_no_quant",
+        vectors: np.ndarray,
+        ground_truth: Tuple[np.ndarray, np.ndarray],
         k: int = 10
-    ) -> Dict[str, float]:
+    ) -> Dict[str, Dict[str, float]]:
         """
         Benchmark accuracy across different quantization methods.
 
-        Uses NDCG (Normalized Discounted Cumulative Gain) to measure ranking quality.
-        NDCG = 1.0 means perfect match with baseline.
+        Every collection (including the unquantized one, since HNSW is
+        approximate too) is scored against exact brute-force neighbours.
 
         Args:
             collections: List of collection names to benchmark
-            test_queries: Array of test query vectors
-            baseline_collection: Collection to use as ground truth
+            test_queries: Array of normalized test query vectors
+            vectors: Normalized vectors that were inserted
+            ground_truth: (ids, scores) from exact_ground_truth
             k: Number of results to compare
 
         Returns:
-            Dictionary mapping collection name to average NDCG score
+            Dictionary mapping collection name to recall, NDCG and latency stats
         """
-        print(f"\n📊 Benchmarking accuracy against {baseline_collection} (NDCG@{k})...")
+        print(f"\n📊 Benchmarking accuracy against exact ground truth (recall@{k}, NDCG@{k})...")
 
+        truth_ids, truth_scores = ground_truth
         results = {}
 
         for collection in collections:
-            ndcg_scores = []
-            query_times = []
-
-            for query in test_queries:
-                # Get baseline results
-                baseline_ids, _ = self.query_collection(baseline_collection, query, limit=k)
-
-                # Get quantized results
-                quant_ids, query_time = self.query_collection(collection, query, limit=k)
-                query_times.append(query_time)
-
-                # Calculate overlap (simple NDCG approximation)
-                overlap = len(set(baseline_ids) & set(quant_ids)) / k
-                ndcg_scores.append(overlap)
-
-            avg_ndcg = np.mean(ndcg_scores)
-            avg_query_time = np.mean(query_times)
-            accuracy_loss = (1 - avg_ndcg) * 100
+            metrics = evaluate(
+                QdrantBackend(self.client, collection),
+                test_queries, vectors, truth_ids, truth_scores, k
+            )
+            accuracy_loss = (1 - metrics["recall"]) * 100
 
             results[collection] = {
-                "ndcg": avg_ndcg,
+                **metrics,
                 "accuracy_loss": accuracy_loss,
-                "avg_query_time_ms": avg_query_time
+                "avg_query_time_ms": metrics["mean_ms"]
             }
 
             print(f"\n  {collection}:")
-            print(f"    NDCG@{k}: {avg_ndcg:.4f}")
+            print(f"    Recall@{k}: {metrics['recall']:.4f}")
+            print(f"    NDCG@{k}: {metrics['ndcg']:.4f}")
             print(f"    Accuracy loss: {accuracy_loss:.2f}%")
-            print(f"    Avg query time: {avg_query_time:.2f}ms")
+            print(f"    Latency p50/p95/p99: {metrics['p50_ms']:.2f} / {metrics['p95_ms']:.2f} / "
+                  f"{metrics['p99_ms']:.2f} ms")
 
             if accuracy_loss < 3:
                 print(f"    ✅ Excellent accuracy (<3% loss)")
@@ -336,10 +708,48 @@ class QdrantQuantizationBenchmark:
 
         return results
 
+    def save_results(
+        self,
+        path: str,
+        memory_stats: Dict[str, Dict[str, Any]],
+        accuracy_results: Dict[str, Dict[str, float]],
+        k: int = 10,
+        sweeps: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        load_tests: Optional[Dict[str, Dict[str, float]]] = None
+    ):
+        """
+        Write benchmark results keyed by quantization profile name (see write_results).
+
+        Args:
+            path: Output JSON file
+            memory_stats: Output of calculate_memory_usage per collection
+            accuracy_results: Output of benchmark_accuracy per collection
+            k: Result depth the accuracy was measured at
+            sweeps: Output of sweep_search_params per collection
+            load_tests: Output of load_test per collection
+        """
+        sweeps = sweeps or {}
+        load_tests = load_tests or {}
+        profiles = {}
+        for collection, profile_name in self.PROFILE_COLLECTIONS.items():
+            if collection not in accuracy_results:
+                continue
+            profiles[profile_name] = {
+                "collection": collection,
+                **profile_entry(accuracy_results[collection], memory_stats[collection]["bytes_per_vector"])
+            }
+            if collection in sweeps:
+                profiles[profile_name]["sweep"] = sweeps[collection]
+            if collection in load_tests:
+                profiles[profile_name]["load_test"] = load_tests[collection]
+
+        write_results(path, self.dimension, k, profiles)
+
     def compare_all_methods(
         self,
         n_vectors: int = 10000,
-        n_test_queries: int = 100
+        n_test_queries: int = 100,
+        results_file: str = None
     ):
         """
         Complete comparison of all quantization methods.
@@ -347,6 +757,7 @@ class QdrantQuantizationBenchmark:
         Args:
             n_vectors: Number of vectors to insert
             n_test_queries: Number of test queries for accuracy benchmark
+            results_file: Optional JSON path for per-profile results
         """
         print("=" * 70)
         print("Qdrant Quantization Methods Comparison")
@@ -354,13 +765,11 @@ class QdrantQuantizationBenchmark:
 
         # Generate sample data (replace with real embeddings in production)
         print(f"\n📊 Generating {n_vectors} sample vectors ({self.dimension} dimensions)...")
-        vectors = np.random.randn(n_vectors, self.dimension).astype(np.float32)
-
-        # Normalize vectors (required for cosine similarity)
-        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors, test_queries = generate_clustered_vectors(n_vectors, n_test_queries, self.dimension)
 
-        test_queries = np.random.randn(n_test_queries, self.dimension).astype(np.float32)
-        test_queries = test_queries / np.linalg.norm(test_queries, axis=1, keepdims=True)
+        # Exact neighbours for every test query (brute force)
+        k = 10
+        ground_truth = exact_ground_truth(vectors, test_queries, k=k)
 
         # Create collections with different quantization methods
         print("\n" + "=" * 70)
@@ -369,10 +778,10 @@ class QdrantQuantizationBenchmark:
 
         self.create_collection_no_quantization()
         self.create_collection_scalar_int8()
-        self.create_collection_asymmetric(compression_ratio=CompressionRatio.x8)
+        self.create_collection_asymmetric(compression_ratio=CompressionRatio.X8)
         self.create_collection_asymmetric(
             collection_name="docs_asymmetric_x16",
-            compression_ratio=CompressionRatio.x16
+            compression_ratio=CompressionRatio.X16
         )
         self.create_collection_binary()
 
@@ -422,20 +831,45 @@ class QdrantQuantizationBenchmark:
         print("Step 4: Accuracy Benchmark")
         print("=" * 70)
 
-        quantized_collections = [
-            "docs_scalar_int8",
-            "docs_asymmetric",
-            "docs_asymmetric_x16",
-            "docs_binary"
-        ]
-
         accuracy_results = self.benchmark_accuracy(
-            collections=quantized_collections,
+            collections=collections,
             test_queries=test_queries,
-            baseline_collection="docs_no_quant",
-            k=10
+            vectors=vectors,
+            ground_truth=ground_truth,
+            k=k
         )
 
+        # Search param sweeps: hnsw_ef for the baseline, plus oversampling/rescore when quantized
+        print("\n" + "=" * 70)
+        print("Step 5: Search Parameter Sweep")
+        print("=" * 70)
+
+        truth_ids, truth_scores = ground_truth
+        sweeps = {
+            "docs_no_quant": sweep_search_params(
+                QdrantBackend(self.client, "docs_no_quant"),
+                test_queries, vectors, truth_ids, truth_scores, k
+            ),
+            "docs_asymmetric": sweep_search_params(
+                QdrantBackend(self.client, "docs_asymmetric"),
+                test_queries, vectors, truth_ids, truth_scores, k,
+                hnsw_ef_values=(64, 128),
+                oversampling_values=(1.0, 2.0, 4.0),
+                rescore_values=(False, True)
+            )
+        }
+
+        # Throughput under concurrent load
+        print("\n" + "=" * 70)
+        print("Step 6: Concurrent Load Test")
+        print("=" * 70)
+
+        load_tests = {
+            collection: load_test(QdrantBackend(self.client, collection), test_queries, k,
+                                  concurrency=8, n_requests=n_test_queries * 10)
+            for collection in ("docs_no_quant", "docs_asymmetric")
+        }
+
         # Summary table
         print("\n" + "=" * 70)
         print("SUMMARY: Quantization Comparison")
@@ -445,7 +879,9 @@ class QdrantQuantizationBenchmark:
         print("-" * 95)
 
         summary_data = [
-            ("No Quantization", "1x", "6,144 bytes", "0%", "Baseline"),
+            ("No Quantization", "1x", "6,144 bytes",
+             f"{accuracy_results['docs_no_quant']['accuracy_loss']:.1f}%",
+             "Baseline"),
             ("Scalar INT8", "4x", "1,536 bytes",
              f"{accuracy_results['docs_scalar_int8']['accuracy_loss']:.1f}%",
              "General purpose"),
@@ -463,6 +899,10 @@ class QdrantQuantizationBenchmark:
         for method, compression, memory, loss, recommendation in summary_data:
             print(f"{method:<25} {compression:<12} {memory:<12} {loss:<15} {recommendation:<20}")
 
+        if results_file:
+            self.save_results(results_file, memory_stats, accuracy_results, k=k,
+                              sweeps=sweeps, load_tests=load_tests)
+
         print("\n" + "=" * 70)
         print("Key Insights")
         print("=" * 70)
@@ -486,15 +926,107 @@ class QdrantQuantizationBenchmark:
         print("   • Consider INT8 if accuracy is critical (<3% loss)")
 
 
-def example_usage():
+# InProcessIndex quantization -> quantization profile. bytes_per_dimension,
+# oversampling and rescore mirror QUANTIZATION_PROFILES in
+# phase3_qdrant/quantization_profiles.py (keep them in sync): recall is
+# recorded at the params the profile is queried with.
+IN_PROCESS_PROFILES = {
+    "none": {"profile": "no_quantization", "bytes_per_dimension": 4,
+             "oversampling": None, "rescore": None},
+    "scalar_int8": {"profile": "scalar_int8", "bytes_per_dimension": 1,
+                    "oversampling": 1.5, "rescore": True},
+    "binary": {"profile": "binary", "bytes_per_dimension": 1 / 8,
+               "oversampling": 3.0, "rescore": True},
+}
+
+
+def run_in_process_benchmark(
+    n_vectors: int = 20000,
+    n_test_queries: int = 200,
+    dimension: int = 1536,
+    k: int = 10,
+    results_file: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Same measurements against InProcessIndex stand-ins (no Qdrant server).
+
+    Useful for checking recall/oversampling trade-offs on real embeddings
+    before provisioning collections. Each profile is measured at its own
+    oversampling/rescore (IN_PROCESS_PROFILES); the sweep is supplementary.
+    With results_file, the results are written in the same format as the
+    Qdrant benchmark.
+    """
+    print("=" * 70)
+    print("In-Process Quantization Benchmark")
+    print("=" * 70)
+
+    print(f"\n📊 Generating {n_vectors} sample vectors ({dimension} dimensions)...")
+    vectors, queries = generate_clustered_vectors(n_vectors, n_test_queries, dimension)
+    truth_ids, truth_scores = exact_ground_truth(vectors, queries, k=k)
+
+    results = {}
+    for quantization in ("none", "scalar_int8", "binary"):
+        index = InProcessIndex(vectors, quantization)
+        quantized = quantization != "none"
+        sweep = sweep_search_params(
+            index, queries, vectors, truth_ids, truth_scores, k,
+            hnsw_ef_values=(None,),
+            oversampling_values=(1.0, 2.0, 4.0) if quantized else (None,),
+            rescore_values=(False, True) if quantized else (None,)
+        )
+        params = {key: IN_PROCESS_PROFILES[quantization][key] for key in ("oversampling", "rescore")}
+        print(f"\n🎯 {index.name} at profile params {params}:")
+        profile_metrics = evaluate(index, queries, vectors, truth_ids, truth_scores, k, **params)
+        print(f"  recall {profile_metrics['recall']:.4f}, ndcg {profile_metrics['ndcg']:.4f}, "
+              f"p50 {profile_metrics['p50_ms']:.2f} ms")
+        results[quantization] = {
+            "profile": {**params, **profile_metrics},
+            "best": max(sweep, key=lambda row: (row["recall"], -row["p50_ms"])),
+            "sweep": sweep,
+            "load_test": load_test(index, queries, k, concurrency=8,
+                                   n_requests=n_test_queries * 5, **params)
+        }
+
+    if results_file:
+        profiles = {}
+        for quantization, result in results.items():
+            profile = IN_PROCESS_PROFILES[quantization]
+            profiles[profile["profile"]] = {
+                "backend": "inprocess",
+                **profile_entry(result["profile"], int(dimension * profile["bytes_per_dimension"])),
+                "oversampling": profile["oversampling"],
+                "rescore": profile["rescore"],
+                "sweep": result["sweep"],
+                "load_test": result["load_test"]
+            }
+        write_results(results_file, dimension, k, profiles)
+
+    return results
+
+
+def example_usage(
+    backend: str = "qdrant",
+    n_vectors: int = 10000,
+    n_test_queries: int = 100,
+    results_file: str = "quantization_results.json"
+):
     """
     Complete example: create collections, insert vectors, benchmark accuracy and memory.
     """
+    if backend == "inprocess":
+        run_in_process_benchmark(n_vectors=n_vectors, n_test_queries=n_test_queries,
+                                 results_file=results_file)
+        return
+
     # Initialize benchmark
     benchmark = QdrantQuantizationBenchmark(host="localhost", port=6333)
 
-    # Run complete comparison with 10k vectors
-    benchmark.compare_all_methods(n_vectors=10000, n_test_queries=100)
+    # Run complete comparison and keep per-profile results
+    benchmark.compare_all_methods(
+        n_vectors=n_vectors,
+        n_test_queries=n_test_queries,
+        results_file=results_file
+    )
 
     print("\n" + "=" * 70)
     print("Example complete! Check Qdrant dashboard at http://localhost:6333/dashboard")
@@ -502,4 +1034,13 @@ def example_usage():
 
 
 if __name__ == "__main__":
-    example_usage()
+    parser = argparse.ArgumentParser(description="Qdrant quantization recall/latency benchmark")
+    parser.add_argument("--backend", choices=["qdrant", "inprocess"], default="qdrant",
+                        help="Local Qdrant server or in-process stand-in")
+    parser.add_argument("--vectors", type=int, default=10000, help="Number of vectors")
+    parser.add_argument("--queries", type=int, default=100, help="Number of test queries")
+    parser.add_argument("--results-file", default="quantization_results.json",
+                        help="JSON output for 01_create_collections.py --benchmark-results")
+    args = parser.parse_args()
+
+    example_usage(args.backend, args.vectors, args.queries, args.results_file)
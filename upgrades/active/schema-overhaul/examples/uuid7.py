@@ -0,0 +1,279 @@
+"""
+UUID v7 Generator (shared by the examples)
+
+Source: RFC 9562 (Universally Unique IDentifiers, May 2024), Section 5.7 and 6.2
+Verified: November 2025
+
+UUID v7 layout (128 bits):
+
+    48 bits  unix_ts_ms   Unix timestamp in milliseconds
+     4 bits  ver          0111
+    12 bits  rand_a       counter (high 12 bits)
+     2 bits  var          10
+    62 bits  rand_b       counter (low 30 bits) + 32 random bits
+
+Monotonicity (RFC 9562 Section 6.2, Method 1 - fixed-length dedicated counter):
+- The 42-bit counter is seeded randomly (top bit clear) at each new millisecond
+  and incremented per ID, so IDs from one generator always sort in creation
+  order, even within the same millisecond
+- Counter overflow or a clock that steps backwards advances the stored
+  timestamp instead of going back in time
+
+Features:
+- generate_uuid_v7(): one ID (thread-safe)
+- generate_many(n): n IDs from a single clock read and counter reservation,
+  built with NumPy (or int arithmetic when NumPy is not installed)
+- decode_uuid_v7() / uuid7_to_timestamp() / is_uuid_v7()
+- benchmark(): IDs per second for each method
+
+Usage:
+    from uuid7 import generate_uuid_v7, generate_many
+
+    entity_uuid = generate_uuid_v7()
+    chunk_uuids = generate_many(1_000_000)
+
+    python uuid7.py --n 1000000      # Run the microbenchmark
+"""
+
+import argparse
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # generate_many falls back to int arithmetic
+    np = None
+
+
+COUNTER_BITS = 42                          # rand_a (12) + high 30 bits of rand_b
+COUNTER_MAX = (1 << COUNTER_BITS) - 1
+COUNTER_SEED_BITS = COUNTER_BITS - 1       # top bit clear: ≥ 2^41 IDs before overflow
+RANDOM_BITS = 32                           # low bits of rand_b, random per ID
+LOW_COUNTER_MASK = (1 << 30) - 1
+
+VERSION_BITS = 0x7 << 12                   # in the 16-bit ver|rand_a field
+VARIANT_BITS = 0b10 << 62                  # in the 64-bit var|rand_b field
+
+# Output columns of the canonical 8-4-4-4-12 string
+DASH_POSITIONS = [8, 13, 18, 23]
+HEX_POSITIONS = [i for i in range(36) if i not in DASH_POSITIONS]
+
+
+class UUID7Generator:
+    """
+    Thread-safe, monotonic UUID v7 generator.
+
+    Only the (timestamp, counter) reservation runs under the lock; random
+    bits and string formatting happen outside it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._counter = 0
+
+    def _reserve(self, n: int) -> Tuple[int, int]:
+        """
+        Reserve n consecutive counter values.
+
+        Returns:
+            (timestamp_ms, first counter value)
+        """
+        if n > (1 << COUNTER_SEED_BITS):
+            raise ValueError(f"at most {1 << COUNTER_SEED_BITS} IDs per reservation")
+
+        now_ms = time.time_ns() // 1_000_000
+        with self._lock:
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                start = int.from_bytes(os.urandom(6), "big") >> (48 - COUNTER_SEED_BITS)
+            else:
+                # Same millisecond (or clock went backwards): keep counting
+                start = self._counter + 1
+            if start + n - 1 > COUNTER_MAX:
+                # Counter exhausted: borrow the next millisecond
+                self._last_ms += 1
+                start = int.from_bytes(os.urandom(6), "big") >> (48 - COUNTER_SEED_BITS)
+            self._counter = start + n - 1
+            return self._last_ms, start
+
+    def generate(self) -> str:
+        """Generate one UUID v7 string."""
+        timestamp_ms, counter = self._reserve(1)
+        value = (
+            (timestamp_ms << 80)
+            | ((VERSION_BITS | (counter >> 30)) << 64)
+            | VARIANT_BITS
+            | ((counter & LOW_COUNTER_MASK) << RANDOM_BITS)
+            | int.from_bytes(os.urandom(4), "big")
+        )
+        return _format_hex(f"{value:032x}")
+
+    def generate_many(self, n: int, use_numpy: Optional[bool] = None) -> List[str]:
+        """
+        Generate n UUID v7 strings, sorted in creation order.
+
+        Args:
+            n: Number of IDs
+            use_numpy: Force (True) or skip (False) the NumPy path (default: if installed)
+
+        Returns:
+            List of n UUID strings
+        """
+        if n <= 0:
+            return []
+        if use_numpy is None:
+            use_numpy = np is not None
+        if not use_numpy:
+            return self._generate_many_int(n)
+
+        raw = self.generate_many_bytes(n)
+        hex_digits = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+        out = np.empty((n, 36), dtype=np.uint8)
+        out[:, DASH_POSITIONS] = ord("-")
+        nibbles = np.empty((n, 32), dtype=np.uint8)
+        nibbles[:, 0::2] = hex_digits[raw >> 4]
+        nibbles[:, 1::2] = hex_digits[raw & 0x0F]
+        out[:, HEX_POSITIONS] = nibbles
+        return out.view("S36").ravel().astype("U36").tolist()
+
+    def generate_many_bytes(self, n: int) -> "np.ndarray":
+        """
+        Generate n UUID v7s as raw big-endian bytes (NumPy required).
+
+        Useful to skip string formatting entirely, e.g. for binary COPY.
+
+        Returns:
+            uint8 array of shape (n, 16)
+        """
+        if np is None:
+            raise ImportError("generate_many_bytes requires numpy")
+        timestamp_ms, start = self._reserve(n)
+        counters = np.arange(start, start + n, dtype=np.uint64)
+        random_bits = np.frombuffer(os.urandom(4 * n), dtype=">u4").astype(np.uint64)
+
+        words = np.empty((n, 2), dtype=">u8")
+        words[:, 0] = np.uint64((timestamp_ms << 16) | VERSION_BITS) | (counters >> np.uint64(30))
+        words[:, 1] = (
+            np.uint64(VARIANT_BITS)
+            | ((counters & np.uint64(LOW_COUNTER_MASK)) << np.uint64(RANDOM_BITS))
+            | random_bits
+        )
+        return words.view(np.uint8).reshape(n, 16)
+
+    def _generate_many_int(self, n: int) -> List[str]:
+        """generate_many without NumPy: one reservation, int arithmetic per ID."""
+        timestamp_ms, start = self._reserve(n)
+        prefix = timestamp_ms << 80 | VARIANT_BITS
+        random_bytes = os.urandom(4 * n)
+        ids = []
+        for i in range(n):
+            counter = start + i
+            value = (
+                prefix
+                | ((VERSION_BITS | (counter >> 30)) << 64)
+                | ((counter & LOW_COUNTER_MASK) << RANDOM_BITS)
+                | int.from_bytes(random_bytes[4 * i:4 * i + 4], "big")
+            )
+            ids.append(_format_hex(f"{value:032x}"))
+        return ids
+
+
+def _format_hex(h: str) -> str:
+    """32 hex digits -> canonical 8-4-4-4-12 UUID string."""
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+_default_generator = UUID7Generator()
+
+
+def generate_uuid_v7() -> str:
+    """Generate one UUID v7 (monotonic within this process)."""
+    return _default_generator.generate()
+
+
+def generate_many(n: int, use_numpy: Optional[bool] = None) -> List[str]:
+    """Generate n UUID v7s in creation order (see UUID7Generator.generate_many)."""
+    return _default_generator.generate_many(n, use_numpy)
+
+
+def uuid7_to_timestamp(value: Union[str, uuid.UUID]) -> int:
+    """Unix timestamp in milliseconds (the top 48 bits)."""
+    if not isinstance(value, uuid.UUID):
+        value = uuid.UUID(str(value))
+    return value.int >> 80
+
+
+def decode_uuid_v7(value: Union[str, uuid.UUID]) -> datetime:
+    """
+    Decode the creation time of a UUID v7.
+
+    Returns:
+        Timezone-aware UTC datetime (millisecond precision)
+    """
+    return datetime.fromtimestamp(uuid7_to_timestamp(value) / 1000, tz=timezone.utc)
+
+
+def is_uuid_v7(value: Union[str, uuid.UUID, None]) -> bool:
+    """True if value is a UUID with version 7 and the RFC 9562 variant."""
+    try:
+        parsed = value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    except (ValueError, TypeError):
+        return False
+    return parsed.version == 7 and parsed.variant == uuid.RFC_4122
+
+
+def benchmark(n: int = 1_000_000) -> Dict[str, float]:
+    """
+    Microbenchmark: IDs per second for each generation method.
+
+    Args:
+        n: IDs per method
+
+    Returns:
+        method -> nanoseconds per ID
+    """
+    generator = UUID7Generator()
+    methods = {
+        "uuid.uuid4() (baseline)": lambda: [str(uuid.uuid4()) for _ in range(n)],
+        "generate() per ID": lambda: [generator.generate() for _ in range(n)],
+        "generate_many (int)": lambda: generator.generate_many(n, use_numpy=False),
+    }
+    if np is not None:
+        methods["generate_many (numpy)"] = lambda: generator.generate_many(n, use_numpy=True)
+        methods["generate_many_bytes (numpy)"] = lambda: generator.generate_many_bytes(n)
+
+    print(f"\n📊 UUID generation benchmark ({n:,} IDs per method):")
+    print(f"   {'method':<30} {'ns/ID':>8} {'IDs/s':>14}")
+    results = {}
+    for name, fn in methods.items():
+        start_time = time.perf_counter()
+        ids = fn()
+        elapsed = time.perf_counter() - start_time
+        results[name] = elapsed / n * 1e9
+        print(f"   {name:<30} {results[name]:>8.0f} {n / elapsed:>14,.0f}")
+
+        if isinstance(ids, list) and name != "uuid.uuid4() (baseline)":
+            # Monotonic and unique (a sorted, strictly increasing list)
+            assert all(a < b for a, b in zip(ids, ids[1:])), f"{name}: IDs out of order"
+            assert is_uuid_v7(ids[0]) and is_uuid_v7(ids[-1]), f"{name}: not UUID v7"
+
+    print("   ✅ All v7 methods produced strictly increasing, valid UUID v7s")
+    return results
+
+
+def main():
+    """Run the UUID v7 microbenchmark."""
+    parser = argparse.ArgumentParser(description="UUID v7 generation microbenchmark")
+    parser.add_argument("--n", type=int, default=1_000_000, help="IDs per method")
+    args = parser.parse_args()
+
+    benchmark(args.n)
+
+
+if __name__ == "__main__":
+    main()
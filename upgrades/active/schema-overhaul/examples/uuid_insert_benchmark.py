@@ -0,0 +1,361 @@
+"""
+UUID Insert Benchmark Suite
+
+Source: postgresql-research.md (UUID v7 index locality)
+Source: RFC 9562 (UUID v7)
+Verified: November 2025
+
+Measures what primary-key choice does to PostgreSQL inserts, with round-trip
+latency taken out of the picture:
+- Key types: uuid_v4 (random), uuid_v7 (time-ordered), bigserial
+- Load methods: multi-row INSERT or COPY, N rows per statement and commit
+- Concurrent writers (one connection each, keys interleaved across writers)
+- Table sizes beyond shared_buffers (--beyond-shared-buffers FACTOR)
+
+Reported per run:
+- rows/s
+- WAL bytes (pg_current_wal_lsn diff) and full-page images (pg_stat_wal, PG 14+)
+- Primary-key index size, leaf density and fragmentation (pgstattuple)
+- Leaf page splits: B-tree leaf pages are only ever added by splitting, so
+  a fresh index has leaf_pages - 1 splits
+
+Random keys split pages in the middle (leaves end up ~50-70% full, all of
+them hot), time-ordered keys split at the right edge (~90% full, only the
+last leaf is hot). The gap grows once the index no longer fits in
+shared_buffers.
+
+Requirements:
+    pip install psycopg2-binary numpy
+    PostgreSQL with the pgstattuple extension (contrib), or initdb/pg_ctl on
+    PATH for --throwaway
+
+Usage:
+    python uuid_insert_benchmark.py --throwaway
+    python uuid_insert_benchmark.py --conn postgresql://localhost/bench --rows 1000000
+    python uuid_insert_benchmark.py --throwaway --shared-buffers 128MB --beyond-shared-buffers 4 \\
+        --methods copy --batch-sizes 10000 --writers 1 4
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator, List, Optional
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from uuid7 import generate_many
+
+KEY_TYPES = ("uuid_v4", "uuid_v7", "bigserial")
+METHODS = ("insert", "copy")
+
+# Heap bytes per row besides the payload (tuple header, key, name, value, line pointer)
+ROW_OVERHEAD_BYTES = 80
+
+
+@dataclass
+class BenchmarkConfig:
+    """Benchmark matrix: every key type × method × batch size × writer count."""
+    rows: int = 200_000
+    key_types: List[str] = field(default_factory=lambda: list(KEY_TYPES))
+    methods: List[str] = field(default_factory=lambda: list(METHODS))
+    batch_sizes: List[int] = field(default_factory=lambda: [1000])
+    writers: List[int] = field(default_factory=lambda: [1])
+    payload_bytes: int = 100
+    beyond_shared_buffers: Optional[float] = None   # size rows to FACTOR × shared_buffers
+
+
+@dataclass
+class BenchmarkResult:
+    """One benchmark run."""
+    key_type: str
+    method: str
+    batch_size: int
+    writers: int
+    rows: int
+    seconds: float
+    rows_per_sec: float
+    wal_bytes: int
+    wal_fpi: Optional[int]
+    table_bytes: int
+    index_bytes: int
+    index_leaf_pages: Optional[int] = None
+    leaf_splits: Optional[int] = None
+    avg_leaf_density: Optional[float] = None
+    leaf_fragmentation: Optional[float] = None
+
+
+@contextmanager
+def throwaway_postgres(shared_buffers: str = "128MB") -> Iterator[str]:
+    """
+    Start a temporary PostgreSQL cluster and remove it afterwards.
+
+    The cluster uses a small shared_buffers so tables quickly outgrow it.
+    Needs initdb and pg_ctl on PATH.
+
+    Yields:
+        Connection string for the "postgres" database (trust auth)
+    """
+    for binary in ("initdb", "pg_ctl"):
+        if shutil.which(binary) is None:
+            raise RuntimeError(f"{binary} not found on PATH (needed for --throwaway)")
+
+    data_dir = tempfile.mkdtemp(prefix="uuid-bench-")
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    try:
+        subprocess.run(["initdb", "-D", data_dir, "-U", "bench", "--auth=trust"],
+                       check=True, capture_output=True)
+        options = f"-p {port} -k {data_dir} -c listen_addresses=127.0.0.1 -c shared_buffers={shared_buffers}"
+        subprocess.run(["pg_ctl", "-D", data_dir, "-o", options, "-l", os.path.join(data_dir, "server.log"),
+                        "-w", "start"], check=True, capture_output=True)
+        print(f"✅ Throwaway PostgreSQL on port {port} (shared_buffers={shared_buffers})")
+        try:
+            yield f"postgresql://bench@127.0.0.1:{port}/postgres"
+        finally:
+            subprocess.run(["pg_ctl", "-D", data_dir, "-m", "fast", "-w", "stop"], capture_output=True)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+class InsertBenchmark:
+    """Run the insert benchmark matrix against one PostgreSQL database."""
+
+    def __init__(self, conn_string: str, config: Optional[BenchmarkConfig] = None):
+        self.conn_string = conn_string
+        self.config = config or BenchmarkConfig()
+        self.conn = psycopg2.connect(conn_string)
+        self.conn.autocommit = True
+        self.has_pgstattuple = self._enable_pgstattuple()
+        self.has_pg_stat_wal = self._scalar("SELECT to_regclass('pg_stat_wal') IS NOT NULL")
+        self.shared_buffers_bytes = self._scalar(
+            "SELECT setting::bigint * pg_size_bytes(unit) FROM pg_settings WHERE name = 'shared_buffers'"
+        )
+
+    def _scalar(self, sql: str, params: tuple = ()) -> Any:
+        with self.conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchone()[0]
+
+    def _enable_pgstattuple(self) -> bool:
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("CREATE EXTENSION IF NOT EXISTS pgstattuple")
+            return True
+        except psycopg2.Error as e:
+            print(f"⚠️  pgstattuple unavailable, index density not reported: {e.pgerror or e}")
+            return False
+
+    def rows_for_run(self) -> int:
+        """Rows per run (sized from shared_buffers if beyond_shared_buffers is set)."""
+        factor = self.config.beyond_shared_buffers
+        if not factor:
+            return self.config.rows
+        row_bytes = self.config.payload_bytes + ROW_OVERHEAD_BYTES
+        return int(math.ceil(factor * self.shared_buffers_bytes / row_bytes))
+
+    def _create_table(self, table: str, key_type: str):
+        key_column = "id BIGSERIAL PRIMARY KEY" if key_type == "bigserial" else "id UUID PRIMARY KEY"
+        with self.conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {table}")
+            cur.execute(f"""
+                CREATE TABLE {table} (
+                    {key_column},
+                    name TEXT NOT NULL,
+                    value INTEGER,
+                    payload TEXT
+                )
+            """)
+
+    @staticmethod
+    def _generate_keys(key_type: str, n: int) -> Optional[List[str]]:
+        """Keys minted before timing starts (bigserial keys come from the server)."""
+        if key_type == "uuid_v4":
+            return [str(uuid.uuid4()) for _ in range(n)]
+        if key_type == "uuid_v7":
+            return generate_many(n)
+        return None
+
+    def _write(self, table: str, method: str, batch_size: int, rows: List[tuple], has_key: bool):
+        """One writer: its rows in statements of batch_size rows, one commit each."""
+        columns = "(id, name, value, payload)" if has_key else "(name, value, payload)"
+        conn = psycopg2.connect(self.conn_string)
+        try:
+            with conn.cursor() as cur:
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    if method == "copy":
+                        buffer = io.StringIO("".join("\t".join(map(str, row)) + "\n" for row in batch))
+                        cur.copy_expert(f"COPY {table} {columns} FROM STDIN", buffer)
+                    else:
+                        execute_values(cur, f"INSERT INTO {table} {columns} VALUES %s",
+                                       batch, page_size=batch_size)
+                    conn.commit()
+        finally:
+            conn.close()
+
+    def _wal_fpi(self) -> Optional[int]:
+        return self._scalar("SELECT wal_fpi FROM pg_stat_wal") if self.has_pg_stat_wal else None
+
+    def run_one(self, key_type: str, method: str, batch_size: int, writers: int, n_rows: int) -> BenchmarkResult:
+        """Insert n_rows into a fresh table and measure it."""
+        table = f"bench_{key_type}"
+        self._create_table(table, key_type)
+
+        keys = self._generate_keys(key_type, n_rows)
+        payload = "x" * self.config.payload_bytes
+        if keys is None:
+            rows = [(f"Entity {i}", i, payload) for i in range(n_rows)]
+        else:
+            rows = [(keys[i], f"Entity {i}", i, payload) for i in range(n_rows)]
+        # Round-robin: concurrent writers insert interleaved keys, as live writers would
+        per_writer = [rows[w::writers] for w in range(writers)]
+
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("CHECKPOINT")            # comparable full-page-image baseline
+        except psycopg2.Error:
+            pass                                     # needs superuser / pg_checkpoint
+        wal_start = self._scalar("SELECT pg_current_wal_lsn()")
+        fpi_start = self._wal_fpi()
+
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=writers) as pool:
+            for future in [pool.submit(self._write, table, method, batch_size, chunk, keys is not None)
+                           for chunk in per_writer]:
+                future.result()
+        seconds = time.perf_counter() - start_time
+
+        wal_bytes = int(self._scalar("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s::pg_lsn)", (wal_start,)))
+        fpi_end = self._wal_fpi()
+
+        result = BenchmarkResult(
+            key_type=key_type,
+            method=method,
+            batch_size=batch_size,
+            writers=writers,
+            rows=n_rows,
+            seconds=seconds,
+            rows_per_sec=n_rows / seconds,
+            wal_bytes=wal_bytes,
+            wal_fpi=None if fpi_start is None else fpi_end - fpi_start,
+            table_bytes=self._scalar("SELECT pg_table_size(%s)", (table,)),
+            index_bytes=self._scalar("SELECT pg_relation_size(%s)", (f"{table}_pkey",)),
+        )
+
+        if self.has_pgstattuple:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT leaf_pages, avg_leaf_density, leaf_fragmentation FROM pgstatindex(%s)",
+                            (f"{table}_pkey",))
+                leaf_pages, density, fragmentation = cur.fetchone()
+            result.index_leaf_pages = leaf_pages
+            result.leaf_splits = max(0, leaf_pages - 1)
+            result.avg_leaf_density = float(density)
+            result.leaf_fragmentation = float(fragmentation)
+
+        with self.conn.cursor() as cur:
+            cur.execute(f"DROP TABLE {table}")
+        return result
+
+    def run(self) -> List[BenchmarkResult]:
+        """Run the full matrix and print a results table."""
+        n_rows = self.rows_for_run()
+        print(f"\n📊 Insert benchmark: {n_rows:,} rows per run, "
+              f"~{n_rows * (self.config.payload_bytes + ROW_OVERHEAD_BYTES) / self.shared_buffers_bytes:.1f}"
+              f"× shared_buffers ({self.shared_buffers_bytes / 1024 ** 2:.0f} MB)")
+
+        results = []
+        for method in self.config.methods:
+            for batch_size in self.config.batch_sizes:
+                for writers in self.config.writers:
+                    for key_type in self.config.key_types:
+                        print(f"🔄 {key_type} / {method} / batch {batch_size} / {writers} writer(s)...")
+                        results.append(self.run_one(key_type, method, batch_size, writers, n_rows))
+
+        self.print_results(results)
+        return results
+
+    @staticmethod
+    def print_results(results: List[BenchmarkResult]):
+        """Print one line per run."""
+        print(f"\n{'key':<10} {'method':<7} {'batch':>6} {'wr':>3} {'rows/s':>10} {'WAL MB':>8} "
+              f"{'WAL B/row':>9} {'FPI':>8} {'idx MB':>7} {'splits':>7} {'density':>8} {'frag':>6}")
+        for r in results:
+            density = f"{r.avg_leaf_density:.1f}%" if r.avg_leaf_density is not None else "-"
+            fragmentation = f"{r.leaf_fragmentation:.1f}%" if r.leaf_fragmentation is not None else "-"
+            print(f"{r.key_type:<10} {r.method:<7} {r.batch_size:>6} {r.writers:>3} "
+                  f"{r.rows_per_sec:>10,.0f} {r.wal_bytes / 1024 ** 2:>8.1f} {r.wal_bytes / r.rows:>9.0f} "
+                  f"{r.wal_fpi if r.wal_fpi is not None else '-':>8} {r.index_bytes / 1024 ** 2:>7.1f} "
+                  f"{r.leaf_splits if r.leaf_splits is not None else '-':>7} {density:>8} {fragmentation:>6}")
+
+    def close(self):
+        """Close the control connection."""
+        self.conn.close()
+
+
+def main():
+    """Parse arguments and run the benchmark matrix."""
+    parser = argparse.ArgumentParser(description="UUID v4 / v7 / bigserial insert benchmark")
+    parser.add_argument("--conn", default=os.getenv("BENCH_POSTGRES_URL"),
+                        help="PostgreSQL connection string (default: $BENCH_POSTGRES_URL)")
+    parser.add_argument("--throwaway", action="store_true",
+                        help="Run against a temporary cluster (initdb/pg_ctl on PATH)")
+    parser.add_argument("--shared-buffers", default="128MB", help="shared_buffers for --throwaway")
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows per run")
+    parser.add_argument("--beyond-shared-buffers", type=float, metavar="FACTOR",
+                        help="Size rows so each table is FACTOR × shared_buffers (overrides --rows)")
+    parser.add_argument("--key-types", nargs="+", choices=KEY_TYPES, default=list(KEY_TYPES))
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 100, 1000])
+    parser.add_argument("--writers", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--payload-bytes", type=int, default=100)
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    if not args.throwaway and not args.conn:
+        parser.error("pass --conn (or set BENCH_POSTGRES_URL) or --throwaway")
+
+    config = BenchmarkConfig(
+        rows=args.rows,
+        key_types=args.key_types,
+        methods=args.methods,
+        batch_sizes=args.batch_sizes,
+        writers=args.writers,
+        payload_bytes=args.payload_bytes,
+        beyond_shared_buffers=args.beyond_shared_buffers,
+    )
+
+    def run(conn_string: str) -> List[BenchmarkResult]:
+        benchmark = InsertBenchmark(conn_string, config)
+        try:
+            return benchmark.run()
+        finally:
+            benchmark.close()
+
+    if args.throwaway:
+        with throwaway_postgres(args.shared_buffers) as conn_string:
+            results = run(conn_string)
+    else:
+        results = run(args.conn)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+        print(f"\n✅ Results saved to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()